@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_background.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : background mode of the main window (hidden or minimized)
+* - The window is watched by an event filter (shown, hidden, minimized, restored)
+* - In background, the changes of the tasks are still applied and saved, but the view
+*   (list, status bar) is not refreshed : the events are kept, and the updates of the
+*   window are suspended (no repaint is even requested)
+* - When the window is back, the view is refreshed once with all the events kept
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+from PyQt5 import QtCore
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttBackgroundMode : tells if the window is in background, and keeps the events not displayed meanwhile
+class PttBackgroundMode(QtCore.QObject):
+    def __init__(self, p_refresh_view):
+        super().__init__()
+        self.refresh_view = p_refresh_view
+        self.window = None
+        self.active = False
+        self.pending_events = []
+        self.nbr_refreshes_deferred = 0
+
+    # Method watch : watches the window (its view is refreshed with the events kept when it's back)
+    def watch(self, p_window):
+        self.window = p_window
+        p_window.installEventFilter(self)
+
+        # Note : the window is hidden while it's destroyed at the exit, it must not be watched anymore
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(self.unwatch)
+
+    # Method unwatch : stops watching the window
+    def unwatch(self):
+
+        if self.window is not None:
+            self.window.removeEventFilter(self)
+            self.window = None
+
+    # Method eventFilter : enters or leaves the background mode when the window is hidden, minimized or shown again
+    def eventFilter(self, p_watched, p_event):
+
+        if p_event.type() in (QtCore.QEvent.Show, QtCore.QEvent.Hide, QtCore.QEvent.WindowStateChange):
+            self.set_active(p_watched.isVisible() is False or p_watched.isMinimized() is True)
+
+        return False
+
+    # Method set_active : enters or leaves the background mode
+    def set_active(self, p_active: bool):
+
+        if p_active == self.active:
+            return
+
+        self.active = p_active
+
+        # Note : a repaint of the whole window is requested once when the updates are enabled again
+        if self.window is not None:
+            self.window.setUpdatesEnabled(p_active is False)
+
+        if p_active is False:
+            w_pending_events = self.pending_events
+            self.pending_events = []
+            self.refresh_view(w_pending_events)
+
+    # Method defer : keeps the events if in background (returns True), so the view is refreshed later
+    def defer(self, p_events: list):
+
+        if self.active is False:
+            return False
+
+        self.pending_events.extend(p_events)
+        self.nbr_refreshes_deferred = self.nbr_refreshes_deferred + 1
+
+        return True
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_backup.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : rotating backups of my_tasks.json
+* - Each backup (= generation) is a gzip file named my_tasks_YYYYMMDD_HHMMSS_<hash>.json.gz
+* - A generation is not created if the content didn't change since the latest one,
+*   or if the file is empty or corrupted (so it can't replace the good backups)
+* - The retention keeps the latest generation of the N last hours, days and weeks
+* - The backups are written in a background thread (the startup is not delayed)
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import re
+import gzip
+import locale
+import hashlib
+import datetime
+import threading
+from ptt_clock import get_ptt_clock
+from ptt_tasks_blocks import decode_tasks_content
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Generation file names : my_tasks_YYYYMMDD_HHMMSS_<1st 16 characters of the sha256 of the content>.json.gz
+glb_backup_prefix = "my_tasks_"
+glb_backup_suffix = ".json.gz"
+glb_backup_datetime_format = "%Y%m%d_%H%M%S"
+glb_backup_name_pattern = re.compile(r"^my_tasks_(\d{8}_\d{6})_([0-9a-f]{16})\.json\.gz$")
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttBackupRetention : number of hourly/daily/weekly generations kept
+class PttBackupRetention:
+    def __init__(self, p_hourly: int = 24, p_daily: int = 7, p_weekly: int = 8):
+        self.hourly = p_hourly
+        self.daily = p_daily
+        self.weekly = p_weekly
+
+
+# Class PttBackupManager : creates the generations of my_tasks.json and removes the ones out of the retention
+class PttBackupManager:
+    def __init__(self, p_my_tasks_json: str, p_backups_dir: str, p_retention: PttBackupRetention):
+        self.my_tasks_json = p_my_tasks_json
+        self.backups_dir = p_backups_dir
+        self.retention = p_retention
+        self.lock = threading.Lock()
+        self.thread = None
+
+    # Method create_backup_in_background : creates a generation in a background thread
+    def create_backup_in_background(self):
+
+        # A backup already in progress is enough
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.thread = threading.Thread(target=self.create_backup, name="ptt_backup")
+        self.thread.start()
+
+    # Method wait : waits for the end of the backup in progress (at the application exit)
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+
+    # Method list_generations : returns the generations found (datetime, content hash, path), the newest first
+    def list_generations(self):
+
+        # Miscellaneous initializations
+        w_generations = []
+
+        try:
+            w_file_names = os.listdir(self.backups_dir)
+        except FileNotFoundError:
+            return w_generations
+
+        for w_file_name in w_file_names:
+            w_match = glb_backup_name_pattern.match(w_file_name)
+            if w_match is not None:
+                w_datetime = datetime.datetime.strptime(w_match.group(1), glb_backup_datetime_format)
+                w_generations.append((w_datetime, w_match.group(2), os.path.join(self.backups_dir, w_file_name)))
+
+        w_generations.sort(reverse=True)
+        return w_generations
+
+    # Method create_backup : creates a new generation if the content is valid and changed, then applies the retention
+    def create_backup(self):
+
+        with self.lock:
+
+            # Reading the current file
+            try:
+                with open(self.my_tasks_json, "rb") as file:
+                    w_content = file.read()
+            except FileNotFoundError:
+                print("PttBackupManager.create_backup : file '{}' not found".format(self.my_tasks_json))
+                return None
+            except IOError:
+                print("PttBackupManager.create_backup : cannot open the '{}' file".format(self.my_tasks_json))
+                return None
+
+            # An empty or corrupted file must never become a backup
+            if is_valid_tasks_content(w_content) is False:
+                print("PttBackupManager.create_backup : empty or invalid '{}' file, no backup created"
+                      .format(self.my_tasks_json))
+                return None
+
+            # Nothing to do if the latest generation has the same content
+            w_content_hash = hashlib.sha256(w_content).hexdigest()[:16]
+            w_generations = self.list_generations()
+            if w_generations and w_generations[0][1] == w_content_hash:
+                return None
+
+            # Writing the new generation (temporary file first, so a generation is never half written)
+            w_now = get_ptt_clock().now()
+            w_backup_path = os.path.join(self.backups_dir, "{}{}_{}{}".format(
+                glb_backup_prefix, w_now.strftime(glb_backup_datetime_format), w_content_hash, glb_backup_suffix))
+            w_backup_path_tmp = w_backup_path + ".tmp"
+
+            try:
+                os.makedirs(self.backups_dir, exist_ok=True)
+                with gzip.open(w_backup_path_tmp, "wb") as file:
+                    file.write(w_content)
+                os.replace(w_backup_path_tmp, w_backup_path)
+            except OSError:
+                print("PttBackupManager.create_backup : cannot write in the '{}' file".format(w_backup_path))
+                return None
+
+            # Removing the generations out of the retention
+            self.apply_retention()
+
+            return w_backup_path
+
+    # Method apply_retention : keeps the latest generation of each of the last hours/days/weeks
+    def apply_retention(self):
+
+        # Miscellaneous initializations
+        w_generations = self.list_generations()
+        w_paths_to_keep = set()
+
+        # The latest generation is always kept
+        if w_generations:
+            w_paths_to_keep.add(w_generations[0][2])
+
+        # For each period, the newest generation of each of the N latest periods is kept
+        for w_nbr_periods, w_get_period in [
+                (self.retention.hourly, lambda p_datetime: p_datetime.strftime("%Y%m%d%H")),
+                (self.retention.daily, lambda p_datetime: p_datetime.strftime("%Y%m%d")),
+                (self.retention.weekly, lambda p_datetime: p_datetime.isocalendar()[:2])]:
+
+            w_periods_seen = set()
+            for w_datetime, w_content_hash, w_path in w_generations:
+                w_period = w_get_period(w_datetime)
+                if w_period not in w_periods_seen and len(w_periods_seen) < w_nbr_periods:
+                    w_periods_seen.add(w_period)
+                    w_paths_to_keep.add(w_path)
+
+        # Removing the other generations
+        for w_datetime, w_content_hash, w_path in w_generations:
+            if w_path not in w_paths_to_keep:
+                try:
+                    os.remove(w_path)
+                except OSError:
+                    print("PttBackupManager.apply_retention : cannot remove the '{}' file".format(w_path))
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function is_valid_tasks_content : checks the content is a tasks file with at least one task
+def is_valid_tasks_content(p_content: bytes):
+
+    # Note : my_tasks.json is written with the default encoding of the system (like the open() default)
+    # A file with damaged blocks is not valid either (the backups must keep the tasks it lost)
+    try:
+        w_tasks_content = decode_tasks_content(p_content.decode(locale.getpreferredencoding(False)))
+        return w_tasks_content.is_damaged() is False and len(w_tasks_content.task_records) > 0
+    except ValueError:
+        return False
@@ -0,0 +1,1180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_bench.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : benchmarks of PTT, on synthetic tasks (nothing is read or written in /data)
+* - Each measure of memory is made in its own process, so the results don't interfere
+* - The Qt benchmarks run with the "offscreen" platform if no platform is set
+* --------------------------------------------------------------------------------- *
+To run a benchmark, go in the ptt (root) folder then :
+python ptt_bench.py descriptions --tasks 200000
+python ptt_bench.py export --tasks 10000 100000 300000
+python ptt_bench.py memory --tasks 1000 10000 100000 --baseline data/ptt_bench_memory.json
+python ptt_bench.py report --years 5 --tasks-per-day 100 --workers 1 2 4 8
+python ptt_bench.py store --processes 1 2 4 8 --operations 200
+python ptt_bench.py heatmap --years 1 5 20
+python ptt_bench.py codecs --tasks 10000 100000
+python ptt_bench.py background --tasks 1000 --ticks 60
+python ptt_bench.py replication --tasks 10000 --latency 50 --saves 20
+python ptt_bench.py billing --users 50 --tasks-per-user 2000
+python ptt_bench.py edit --tasks 10000 100000 --edits 50
+python ptt_bench.py workspaces --workspaces 8 --tasks 20000 --budgets 0 32 128 --switches 100
+python ptt_bench.py layout --tasks 10000 100000
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import datetime
+import argparse
+import subprocess
+import tempfile
+import tracemalloc
+from ptt_memory import get_resident_memory_in_kb
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Seed of the synthetic tasks (the same tasks are generated at each run)
+glb_bench_seed = 2020
+
+# Memory benchmark : maximum growth allowed when my tasks are loaded again (leak), and vs the baseline (regression)
+glb_bench_max_reload_growth_in_percent = 10
+glb_bench_max_baseline_growth_in_percent = 10
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function generate_task_records : generates tasks like PTT does (splits at 8h, same tickets again and again...)
+def generate_task_records(p_nbr_tasks: int, p_nbr_descriptions: int = 2000, p_seed: int = glb_bench_seed):
+
+    # Miscellaneous initializations
+    w_random = random.Random(p_seed)
+    w_descriptions = ["TICKET-{} : {}".format(1000 + w_index, w_random.choice(
+        ["Analyse", "Développement", "Réunion", "Support client", "Recette", "Documentation"]))
+        for w_index in range(p_nbr_descriptions)]
+    w_started_on = datetime.datetime(2015, 1, 5, 8, 0)
+    w_task_records = []
+
+    while len(w_task_records) < p_nbr_tasks:
+
+        # Some tickets come back much more often than the others
+        w_description = w_descriptions[int(w_random.paretovariate(1.2)) % p_nbr_descriptions]
+        w_duration_in_min = w_random.randint(1, 600)
+
+        # Splitting the tasks over 8h like add_duration_to_task_at_row does
+        while w_duration_in_min > 0 and len(w_task_records) < p_nbr_tasks:
+            w_task_duration_in_min = min(w_duration_in_min, 480)
+            w_task_records.append({
+                "task_id": "{:032x}".format(w_random.getrandbits(128)),
+                "started_on": w_started_on.strftime("%d/%m/%Y %H:%M"),
+                "duration": "{:02d}:{:02d}".format(w_task_duration_in_min // 60, w_task_duration_in_min % 60),
+                "description": w_description})
+            w_started_on = w_started_on + datetime.timedelta(minutes=w_task_duration_in_min)
+            w_duration_in_min = w_duration_in_min - w_task_duration_in_min
+
+    # Like PTT, the latest task is the 1st one
+    w_task_records.reverse()
+    return w_task_records
+
+
+# Function generate_tasks_content : returns the synthetic tasks as the content of a my_tasks.json file
+def generate_tasks_content(p_nbr_tasks: int):
+    return json.dumps({"tasks": generate_task_records(p_nbr_tasks)}, indent=4, ensure_ascii=False)
+
+
+# Function run_worker : runs a measure in its own process and returns its JSON result
+def run_worker(p_arguments: list):
+
+    w_environment = dict(os.environ)
+    w_environment.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    w_output = subprocess.run([sys.executable, os.path.abspath(__file__)] + p_arguments, env=w_environment,
+                              stdout=subprocess.PIPE, check=True).stdout
+    return json.loads(w_output.decode("utf-8").strip().splitlines()[-1])
+
+
+# Function print_table : prints a simple text table
+def print_table(p_headers: list, p_rows: list):
+
+    w_widths = [max(len(str(w_value)) for w_value in [w_header] + [w_row[w_index] for w_row in p_rows])
+                for w_index, w_header in enumerate(p_headers)]
+
+    print(" | ".join(str(w_header).ljust(w_width) for w_header, w_width in zip(p_headers, w_widths)))
+    print("-+-".join("-" * w_width for w_width in w_widths))
+    for w_row in p_rows:
+        print(" | ".join(str(w_value).ljust(w_width) for w_value, w_width in zip(w_row, w_widths)))
+
+
+# ------------------------------------------- #
+# Benchmark : descriptions (memory of the list of tasks, descriptions as texts or as ids of distinct texts)
+# Note : PTT keeps the texts in the list, the ids only saved about 4% with 100k or 200k tasks (see ptt_descriptions.py)
+# ------------------------------------------- #
+
+# Function bench_descriptions_worker : loads the synthetic tasks in a QTableWidget like load_tasks_from_file does
+def bench_descriptions_worker(p_mode: str, p_nbr_tasks: int):
+
+    from PyQt5 import QtWidgets
+    from PyQt5.QtWidgets import QTableWidgetItem
+    from PyQt5.QtCore import Qt
+
+    w_app = QtWidgets.QApplication([])
+    w_lst_tasks = QtWidgets.QTableWidget(0, 3)
+    w_description_ids = {}
+
+    # The content is generated before the 1st measure, then parsed like a real file (one string per task)
+    # Note : the records parsed are still held at the 2nd measure in both modes, so only the list makes the difference
+    # (freeing them first would only measure how the Python allocator gives the memory back)
+    w_content = generate_tasks_content(p_nbr_tasks)
+    gc.collect()
+    w_memory_before_in_kb = get_resident_memory_in_kb()
+
+    w_task_records = json.loads(w_content)["tasks"]
+    w_lst_tasks.setRowCount(len(w_task_records))
+
+    for w_row, w_task_record in enumerate(w_task_records):
+
+        w_lst_tasks.setItem(w_row, 0, QTableWidgetItem(w_task_record["started_on"]))
+        w_lst_tasks.setItem(w_row, 1, QTableWidgetItem(w_task_record["duration"]))
+
+        if p_mode == "text":
+            w_lst_tasks.setItem(w_row, 2, QTableWidgetItem(w_task_record["description"]))
+        else:
+            w_cell2_qtwi = QTableWidgetItem()
+            w_cell2_qtwi.setData(Qt.UserRole, w_description_ids.setdefault(w_task_record["description"],
+                                                                           len(w_description_ids)))
+            w_lst_tasks.setItem(w_row, 2, w_cell2_qtwi)
+
+    gc.collect()
+    w_memory_after_in_kb = get_resident_memory_in_kb()
+
+    print(json.dumps({"mode": p_mode, "tasks": len(w_task_records),
+                      "descriptions": len(w_description_ids),
+                      "memory_in_kb": w_memory_after_in_kb - w_memory_before_in_kb}))
+    w_app.quit()
+
+
+# Function bench_descriptions : compares the memory used by the list with plain text or interned descriptions
+def bench_descriptions(p_nbr_tasks: int):
+
+    w_rows = []
+    w_reference_in_kb = 0
+
+    for w_mode in ["text", "interned"]:
+        w_result = run_worker(["descriptions-worker", "--mode", w_mode, "--tasks", str(p_nbr_tasks)])
+        if w_mode == "text":
+            w_reference_in_kb = w_result["memory_in_kb"]
+        w_rows.append([w_mode, w_result["tasks"], w_result["descriptions"],
+                       "{:.1f}".format(w_result["memory_in_kb"] / 1024),
+                       "{:+.1f} %".format(100 * (w_result["memory_in_kb"] - w_reference_in_kb) / max(w_reference_in_kb, 1))])
+
+    print_table(["mode", "tasks", "distinct descriptions", "resident memory (MB)", "vs text"], w_rows)
+
+
+# ------------------------------------------- #
+# Benchmark : export (peak memory of a streaming export, whatever the number of tasks)
+# ------------------------------------------- #
+
+# Function bench_export_worker : measures the peak of Python memory of an export, or of a plain json.load
+def bench_export_worker(p_mode: str, p_nbr_tasks: int):
+
+    from ptt_export import PttExportFilter, export_tasks
+
+    with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+        w_tasks_path = os.path.join(w_tmp_dir, "my_tasks.json")
+        with open(w_tasks_path, "w") as file:
+            file.write(generate_tasks_content(p_nbr_tasks))
+
+        # Note : the duration is measured in a 1st run, since tracemalloc slows down the 2nd one a lot
+        for w_traced in [False, True]:
+
+            gc.collect()
+            if w_traced is True:
+                tracemalloc.start()
+            w_time_start = datetime.datetime.now()
+
+            if p_mode == "stream":
+                export_tasks(w_tasks_path, os.path.join(w_tmp_dir, "export.csv"), PttExportFilter())
+            else:
+                with open(w_tasks_path, "r") as file:
+                    json.load(file)
+
+            if w_traced is False:
+                w_duration_in_secs = (datetime.datetime.now() - w_time_start).total_seconds()
+
+        w_peak_in_kb = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    print(json.dumps({"mode": p_mode, "tasks": p_nbr_tasks, "peak_in_kb": w_peak_in_kb,
+                      "duration_in_secs": w_duration_in_secs}))
+
+
+# Function bench_export : compares the peak memory of the streaming export with a plain json.load of the file
+def bench_export(p_nbrs_tasks: list):
+
+    w_rows = []
+
+    for w_nbr_tasks in p_nbrs_tasks:
+        for w_mode in ["json.load", "stream"]:
+            w_result = run_worker(["export-worker", "--mode", w_mode, "--tasks", str(w_nbr_tasks)])
+            w_rows.append([w_mode, w_result["tasks"], "{:.1f}".format(w_result["peak_in_kb"] / 1024),
+                           "{:.2f}".format(w_result["duration_in_secs"])])
+
+    print_table(["mode", "tasks", "peak memory (MB)", "duration (s)"], w_rows)
+
+
+# ------------------------------------------- #
+# Benchmark : memory (resident memory of PTT with 1k/10k/100k tasks loaded, leaks and regressions)
+# ------------------------------------------- #
+
+# Function bench_memory_worker : loads the synthetic tasks with load_tasks_from_file, 4 times (the 4th load must not
+# keep more Python memory or objects than the 3rd one)
+def bench_memory_worker(p_nbr_tasks: int):
+
+    from ptt_simulator import prepare_work_dir
+
+    with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+        w_tasks_path = os.path.join(w_tmp_dir, "my_tasks.json")
+        with open(w_tasks_path, "w") as file:
+            file.write(generate_tasks_content(p_nbr_tasks))
+
+        w_work_dir = os.path.join(w_tmp_dir, "ptt")
+        prepare_work_dir(w_work_dir, w_tasks_path)
+        os.remove(w_tasks_path)
+        os.chdir(w_work_dir)
+
+        # Note : ptt_main is imported without its event loop (not run as __main__), so only the loading is measured
+        import ptt_main
+
+        gc.collect()
+        w_memory_empty_in_kb = get_resident_memory_in_kb()
+        w_memory_in_kb = []
+        w_traced_in_kb = []
+        w_nbrs_objects = []
+
+        # Note : the resident memory of the reloads depends on the allocators (the C++ heap of Qt isn't given back as
+        # is), so the leaks are searched in the Python memory (tracemalloc) and objects, once warmed up by 2 loads
+        for w_load in range(4):
+
+            if w_load == 2:
+                tracemalloc.start()
+
+            # Emptying the list before loading my tasks again
+            ptt_main.ptt_main_dlg.lst_tasks.setRowCount(0)
+
+            ptt_main.load_tasks_from_file()
+            gc.collect()
+            w_memory_in_kb.append(get_resident_memory_in_kb() - w_memory_empty_in_kb)
+
+            if w_load >= 2:
+                w_traced_in_kb.append(tracemalloc.get_traced_memory()[0] // 1024)
+                w_nbrs_objects.append(len(gc.get_objects()))
+
+        tracemalloc.stop()
+        w_nbr_rows = ptt_main.ptt_main_dlg.lst_tasks.rowCount()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print(json.dumps({"tasks": w_nbr_rows, "load_in_kb": w_memory_in_kb[0], "reload_in_kb": w_memory_in_kb[1],
+                      "traced_load_in_kb": w_traced_in_kb[0],
+                      "traced_growth_in_kb": w_traced_in_kb[1] - w_traced_in_kb[0],
+                      "objects_growth": w_nbrs_objects[1] - w_nbrs_objects[0]}))
+
+
+# Function bench_memory : measures the resident memory of the loaded tasks, compared with a baseline if any
+def bench_memory(p_nbrs_tasks: list, p_baseline_path: str, p_save_baseline: bool):
+
+    # Miscellaneous initializations
+    w_rows = []
+    w_results = {}
+    w_failures = []
+    w_baseline = {}
+
+    if p_baseline_path != "" and os.path.exists(p_baseline_path):
+        with open(p_baseline_path, "r") as file:
+            w_baseline = json.load(file)
+
+    for w_nbr_tasks in p_nbrs_tasks:
+
+        w_result = run_worker(["memory-worker", "--tasks", str(w_nbr_tasks)])
+        w_results[str(w_nbr_tasks)] = w_result
+        w_traced_growth_in_kb = w_result["traced_growth_in_kb"]
+        w_baseline_in_kb = w_baseline.get(str(w_nbr_tasks), {}).get("load_in_kb")
+
+        w_rows.append([w_nbr_tasks, "{:.1f}".format(w_result["load_in_kb"] / 1024),
+                       "{:.1f}".format(w_result["load_in_kb"] / 1024 * 10000 / w_nbr_tasks),
+                       "{:.1f}".format(w_result["reload_in_kb"] / 1024), "{:+.1f}".format(w_traced_growth_in_kb / 1024),
+                       "{:+d}".format(w_result["objects_growth"]),
+                       "" if w_baseline_in_kb is None else "{:+.1f} %".format(
+                           100 * (w_result["load_in_kb"] - w_baseline_in_kb) / max(w_baseline_in_kb, 1))])
+
+        # A new load keeping more Python memory or objects than the previous one means something is kept from the
+        # previous list (leak) : a leak of 1 object per task is found, the few caches filled once are tolerated
+        if w_traced_growth_in_kb > w_result["traced_load_in_kb"] * glb_bench_max_reload_growth_in_percent / 100:
+            w_failures.append("{} tasks : the 4th load keeps {} KB more than the 3rd one".format(
+                w_nbr_tasks, w_traced_growth_in_kb))
+
+        if w_result["objects_growth"] > w_nbr_tasks * glb_bench_max_reload_growth_in_percent / 100:
+            w_failures.append("{} tasks : the 4th load keeps {} objects more than the 3rd one".format(
+                w_nbr_tasks, w_result["objects_growth"]))
+
+        # Note : the resident memory is only compared with a baseline (measured on the same machine)
+        if w_baseline_in_kb is not None and \
+                w_result["load_in_kb"] > w_baseline_in_kb * (100 + glb_bench_max_baseline_growth_in_percent) / 100:
+            w_failures.append("{} tasks : {} KB instead of {} KB in the baseline".format(
+                w_nbr_tasks, w_result["load_in_kb"], w_baseline_in_kb))
+
+    print_table(["tasks", "resident memory (MB)", "MB per 10k tasks", "after 2 loads (MB)", "4th load Python (MB)",
+                 "4th load objects", "vs baseline"], w_rows)
+
+    if p_save_baseline is True:
+        with open(p_baseline_path, "w") as file:
+            json.dump(w_results, file, indent=4)
+        print("Baseline saved in '{}'".format(p_baseline_path))
+
+    for w_failure in w_failures:
+        print("REGRESSION : {}".format(w_failure))
+
+    return len(w_failures) == 0
+
+
+# ------------------------------------------- #
+# Benchmark : report (speedup of the reports over the archives with 1, 2, 4... processes)
+# ------------------------------------------- #
+
+# Function generate_history_files : writes a synthetic history (one archive per month, saved by blocks), returns them
+def generate_history_files(p_dir: str, p_nbr_years: int, p_nbr_tasks_per_day: int):
+
+    from ptt_tasks_blocks import encode_tasks_blocks, split_task_records
+
+    # Miscellaneous initializations
+    w_first_day = datetime.datetime(2015, 1, 1, 8, 0)
+    w_task_records_by_month = {}
+
+    # The synthetic tasks are spread over the days of the history, from the 1st one
+    for w_index, w_task_record in enumerate(reversed(generate_task_records(p_nbr_years * 365 * p_nbr_tasks_per_day))):
+        w_started_on = w_first_day + datetime.timedelta(
+            days=w_index // p_nbr_tasks_per_day, minutes=(w_index % p_nbr_tasks_per_day) * 600 // p_nbr_tasks_per_day)
+        w_task_record["started_on"] = w_started_on.strftime("%d/%m/%Y %H:%M")
+        w_task_records_by_month.setdefault(w_started_on.strftime("%Y_%m"), []).append(w_task_record)
+
+    w_file_paths = []
+    for w_month, w_task_records in sorted(w_task_records_by_month.items()):
+        w_file_paths.append(os.path.join(p_dir, "my_tasks_{}.json".format(w_month)))
+        with open(w_file_paths[-1], "w") as file:
+            file.write(encode_tasks_blocks([{"tasks": w_block} for w_block in
+                                            split_task_records(list(reversed(w_task_records)))]))
+
+    return w_file_paths
+
+
+# Function bench_report : measures a monthly report over the synthetic history with more and more processes
+def bench_report(p_nbr_years: int, p_nbr_tasks_per_day: int, p_nbrs_workers: list):
+
+    from ptt_export import PttExportFilter
+    from ptt_report import split_report_units, report_tasks
+
+    # Miscellaneous initializations
+    w_rows = []
+    w_reference_report = None
+    w_reference_duration_in_secs = None
+
+    with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+        w_file_paths = generate_history_files(w_tmp_dir, p_nbr_years, p_nbr_tasks_per_day)
+        print("{} archive(s), {} unit(s), {} CPU(s)".format(len(w_file_paths), len(split_report_units(w_file_paths)),
+                                                            os.cpu_count()))
+
+        for w_nbr_workers in p_nbrs_workers:
+
+            w_report_path = os.path.join(w_tmp_dir, "report_{}.csv".format(w_nbr_workers))
+            w_time_start = datetime.datetime.now()
+            w_report_totals = report_tasks(w_file_paths, w_report_path, PttExportFilter(), "month", w_nbr_workers)
+            w_duration_in_secs = (datetime.datetime.now() - w_time_start).total_seconds()
+
+            # The same report must be written whatever the number of processes
+            with open(w_report_path, "r", encoding="utf-8") as file:
+                w_report = file.read()
+            if w_reference_report is None:
+                w_reference_report = w_report
+                w_reference_duration_in_secs = w_duration_in_secs
+            elif w_report != w_reference_report:
+                print("ERROR : the report with {} process(es) differs from the 1st one".format(w_nbr_workers))
+                return False
+
+            w_speedup = w_reference_duration_in_secs / w_duration_in_secs
+            w_rows.append([w_nbr_workers, w_report_totals.nbr_tasks, "{:.2f}".format(w_duration_in_secs),
+                           "x{:.2f}".format(w_speedup), "{:.0f} %".format(100 * w_speedup / w_nbr_workers)])
+
+    print_table(["processes", "tasks", "duration (s)", "speedup", "efficiency"], w_rows)
+    return True
+
+
+# ------------------------------------------- #
+# Benchmark : store (throughput of several processes writing my tasks at the same time, nothing lost)
+# ------------------------------------------- #
+
+# Function bench_store_worker : adds tasks, and edits tasks read before (maybe changed since then by the others)
+def bench_store_worker(p_tasks_path: str, p_nbr_operations: int, p_seed: int):
+
+    from ptt_tasks_store import PttTasksStore, PttTasksStoreChange, get_record_revision
+
+    # Miscellaneous initializations
+    w_random = random.Random(p_seed)
+    w_tasks_store = PttTasksStore(p_tasks_path)
+    w_task_records = generate_task_records(p_nbr_operations, 50, p_seed)
+    w_read_records = []
+    w_added_task_ids = []
+    w_nbr_conflicts = 0
+    w_time_start = datetime.datetime.now()
+
+    for w_index, w_task_record in enumerate(w_task_records):
+
+        # 1 operation out of 4 : an edit on the revision read a few operations before (optimistic)
+        if w_index % 4 == 3 and w_read_records:
+            w_read_record = w_random.choice(w_read_records)
+            w_change = PttTasksStoreChange("put", dict(w_read_record, duration="00:{:02d}".format(w_index % 60)),
+                                           get_record_revision(w_read_record))
+        else:
+            w_change = PttTasksStoreChange("put", {w_key: w_task_record[w_key]
+                                                   for w_key in ["started_on", "duration", "description"]})
+
+        w_store_result = w_tasks_store.commit([w_change])
+        w_added_task_ids.extend(w_store_result.added_task_ids)
+        w_nbr_conflicts = w_nbr_conflicts + w_store_result.nbr_conflicts
+
+        if w_index % 8 == 0:
+            w_read_records = w_tasks_store.read()[:20]
+
+    print(json.dumps({"operations": p_nbr_operations, "conflicts": w_nbr_conflicts,
+                      "added_task_ids": w_added_task_ids,
+                      "duration_in_secs": (datetime.datetime.now() - w_time_start).total_seconds()}))
+
+
+# Function bench_store : runs several writers at the same time, then checks no task was lost
+def bench_store(p_nbrs_processes: list, p_nbr_operations: int):
+
+    from ptt_tasks_store import PttTasksStore
+
+    # Miscellaneous initializations
+    w_rows = []
+    w_is_valid = True
+
+    for w_nbr_processes in p_nbrs_processes:
+
+        with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+            w_tasks_path = os.path.join(w_tmp_dir, "my_tasks.json")
+            w_time_start = datetime.datetime.now()
+
+            w_processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "store-worker", "--path",
+                                             w_tasks_path, "--operations", str(p_nbr_operations), "--seed",
+                                             str(glb_bench_seed + w_index)], stdout=subprocess.PIPE)
+                           for w_index in range(w_nbr_processes)]
+            w_results = [json.loads(w_process.communicate()[0].decode("utf-8").strip().splitlines()[-1])
+                         for w_process in w_processes]
+
+            w_duration_in_secs = (datetime.datetime.now() - w_time_start).total_seconds()
+
+            # Every task added by a writer must still be there (no write overwritten by another one)
+            w_task_ids = {w_task_record["task_id"] for w_task_record in PttTasksStore(w_tasks_path).read()}
+            w_nbr_lost = sum(1 for w_result in w_results for w_task_id in w_result["added_task_ids"]
+                             if w_task_id not in w_task_ids)
+            w_is_valid = w_is_valid and w_nbr_lost == 0
+
+        w_nbr_operations = sum(w_result["operations"] for w_result in w_results)
+        w_rows.append([w_nbr_processes, w_nbr_operations, "{:.2f}".format(w_duration_in_secs),
+                       "{:.0f}".format(w_nbr_operations / w_duration_in_secs),
+                       sum(w_result["conflicts"] for w_result in w_results), len(w_task_ids), w_nbr_lost])
+
+    print_table(["processes", "operations", "duration (s)", "operations/s", "conflicts merged", "tasks", "lost"],
+                w_rows)
+    return w_is_valid
+
+
+# ------------------------------------------- #
+# Benchmark : heatmap (display of the calendar of the time worked)
+# ------------------------------------------- #
+
+# Function bench_heatmap : measures the 1st display of the calendar (buckets and drawing), then the next ones (cached)
+def bench_heatmap(p_nbrs_years: list, p_nbr_repeats: int = 20):
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5 import QtGui
+    from ptt_heatmap import PttHeatmap
+
+    # Miscellaneous initializations
+    w_app = QtGui.QGuiApplication([])
+    w_random = random.Random(glb_bench_seed)
+    w_today = datetime.date.today()
+    w_rows = []
+
+    for w_nbr_years in p_nbrs_years:
+
+        # Synthetic time worked : 4 to 9 hours, 5 days a week
+        w_seconds_by_day = {}
+        for w_index in range(w_nbr_years * 365):
+            w_date = w_today - datetime.timedelta(days=w_index)
+            if w_date.weekday() < 5:
+                w_seconds_by_day[w_date.isoformat()] = w_random.randrange(4 * 3600, 9 * 3600, 60)
+
+        w_durations_in_ms = []
+        for w_repeat in range(p_nbr_repeats):
+            w_heatmap = PttHeatmap()
+            w_time_start = datetime.datetime.now()
+            w_heatmap.get_image(w_seconds_by_day, w_today)
+            w_durations_in_ms.append((datetime.datetime.now() - w_time_start).total_seconds() * 1000)
+
+        w_time_start = datetime.datetime.now()
+        for w_repeat in range(p_nbr_repeats):
+            w_heatmap.get_image(w_seconds_by_day, w_today)
+        w_cached_in_ms = (datetime.datetime.now() - w_time_start).total_seconds() * 1000 / p_nbr_repeats
+
+        w_rows.append([w_nbr_years, len(w_seconds_by_day), "{:.2f}".format(min(w_durations_in_ms)),
+                       "{:.4f}".format(w_cached_in_ms), "{}x{}".format(w_heatmap.image.width(),
+                                                                         w_heatmap.image.height())])
+
+    print_table(["years", "days worked", "1st display (ms)", "next displays (ms)", "image"], w_rows)
+    del w_app
+
+
+# ------------------------------------------- #
+# Benchmark : codecs (encoding/decoding time and size of my tasks file)
+# ------------------------------------------- #
+
+# Function measure_codec : returns the best encoding and decoding durations (ms) of a codec, and the size (KB)
+def measure_codec(p_encode, p_decode, p_nbr_repeats: int):
+
+    w_encode_durations_in_ms = []
+    w_decode_durations_in_ms = []
+
+    for w_repeat in range(p_nbr_repeats):
+
+        gc.collect()
+        w_time_start = time.perf_counter()
+        w_content = p_encode()
+        w_encode_durations_in_ms.append(1000 * (time.perf_counter() - w_time_start))
+
+        w_time_start = time.perf_counter()
+        p_decode(w_content)
+        w_decode_durations_in_ms.append(1000 * (time.perf_counter() - w_time_start))
+
+    return min(w_encode_durations_in_ms), min(w_decode_durations_in_ms), len(w_content.encode("utf-8")) / 1024
+
+
+# Function bench_codecs : compares the codecs of my tasks file (and the plain JSON file of the first versions)
+def bench_codecs(p_nbrs_tasks: list, p_nbr_repeats: int = 3):
+
+    import ptt_codecs
+    from ptt_tasks_blocks import split_task_records, encode_tasks_blocks, decode_tasks_content
+
+    # Codecs measured : name, codec, accelerated libraries used or not
+    w_variants = [("pretty (json)", "pretty", False), ("compact (json)", "compact", False)]
+    if ptt_codecs.orjson is not None:
+        w_variants.extend([("pretty (orjson loads)", "pretty", True), ("compact (orjson)", "compact", True)])
+    else:
+        print("orjson is not installed, only the json module is measured")
+
+    w_rows = []
+
+    for w_nbr_tasks in p_nbrs_tasks:
+
+        w_task_records = generate_task_records(w_nbr_tasks)
+
+        # Reference : the plain JSON file of the first versions (no blocks, indent=4)
+        w_results = measure_codec(lambda: json.dumps({"tasks": w_task_records}, indent=4, ensure_ascii=False),
+                                  json.loads, p_nbr_repeats)
+        w_rows.append([w_nbr_tasks, "plain indent=4 (json)"] + ["{:.0f}".format(w_result) for w_result in w_results])
+
+        for w_name, w_codec_name, w_accelerated in w_variants:
+            ptt_codecs.glb_codecs_accelerated = w_accelerated
+            w_results = measure_codec(lambda: encode_tasks_blocks([{"tasks": w_block_records} for w_block_records
+                                                                   in split_task_records(w_task_records)],
+                                                                  w_codec_name),
+                                      decode_tasks_content, p_nbr_repeats)
+            w_rows.append([w_nbr_tasks, w_name] + ["{:.0f}".format(w_result) for w_result in w_results])
+
+    ptt_codecs.glb_codecs_accelerated = True
+    print_table(["tasks", "codec", "encode (ms)", "decode and check (ms)", "size (KB)"], w_rows)
+
+
+# ------------------------------------------- #
+# Benchmark : background (cost of the ticks of the active task, window displayed or minimized)
+# ------------------------------------------- #
+
+# Function bench_background_worker : runs ticks of the active task with the window displayed, then minimized
+def bench_background_worker(p_nbr_tasks: int, p_nbr_ticks: int):
+
+    from PyQt5 import QtCore, QtWidgets
+    from ptt_simulator import prepare_work_dir
+
+    # Class PttEventCounter : counts the Qt events delivered (repaints, layouts, timers...)
+    class PttEventCounter(QtCore.QObject):
+        def __init__(self):
+            super().__init__()
+            self.nbr_events = 0
+
+        def eventFilter(self, p_watched, p_event):
+            self.nbr_events = self.nbr_events + 1
+            return False
+
+    with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+        w_tasks_path = os.path.join(w_tmp_dir, "my_tasks.json")
+        with open(w_tasks_path, "w") as file:
+            file.write(generate_tasks_content(p_nbr_tasks))
+
+        w_work_dir = os.path.join(w_tmp_dir, "ptt")
+        prepare_work_dir(w_work_dir, w_tasks_path)
+        os.remove(w_tasks_path)
+        os.chdir(w_work_dir)
+
+        # Note : ptt_main is imported without its event loop (not run as __main__), the ticks are run here
+        import ptt_main
+
+        ptt_main.init_ptt_main_window()
+        w_event_counter = PttEventCounter()
+        QtWidgets.QApplication.instance().installEventFilter(w_event_counter)
+        w_results = {}
+
+        for w_mode, w_show in [("displayed", ptt_main.ptt_main_dlg.showNormal),
+                               ("minimized", ptt_main.ptt_main_dlg.showMinimized)]:
+
+            w_show()
+            QtWidgets.QApplication.processEvents()
+            w_event_counter.nbr_events = 0
+            w_time_start = time.process_time()
+
+            for w_tick in range(p_nbr_ticks):
+                ptt_main.auto_increment_active_task()
+                ptt_main.glb_ptt_task_events.flush()
+                QtWidgets.QApplication.processEvents()
+
+            w_results[w_mode] = {"cpu_in_msec": 1000 * (time.process_time() - w_time_start) / p_nbr_ticks,
+                                 "events": w_event_counter.nbr_events / p_nbr_ticks}
+
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print(json.dumps(w_results))
+
+
+# Function bench_background : compares the cost of a tick with the window displayed or minimized (saves included)
+def bench_background(p_nbr_tasks: int, p_nbr_ticks: int):
+
+    w_results = run_worker(["background-worker", "--tasks", str(p_nbr_tasks), "--ticks", str(p_nbr_ticks)])
+
+    print_table(["window", "CPU per tick (ms)", "Qt events per tick"],
+                [[w_mode, "{:.2f}".format(w_result["cpu_in_msec"]), "{:.1f}".format(w_result["events"])]
+                 for w_mode, w_result in w_results.items()])
+
+
+# ------------------------------------------- #
+# Benchmark : replication (saves in the data directory or in the local cache)
+# ------------------------------------------- #
+
+# Function bench_replication : compares the saves made in the data directory (slow) or in the local cache, then
+# measures the lag of the replication, also when the data directory is unavailable for a while
+# Note : the data directory is a local folder, each of its operations made slower by the latency (ms)
+def bench_replication(p_nbr_tasks: int, p_latency_in_msec: int, p_nbr_saves: int):
+
+    import ptt_replicator
+    from ptt_tasks_blocks import write_tasks_content
+
+    # Miscellaneous initializations
+    w_content = generate_tasks_content(p_nbr_tasks)
+    w_latency_in_secs = p_latency_in_msec / 1000
+    w_rows = []
+
+    with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+        w_local_dir = os.path.join(w_tmp_dir, "cache")
+        w_remote_dir = os.path.join(w_tmp_dir, "data")
+        os.makedirs(w_remote_dir)
+        w_replicator = ptt_replicator.PttReplicator(w_local_dir, w_remote_dir, w_latency_in_secs)
+        w_replicator.pull()
+
+        # Direct save : the temporary file is written, then replaced (2 operations on the data directory at least)
+        w_durations = []
+        for w_save in range(p_nbr_saves):
+            w_time_start = time.perf_counter()
+            w_replicator.wait_remote()
+            write_tasks_content(os.path.join(w_remote_dir, "my_tasks.json"), w_content)
+            w_replicator.wait_remote()
+            w_durations.append(time.perf_counter() - w_time_start)
+        w_rows.append(["data directory", "{:.1f}".format(1000 * sorted(w_durations)[len(w_durations) // 2]),
+                       "{:.1f}".format(1000 * max(w_durations)), "-", "-"])
+
+        # Note : removed, or the 1st replication would see it as changed by another machine (see the conflict below)
+        os.remove(os.path.join(w_remote_dir, "my_tasks.json"))
+
+        # Save in the local cache, the replication asked at once
+        w_replicator.start()
+        w_durations = []
+        w_lags = []
+        for w_save in range(p_nbr_saves):
+            w_time_start = time.perf_counter()
+            write_tasks_content(os.path.join(w_local_dir, "my_tasks.json"), w_content)
+            w_replicator.notify()
+            w_durations.append(time.perf_counter() - w_time_start)
+            w_lags.append(wait_replication(w_replicator, w_time_start))
+        w_rows.append(["local cache", "{:.1f}".format(1000 * sorted(w_durations)[len(w_durations) // 2]),
+                       "{:.1f}".format(1000 * max(w_durations)),
+                       "{:.1f}".format(1000 * sorted(w_lags)[len(w_lags) // 2]), "{:.1f}".format(1000 * max(w_lags))])
+
+        # Data directory unavailable for 5 seconds : the saves are still local, the replication is tried again later
+        os.rename(w_remote_dir, w_remote_dir + "_unavailable")
+        w_time_start = time.perf_counter()
+        write_tasks_content(os.path.join(w_local_dir, "my_tasks.json"), w_content)
+        w_replicator.notify()
+        time.sleep(5)
+        w_nbr_failures = w_replicator.nbr_failures
+        os.rename(w_remote_dir + "_unavailable", w_remote_dir)
+        w_lag = wait_replication(w_replicator, w_time_start)
+        w_rows.append(["local cache, 5s outage ({} tries failed)".format(w_nbr_failures), "-", "-",
+                       "{:.1f}".format(1000 * w_lag), "{:.1f}".format(1000 * w_lag)])
+
+        # Data directory changed by another machine before the replication : its version must be kept in quarantine
+        w_remote_content = generate_tasks_content(p_nbr_tasks // 2)
+        write_tasks_content(os.path.join(w_remote_dir, "my_tasks.json"), w_remote_content)
+        w_time_start = time.perf_counter()
+        write_tasks_content(os.path.join(w_local_dir, "my_tasks.json"), w_content)
+        w_replicator.notify()
+        w_lag = wait_replication(w_replicator, w_time_start)
+        w_conflicts_dir = os.path.join(w_local_dir, ptt_replicator.glb_replication_conflicts_dir)
+        w_conflict_contents = []
+        for w_file_name in os.listdir(w_conflicts_dir) if os.path.isdir(w_conflicts_dir) else []:
+            with open(os.path.join(w_conflicts_dir, w_file_name), "r", encoding="utf-8") as file:
+                w_conflict_contents.append(file.read())
+        w_kept = w_remote_content in w_conflict_contents
+        w_rows.append(["local cache, changed remotely (kept in quarantine : {})".format("yes" if w_kept else "no"),
+                       "-", "-", "{:.1f}".format(1000 * w_lag), "{:.1f}".format(1000 * w_lag)])
+
+        # Note : the latest changes are replicated when stopped, the quarantine must still be local
+        w_replicator.stop()
+        w_replicated = os.path.exists(os.path.join(w_remote_dir, ptt_replicator.glb_replication_conflicts_dir))
+
+    print_table(["saves in", "save p50 (ms)", "save max (ms)", "lag p50 (ms)", "lag max (ms)"], w_rows)
+
+    if w_kept is False:
+        print("REGRESSION : the version changed in the data directory was replaced without being kept in quarantine")
+    if w_replicated is True:
+        print("REGRESSION : the quarantine of the local cache was replicated in the data directory")
+
+    return w_kept is True and w_replicated is False
+
+
+# Function wait_replication : waits until nothing is left to replicate, returns the lag since the time received (s)
+def wait_replication(p_replicator, p_time_start: float):
+
+    # Note : the change may not have been found yet, the status is only read once the manifest is up to date
+    w_nbr_files_replicated = p_replicator.nbr_files_replicated
+    while p_replicator.nbr_files_replicated == w_nbr_files_replicated or p_replicator.status().nbr_pending > 0:
+        time.sleep(0.001)
+
+    return time.perf_counter() - p_time_start
+
+
+# ------------------------------------------- #
+# Benchmark : billing (rules applied with NumPy or in plain Python)
+# ------------------------------------------- #
+
+# Function bench_billing : measures the billing of a year of tasks of several users (about 2000 tasks per user)
+# Note : the clients are the 2 1st digits of the tickets (about 20 clients)
+def bench_billing(p_nbr_users: int, p_nbr_tasks_per_user: int, p_rules_text: str, p_nbr_repeats: int = 3):
+
+    import ptt_billing
+
+    # Miscellaneous initializations
+    w_task_records_by_user = [generate_task_records(p_nbr_tasks_per_user, p_seed=glb_bench_seed + w_user)
+                              for w_user in range(p_nbr_users)]
+    w_billing_rules = ptt_billing.parse_billing_rules(p_rules_text)
+    w_rows = []
+
+    # Columns of the tasks (read once whatever the rules)
+    w_durations = []
+    for w_repeat in range(p_nbr_repeats):
+        w_time_start = time.perf_counter()
+        w_task_columns = ptt_billing.PttTaskColumns(r"TICKET-(\d\d)")
+        for w_user, w_task_records in enumerate(w_task_records_by_user):
+            for w_task_record in w_task_records:
+                w_task_columns.add_task_record(w_task_record, w_user)
+        w_durations.append(time.perf_counter() - w_time_start)
+    w_rows.append(["columns of the tasks", "{:.0f}".format(1000 * min(w_durations)), "-"])
+
+    # Rules applied with NumPy (if installed) or in plain Python : the totals must be the same
+    w_variants = [("rules (plain Python)", False)]
+    if ptt_billing.import_numpy() is not None:
+        w_variants.append(("rules (NumPy)", True))
+    else:
+        print("NumPy is not installed, only the plain Python computations are measured")
+
+    for w_name, w_vectorized in w_variants:
+        ptt_billing.glb_billing_vectorized = w_vectorized
+        w_durations = []
+        for w_repeat in range(p_nbr_repeats):
+            w_time_start = time.perf_counter()
+            w_billing_totals = ptt_billing.compute_billing(w_task_columns, w_billing_rules)
+            w_durations.append(time.perf_counter() - w_time_start)
+        w_rows.append([w_name, "{:.0f}".format(1000 * min(w_durations)), "{:.0f} h billable for {:.0f} h".format(
+            w_billing_totals.billable_seconds() / 3600, w_billing_totals.raw_seconds() / 3600)])
+
+    ptt_billing.glb_billing_vectorized = True
+    print("{} user(s), {} task(s), rules : {}".format(p_nbr_users, len(w_task_columns.seconds), p_rules_text))
+    print_table(["step", "time (ms)", "totals"], w_rows)
+
+
+# ------------------------------------------- #
+# Benchmark : edit (save of a task edited in the list, all the blocks or only its block encoded again)
+# ------------------------------------------- #
+
+# Function bench_edit : compares the save of the whole file encoded again with the save of the edited task alone
+# Note : both write and sync the whole file, the task alone only saves the encoding of the other blocks
+def bench_edit(p_nbrs_tasks: list, p_nbr_edits: int):
+
+    from ptt_tasks_blocks import split_task_records, encode_tasks_blocks, decode_tasks_content, read_tasks_content, \
+        write_tasks_content, replace_content_task_record
+
+    # Miscellaneous initializations
+    w_random = random.Random(glb_bench_seed)
+    w_rows = []
+
+    with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+        w_tasks_path = os.path.join(w_tmp_dir, "my_tasks.json")
+
+        for w_nbr_tasks in p_nbrs_tasks:
+
+            w_task_records = generate_task_records(w_nbr_tasks)
+            write_tasks_content(w_tasks_path, encode_tasks_blocks([{"tasks": w_block_records} for w_block_records
+                                                                   in split_task_records(w_task_records)]))
+
+            # Whole file : all the blocks encoded again (with their checksum), then written
+            w_durations = []
+            for w_edit in range(p_nbr_edits):
+                w_task_record = w_random.choice(w_task_records)
+                w_task_record["duration"] = "{:02d}:{:02d}".format(w_random.randint(0, 7), w_random.randint(0, 59))
+                w_time_start = time.perf_counter()
+                write_tasks_content(w_tasks_path, encode_tasks_blocks([{"tasks": w_block_records} for w_block_records
+                                                                       in split_task_records(w_task_records)]))
+                w_durations.append(time.perf_counter() - w_time_start)
+            w_rows.append([w_nbr_tasks, "all blocks", "{:.2f}".format(1000 * sorted(w_durations)[p_nbr_edits // 2]),
+                           "{:.2f}".format(1000 * max(w_durations))])
+
+            # Task alone : the file read, only the block of the task encoded again, then the whole file written
+            w_durations = []
+            for w_edit in range(p_nbr_edits):
+                w_task_record = w_random.choice(w_task_records)
+                w_task_record["duration"] = "{:02d}:{:02d}".format(w_random.randint(0, 7), w_random.randint(0, 59))
+                w_time_start = time.perf_counter()
+                write_tasks_content(w_tasks_path, replace_content_task_record(read_tasks_content(w_tasks_path),
+                                                                              w_task_record))
+                w_durations.append(time.perf_counter() - w_time_start)
+            w_rows.append([w_nbr_tasks, "its block", "{:.2f}".format(1000 * sorted(w_durations)[p_nbr_edits // 2]),
+                           "{:.2f}".format(1000 * max(w_durations))])
+
+            # Both saves must give the same tasks
+            if decode_tasks_content(read_tasks_content(w_tasks_path)).task_records != w_task_records:
+                print("bench_edit : the tasks saved alone are not the tasks edited")
+                return False
+
+    print_table(["tasks", "blocks encoded", "save p50 (ms)", "save max (ms)"], w_rows)
+    return True
+
+
+# ------------------------------------------- #
+# Benchmark : workspaces (switches between workspaces, loaded from their files or kept in memory)
+# ------------------------------------------- #
+
+# Function load_workspace_state : loads a workspace from its files like PTT does (tasks, versions, day totals...)
+def load_workspace_state(p_name: str, p_workspace_dir: str):
+
+    from ptt_tasks_blocks import decode_tasks_content, read_tasks_content
+    from ptt_tasks_store import get_record_revision
+    from ptt_sync import PttSyncState, task_fingerprint
+    from ptt_day_totals import PttDayTotals
+    from ptt_undo import PttUndoStack
+    from ptt_workspaces import PttWorkspaceState, get_file_signature
+
+    w_my_tasks_json = os.path.join(p_workspace_dir, "my_tasks.json")
+    w_content = read_tasks_content(w_my_tasks_json)
+    w_task_records = decode_tasks_content(w_content).task_records
+
+    w_workspace_state = PttWorkspaceState(p_name, [(w_task_record["task_id"], w_task_record["started_on"],
+                                                    w_task_record["duration"], w_task_record["description"])
+                                                   for w_task_record in w_task_records])
+    w_workspace_state.file_signature = get_file_signature(w_my_tasks_json)
+    w_workspace_state.fingerprints = {w_task_record["task_id"]: task_fingerprint(w_task_record)
+                                      for w_task_record in w_task_records}
+    w_workspace_state.revisions = {w_task_record["task_id"]: get_record_revision(w_task_record)
+                                   for w_task_record in w_task_records}
+    w_workspace_state.sync_state = PttSyncState(os.path.join(p_workspace_dir, "ptt_sync.json"))
+    w_workspace_state.sync_state.load_records(w_task_records)
+    w_workspace_state.day_totals = PttDayTotals()
+    w_workspace_state.day_totals.rebuild(w_task_records)
+    w_workspace_state.undo_stack = PttUndoStack()
+
+    return w_workspace_state
+
+
+# Function bench_workspaces : measures switches between workspaces (the recent ones more often) with several budgets
+def bench_workspaces(p_nbr_workspaces: int, p_nbr_tasks: int, p_budgets_in_mb: list, p_nbr_switches: int):
+
+    from ptt_tasks_blocks import split_task_records, encode_tasks_blocks, write_tasks_content
+    from ptt_workspaces import PttWorkspaceCache, create_workspace, get_workspace_dir
+
+    # Miscellaneous initializations
+    w_rows = []
+
+    with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+        w_names = ["client {}".format(w_index + 1) for w_index in range(p_nbr_workspaces)]
+        for w_index, w_name in enumerate(w_names):
+            w_task_records = generate_task_records(p_nbr_tasks, p_seed=glb_bench_seed + w_index)
+            write_tasks_content(os.path.join(create_workspace(w_tmp_dir, w_name), "my_tasks.json"),
+                                encode_tasks_blocks([{"tasks": w_block_records} for w_block_records
+                                                     in split_task_records(w_task_records)]))
+
+        for w_budget_in_mb in p_budgets_in_mb:
+
+            # The same switches for each budget : a consultant mostly goes back to the latest clients
+            w_random = random.Random(glb_bench_seed)
+            w_cache = PttWorkspaceCache(w_budget_in_mb * 1024 * 1024)
+            w_current_state = load_workspace_state(w_names[0], get_workspace_dir(w_tmp_dir, w_names[0]))
+            w_recent_names = list(w_names)
+            w_durations = []
+
+            for w_switch in range(p_nbr_switches):
+
+                w_name = w_recent_names[min(int(w_random.paretovariate(1.5)), p_nbr_workspaces - 1)]
+                w_recent_names.remove(w_name)
+                w_recent_names.insert(0, w_name)
+                w_workspace_dir = get_workspace_dir(w_tmp_dir, w_name)
+
+                w_time_start = time.perf_counter()
+                w_workspace_state = w_cache.take(w_name)
+                w_cache.put(w_current_state)
+                if w_workspace_state is None or \
+                        not w_workspace_state.is_file_unchanged(os.path.join(w_workspace_dir, "my_tasks.json")):
+                    w_workspace_state = load_workspace_state(w_name, w_workspace_dir)
+                w_current_state = w_workspace_state
+                w_durations.append(time.perf_counter() - w_time_start)
+
+            w_rows.append([w_budget_in_mb, w_cache.nbr_hits, w_cache.nbr_misses, w_cache.nbr_evictions,
+                           "{:.1f}".format(1000 * sorted(w_durations)[p_nbr_switches // 2]),
+                           "{:.1f}".format(1000 * sum(w_durations) / p_nbr_switches),
+                           "{:.1f}".format(w_cache.size_in_bytes / 1024 / 1024)])
+
+    print("{} workspace(s) of {} task(s), {} switch(es)".format(p_nbr_workspaces, p_nbr_tasks, p_nbr_switches))
+    print_table(["budget (MB)", "hits", "misses", "evictions", "switch p50 (ms)", "switch mean (ms)", "kept (MB)"],
+                w_rows)
+
+
+# ------------------------------------------- #
+# Benchmark : layout (widths of the columns of the list at startup, sized on the contents or restored)
+# ------------------------------------------- #
+
+# Function bench_layout : compares the columns sized on all the rows, on a sample of rows, and the widths restored
+def bench_layout(p_nbrs_tasks: list, p_nbr_repeats: int = 5):
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5 import QtWidgets
+    from ptt_layout import PttLayout, size_table_columns
+
+    # Miscellaneous initializations
+    w_app = QtWidgets.QApplication([])
+    w_rows = []
+
+    with tempfile.TemporaryDirectory() as w_tmp_dir:
+
+        w_layout_path = os.path.join(w_tmp_dir, "ptt_layout.json")
+
+        for w_nbr_tasks in p_nbrs_tasks:
+
+            # The list of the main window : 3 columns, the latest task on top, 20 rows displayed
+            w_table = QtWidgets.QTableWidget(w_nbr_tasks, 3)
+            for w_row, w_task_record in enumerate(reversed(generate_task_records(w_nbr_tasks))):
+                w_table.setItem(w_row, 0, QtWidgets.QTableWidgetItem(w_task_record["started_on"]))
+                w_table.setItem(w_row, 1, QtWidgets.QTableWidgetItem(w_task_record["duration"]))
+                w_table.setItem(w_row, 2, QtWidgets.QTableWidgetItem(w_task_record["description"]))
+            w_table.resize(800, 20 * w_table.verticalHeader().defaultSectionSize())
+
+            w_modes = [("all the rows", lambda: size_table_columns(w_table, -1)),
+                       ("1000 rows (Qt default)", lambda: size_table_columns(w_table, 1000)),
+                       ("sample of rows", lambda: size_table_columns(w_table))]
+
+            for w_mode, w_size_columns in w_modes:
+                w_durations = []
+                for w_repeat in range(p_nbr_repeats):
+                    w_time_start = time.perf_counter()
+                    w_size_columns()
+                    w_durations.append(time.perf_counter() - w_time_start)
+                w_rows.append([w_nbr_tasks, w_mode, "{:.2f}".format(1000 * min(w_durations)),
+                               " ".join(str(w_table.columnWidth(w_column)) for w_column in range(3))])
+
+            # Widths restored from the layout saved at the exit (the file read at each startup)
+            w_layout = PttLayout(w_layout_path)
+            w_layout.capture(w_table, w_table)
+            w_layout.save()
+
+            w_durations = []
+            for w_repeat in range(p_nbr_repeats):
+                w_time_start = time.perf_counter()
+                w_layout = PttLayout(w_layout_path)
+                w_layout.load()
+                w_layout.restore_table(w_table)
+                w_durations.append(time.perf_counter() - w_time_start)
+            w_rows.append([w_nbr_tasks, "layout restored", "{:.2f}".format(1000 * min(w_durations)),
+                           " ".join(str(w_table.columnWidth(w_column)) for w_column in range(3))])
+
+            w_table.deleteLater()
+
+    print_table(["tasks", "columns sized on", "time (ms)", "widths"], w_rows)
+    del w_app
+
+
+# ------------------------------------------- #
+# Main
+# ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    w_parser = argparse.ArgumentParser(description="PTT benchmarks")
+    w_subparsers = w_parser.add_subparsers(dest="benchmark", required=True)
+
+    w_subparser = w_subparsers.add_parser("descriptions", help="memory of the list, interned descriptions or not")
+    w_subparser.add_argument("--tasks", type=int, default=200000)
+
+    w_subparser = w_subparsers.add_parser("descriptions-worker")
+    w_subparser.add_argument("--mode", choices=["text", "interned"], required=True)
+    w_subparser.add_argument("--tasks", type=int, required=True)
+
+    w_subparser = w_subparsers.add_parser("export", help="peak memory of the streaming export")
+    w_subparser.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000, 300000])
+
+    w_subparser = w_subparsers.add_parser("export-worker")
+    w_subparser.add_argument("--mode", choices=["stream", "json.load"], required=True)
+    w_subparser.add_argument("--tasks", type=int, required=True)
+
+    w_subparser = w_subparsers.add_parser("memory", help="resident memory of the loaded tasks (leaks, regressions)")
+    w_subparser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000, 100000])
+    w_subparser.add_argument("--baseline", default="", help="JSON results of a previous run to compare with")
+    w_subparser.add_argument("--save-baseline", action="store_true", help="saves the results as the new baseline")
+
+    w_subparser = w_subparsers.add_parser("memory-worker")
+    w_subparser.add_argument("--tasks", type=int, required=True)
+
+    w_subparser = w_subparsers.add_parser("report", help="speedup of the reports with several processes")
+    w_subparser.add_argument("--years", type=int, default=5)
+    w_subparser.add_argument("--tasks-per-day", type=int, default=100)
+    w_subparser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+
+    w_subparser = w_subparsers.add_parser("store", help="throughput of several writers of my tasks (nothing lost)")
+    w_subparser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    w_subparser.add_argument("--operations", type=int, default=200, help="operations of each process")
+
+    w_subparser = w_subparsers.add_parser("store-worker")
+    w_subparser.add_argument("--path", required=True)
+    w_subparser.add_argument("--operations", type=int, required=True)
+    w_subparser.add_argument("--seed", type=int, required=True)
+
+    w_subparser = w_subparsers.add_parser("heatmap", help="display of the calendar of the time worked")
+    w_subparser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+
+    w_subparser = w_subparsers.add_parser("codecs", help="encoding/decoding time and size of my tasks file")
+    w_subparser.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000])
+
+    w_subparser = w_subparsers.add_parser("background", help="cost of the ticks, window displayed or minimized")
+    w_subparser.add_argument("--tasks", type=int, default=1000)
+    w_subparser.add_argument("--ticks", type=int, default=60)
+
+    w_subparser = w_subparsers.add_parser("background-worker")
+    w_subparser.add_argument("--tasks", type=int, required=True)
+    w_subparser.add_argument("--ticks", type=int, required=True)
+
+    w_subparser = w_subparsers.add_parser("replication", help="saves in the data directory or in the local cache")
+    w_subparser.add_argument("--tasks", type=int, default=10000)
+    w_subparser.add_argument("--latency", type=int, default=50, help="latency of the data directory (ms)")
+    w_subparser.add_argument("--saves", type=int, default=20)
+
+    w_subparser = w_subparsers.add_parser("billing", help="billing of a year of tasks of several users")
+    w_subparser.add_argument("--users", type=int, default=50)
+    w_subparser.add_argument("--tasks-per-user", type=int, default=2000)
+    w_subparser.add_argument("--rules", default="round_up:15, minimum_per_day_per_client:30, maximum_per_day:480")
+
+    w_subparser = w_subparsers.add_parser("edit", help="save of a task edited in the list (all blocks or its block "
+                                                       "encoded again)")
+    w_subparser.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000])
+    w_subparser.add_argument("--edits", type=int, default=50)
+
+    w_subparser = w_subparsers.add_parser("workspaces", help="switches between workspaces, budgets of the cache")
+    w_subparser.add_argument("--workspaces", type=int, default=8)
+    w_subparser.add_argument("--tasks", type=int, default=20000, help="tasks per workspace")
+    w_subparser.add_argument("--budgets", type=int, nargs="+", default=[0, 32, 128], help="budgets of the cache (MB)")
+    w_subparser.add_argument("--switches", type=int, default=100)
+
+    w_subparser = w_subparsers.add_parser("layout", help="widths of the columns at startup, sized or restored")
+    w_subparser.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000])
+
+    w_args = w_parser.parse_args()
+
+    if w_args.benchmark == "descriptions":
+        bench_descriptions(w_args.tasks)
+    elif w_args.benchmark == "descriptions-worker":
+        bench_descriptions_worker(w_args.mode, w_args.tasks)
+    elif w_args.benchmark == "export":
+        bench_export(w_args.tasks)
+    elif w_args.benchmark == "export-worker":
+        bench_export_worker(w_args.mode, w_args.tasks)
+    elif w_args.benchmark == "memory":
+        if bench_memory(w_args.tasks, w_args.baseline, w_args.save_baseline) is False:
+            sys.exit(1)
+    elif w_args.benchmark == "memory-worker":
+        bench_memory_worker(w_args.tasks)
+    elif w_args.benchmark == "report":
+        if bench_report(w_args.years, w_args.tasks_per_day, w_args.workers) is False:
+            sys.exit(1)
+    elif w_args.benchmark == "store":
+        if bench_store(w_args.processes, w_args.operations) is False:
+            sys.exit(1)
+    elif w_args.benchmark == "store-worker":
+        bench_store_worker(w_args.path, w_args.operations, w_args.seed)
+    elif w_args.benchmark == "heatmap":
+        bench_heatmap(w_args.years)
+    elif w_args.benchmark == "codecs":
+        bench_codecs(w_args.tasks)
+    elif w_args.benchmark == "background":
+        bench_background(w_args.tasks, w_args.ticks)
+    elif w_args.benchmark == "background-worker":
+        bench_background_worker(w_args.tasks, w_args.ticks)
+    elif w_args.benchmark == "replication":
+        if bench_replication(w_args.tasks, w_args.latency, w_args.saves) is False:
+            sys.exit(1)
+    elif w_args.benchmark == "billing":
+        bench_billing(w_args.users, w_args.tasks_per_user, w_args.rules)
+    elif w_args.benchmark == "edit":
+        if bench_edit(w_args.tasks, w_args.edits) is False:
+            sys.exit(1)
+    elif w_args.benchmark == "workspaces":
+        bench_workspaces(w_args.workspaces, w_args.tasks, w_args.budgets, w_args.switches)
+    elif w_args.benchmark == "layout":
+        bench_layout(w_args.tasks)
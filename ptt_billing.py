@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_billing.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : billable time per period and client, computed with a set of rules
+* - The rules are given as a text, ex: "round_up:15, minimum_per_day_per_client:30,
+*   maximum_per_day:480" (in minutes, see glb_billing_rule_kinds)
+* - The rules of the tasks are applied first, then the rules of the days in their order
+* - The client of a task is found in its description (1st word by default)
+* - The rules of the days apply to the days of each user (one list of files per user)
+* - The tasks are read once and put in columns (user, day, client, seconds), the rules are
+*   applied on the whole columns : with NumPy if installed (vectorized), the same integer
+*   computations in plain Python otherwise
+* - NumPy is only imported the 1st time the rules are applied (not at the startup of PTT)
+* - The billable totals are written next to the raw totals
+* - No dependency on PyQt5, so it can be run without the GUI
+* --------------------------------------------------------------------------------- *
+To write the billable time per month of the tasks files of several users, go in the ptt (root) folder then :
+python ptt_billing.py --users alice.json bob.json --from 2020-01-01 --to 2020-12-31
+                      --rules "round_up:15, minimum_per_day_per_client:30" billing_2020.csv
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import re
+import sys
+import csv
+import array
+import argparse
+import datetime
+from ptt_export import PttExportFilter, parse_date_argument
+from ptt_tasks_stream import PttTasksStreamError, iter_task_records
+from ptt_report import glb_report_periods, list_report_sources, convert_seconds_to_duration
+from ptt_day_totals import duration_to_seconds
+from ptt_billing_defaults import glb_billing_client_pattern_default
+from ptt_workspaces import get_config_workspace_dir
+
+# Note : NumPy is imported when the rules are applied (see import_numpy), it takes longer than the rest of PTT to import
+numpy = None
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Kinds of rules (minutes) : the rules of the tasks, then the rules of the days of a client or of all the clients
+glb_billing_task_rules = ["round_up", "round_nearest"]
+glb_billing_day_rules = ["minimum_per_day_per_client", "maximum_per_day_per_client", "maximum_per_day"]
+glb_billing_rule_kinds = glb_billing_task_rules + glb_billing_day_rules
+
+# Use of NumPy when it's installed (the plain Python computations only if False)
+glb_billing_vectorized = True
+glb_billing_numpy_imported = False
+
+# Columns of the billing
+glb_billing_columns = ["period", "client", "duration", "hours", "billable duration", "billable hours"]
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttBillingError : raised when the rules are invalid or when the billing can't be written
+class PttBillingError(Exception):
+    pass
+
+
+# Class PttBillingRule : kind of rule and its value in minutes
+class PttBillingRule:
+    def __init__(self, p_kind: str, p_minutes: int):
+        self.kind = p_kind
+        self.minutes = p_minutes
+
+
+# Class PttTaskColumns : user, day (ordinal), client (index in client_names) and seconds of each task, in compact arrays
+class PttTaskColumns:
+    def __init__(self, p_client_pattern: str = glb_billing_client_pattern_default):
+        self.users = array.array("i")
+        self.days = array.array("i")
+        self.clients = array.array("i")
+        self.seconds = array.array("q")
+        self.client_names = []
+        self.client_regex = re.compile(p_client_pattern)
+        self.client_by_description = {}
+        self.client_by_name = {}
+        self.day_by_started_on = {}
+
+    # Method add_task_record : appends a task (the days and the clients of the descriptions already seen are reused)
+    def add_task_record(self, p_task_record: dict, p_user: int = 0):
+
+        w_date_text = p_task_record["started_on"][:10]
+        w_day = self.day_by_started_on.get(w_date_text)
+        if w_day is None:
+            w_day = datetime.datetime.strptime(w_date_text, "%d/%m/%Y").toordinal()
+            self.day_by_started_on[w_date_text] = w_day
+
+        w_description = p_task_record["description"]
+        w_client = self.client_by_description.get(w_description)
+        if w_client is None:
+            w_client = self.get_client(w_description)
+            self.client_by_description[w_description] = w_client
+
+        self.users.append(p_user)
+        self.days.append(w_day)
+        self.clients.append(w_client)
+        self.seconds.append(duration_to_seconds(p_task_record["duration"]))
+
+    # Method get_client : returns the index of the client of a description (added if new, "" if not found)
+    def get_client(self, p_description: str):
+
+        w_match = self.client_regex.search(p_description)
+        w_client_name = ""
+        if w_match is not None:
+            w_client_name = (w_match.group(1) if self.client_regex.groups > 0 else w_match.group(0)).upper()
+
+        w_client = self.client_by_name.get(w_client_name)
+        if w_client is None:
+            w_client = len(self.client_names)
+            self.client_names.append(w_client_name)
+            self.client_by_name[w_client_name] = w_client
+
+        return w_client
+
+
+# Class PttBillingTotals : raw and billable seconds per (period, client), tasks counted and errors (damaged parts...)
+class PttBillingTotals:
+    def __init__(self):
+        self.seconds = {}
+        self.nbr_tasks = 0
+        self.errors = []
+
+    # Method raw_seconds : total of the raw seconds
+    def raw_seconds(self):
+        return sum(w_seconds[0] for w_seconds in self.seconds.values())
+
+    # Method billable_seconds : total of the billable seconds
+    def billable_seconds(self):
+        return sum(w_seconds[1] for w_seconds in self.seconds.values())
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function parse_billing_rules : returns the rules of a text "kind:minutes, kind:minutes..." (the tasks rules 1st)
+def parse_billing_rules(p_rules_text: str):
+
+    w_billing_rules = []
+
+    for w_rule_text in p_rules_text.split(","):
+
+        if w_rule_text.strip() == "":
+            continue
+
+        w_kind, w_separator, w_minutes = w_rule_text.partition(":")
+        w_kind = w_kind.strip()
+        if w_kind not in glb_billing_rule_kinds:
+            raise PttBillingError("unknown rule '{}' (rules : {})".format(w_kind, ", ".join(glb_billing_rule_kinds)))
+
+        try:
+            w_minutes = int(w_minutes)
+        except ValueError:
+            raise PttBillingError("invalid minutes '{}' for the rule '{}'".format(w_minutes.strip(), w_kind))
+        if w_minutes <= 0:
+            raise PttBillingError("the minutes of the rule '{}' must be over 0".format(w_kind))
+
+        w_billing_rules.append(PttBillingRule(w_kind, w_minutes))
+
+    # Note : sorted() keeps the order of the rules of the same kind (tasks or days)
+    return sorted(w_billing_rules, key=lambda p_rule: p_rule.kind not in glb_billing_task_rules)
+
+
+# Function import_numpy : imports NumPy the 1st time it's needed, returns it (None if it's not installed)
+def import_numpy():
+
+    global numpy, glb_billing_numpy_imported
+
+    if glb_billing_numpy_imported is False:
+        glb_billing_numpy_imported = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+    return numpy
+
+
+# Function is_vectorized : tells if the rules are applied with NumPy
+def is_vectorized():
+    return glb_billing_vectorized is True and import_numpy() is not None
+
+
+# Function apply_billing_rules : returns the raw and billable seconds per (day, client) of each user of the columns
+def apply_billing_rules(p_task_columns: PttTaskColumns, p_billing_rules: list):
+
+    if is_vectorized():
+        return apply_billing_rules_numpy(p_task_columns, p_billing_rules)
+
+    return apply_billing_rules_python(p_task_columns, p_billing_rules)
+
+
+# Function apply_billing_rules_numpy : apply_billing_rules on whole arrays (one operation per rule)
+def apply_billing_rules_numpy(p_task_columns: PttTaskColumns, p_billing_rules: list):
+
+    if len(p_task_columns.seconds) == 0:
+        return []
+
+    # Miscellaneous initializations
+    w_nbr_clients = max(len(p_task_columns.client_names), 1)
+    w_days = numpy.asarray(p_task_columns.days, dtype=numpy.int64)
+    w_first_day = int(w_days.min())
+    w_nbr_days = int(w_days.max()) - w_first_day + 1
+    w_seconds = numpy.asarray(p_task_columns.seconds, dtype=numpy.int64)
+    w_billable = w_seconds.copy()
+
+    # Rules of the tasks
+    for w_rule in p_billing_rules:
+        w_step = w_rule.minutes * 60
+        if w_rule.kind == "round_up":
+            w_billable = -(-w_billable // w_step) * w_step
+        elif w_rule.kind == "round_nearest":
+            w_billable = (w_billable + w_step // 2) // w_step * w_step
+
+    # Grouping the tasks by (user, day, client) : the days of the users are numbered from the 1st day of the columns
+    w_user_days = numpy.asarray(p_task_columns.users, dtype=numpy.int64) * w_nbr_days + (w_days - w_first_day)
+    w_keys = w_user_days * w_nbr_clients + numpy.asarray(p_task_columns.clients, dtype=numpy.int64)
+    w_group_keys, w_group_of_task = numpy.unique(w_keys, return_inverse=True)
+    w_group_raw = sum_by_index(w_group_of_task, w_seconds, len(w_group_keys))
+    w_group_billable = sum_by_index(w_group_of_task, w_billable, len(w_group_keys))
+    w_group_user_days = w_group_keys // w_nbr_clients
+
+    # Rules of the days
+    for w_rule in p_billing_rules:
+        w_limit = w_rule.minutes * 60
+        if w_rule.kind == "minimum_per_day_per_client":
+            w_group_billable = numpy.where(w_group_billable > 0, numpy.maximum(w_group_billable, w_limit), 0)
+        elif w_rule.kind == "maximum_per_day_per_client":
+            w_group_billable = numpy.minimum(w_group_billable, w_limit)
+        elif w_rule.kind == "maximum_per_day":
+            # Note : the clients of a day over the limit share it in proportion of their time
+            w_user_days, w_day_of_group = numpy.unique(w_group_user_days, return_inverse=True)
+            w_day_billable = sum_by_index(w_day_of_group, w_group_billable, len(w_user_days))[w_day_of_group]
+            w_group_billable = numpy.where(w_day_billable > w_limit,
+                                           w_group_billable * w_limit // numpy.maximum(w_day_billable, 1),
+                                           w_group_billable)
+
+    return zip((w_group_user_days % w_nbr_days + w_first_day).tolist(), (w_group_keys % w_nbr_clients).tolist(),
+               w_group_raw.tolist(), w_group_billable.tolist())
+
+
+# Function sum_by_index : sums up the seconds with the same index (NumPy), in an array of p_length seconds
+def sum_by_index(p_indexes, p_seconds, p_length: int):
+
+    # Note : the sums are made in float64, exact up to 2^53 seconds
+    return numpy.bincount(p_indexes, weights=p_seconds, minlength=p_length).astype(numpy.int64)
+
+
+# Function apply_billing_rules_python : apply_billing_rules in plain Python (same integer computations as NumPy)
+def apply_billing_rules_python(p_task_columns: PttTaskColumns, p_billing_rules: list):
+
+    # Miscellaneous initializations
+    w_billable = list(p_task_columns.seconds)
+
+    # Rules of the tasks
+    for w_rule in p_billing_rules:
+        w_step = w_rule.minutes * 60
+        if w_rule.kind == "round_up":
+            w_billable = [-(-w_seconds // w_step) * w_step for w_seconds in w_billable]
+        elif w_rule.kind == "round_nearest":
+            w_billable = [(w_seconds + w_step // 2) // w_step * w_step for w_seconds in w_billable]
+
+    # Grouping the tasks by (user, day, client)
+    w_groups = {}
+    for w_key, w_seconds, w_billable_seconds in zip(zip(p_task_columns.users, p_task_columns.days,
+                                                        p_task_columns.clients), p_task_columns.seconds, w_billable):
+        w_group = w_groups.get(w_key)
+        if w_group is None:
+            w_groups[w_key] = [w_seconds, w_billable_seconds]
+        else:
+            w_group[0] = w_group[0] + w_seconds
+            w_group[1] = w_group[1] + w_billable_seconds
+
+    # Rules of the days
+    for w_rule in p_billing_rules:
+        w_limit = w_rule.minutes * 60
+        if w_rule.kind == "minimum_per_day_per_client":
+            for w_group in w_groups.values():
+                if w_group[1] > 0:
+                    w_group[1] = max(w_group[1], w_limit)
+        elif w_rule.kind == "maximum_per_day_per_client":
+            for w_group in w_groups.values():
+                w_group[1] = min(w_group[1], w_limit)
+        elif w_rule.kind == "maximum_per_day":
+            w_day_billable = {}
+            for (w_user, w_day, w_client), w_group in w_groups.items():
+                w_day_billable[w_user, w_day] = w_day_billable.get((w_user, w_day), 0) + w_group[1]
+            for (w_user, w_day, w_client), w_group in w_groups.items():
+                if w_day_billable[w_user, w_day] > w_limit:
+                    w_group[1] = w_group[1] * w_limit // w_day_billable[w_user, w_day]
+
+    return [(w_day, w_client, w_group[0], w_group[1]) for (w_user, w_day, w_client), w_group in w_groups.items()]
+
+
+# Function compute_billing : applies the rules on the columns, returns the raw and billable seconds per period/client
+def compute_billing(p_task_columns: PttTaskColumns, p_billing_rules: list, p_period: str = "month"):
+
+    # Miscellaneous initializations
+    w_billing_totals = PttBillingTotals()
+    w_billing_totals.nbr_tasks = len(p_task_columns.seconds)
+    w_period_length = glb_report_periods[p_period]
+    w_periods = {}
+
+    # Note : only a few hundreds of (day, client) are left, the periods are found from them
+    for w_day, w_client, w_seconds, w_billable_seconds in apply_billing_rules(p_task_columns, p_billing_rules):
+
+        w_period = w_periods.get(w_day)
+        if w_period is None:
+            w_period = datetime.date.fromordinal(w_day).isoformat()[:w_period_length]
+            w_periods[w_day] = w_period
+
+        w_key = (w_period, p_task_columns.client_names[w_client])
+        w_totals = w_billing_totals.seconds.setdefault(w_key, [0, 0])
+        w_totals[0] = w_totals[0] + w_seconds
+        w_totals[1] = w_totals[1] + w_billable_seconds
+
+    return w_billing_totals
+
+
+# Function read_task_columns : reads the tasks accepted by the filter in columns, from the files of each user
+def read_task_columns(p_source_paths_by_user: list, p_billing_filter: PttExportFilter, p_client_pattern: str,
+                      p_errors: list):
+
+    try:
+        w_task_columns = PttTaskColumns(p_client_pattern)
+    except re.error as w_error:
+        raise PttBillingError("invalid client pattern '{}' ({})".format(p_client_pattern, w_error))
+
+    # Note : a file which can't be read is reported, the other files are still billed
+    for w_user, w_source_paths in enumerate(p_source_paths_by_user):
+        for w_source_path in w_source_paths:
+            try:
+                for w_task_record in iter_task_records(w_source_path):
+                    if p_billing_filter.accepts(w_task_record):
+                        w_task_columns.add_task_record(w_task_record, w_user)
+            except (OSError, PttTasksStreamError, KeyError, ValueError) as w_error:
+                p_errors.append("'{}' : {}".format(w_source_path, w_error))
+
+    return w_task_columns
+
+
+# Function write_billing : writes the totals in a CSV file (by period, then client), returns the number of rows
+def write_billing(p_billing_totals: PttBillingTotals, p_file):
+
+    w_writer = csv.writer(p_file)
+    w_writer.writerow(glb_billing_columns)
+
+    for (w_period, w_client), (w_seconds, w_billable_seconds) in sorted(p_billing_totals.seconds.items()):
+        w_writer.writerow([w_period, w_client,
+                           convert_seconds_to_duration(w_seconds), "{:.2f}".format(w_seconds / 3600),
+                           convert_seconds_to_duration(w_billable_seconds), "{:.2f}".format(w_billable_seconds / 3600)])
+
+    return len(p_billing_totals.seconds)
+
+
+# Function bill_tasks : writes the billable time of the tasks files of each user in a CSV file, returns the totals
+def bill_tasks(p_source_paths_by_user: list, p_target_path: str, p_billing_filter: PttExportFilter, p_rules_text: str,
+               p_client_pattern: str = glb_billing_client_pattern_default, p_period: str = "month"):
+
+    if p_period not in glb_report_periods:
+        raise PttBillingError("unknown period '{}'".format(p_period))
+
+    w_billing_rules = parse_billing_rules(p_rules_text)
+    w_errors = []
+    w_billing_totals = compute_billing(read_task_columns(p_source_paths_by_user, p_billing_filter, p_client_pattern,
+                                                         w_errors), w_billing_rules, p_period)
+    w_billing_totals.errors = w_errors
+
+    # Note : the billing is written in a temporary file first, so a previous billing is never left half written
+    w_tmp_path = p_target_path + ".tmp"
+
+    try:
+        with open(w_tmp_path, "w", encoding="utf-8", newline="") as w_file:
+            write_billing(w_billing_totals, w_file)
+        os.replace(w_tmp_path, p_target_path)
+
+    except OSError as w_error:
+        if os.path.exists(w_tmp_path):
+            os.remove(w_tmp_path)
+        raise PttBillingError("cannot write the billing '{}' ({})".format(p_target_path, w_error))
+
+    return w_billing_totals
+
+
+# ------------------------------------------- #
+# Main
+# ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    w_parser = argparse.ArgumentParser(description="Writes the raw and billable time per period and client (CSV file)")
+    w_parser.add_argument("target", help="CSV file to write")
+    w_parser.add_argument("--source", nargs="+", default=[],
+                          help="tasks files or backups (.json.gz) to read (by default, my tasks and archives of "
+                               "the data directory and workspace of ptt_config.ini)")
+    w_parser.add_argument("--users", nargs="+", default=[],
+                          help="tasks files of several users, one per user (instead of --source)")
+    w_parser.add_argument("--rules", default="", help="rules, ex: \"round_up:15, minimum_per_day_per_client:30\"")
+    w_parser.add_argument("--client-pattern", default=glb_billing_client_pattern_default,
+                          help="regular expression of the client in the descriptions (1st group)")
+    w_parser.add_argument("--period", choices=list(glb_report_periods), default="month", help="period of the totals")
+    w_parser.add_argument("--from", dest="date_from", type=parse_date_argument, help="1st day billed")
+    w_parser.add_argument("--to", dest="date_to", type=parse_date_argument, help="last day billed")
+    w_parser.add_argument("--description", default="", help="text the description must contain (case insensitive)")
+    w_args = w_parser.parse_args()
+
+    # Note : the files of --source are the files of a single user
+    if w_args.users:
+        w_source_paths_by_user = [[w_source_path] for w_source_path in w_args.users]
+    else:
+        w_workspace_dir = get_config_workspace_dir()
+        w_source_paths_by_user = [w_args.source or list_report_sources(os.path.join(w_workspace_dir, "my_tasks.json"),
+                                                                        os.path.join(w_workspace_dir, "archives"))]
+
+    try:
+        w_totals = bill_tasks(w_source_paths_by_user, w_args.target,
+                              PttExportFilter(w_args.date_from, w_args.date_to, w_args.description), w_args.rules,
+                              w_args.client_pattern, w_args.period)
+    except PttBillingError as w_error:
+        print("ptt_billing : {}".format(w_error), file=sys.stderr)
+        sys.exit(1)
+
+    for w_billing_error in w_totals.errors:
+        print("ptt_billing : {}".format(w_billing_error), file=sys.stderr)
+
+    print("{} task(s) of {} file(s) billed in '{}' : {} billable for {} worked".format(
+        w_totals.nbr_tasks, sum(len(w_source_paths) for w_source_paths in w_source_paths_by_user), w_args.target,
+        convert_seconds_to_duration(w_totals.billable_seconds()), convert_seconds_to_duration(w_totals.raw_seconds())))
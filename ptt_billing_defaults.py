@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_billing_defaults.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : default values of the billing (see ptt_billing.py)
+* - No imports : the settings (ptt_config.py) read the defaults from here, without loading
+*   the billing and its dependencies at the startup of PTT
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Client of a task : the 1st word of its description by default (ex: "ACME" for "ACME-1234 : Analyse")
+glb_billing_client_pattern_default = r"^\W*([^\W_]+)"
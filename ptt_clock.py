@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_clock.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : clock and timers used by PTT (current datetime, timers of the active task...)
+* - PTT asks the current datetime and creates its timers through get_ptt_clock()
+* - By default, it's the system clock with QTimer objects
+* - A PttSimulatedClock can be installed before importing ptt_main.py : the time only
+*   moves when advance() is called, and the timers are fired in the right order meanwhile
+*   (used by ptt_simulator.py to run months of tracking in a few minutes)
+* - No dependency on PyQt5 for the simulated clock (QtCore is only imported for the QTimer)
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import datetime
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttClock : system clock, the timers are QTimer objects
+class PttClock:
+
+    # Method now : current local datetime
+    def now(self):
+        return datetime.datetime.now()
+
+    # Method create_timer : returns a new timer (same methods and timeout signal as a QTimer)
+    def create_timer(self):
+        from PyQt5 import QtCore
+        return QtCore.QTimer()
+
+
+# Class PttClockSignal : minimal signal (connect/emit) for the simulated timers
+class PttClockSignal:
+    def __init__(self):
+        self.slots = []
+
+    # Method connect : adds a function to call when the signal is emitted
+    def connect(self, p_slot):
+        self.slots.append(p_slot)
+
+    # Method emit : calls all the functions connected
+    def emit(self):
+        for w_slot in list(self.slots):
+            w_slot()
+
+
+# Class PttSimulatedTimer : timer fired by a PttSimulatedClock (subset of the QTimer methods used by PTT)
+class PttSimulatedTimer:
+    def __init__(self, p_clock):
+        self.clock = p_clock
+        self.timeout = PttClockSignal()
+        self.interval_in_msec = 0
+        self.single_shot = False
+        self.due_at = None
+
+    # Method setSingleShot : the timer is only fired once after each start
+    def setSingleShot(self, p_single_shot: bool):
+        self.single_shot = p_single_shot
+
+    # Method setInterval : changes the interval used by the next start
+    def setInterval(self, p_interval_in_msec: int):
+        self.interval_in_msec = p_interval_in_msec
+
+    # Method interval : interval of the timer
+    def interval(self):
+        return self.interval_in_msec
+
+    # Method start : (re)starts the timer, with a new interval if any
+    def start(self, p_interval_in_msec: int = None):
+        if p_interval_in_msec is not None:
+            self.interval_in_msec = p_interval_in_msec
+        self.due_at = self.clock.now() + datetime.timedelta(milliseconds=self.interval_in_msec)
+
+    # Method stop : stops the timer
+    def stop(self):
+        self.due_at = None
+
+    # Method isActive : True if the timer is started
+    def isActive(self):
+        return self.due_at is not None
+
+
+# Class PttSimulatedClock : clock which only moves when advance() is called
+class PttSimulatedClock(PttClock):
+    def __init__(self, p_start: datetime.datetime):
+        self.current = p_start
+        self.timers = []
+
+    # Method now : current simulated datetime
+    def now(self):
+        return self.current
+
+    # Method create_timer : returns a new simulated timer
+    def create_timer(self):
+        w_timer = PttSimulatedTimer(self)
+        self.timers.append(w_timer)
+        return w_timer
+
+    # Method advance : moves the time forward, firing the timers due meanwhile (in their order), returns the nbr fired
+    def advance(self, p_seconds: float):
+
+        # Miscellaneous initializations
+        w_target = self.current + datetime.timedelta(seconds=p_seconds)
+        w_nbr_fired = 0
+
+        while True:
+
+            # Looking for the next timer due (the 1st one created first if several are due at the same time)
+            w_next_timer = None
+            for w_timer in self.timers:
+                if w_timer.due_at is not None and w_timer.due_at <= w_target and \
+                        (w_next_timer is None or w_timer.due_at < w_next_timer.due_at):
+                    w_next_timer = w_timer
+
+            if w_next_timer is None:
+                break
+
+            # The time moves to the timer, which is started again (unless single shot) before being fired
+            self.current = w_next_timer.due_at
+            if w_next_timer.single_shot is True:
+                w_next_timer.due_at = None
+            else:
+                w_next_timer.due_at = self.current + datetime.timedelta(
+                    milliseconds=max(w_next_timer.interval_in_msec, 1))
+
+            w_next_timer.timeout.emit()
+            w_nbr_fired = w_nbr_fired + 1
+
+        self.current = w_target
+        return w_nbr_fired
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Clock used by PTT (replaced by install_ptt_clock)
+glb_ptt_clock = PttClock()
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function get_ptt_clock : returns the clock used by PTT
+def get_ptt_clock():
+    return glb_ptt_clock
+
+
+# Function install_ptt_clock : replaces the clock used by PTT (before importing ptt_main.py)
+def install_ptt_clock(p_clock: PttClock):
+    global glb_ptt_clock
+    glb_ptt_clock = p_clock
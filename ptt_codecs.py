@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_codecs.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : codecs of the JSON texts of my tasks (the data of the blocks, see ptt_tasks_blocks.py)
+* - "pretty" : json.dumps with its default separators (the format of the previous versions)
+* - "compact" : no spaces after the separators (smaller file)
+* - The codec is written in the tasks file (except "pretty"), so it's found when loading
+* - The accelerated libraries are used automatically when installed (orjson for now), the
+*   standard json module otherwise : an accelerated encoder must write exactly the same
+*   texts as json.dumps (the checksums of the blocks are computed on these texts)
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Codec of the files of the previous versions (and of the files without "codec")
+glb_codec_default = "pretty"
+
+# Use of the accelerated libraries when they are installed (the standard json module only if False)
+glb_codecs_accelerated = True
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttCodec : layout of the JSON texts (separators), and the accelerated encoder writing the same texts if any
+class PttCodec:
+    def __init__(self, p_name: str, p_separators: tuple):
+        self.name = p_name
+        self.separators = p_separators
+        self.accelerated_dumps = None
+
+    # Method dumps : returns the JSON text of the data (the accelerated encoder is used if installed)
+    def dumps(self, p_data):
+
+        # Note : if the accelerated encoder can't encode the data (invalid texts...), json.dumps tells why
+        if glb_codecs_accelerated is True and self.accelerated_dumps is not None:
+            try:
+                return self.accelerated_dumps(p_data)
+            except (TypeError, ValueError):
+                pass
+
+        return json.dumps(p_data, ensure_ascii=False, separators=self.separators)
+
+
+# ------------------------------------------- #
+# Codecs
+# ------------------------------------------- #
+
+# Codecs of the tasks files, by name
+glb_codecs = {
+    "pretty": PttCodec("pretty", (", ", ": ")),
+    "compact": PttCodec("compact", (",", ":"))}
+
+# orjson writes the "compact" texts
+if orjson is not None:
+    glb_codecs["compact"].accelerated_dumps = lambda p_data: orjson.dumps(p_data).decode("utf-8")
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function get_codec : returns a codec by its name (the default one if unknown)
+def get_codec(p_name: str):
+
+    w_codec = glb_codecs.get(p_name)
+    if w_codec is None:
+        print("get_codec : unknown codec '{}', '{}' used instead".format(p_name, glb_codec_default))
+        w_codec = glb_codecs[glb_codec_default]
+
+    return w_codec
+
+
+# Function loads : decodes a JSON text, whatever the codec which wrote it (the accelerated decoder is used if installed)
+def loads(p_text: str):
+
+    # Note : if the accelerated decoder rejects the text, json.loads decides (and tells why)
+    if glb_codecs_accelerated is True and orjson is not None:
+        try:
+            return orjson.loads(p_text)
+        except ValueError:
+            pass
+
+    return json.loads(p_text)
+
+
+# Function get_accelerator_name : name of the accelerated library used ("" if none)
+def get_accelerator_name():
+    return "orjson" if glb_codecs_accelerated is True and orjson is not None else ""
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_config.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : typed settings of ptt_config.ini, loaded once and cached
+* - The file is watched (QFileSystemWatcher) and reloaded only when it changes on disk
+* - The changes are batched (a single write a short time after the last change)
+* - The file is written atomically (temporary file, then replaced)
+* - To add a new setting, just add a PttConfigKey in glb_ptt_config_keys
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+from PyQt5 import QtCore
+from ptt_sync import glb_sync_default_host, glb_sync_default_port
+from ptt_clock import get_ptt_clock
+from ptt_codecs import glb_codec_default, glb_codecs
+from ptt_billing_defaults import glb_billing_client_pattern_default
+from ptt_workspaces import glb_workspace_default, glb_workspaces_cache_size_in_mb
+import os
+import configparser
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttConfigKey : describes a setting (section/key in the .ini file, attribute, type and default value)
+class PttConfigKey:
+    def __init__(self, p_section: str, p_key: str, p_attribute: str, p_type: type, p_default, p_allowed=None):
+        self.section = p_section
+        self.key = p_key
+        self.attribute = p_attribute
+        self.type = p_type
+        self.default = p_default
+        self.allowed = p_allowed
+
+
+# List of the settings handled in ptt_config.ini
+glb_ptt_config_keys = [
+    PttConfigKey("UI", "language", "UI_Language", str, "fr", {"fr", "en"}),
+    PttConfigKey("SYNC", "server_host", "SYNC_Server_Host", str, glb_sync_default_host),
+    PttConfigKey("SYNC", "server_port", "SYNC_Server_Port", int, glb_sync_default_port),
+    PttConfigKey("BACKUP", "hourly", "BACKUP_Hourly", int, 24),
+    PttConfigKey("BACKUP", "daily", "BACKUP_Daily", int, 7),
+    PttConfigKey("BACKUP", "weekly", "BACKUP_Weekly", int, 8),
+    PttConfigKey("STORAGE", "intern_descriptions", "STORAGE_Intern_Descriptions", bool, False),
+    PttConfigKey("STORAGE", "codec", "STORAGE_Codec", str, glb_codec_default, set(glb_codecs)),
+    PttConfigKey("STORAGE", "data_dir", "STORAGE_Data_Dir", str, ""),
+    PttConfigKey("STORAGE", "local_cache_dir", "STORAGE_Local_Cache_Dir", str, ""),
+    PttConfigKey("BILLING", "rules", "BILLING_Rules", str, ""),
+    PttConfigKey("BILLING", "client_pattern", "BILLING_Client_Pattern", str, glb_billing_client_pattern_default),
+    PttConfigKey("WORKSPACES", "current", "WORKSPACES_Current", str, glb_workspace_default),
+    PttConfigKey("WORKSPACES", "cache_size_mb", "WORKSPACES_Cache_Size_MB", int, glb_workspaces_cache_size_in_mb)]
+
+# Delay before writing the changes in the file (all the changes made meanwhile are written at once)
+glb_ptt_config_write_delay_in_msec = 500
+
+
+# Class PttConfig : values of the ptt_config.ini file, as typed attributes (see glb_ptt_config_keys)
+class PttConfig(QtCore.QObject):
+
+    # Signal emitted when the file was modified outside of PTT and reloaded
+    config_changed = QtCore.pyqtSignal()
+
+    def __init__(self, p_ptt_config_ini: str):
+        super().__init__()
+        self.ptt_config_ini = p_ptt_config_ini
+        self.parser = configparser.ConfigParser()
+        self.file_signature = None
+        self.watcher = None
+        self.write_timer = None
+
+        # Default values until the file is loaded
+        for w_config_key in glb_ptt_config_keys:
+            setattr(self, w_config_key.attribute, w_config_key.default)
+
+    # Method load : reads the file and converts the values (invalid or missing values get their default value)
+    def load(self):
+
+        # Reading the config file
+        w_parser = configparser.ConfigParser()
+        try:
+            w_parser.read(self.ptt_config_ini, encoding="utf-8")
+        except configparser.Error:
+            print("PttConfig.load : error when reading the '{}' file".format(self.ptt_config_ini))
+            return
+
+        self.parser = w_parser
+        self.file_signature = self.get_file_signature()
+
+        for w_config_key in glb_ptt_config_keys:
+            setattr(self, w_config_key.attribute, self.read_value(w_config_key))
+
+    # Method read_value : reads a value from the parser and checks its type and its allowed values
+    def read_value(self, p_config_key: PttConfigKey):
+
+        # Missing section or key
+        if self.parser.has_option(p_config_key.section, p_config_key.key) is False:
+            return p_config_key.default
+
+        try:
+            if p_config_key.type is int:
+                w_value = self.parser.getint(p_config_key.section, p_config_key.key)
+            elif p_config_key.type is bool:
+                w_value = self.parser.getboolean(p_config_key.section, p_config_key.key)
+            else:
+                w_value = self.parser.get(p_config_key.section, p_config_key.key)
+        except ValueError:
+            print("PttConfig.read_value : invalid value for [{}] {} in the '{}' file"
+                  .format(p_config_key.section, p_config_key.key, self.ptt_config_ini))
+            return p_config_key.default
+
+        # If the value found is not supported, we set it to the default value
+        if p_config_key.allowed is not None and w_value not in p_config_key.allowed:
+            return p_config_key.default
+
+        return w_value
+
+    # Method set_value : changes a value ; the file is written later, with all the other changes made meanwhile
+    def set_value(self, p_attribute: str, p_value):
+
+        # Retrieving the setting description
+        w_config_key = None
+        for w_key in glb_ptt_config_keys:
+            if w_key.attribute == p_attribute:
+                w_config_key = w_key
+
+        if w_config_key is None:
+            raise KeyError(p_attribute)
+
+        # If the value is not supported, we set it to the default value
+        if w_config_key.allowed is not None and p_value not in w_config_key.allowed:
+            p_value = w_config_key.default
+
+        setattr(self, p_attribute, p_value)
+
+        # Updating the parser (adding the section if none was found)
+        if self.parser.has_section(w_config_key.section) is False:
+            self.parser.add_section(w_config_key.section)
+
+        if w_config_key.type is bool:
+            self.parser.set(w_config_key.section, w_config_key.key, "yes" if p_value else "no")
+        else:
+            self.parser.set(w_config_key.section, w_config_key.key, str(p_value))
+
+        # Writing is delayed (or immediate if there is no event loop to run the timer)
+        if self.write_timer is not None:
+            self.write_timer.start(glb_ptt_config_write_delay_in_msec)
+        else:
+            self.write()
+
+    # Method write : writes the whole config atomically (a crash can't leave an half written file)
+    def write(self):
+
+        # Miscellaneous initializations
+        w_ptt_config_ini_tmp = self.ptt_config_ini + ".tmp"
+
+        try:
+            with open(w_ptt_config_ini_tmp, "w", encoding="utf-8") as w_configfile:
+                self.parser.write(w_configfile)
+            os.replace(w_ptt_config_ini_tmp, self.ptt_config_ini)
+        except OSError:
+            print("PttConfig.write : cannot write in the '{}' file".format(self.ptt_config_ini))
+            return
+
+        # Our own write must not be seen as an external change
+        self.file_signature = self.get_file_signature()
+
+        # The file was replaced, so it must be watched again
+        if self.watcher is not None and self.ptt_config_ini not in self.watcher.files():
+            self.watcher.addPath(self.ptt_config_ini)
+
+    # Method flush : writes the pending changes right now (at the application exit for example)
+    def flush(self):
+        if self.write_timer is not None and self.write_timer.isActive():
+            self.write_timer.stop()
+            self.write()
+
+    # Method watch : starts watching the file (and its folder, since the file may not exist yet or be replaced)
+    def watch(self):
+
+        self.write_timer = get_ptt_clock().create_timer()
+        self.write_timer.setSingleShot(True)
+        self.write_timer.timeout.connect(self.write)
+
+        self.watcher = QtCore.QFileSystemWatcher()
+        self.watcher.addPath(os.path.dirname(os.path.abspath(self.ptt_config_ini)))
+        if os.path.exists(self.ptt_config_ini):
+            self.watcher.addPath(self.ptt_config_ini)
+
+        self.watcher.fileChanged.connect(self.file_changed)
+        self.watcher.directoryChanged.connect(self.file_changed)
+
+    # Method get_file_signature : modification time and size of the file (None if it doesn't exist)
+    def get_file_signature(self):
+        try:
+            w_stat = os.stat(self.ptt_config_ini)
+            return w_stat.st_mtime_ns, w_stat.st_size
+        except OSError:
+            return None
+
+    # Method file_changed : reloads the file only if it was really modified outside of PTT
+    def file_changed(self):
+
+        # Watching the file again if it was replaced or created
+        if os.path.exists(self.ptt_config_ini) and self.ptt_config_ini not in self.watcher.files():
+            self.watcher.addPath(self.ptt_config_ini)
+
+        # Nothing to do if the file is the one we wrote or if our changes are not written yet
+        if self.get_file_signature() == self.file_signature or self.write_timer.isActive():
+            return
+
+        self.load()
+        self.config_changed.emit()
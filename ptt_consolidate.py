@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_consolidate.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : consolidation of the tasks with the same description over a date range
+* - The tasks are grouped by description (case and spaces ignored), and by day if asked,
+*   in one pass with a dictionary
+* - The durations of each group are summed up, then split in tasks of 8 hours maximum :
+*   the upper tasks of the group are kept with these durations, the others are removed
+* - Only the plan is computed here (rows to update and to remove), the main window
+*   applies it in one operation (one save, one undo)
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+from ptt_export import PttExportFilter
+from ptt_day_totals import started_on_to_day, duration_to_seconds
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Maximum duration of a task (same as the timer, see add_duration_to_task_at_row)
+glb_consolidate_max_duration_in_sec = 8 * 3600
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttConsolidationGroup : rows of the tasks with the same description (and day), and their total duration
+class PttConsolidationGroup:
+    def __init__(self, p_description: str, p_day: str):
+        self.description = p_description
+        self.day = p_day
+        self.rows = []
+        self.total_in_secs = 0
+
+
+# Class PttConsolidationPlan : groups consolidated, rows updated (row, duration, description) and rows removed
+class PttConsolidationPlan:
+    def __init__(self):
+        self.groups = []
+        self.updated_rows = []
+        self.removed_rows = []
+
+    # Method nbr_tasks_before : number of tasks of the groups consolidated
+    def nbr_tasks_before(self):
+        return len(self.updated_rows) + len(self.removed_rows)
+
+    # Method nbr_tasks_after : number of tasks left once the groups are consolidated
+    def nbr_tasks_after(self):
+        return len(self.updated_rows)
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function normalize_description : returns the key of a description (case and repeated spaces ignored)
+def normalize_description(p_description: str):
+    return " ".join(p_description.split()).casefold()
+
+
+# Function split_duration : splits a duration in parts of p_max_duration_in_secs maximum (the remains 1st)
+def split_duration(p_duration_in_secs: int, p_max_duration_in_secs: int = glb_consolidate_max_duration_in_sec):
+
+    w_nbr_full_parts = max(0, -(-p_duration_in_secs // p_max_duration_in_secs) - 1)
+    w_remains_in_secs = p_duration_in_secs - p_max_duration_in_secs * w_nbr_full_parts
+
+    return [w_remains_in_secs] + [p_max_duration_in_secs] * w_nbr_full_parts
+
+
+# Function convert_secs_to_duration : turns seconds into a "hh:mm" duration
+def convert_secs_to_duration(p_duration_in_secs: int):
+    return "{:02d}:{:02d}".format(p_duration_in_secs // 3600, p_duration_in_secs % 3600 // 60)
+
+
+# Function plan_consolidation : groups the tasks (row, started_on, duration, description) in one pass, returns the plan
+def plan_consolidation(p_tasks_cells, p_consolidate_filter: PttExportFilter, p_by_day: bool,
+                       p_max_duration_in_secs: int = glb_consolidate_max_duration_in_sec):
+
+    # Miscellaneous initializations
+    w_groups = {}
+    w_consolidation_plan = PttConsolidationPlan()
+
+    # Grouping the tasks of the range (the rows are received from the top, so the upper task of a group comes 1st)
+    for w_row, w_started_on, w_duration, w_description in p_tasks_cells:
+
+        if not p_consolidate_filter.accepts({"started_on": w_started_on, "description": w_description}):
+            continue
+
+        w_day = started_on_to_day(w_started_on)
+        w_key = (normalize_description(w_description), w_day if p_by_day is True else "")
+
+        w_group = w_groups.get(w_key)
+        if w_group is None:
+            w_group = PttConsolidationGroup(w_description, w_day if p_by_day is True else "")
+            w_groups[w_key] = w_group
+
+        w_group.rows.append(w_row)
+        w_group.total_in_secs = w_group.total_in_secs + duration_to_seconds(w_duration)
+
+    # Each group keeps as many tasks as parts of 8 hours (the upper ones), the other tasks are removed
+    for w_group in w_groups.values():
+
+        w_durations_in_secs = split_duration(w_group.total_in_secs, p_max_duration_in_secs)
+        if len(w_group.rows) <= len(w_durations_in_secs):
+            continue
+
+        w_consolidation_plan.groups.append(w_group)
+        for w_row, w_duration_in_secs in zip(w_group.rows, w_durations_in_secs):
+            w_consolidation_plan.updated_rows.append((w_row, convert_secs_to_duration(w_duration_in_secs),
+                                                      w_group.description))
+        w_consolidation_plan.removed_rows.extend(w_group.rows[len(w_durations_in_secs):])
+
+    return w_consolidation_plan
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_day_totals.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : totals of the time worked per day (and per description of each day)
+* - The totals are updated task by task (tick, edit, merge, delete...), the duration of
+*   each task being counted on the day it started on (the tasks never last over 8 hours)
+* - The totals of a day and of a week are then given without reading the tasks
+* - The totals are saved in ptt_day_totals.json with the hash of the my_tasks.json content
+*   they match : at startup, they are only computed again if the tasks file changed
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import json
+import datetime
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Version of the ptt_day_totals.json file (the totals are computed again if it changes)
+glb_day_totals_version = 1
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttDayTotals : seconds worked per day ("yyyy-mm-dd") and per description of each day
+class PttDayTotals:
+    def __init__(self):
+        self.seconds_by_day = {}
+        self.description_seconds_by_day = {}
+        self.task_totals = {}
+
+    # Method add : adds (or removes, with negative seconds) seconds to a day and a description of this day
+    def add(self, p_day: str, p_description: str, p_seconds: int):
+
+        self.seconds_by_day[p_day] = self.seconds_by_day.get(p_day, 0) + p_seconds
+
+        w_description_seconds = self.description_seconds_by_day.setdefault(p_day, {})
+        w_description_seconds[p_description] = w_description_seconds.get(p_description, 0) + p_seconds
+
+        # The empty totals are forgotten
+        if w_description_seconds[p_description] == 0:
+            del w_description_seconds[p_description]
+        if not w_description_seconds:
+            del self.description_seconds_by_day[p_day]
+            del self.seconds_by_day[p_day]
+
+    # Method set_task : counts the task with its new values (its previous values are not counted anymore)
+    def set_task(self, p_task_id: str, p_started_on: str, p_duration: str, p_description: str):
+
+        w_task_total = (started_on_to_day(p_started_on), p_description, duration_to_seconds(p_duration))
+        if self.task_totals.get(p_task_id) == w_task_total:
+            return
+
+        self.remove_task(p_task_id)
+        self.task_totals[p_task_id] = w_task_total
+        self.add(*w_task_total)
+
+    # Method remove_task : stops counting a task (unknown task ids are ignored)
+    def remove_task(self, p_task_id: str):
+
+        w_task_total = self.task_totals.pop(p_task_id, None)
+        if w_task_total is not None:
+            w_day, w_description, w_seconds = w_task_total
+            self.add(w_day, w_description, -w_seconds)
+
+    # Method rebuild : computes all the totals again from the task records
+    def rebuild(self, p_task_records: list):
+
+        self.seconds_by_day = {}
+        self.description_seconds_by_day = {}
+        self.task_totals = {}
+
+        for w_task_record in p_task_records:
+            self.set_task(w_task_record["task_id"], w_task_record["started_on"], w_task_record["duration"],
+                          w_task_record["description"])
+
+    # Method seconds_of_day : seconds worked on a day
+    def seconds_of_day(self, p_date: datetime.date):
+        return self.seconds_by_day.get(p_date.isoformat(), 0)
+
+    # Method seconds_of_week : seconds worked during the week (monday to sunday) of a day
+    def seconds_of_week(self, p_date: datetime.date):
+
+        w_monday = p_date - datetime.timedelta(days=p_date.weekday())
+        return sum(self.seconds_of_day(w_monday + datetime.timedelta(days=w_index)) for w_index in range(7))
+
+    # Method description_seconds_of_day : seconds worked on a day per description (the longest first)
+    def description_seconds_of_day(self, p_date: datetime.date):
+
+        w_description_seconds = self.description_seconds_by_day.get(p_date.isoformat(), {})
+        return sorted(w_description_seconds.items(), key=lambda p_item: (-p_item[1], p_item[0]))
+
+    # Method load : loads the totals saved if they match the content of my_tasks.json (its hash), returns True if so
+    def load(self, p_day_totals_json: str, p_content_hash: str):
+
+        try:
+            with open(p_day_totals_json, "r", encoding="utf-8") as file:
+                w_day_totals_data = json.load(file)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError):
+            print("PttDayTotals.load : cannot read the '{}' file".format(p_day_totals_json))
+            return False
+
+        try:
+            if w_day_totals_data["version"] != glb_day_totals_version or w_day_totals_data["key"] != p_content_hash:
+                return False
+
+            self.task_totals = {w_task_id: (w_day, w_description, w_seconds)
+                                for w_task_id, (w_day, w_description, w_seconds)
+                                in w_day_totals_data["tasks"].items()}
+            self.seconds_by_day = w_day_totals_data["days"]
+            self.description_seconds_by_day = w_day_totals_data["descriptions"]
+
+        except (KeyError, TypeError, ValueError, AttributeError):
+            print("PttDayTotals.load : invalid data in the '{}' file".format(p_day_totals_json))
+            self.rebuild([])
+            return False
+
+        return True
+
+    # Method save : saves the totals with the hash of the my_tasks.json content they match
+    def save(self, p_day_totals_json: str, p_content_hash: str):
+
+        w_day_totals_data = {
+            "version": glb_day_totals_version,
+            "key": p_content_hash,
+            "days": self.seconds_by_day,
+            "descriptions": self.description_seconds_by_day,
+            "tasks": self.task_totals}
+
+        # Note : written in a temporary file first, so the totals are never half written
+        w_day_totals_json_tmp = p_day_totals_json + ".tmp"
+
+        try:
+            with open(w_day_totals_json_tmp, "w", encoding="utf-8") as file:
+                json.dump(w_day_totals_data, file, ensure_ascii=False)
+            os.replace(w_day_totals_json_tmp, p_day_totals_json)
+        except OSError:
+            print("PttDayTotals.save : cannot write in the '{}' file".format(p_day_totals_json))
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function started_on_to_day : turns a "dd/MM/yyyy hh:mm" text into a "yyyy-mm-dd" day
+def started_on_to_day(p_started_on: str):
+    return "{}-{}-{}".format(p_started_on[6:10], p_started_on[3:5], p_started_on[0:2])
+
+
+# Function duration_to_seconds : turns a "hh:mm" duration into seconds
+def duration_to_seconds(p_duration: str):
+
+    # Note : an invalid duration (modified outside of PTT) counts for nothing
+    try:
+        w_hours, w_minutes = p_duration.split(":")[:2]
+        return int(w_hours) * 3600 + int(w_minutes) * 60
+    except ValueError:
+        return 0
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_descriptions.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : packed format of my tasks on disk, each distinct description being saved once
+* - The descriptions are saved in a "descriptions" array, the tasks having a
+*   "description_id" instead of a "description" (see pack_task_records, and
+*   ptt_tasks_blocks.py for the loading)
+* - In the list, the descriptions stay plain texts : keeping only their id in the cells
+*   (displayed by a delegate) saved about 4% of the memory with 100k or 200k tasks, not
+*   worth a shared table of the descriptions (see ptt_bench.py descriptions)
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function pack_task_records : replaces the descriptions of the records by ids in a table of distinct descriptions
+def pack_task_records(p_task_records: list):
+
+    # Miscellaneous initializations
+    w_descriptions = []
+    w_ids = {}
+    w_packed_records = []
+
+    for w_task_record in p_task_records:
+
+        w_description = w_task_record["description"]
+        w_id = w_ids.get(w_description)
+        if w_id is None:
+            w_id = len(w_descriptions)
+            w_ids[w_description] = w_id
+            w_descriptions.append(w_description)
+
+        w_packed_record = {w_key: w_value for w_key, w_value in w_task_record.items() if w_key != "description"}
+        w_packed_record["description_id"] = w_id
+        w_packed_records.append(w_packed_record)
+
+    return {"descriptions": w_descriptions, "tasks": w_packed_records}
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_edit_delegates.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : delegates editing the tasks in place, in the cells of the list
+* - Started on : date/time field (with a calendar), duration : time field between - and +
+*   buttons (adding/subtracting a step), description : multi-line text field
+* - A cell edited is not written in the list by the delegate : the text is sent to the
+*   function received (p_commit_cell), which updates the row and saves the task alone
+* - The edit is validated with Enter (Ctrl+Enter for the description, Enter adding a new
+*   line), Tab or by leaving the cell, and cancelled with Escape
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+from PyQt5.QtWidgets import QStyledItemDelegate, QDateTimeEdit, QTimeEdit, QPlainTextEdit, QToolButton, QWidget, \
+    QHBoxLayout
+from PyQt5.QtCore import Qt, QDateTime, QTime, QEvent
+from PyQt5.QtGui import QTextCursor
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Number of lines displayed by the description field (it's taller than the cell)
+glb_description_editor_nbr_lines = 4
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttStartedOnDelegate : edits the date/time a task started on
+class PttStartedOnDelegate(QStyledItemDelegate):
+    def __init__(self, p_format: str, p_commit_cell, p_parent=None):
+        super().__init__(p_parent)
+        self.format = p_format
+        self.commit_cell = p_commit_cell
+
+    # Method createEditor : date/time field with a calendar
+    def createEditor(self, p_parent, p_option, p_index):
+        w_editor = QDateTimeEdit(p_parent)
+        w_editor.setDisplayFormat(self.format)
+        w_editor.setCalendarPopup(True)
+        return w_editor
+
+    # Method setEditorData : the field starts with the date/time of the cell
+    def setEditorData(self, p_editor, p_index):
+        p_editor.setDateTime(QDateTime.fromString(p_index.data(Qt.DisplayRole), self.format))
+
+    # Method setModelData : sends the date/time to the commit function (the row is updated and saved by it)
+    def setModelData(self, p_editor, p_model, p_index):
+        self.commit_cell(p_index.row(), p_index.column(), p_editor.dateTime().toString(self.format))
+
+
+# Class PttDurationEditor : time field of a duration, between the buttons subtracting and adding a step
+class PttDurationEditor(QWidget):
+    def __init__(self, p_format: str, p_minimum: QTime, p_maximum: QTime, p_step_in_min: int, p_parent=None):
+        super().__init__(p_parent)
+        self.step_in_min = p_step_in_min
+
+        self.time_edit = QTimeEdit(self)
+        self.time_edit.setDisplayFormat(p_format)
+        self.time_edit.setMinimumTime(p_minimum)
+        self.time_edit.setMaximumTime(p_maximum)
+        self.time_edit.setAlignment(Qt.AlignCenter)
+
+        # Note : the buttons never take the focus, so the edit is not validated when they are clicked
+        self.btn_minus = QToolButton(self)
+        self.btn_minus.setText("-")
+        self.btn_minus.setFocusPolicy(Qt.NoFocus)
+        self.btn_minus.setAutoRepeat(True)
+        self.btn_minus.clicked.connect(lambda: self.add_step(-1))
+
+        self.btn_plus = QToolButton(self)
+        self.btn_plus.setText("+")
+        self.btn_plus.setFocusPolicy(Qt.NoFocus)
+        self.btn_plus.setAutoRepeat(True)
+        self.btn_plus.clicked.connect(lambda: self.add_step(1))
+
+        w_layout = QHBoxLayout(self)
+        w_layout.setContentsMargins(0, 0, 0, 0)
+        w_layout.setSpacing(0)
+        w_layout.addWidget(self.btn_minus)
+        w_layout.addWidget(self.time_edit, 1)
+        w_layout.addWidget(self.btn_plus)
+
+        self.setFocusProxy(self.time_edit)
+        self.setAutoFillBackground(True)
+
+    # Method add_step : adds (p_sign = 1) or subtracts (p_sign = -1) a step to the duration (kept between min and max)
+    def add_step(self, p_sign: int):
+        w_time = self.time_edit.time()
+        w_limit = self.time_edit.maximumTime() if p_sign > 0 else self.time_edit.minimumTime()
+        self.time_edit.setTime(w_time.addSecs(p_sign * min(self.step_in_min * 60, abs(w_time.secsTo(w_limit)))))
+
+
+# Class PttDurationDelegate : edits the duration of a task
+class PttDurationDelegate(QStyledItemDelegate):
+    def __init__(self, p_format: str, p_minimum: QTime, p_maximum: QTime, p_step_in_min: int, p_commit_cell,
+                 p_parent=None):
+        super().__init__(p_parent)
+        self.format = p_format
+        self.minimum = p_minimum
+        self.maximum = p_maximum
+        self.step_in_min = p_step_in_min
+        self.commit_cell = p_commit_cell
+
+    # Method createEditor : time field between the - and + buttons
+    def createEditor(self, p_parent, p_option, p_index):
+        w_editor = PttDurationEditor(self.format, self.minimum, self.maximum, self.step_in_min, p_parent)
+
+        # The keys and the focus of the time field are handled as the ones of the editor (see eventFilter)
+        w_editor.time_edit.installEventFilter(self)
+        return w_editor
+
+    # Method eventFilter : the events of the time field are the events of its editor (Enter, Tab, Escape, focus...)
+    def eventFilter(self, p_object, p_event):
+        if isinstance(p_object.parent(), PttDurationEditor):
+            return super().eventFilter(p_object.parent(), p_event)
+        return super().eventFilter(p_object, p_event)
+
+    # Method setEditorData : the field starts with the duration of the cell
+    def setEditorData(self, p_editor, p_index):
+        p_editor.time_edit.setTime(QTime.fromString(p_index.data(Qt.DisplayRole), self.format))
+
+    # Method setModelData : sends the duration to the commit function (the row is updated and saved by it)
+    def setModelData(self, p_editor, p_model, p_index):
+        self.commit_cell(p_index.row(), p_index.column(), p_editor.time_edit.time().toString(self.format))
+
+
+# Class PttDescriptionEditDelegate : edits the description of a task
+class PttDescriptionEditDelegate(QStyledItemDelegate):
+    def __init__(self, p_commit_cell, p_parent=None):
+        super().__init__(p_parent)
+        self.commit_cell = p_commit_cell
+
+    # Method createEditor : multi-line text field
+    def createEditor(self, p_parent, p_option, p_index):
+        w_editor = QPlainTextEdit(p_parent)
+        w_editor.setTabChangesFocus(True)
+        return w_editor
+
+    # Method updateEditorGeometry : the field is taller than the cell, to see several lines
+    def updateEditorGeometry(self, p_editor, p_option, p_index):
+        w_rect = p_option.rect
+        w_rect.setHeight(max(w_rect.height(), p_editor.fontMetrics().lineSpacing() * glb_description_editor_nbr_lines +
+                             2 * p_editor.frameWidth() + 2 * int(p_editor.document().documentMargin())))
+        p_editor.setGeometry(w_rect)
+
+    # Method eventFilter : Ctrl+Enter validates the description (Enter adds a new line)
+    def eventFilter(self, p_object, p_event):
+        if p_event.type() == QEvent.KeyPress and p_event.key() in (Qt.Key_Return, Qt.Key_Enter) and \
+                p_event.modifiers() & Qt.ControlModifier:
+            self.commitData.emit(p_object)
+            self.closeEditor.emit(p_object, QStyledItemDelegate.NoHint)
+            return True
+        return super().eventFilter(p_object, p_event)
+
+    # Method setEditorData : the field starts with the text of the description
+    def setEditorData(self, p_editor, p_index):
+        p_editor.setPlainText(p_index.data(Qt.DisplayRole))
+        p_editor.moveCursor(QTextCursor.End)
+
+    # Method setModelData : sends the description to the commit function (the row is updated and saved by it)
+    def setModelData(self, p_editor, p_model, p_index):
+        self.commit_cell(p_index.row(), p_index.column(), p_editor.toPlainText())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_events.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : events of the changes made on the tasks, and the bus delivering them
+* - Each operation on the tasks (add, activate, edit, merge, delete, import, undo...) emits
+*   its changes once : PttTaskAdded, PttTaskUpdated, PttTaskMoved, PttTaskRemoved
+* - The handlers subscribed with subscribe() are called at once (for the given event class)
+* - The batch handlers subscribed with subscribe_batch() (save, view, status bar...) are called
+*   once per event loop turn, with all the events emitted meanwhile : several operations
+*   made in the same turn only lead to one save
+* - The delivery is triggered by a single shot timer of the PTT clock (see ptt_clock.py)
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+from ptt_clock import get_ptt_clock
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Origins of the changes : made in PTT, loaded from my_tasks.json (modified outside of PTT), received by the sync,
+# made in PTT and already saved alone in my_tasks.json (a task edited in the list)
+glb_task_event_origin_ptt = "ptt"
+glb_task_event_origin_file = "file"
+glb_task_event_origin_sync = "sync"
+glb_task_event_origin_record = "record"
+
+# Origins of the changes already saved in my_tasks.json
+glb_task_event_saved_origins = {glb_task_event_origin_file, glb_task_event_origin_record}
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttTaskEvent : change made on some tasks (base class of the events)
+class PttTaskEvent:
+    def __init__(self, p_task_ids: list, p_origin: str = glb_task_event_origin_ptt):
+        self.task_ids = p_task_ids
+        self.origin = p_origin
+
+
+# Class PttTaskAdded : tasks added in the list
+class PttTaskAdded(PttTaskEvent):
+    pass
+
+
+# Class PttTaskUpdated : tasks whose started on, duration or description changed (still at the same row)
+class PttTaskUpdated(PttTaskEvent):
+    pass
+
+
+# Class PttTaskMoved : tasks moved to another row (p_row = their new row, 0 for the task activated)
+class PttTaskMoved(PttTaskEvent):
+    def __init__(self, p_task_ids: list, p_row: int, p_origin: str = glb_task_event_origin_ptt):
+        super().__init__(p_task_ids, p_origin)
+        self.row = p_row
+
+
+# Class PttTaskRemoved : tasks removed from the list
+class PttTaskRemoved(PttTaskEvent):
+    pass
+
+
+# Class PttTaskEventBus : delivers the events to the handlers, and to the batch handlers once per event loop turn
+class PttTaskEventBus:
+    def __init__(self):
+        self.handlers = []
+        self.batch_handlers = []
+        self.pending_events = []
+        self.flush_timer = None
+
+    # Method subscribe : calls the handler at once with each event of the class received (or of its subclasses)
+    def subscribe(self, p_event_class, p_handler):
+        self.handlers.append((p_event_class, p_handler))
+
+    # Method subscribe_batch : calls the handler once per event loop turn with the list of the events emitted
+    def subscribe_batch(self, p_handler):
+        self.batch_handlers.append(p_handler)
+
+    # Method emit : delivers an event (the batch handlers will get it at the end of the event loop turn)
+    def emit(self, p_event: PttTaskEvent):
+
+        # Nothing changed
+        if not p_event.task_ids:
+            return
+
+        for w_event_class, w_handler in self.handlers:
+            if isinstance(p_event, w_event_class):
+                w_handler(p_event)
+
+        self.pending_events.append(p_event)
+
+        # The timer is only created once (the clock may have been replaced before)
+        if self.flush_timer is None:
+            self.flush_timer = get_ptt_clock().create_timer()
+            self.flush_timer.setSingleShot(True)
+            self.flush_timer.timeout.connect(self.flush)
+
+        if not self.flush_timer.isActive():
+            self.flush_timer.start(0)
+
+    # Method has_pending_events : True if some events were not delivered yet to the batch handlers
+    def has_pending_events(self):
+        return len(self.pending_events) > 0
+
+    # Method flush : delivers the pending events to the batch handlers now (also called before quitting)
+    def flush(self):
+
+        if self.flush_timer is not None:
+            self.flush_timer.stop()
+
+        # Note : the events emitted by the handlers themselves are delivered by the next flush
+        w_events = self.pending_events
+        self.pending_events = []
+
+        if w_events:
+            for w_batch_handler in self.batch_handlers:
+                w_batch_handler(w_events)
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function get_events_task_ids : returns the ids of the tasks changed by the events received
+def get_events_task_ids(p_events: list):
+
+    w_task_ids = set()
+    for w_event in p_events:
+        w_task_ids.update(w_event.task_ids)
+
+    return w_task_ids
+
+
+# Function events_change_rows : True if some events add, move or remove tasks (the row numbers changed)
+def events_change_rows(p_events: list):
+    return any(not isinstance(w_event, PttTaskUpdated) for w_event in p_events)
+
+
+# Function events_need_save : True if some changes are not saved in my_tasks.json yet
+def events_need_save(p_events: list):
+    return any(w_event.origin not in glb_task_event_saved_origins for w_event in p_events)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_export.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : export of the tasks to CSV, JSON lines or iCalendar (.ics) files
+* - The records are read one by one (see ptt_tasks_stream.py), filtered then written
+*   one by one, so the memory used doesn't depend on the number of tasks
+* - The tasks are written in the order of the tasks file (the newest first)
+* - The CSV and JSON lines files can be imported again (see ptt_import.py)
+* - My tasks are read where PTT writes them (local cache, data directory and workspace set
+*   in data/ptt_config.ini), unless --source is given
+* - No dependency on PyQt5, so it can be run without the GUI (nightly exports...)
+* --------------------------------------------------------------------------------- *
+To export the tasks of a month, go in the ptt (root) folder then :
+python ptt_export.py --from 2020-01-01 --to 2020-01-31 timesheet_2020_01.csv
+A backup can also be exported : --source data/backups/my_tasks_20200131_230000_xxx.json.gz
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import sys
+import csv
+import json
+import datetime
+import argparse
+from ptt_clock import get_ptt_clock
+from ptt_tasks_stream import PttTasksStreamError, iter_task_records
+from ptt_workspaces import get_config_workspace_dir
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Formats of export, found with the extension of the file
+glb_export_formats = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".ics": "ics"}
+
+# Columns of the CSV files and keys of the JSON lines files
+glb_export_columns = ["task_id", "started_on", "duration", "description"]
+
+# Identifier of the iCalendar files (and domain of the events UID)
+glb_export_ics_product_id = "-//dchlab//PTT - Python Time Tracker//FR"
+glb_export_ics_uid_domain = "ptt.dchlab"
+
+# Maximum length of the iCalendar lines (in bytes, the longer lines are folded)
+glb_export_ics_max_line_length = 75
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttExportError : raised when an export can't be done (unknown format, file not readable or writable...)
+class PttExportError(Exception):
+    pass
+
+
+# Class PttExportFilter : date range (included) and text the description must contain (None = no filter)
+class PttExportFilter:
+    def __init__(self, p_date_from=None, p_date_to=None, p_description: str = ""):
+        self.date_from = p_date_from
+        self.date_to = p_date_to
+        self.description = p_description.casefold()
+
+    # Method accepts : returns True if the task record must be exported
+    def accepts(self, p_task_record: dict):
+
+        if self.date_from is not None or self.date_to is not None:
+            w_started_on_date = started_on_to_datetime(p_task_record["started_on"]).date()
+            if self.date_from is not None and w_started_on_date < self.date_from:
+                return False
+            if self.date_to is not None and w_started_on_date > self.date_to:
+                return False
+
+        return self.description == "" or self.description in p_task_record["description"].casefold()
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function started_on_to_datetime : turns a "dd/MM/yyyy hh:mm" text into a datetime
+def started_on_to_datetime(p_started_on: str):
+    return datetime.datetime(int(p_started_on[6:10]), int(p_started_on[3:5]), int(p_started_on[0:2]),
+                             int(p_started_on[11:13]), int(p_started_on[14:16]))
+
+
+# Function filter_task_records : yields the task records accepted by the filter
+def filter_task_records(p_task_records, p_export_filter: PttExportFilter):
+    for w_task_record in p_task_records:
+        if p_export_filter.accepts(w_task_record):
+            yield w_task_record
+
+
+# Function write_csv : writes the task records in a CSV file, returns the number of records written
+def write_csv(p_task_records, p_file):
+
+    w_nbr_records = 0
+    w_writer = csv.writer(p_file)
+    w_writer.writerow(glb_export_columns)
+
+    for w_task_record in p_task_records:
+        w_writer.writerow([w_task_record.get(w_column, "") for w_column in glb_export_columns])
+        w_nbr_records = w_nbr_records + 1
+
+    return w_nbr_records
+
+
+# Function write_jsonl : writes the task records in a JSON lines file, returns the number of records written
+def write_jsonl(p_task_records, p_file):
+
+    w_nbr_records = 0
+
+    for w_task_record in p_task_records:
+        p_file.write(json.dumps({w_column: w_task_record.get(w_column, "") for w_column in glb_export_columns},
+                                ensure_ascii=False) + "\n")
+        w_nbr_records = w_nbr_records + 1
+
+    return w_nbr_records
+
+
+# Function escape_ics_text : escapes a text for an iCalendar property value
+def escape_ics_text(p_text: str):
+    return p_text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n")\
+        .replace("\n", "\\n")
+
+
+# Function fold_ics_line : splits an iCalendar line in lines of 75 bytes at most (the next ones start with a space)
+def fold_ics_line(p_line: str):
+
+    w_lines = []
+    w_current = ""
+
+    for w_char in p_line:
+        w_max_length = glb_export_ics_max_line_length if not w_lines else glb_export_ics_max_line_length - 1
+        if len((w_current + w_char).encode("utf-8")) > w_max_length:
+            w_lines.append(w_current)
+            w_current = ""
+        w_current = w_current + w_char
+
+    w_lines.append(w_current)
+    return "\r\n ".join(w_lines) + "\r\n"
+
+
+# Function write_ics : writes the task records as events of an iCalendar file, returns the number of records written
+def write_ics(p_task_records, p_file):
+
+    # Note : the dates are written as "floating" local times, like they are displayed in PTT
+    w_nbr_records = 0
+    w_dtstamp = get_ptt_clock().now().astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    p_file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{}\r\nCALSCALE:GREGORIAN\r\n".format(
+        glb_export_ics_product_id))
+
+    for w_task_record in p_task_records:
+
+        w_hours, w_minutes = w_task_record["duration"].split(":")
+        p_file.write("BEGIN:VEVENT\r\n")
+        p_file.write(fold_ics_line("UID:{}@{}".format(w_task_record.get("task_id", ""), glb_export_ics_uid_domain)))
+        p_file.write("DTSTAMP:{}\r\n".format(w_dtstamp))
+        p_file.write("DTSTART:{}\r\n".format(started_on_to_datetime(w_task_record["started_on"]).strftime(
+            "%Y%m%dT%H%M%S")))
+        p_file.write("DURATION:PT{}H{}M\r\n".format(int(w_hours), int(w_minutes)))
+        p_file.write(fold_ics_line("SUMMARY:{}".format(escape_ics_text(w_task_record["description"]))))
+        p_file.write("END:VEVENT\r\n")
+        w_nbr_records = w_nbr_records + 1
+
+    p_file.write("END:VCALENDAR\r\n")
+    return w_nbr_records
+
+
+# Function get_export_format : returns the format of export of a file ("csv", "jsonl" or "ics") with its extension
+def get_export_format(p_file_path: str):
+
+    w_extension = os.path.splitext(p_file_path)[1].lower()
+    if w_extension not in glb_export_formats:
+        raise PttExportError("unknown file format '{}' (.csv, .jsonl or .ics expected)".format(w_extension))
+
+    return glb_export_formats[w_extension]
+
+
+# Function write_task_records : writes the task records in the format received, returns the number of records written
+def write_task_records(p_task_records, p_file, p_export_format: str):
+
+    if p_export_format == "csv":
+        return write_csv(p_task_records, p_file)
+    elif p_export_format == "jsonl":
+        return write_jsonl(p_task_records, p_file)
+    elif p_export_format == "ics":
+        return write_ics(p_task_records, p_file)
+
+    raise PttExportError("unknown export format '{}'".format(p_export_format))
+
+
+# Function export_tasks : exports the tasks of a tasks file (or backup), returns the number of tasks exported
+def export_tasks(p_source_path: str, p_target_path: str, p_export_filter: PttExportFilter, p_export_format: str = ""):
+
+    # The format is found with the extension if not given
+    if p_export_format == "":
+        p_export_format = get_export_format(p_target_path)
+    elif p_export_format not in glb_export_formats.values():
+        raise PttExportError("unknown export format '{}'".format(p_export_format))
+
+    # Note : the export is written in a temporary file first, so a previous export is never left half written
+    w_tmp_path = p_target_path + ".tmp"
+
+    try:
+        with open(w_tmp_path, "w", encoding="utf-8", newline="") as w_file:
+            w_nbr_records = write_task_records(filter_task_records(iter_task_records(p_source_path), p_export_filter),
+                                               w_file, p_export_format)
+        os.replace(w_tmp_path, p_target_path)
+
+    except (OSError, PttTasksStreamError, KeyError, ValueError) as w_error:
+        if os.path.exists(w_tmp_path):
+            os.remove(w_tmp_path)
+        raise PttExportError("cannot export the tasks of '{}' ({})".format(p_source_path, w_error))
+
+    return w_nbr_records
+
+
+# Function parse_date_argument : turns a "yyyy-mm-dd" or "dd/mm/yyyy" argument into a date
+def parse_date_argument(p_text: str):
+
+    for w_format in ["%Y-%m-%d", "%d/%m/%Y"]:
+        try:
+            return datetime.datetime.strptime(p_text, w_format).date()
+        except ValueError:
+            pass
+
+    raise argparse.ArgumentTypeError("invalid date '{}' (yyyy-mm-dd or dd/mm/yyyy expected)".format(p_text))
+
+
+# ------------------------------------------- #
+# Main
+# ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    w_parser = argparse.ArgumentParser(description="Exports the PTT tasks to a CSV, JSON lines or iCalendar file")
+    w_parser.add_argument("target", help="file to write (.csv, .jsonl or .ics), '-' for the standard output")
+    w_parser.add_argument("--source", default="", help="tasks file or backup (.json.gz) to export (by default, my "
+                                                       "tasks of the data directory and workspace of ptt_config.ini)")
+    w_parser.add_argument("--format", choices=["csv", "jsonl", "ics"], default="",
+                          help="format of export (found with the extension of the target by default)")
+    w_parser.add_argument("--from", dest="date_from", type=parse_date_argument, help="1st day exported")
+    w_parser.add_argument("--to", dest="date_to", type=parse_date_argument, help="last day exported")
+    w_parser.add_argument("--description", default="", help="text the description must contain (case insensitive)")
+    w_args = w_parser.parse_args()
+
+    w_source = w_args.source or os.path.join(get_config_workspace_dir(), "my_tasks.json")
+    w_export_filter = PttExportFilter(w_args.date_from, w_args.date_to, w_args.description)
+
+    try:
+        if w_args.target == "-":
+            write_task_records(filter_task_records(iter_task_records(w_source), w_export_filter), sys.stdout,
+                               w_args.format or "csv")
+        else:
+            w_nbr_exported = export_tasks(w_source, w_args.target, w_export_filter, w_args.format)
+            print("{} task(s) exported in '{}'".format(w_nbr_exported, w_args.target))
+
+    except (PttExportError, PttTasksStreamError, OSError) as w_error:
+        print("ptt_export : {}".format(w_error), file=sys.stderr)
+        sys.exit(1)
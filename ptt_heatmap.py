@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_heatmap.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : calendar of the time worked, one cell per day coloured by the hours worked
+* - The seconds worked per day come from the day totals (see ptt_day_totals.py), put in
+*   one pass in a compact array of the days (one unsigned int per day, from the 1st of
+*   January of the 1st year) : the tasks are never read
+* - The calendar (one block of 7 rows x 54 weeks per year, the latest year on top) is
+*   drawn once in a QImage, kept until the tasks change
+* - The day under a point of the image is computed, nothing is searched
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import array
+import bisect
+import datetime
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtCore import Qt
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Size of a day cell, and space between 2 cells (in pixels)
+glb_heatmap_cell_size = 11
+glb_heatmap_cell_stride = 13
+
+# Margins : years on the left, legend at the bottom
+glb_heatmap_margin_left = 56
+glb_heatmap_margin_top = 8
+glb_heatmap_year_space = 12
+glb_heatmap_legend_height = 28
+
+# Number of weeks (columns) of a year
+glb_heatmap_nbr_weeks = 54
+
+# Colours of the days : not worked, then less than 2, 4, 6 hours and more
+glb_heatmap_levels_in_hours = [0, 2, 4, 6]
+glb_heatmap_colors = ["#ebedf0", "#c6e48b", "#7bc96f", "#239a3b", "#196127"]
+glb_heatmap_legend = ["0h", "< 2h", "< 4h", "< 6h", "6h et +"]
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttDayBuckets : seconds worked per day, in an array indexed by the number of days since the 1st day
+class PttDayBuckets:
+    def __init__(self, p_first_year: int, p_last_year: int):
+        self.first_year = p_first_year
+        self.last_year = p_last_year
+        self.first_day = datetime.date(p_first_year, 1, 1)
+        w_nbr_days = (datetime.date(p_last_year, 12, 31) - self.first_day).days + 1
+        self.seconds = array.array("I", bytes(w_nbr_days * array.array("I").itemsize))
+
+    # Method seconds_of : seconds worked on a day (0 out of the years of the buckets)
+    def seconds_of(self, p_date: datetime.date):
+
+        w_index = (p_date - self.first_day).days
+        if 0 <= w_index < len(self.seconds):
+            return self.seconds[w_index]
+
+        return 0
+
+
+# Class PttHeatmap : calendar of the time worked, drawn once in a QImage
+class PttHeatmap:
+    def __init__(self):
+        self.buckets = None
+        self.image = None
+
+    # Method invalidate : the calendar is drawn again the next time it's displayed (the tasks changed)
+    def invalidate(self):
+        self.image = None
+
+    # Method get_image : returns the calendar, drawn from the seconds per day ("yyyy-mm-dd") only if needed
+    def get_image(self, p_seconds_by_day: dict, p_today: datetime.date):
+
+        if self.image is None or self.buckets.last_year < p_today.year:
+            self.buckets = build_day_buckets(p_seconds_by_day, p_today)
+            self.image = draw_heatmap(self.buckets)
+
+        return self.image
+
+    # Method day_at : returns the day of the cell at a point of the image (None out of the cells)
+    def day_at(self, p_x: int, p_y: int):
+
+        if self.buckets is None or p_x < glb_heatmap_margin_left or p_y < glb_heatmap_margin_top:
+            return None
+
+        w_year_index, w_y = divmod(p_y - glb_heatmap_margin_top, get_year_height())
+        w_week, w_x = divmod(p_x - glb_heatmap_margin_left, glb_heatmap_cell_stride)
+        w_weekday, w_y = divmod(w_y, glb_heatmap_cell_stride)
+        if w_weekday > 6 or w_week >= glb_heatmap_nbr_weeks or \
+                w_x >= glb_heatmap_cell_size or w_y >= glb_heatmap_cell_size:
+            return None
+
+        w_year = self.buckets.last_year - w_year_index
+        if w_year < self.buckets.first_year:
+            return None
+
+        w_january_1st = datetime.date(w_year, 1, 1)
+        w_date = w_january_1st + datetime.timedelta(days=w_week * 7 + w_weekday - w_january_1st.weekday())
+
+        return w_date if w_date.year == w_year else None
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function get_year_height : height of the block of a year in the image
+def get_year_height():
+    return 7 * glb_heatmap_cell_stride + glb_heatmap_year_space
+
+
+# Function build_day_buckets : puts the seconds per day ("yyyy-mm-dd") in the array of the days, in one pass
+def build_day_buckets(p_seconds_by_day: dict, p_today: datetime.date):
+
+    # Miscellaneous initializations
+    w_days = []
+    for w_day, w_seconds in p_seconds_by_day.items():
+        try:
+            w_days.append((datetime.date.fromisoformat(w_day), w_seconds))
+        except (TypeError, ValueError):
+            print("build_day_buckets : invalid day '{}' ignored".format(w_day))
+
+    w_years = [w_date.year for w_date, w_seconds in w_days] + [p_today.year]
+    w_day_buckets = PttDayBuckets(min(w_years), max(w_years))
+
+    for w_date, w_seconds in w_days:
+        w_day_buckets.seconds[(w_date - w_day_buckets.first_day).days] = max(0, w_seconds)
+
+    return w_day_buckets
+
+
+# Function get_level : level of colour of the seconds worked on a day
+def get_level(p_seconds: int):
+
+    if p_seconds <= 0:
+        return 0
+
+    return bisect.bisect_right(glb_heatmap_levels_in_hours, p_seconds / 3600)
+
+
+# Function draw_heatmap : draws the calendar of the buckets, the latest year on top, and the legend at the bottom
+def draw_heatmap(p_day_buckets: PttDayBuckets):
+
+    # Miscellaneous initializations
+    w_nbr_years = p_day_buckets.last_year - p_day_buckets.first_year + 1
+    w_image = QImage(glb_heatmap_margin_left + glb_heatmap_nbr_weeks * glb_heatmap_cell_stride,
+                     glb_heatmap_margin_top + w_nbr_years * get_year_height() + glb_heatmap_legend_height,
+                     QImage.Format_RGB32)
+    w_image.fill(QColor(Qt.white))
+    w_colors = [QColor(w_color) for w_color in glb_heatmap_colors]
+
+    w_painter = QPainter(w_image)
+
+    for w_year_index in range(w_nbr_years):
+
+        w_year = p_day_buckets.last_year - w_year_index
+        w_year_top = glb_heatmap_margin_top + w_year_index * get_year_height()
+        w_painter.drawText(0, w_year_top, glb_heatmap_margin_left - 10, 7 * glb_heatmap_cell_stride,
+                           Qt.AlignRight | Qt.AlignVCenter, str(w_year))
+
+        # Note : the days of the year are contiguous in the array, the week of a day is computed from the 1st of January
+        w_index = (datetime.date(w_year, 1, 1) - p_day_buckets.first_day).days
+        w_offset = datetime.date(w_year, 1, 1).weekday()
+        w_nbr_days = (datetime.date(w_year, 12, 31) - datetime.date(w_year, 1, 1)).days + 1
+
+        for w_day_index in range(w_nbr_days):
+            w_week, w_weekday = divmod(w_day_index + w_offset, 7)
+            w_painter.fillRect(glb_heatmap_margin_left + w_week * glb_heatmap_cell_stride,
+                               w_year_top + w_weekday * glb_heatmap_cell_stride,
+                               glb_heatmap_cell_size, glb_heatmap_cell_size,
+                               w_colors[get_level(p_day_buckets.seconds[w_index + w_day_index])])
+
+    # Legend
+    w_legend_top = glb_heatmap_margin_top + w_nbr_years * get_year_height()
+    w_x = glb_heatmap_margin_left
+    for w_color, w_text in zip(w_colors, glb_heatmap_legend):
+        w_painter.fillRect(w_x, w_legend_top, glb_heatmap_cell_size, glb_heatmap_cell_size, w_color)
+        w_painter.drawText(w_x + glb_heatmap_cell_stride, w_legend_top - 2, 60, glb_heatmap_cell_stride + 2,
+                           Qt.AlignLeft | Qt.AlignVCenter, w_text)
+        w_x = w_x + glb_heatmap_cell_stride + 64
+
+    w_painter.end()
+
+    return w_image
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_import.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : import of tasks from CSV files (PTT or other trackers) and JSON lines files
+* - The file is read line by line through a chain of generators :
+*   read rows -> map columns -> validate/normalize -> split over 8h -> remove duplicates
+* - Nothing is inserted here : the records are returned to ptt_main.py, which inserts
+*   them in batches and saves my tasks only once at the end
+* - The columns are found by their names (see glb_import_columns), for instance :
+*   PTT    : started_on, duration, description
+*   Toggl  : Start date, Start time, Duration, Description
+*   Harvest: Date, Hours, Notes
+* - JSON lines : one object per line with the same keys as the CSV columns
+* - A duration is "hh:mm", "hh:mm:ss" or a number of hours ("1.5" or "1,5"), a week at most
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import csv
+import json
+import math
+import datetime
+from ptt_sync import new_task_id
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Names accepted for each column (lower case, the 1st one found in the file is used)
+glb_import_columns = {
+    "started_on": ["started_on", "start", "start date", "start_date", "started at", "date"],
+    "start_time": ["start time", "start_time"],
+    "ended_on": ["ended_on", "end", "end date", "end_date", "ended at"],
+    "end_time": ["end time", "end_time"],
+    "duration": ["duration", "duration (h)", "duration (decimal)", "hours", "time (h)"],
+    "description": ["description", "task", "title", "notes", "activity", "name"]}
+
+# Datetime formats accepted (the ISO formats are also accepted)
+glb_import_datetime_formats = ["%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y", "%d.%m.%Y %H:%M", "%d.%m.%Y"]
+
+# Same formats as the tasks list ("dd/MM/yyyy hh:mm" and "hh:mm")
+glb_import_started_on_format = "%d/%m/%Y %H:%M"
+
+# Maximum duration of a task (longer entries are split, like add_duration_to_task_at_row does)
+glb_import_max_task_duration_in_sec = 28800
+
+# Maximum duration of an entry (a week) : a longer one is an error of the file, not split in thousands of tasks
+glb_import_max_entry_duration_in_sec = 604800
+
+# Number of errors kept to be displayed (the others are only counted)
+glb_import_max_errors_kept = 20
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttImportError : raised when a file can't be imported at all (unknown format, missing columns...)
+class PttImportError(Exception):
+    pass
+
+
+# Class PttImportStats : counters of an import, updated while the records are read
+class PttImportStats:
+    def __init__(self, p_file_size: int = 0):
+        self.file_size = p_file_size
+        self.nbr_chars_read = 0
+        self.nbr_rows_read = 0
+        self.nbr_rows_rejected = 0
+        self.nbr_tasks_split = 0
+        self.nbr_duplicates = 0
+        self.nbr_records = 0
+        self.errors = []
+
+    # Method add_error : counts a rejected row (only the first errors are kept)
+    def add_error(self, p_line: int, p_message: str):
+        self.nbr_rows_rejected = self.nbr_rows_rejected + 1
+        if len(self.errors) < glb_import_max_errors_kept:
+            self.errors.append("line {} : {}".format(p_line, p_message))
+
+    # Method progress : part of the file read, from 0 to 1
+    def progress(self):
+        if self.file_size <= 0:
+            return 0
+        return min(1, self.nbr_chars_read / self.file_size)
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function read_lines : yields the lines of a text file, counting the characters read for the progress
+def read_lines(p_file, p_import_stats: PttImportStats):
+    for w_line in p_file:
+        p_import_stats.nbr_chars_read = p_import_stats.nbr_chars_read + len(w_line)
+        yield w_line
+
+
+# Function read_csv_rows : yields (line number, dict of the columns) for each row of a CSV file
+def read_csv_rows(p_file, p_import_stats: PttImportStats):
+
+    # Detecting the delimiter from the beginning of the file (Excel exports often use ";")
+    w_sample = p_file.read(4096)
+    p_file.seek(0)
+    try:
+        w_dialect = csv.Sniffer().sniff(w_sample, delimiters=",;\t|")
+    except csv.Error:
+        w_dialect = csv.excel
+
+    w_reader = csv.DictReader(read_lines(p_file, p_import_stats), dialect=w_dialect)
+
+    # Note : the line number of the header is 1
+    for w_row in w_reader:
+        yield w_reader.line_num, w_row
+
+
+# Function read_jsonl_rows : yields (line number, dict) for each line of a JSON lines file
+def read_jsonl_rows(p_file, p_import_stats: PttImportStats):
+
+    for w_line_number, w_line in enumerate(read_lines(p_file, p_import_stats), 1):
+
+        # Empty lines are allowed (at the end of the file for instance)
+        if w_line.strip() == "":
+            continue
+
+        try:
+            w_row = json.loads(w_line)
+        except ValueError:
+            p_import_stats.nbr_rows_read = p_import_stats.nbr_rows_read + 1
+            p_import_stats.add_error(w_line_number, "invalid JSON")
+            continue
+
+        if isinstance(w_row, dict):
+            yield w_line_number, w_row
+        else:
+            p_import_stats.nbr_rows_read = p_import_stats.nbr_rows_read + 1
+            p_import_stats.add_error(w_line_number, "a JSON object is expected")
+
+
+# Function map_columns : yields (line number, dict with the PTT column names) for each row
+def map_columns(p_rows, p_import_stats: PttImportStats):
+
+    # Miscellaneous initializations
+    w_columns = None
+
+    for w_line_number, w_row in p_rows:
+
+        p_import_stats.nbr_rows_read = p_import_stats.nbr_rows_read + 1
+
+        # The names of the columns are found with the 1st row
+        if w_columns is None:
+            w_keys = {str(w_key).strip().lower(): w_key for w_key in w_row if w_key is not None}
+            w_columns = {}
+            for w_column, w_names in glb_import_columns.items():
+                for w_name in w_names:
+                    if w_name in w_keys:
+                        w_columns[w_column] = w_keys[w_name]
+                        break
+
+            if "started_on" not in w_columns or "description" not in w_columns or \
+                    ("duration" not in w_columns and "ended_on" not in w_columns):
+                raise PttImportError("the columns of the start, duration (or end) and description were not found")
+
+        yield w_line_number, {w_column: w_row.get(w_key) for w_column, w_key in w_columns.items()}
+
+
+# Function parse_datetime : turns a date (and an optional time) into a datetime, None if invalid
+def parse_datetime(p_date_text: str, p_time_text=None):
+
+    w_text = str(p_date_text).strip()
+    if p_time_text is not None and str(p_time_text).strip() != "":
+        w_text = w_text + " " + str(p_time_text).strip()
+
+    # Quick path for the format of PTT itself "dd/MM/yyyy hh:mm" (strptime is much slower)
+    if len(w_text) == 16 and w_text[2] == "/" and w_text[5] == "/" and w_text[13] == ":":
+        try:
+            return datetime.datetime(int(w_text[6:10]), int(w_text[3:5]), int(w_text[0:2]),
+                                     int(w_text[11:13]), int(w_text[14:16]))
+        except ValueError:
+            pass
+
+    try:
+        return datetime.datetime.fromisoformat(w_text.replace("Z", "")).replace(tzinfo=None)
+    except ValueError:
+        pass
+
+    for w_format in glb_import_datetime_formats:
+        try:
+            return datetime.datetime.strptime(w_text, w_format)
+        except ValueError:
+            pass
+
+    return None
+
+
+# Function parse_duration_in_secs : turns "hh:mm", "hh:mm:ss" or a number of hours into seconds, None if invalid
+def parse_duration_in_secs(p_duration):
+
+    # Numbers of JSON lines are hours too
+    if isinstance(p_duration, (int, float)) and not isinstance(p_duration, bool):
+        return get_hours_in_secs(p_duration)
+
+    w_text = str(p_duration).strip()
+
+    try:
+        if ":" in w_text:
+            w_parts = [int(w_part) for w_part in w_text.split(":")]
+            if len(w_parts) == 2:
+                w_parts.append(0)
+            if len(w_parts) != 3 or min(w_parts) < 0 or w_parts[1] > 59 or w_parts[2] > 59:
+                return None
+            return w_parts[0] * 3600 + w_parts[1] * 60 + w_parts[2]
+
+        return get_hours_in_secs(float(w_text.replace(",", ".")))
+
+    except (ValueError, OverflowError):
+        return None
+
+
+# Function get_hours_in_secs : turns a number of hours into seconds, None if negative or not finite ("inf", "nan"...)
+def get_hours_in_secs(p_hours: float):
+
+    if math.isfinite(p_hours) is False or p_hours < 0:
+        return None
+
+    try:
+        return int(round(p_hours * 3600))
+    except (ValueError, OverflowError):
+        return None
+
+
+# Function normalize_rows : yields (datetime started on, duration in secs, description) for each valid row
+def normalize_rows(p_rows, p_import_stats: PttImportStats):
+
+    for w_line_number, w_row in p_rows:
+
+        # The description is mandatory (the same spaces as z_task_to_add are removed)
+        w_description = str(w_row.get("description") or "").strip()
+        if w_description == "":
+            p_import_stats.add_error(w_line_number, "no description")
+            continue
+
+        w_started_on = parse_datetime(w_row.get("started_on") or "", w_row.get("start_time"))
+        if w_started_on is None:
+            p_import_stats.add_error(w_line_number, "invalid start '{}'".format(w_row.get("started_on")))
+            continue
+
+        # Duration, or the difference with the end when there is no duration
+        if w_row.get("duration") not in (None, ""):
+            w_duration_in_secs = parse_duration_in_secs(w_row["duration"])
+        else:
+            w_ended_on = parse_datetime(w_row.get("ended_on") or "", w_row.get("end_time"))
+            w_duration_in_secs = None
+            if w_ended_on is not None and w_ended_on >= w_started_on:
+                w_duration_in_secs = int((w_ended_on - w_started_on).total_seconds())
+
+        if w_duration_in_secs is None:
+            p_import_stats.add_error(w_line_number, "invalid duration '{}'".format(w_row.get("duration")))
+            continue
+
+        if w_duration_in_secs > glb_import_max_entry_duration_in_sec:
+            p_import_stats.add_error(w_line_number, "duration over {} hours".format(
+                glb_import_max_entry_duration_in_sec // 3600))
+            continue
+
+        yield w_started_on, w_duration_in_secs, w_description
+
+
+# Function split_long_tasks : yields (started on, duration in secs, description), the long tasks being split over 8h
+def split_long_tasks(p_tasks, p_import_stats: PttImportStats):
+
+    for w_started_on, w_duration_in_secs, w_description in p_tasks:
+
+        if w_duration_in_secs > glb_import_max_task_duration_in_sec:
+            p_import_stats.nbr_tasks_split = p_import_stats.nbr_tasks_split + 1
+
+        # Like the timer does : a full 8h task, then a new task with the remains
+        while w_duration_in_secs > glb_import_max_task_duration_in_sec:
+            yield w_started_on, glb_import_max_task_duration_in_sec, w_description
+            w_started_on = w_started_on + datetime.timedelta(seconds=glb_import_max_task_duration_in_sec)
+            w_duration_in_secs = w_duration_in_secs - glb_import_max_task_duration_in_sec
+
+        yield w_started_on, w_duration_in_secs, w_description
+
+
+# Function format_task_cells : yields the texts of the 3 cells of the list (durations rounded to the minute)
+def format_task_cells(p_tasks):
+
+    for w_started_on, w_duration_in_secs, w_description in p_tasks:
+        w_duration_in_min = (w_duration_in_secs + 30) // 60
+        yield w_started_on.strftime(glb_import_started_on_format), \
+            "{:02d}:{:02d}".format(w_duration_in_min // 60, w_duration_in_min % 60), w_description
+
+
+# Function remove_duplicates : yields the records (task_id, started_on, duration, description) not known yet
+def remove_duplicates(p_tasks_cells, p_known_cells: set, p_import_stats: PttImportStats):
+
+    # Note : p_known_cells contains the (started_on, duration, description) of the tasks already in the list,
+    # the records imported are added to it, so a file imported twice only adds its tasks once
+    for w_task_cells in p_tasks_cells:
+
+        if w_task_cells in p_known_cells:
+            p_import_stats.nbr_duplicates = p_import_stats.nbr_duplicates + 1
+            continue
+
+        p_known_cells.add(w_task_cells)
+        p_import_stats.nbr_records = p_import_stats.nbr_records + 1
+        yield (new_task_id(),) + w_task_cells
+
+
+# Function import_task_records : yields the new records to import from a CSV or JSON lines file
+def import_task_records(p_file_path: str, p_known_cells: set, p_import_stats: PttImportStats):
+
+    # The format is chosen with the extension (".json" and ".jsonl" files are JSON lines)
+    w_extension = os.path.splitext(p_file_path)[1].lower()
+    if w_extension not in [".csv", ".txt", ".json", ".jsonl"]:
+        raise PttImportError("unknown file format '{}'".format(w_extension))
+
+    try:
+        p_import_stats.file_size = os.path.getsize(p_file_path)
+        w_file = open(p_file_path, "r", encoding="utf-8-sig", newline="")
+    except OSError as w_error:
+        raise PttImportError("cannot open the '{}' file ({})".format(p_file_path, w_error))
+
+    with w_file:
+
+        try:
+            if w_extension in [".json", ".jsonl"]:
+                w_rows = read_jsonl_rows(w_file, p_import_stats)
+            else:
+                w_rows = read_csv_rows(w_file, p_import_stats)
+
+            # Chaining the generators : each row goes through all the steps before the next one is read
+            w_tasks = normalize_rows(map_columns(w_rows, p_import_stats), p_import_stats)
+            w_tasks_cells = format_task_cells(split_long_tasks(w_tasks, p_import_stats))
+            yield from remove_duplicates(w_tasks_cells, p_known_cells, p_import_stats)
+
+        except (UnicodeDecodeError, csv.Error) as w_error:
+            raise PttImportError("cannot read the '{}' file ({})".format(p_file_path, w_error))
+
+
+# Function started_on_sort_key : turns a "dd/MM/yyyy hh:mm" text into a sortable "yyyyMMddhhmm" text
+def started_on_sort_key(p_started_on: str):
+    return p_started_on[6:10] + p_started_on[3:5] + p_started_on[0:2] + p_started_on[11:13] + p_started_on[14:16]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_layout.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : layout of the main window, saved at the exit and restored at the next startup
+* - The geometry of the window, the widths of the columns of the list, its scroll position
+*   and its sort indicator are saved in ptt_layout.json (a cache : nothing is lost if it's
+*   removed or invalid)
+* - Restoring the widths costs nothing, the contents of the list are not measured
+* - Without a layout saved (1st startup, other version...), the widths are computed on a
+*   bounded sample of rows (the visible ones first, see Qt's resizeContentsPrecision),
+*   never on the whole list
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import json
+from PyQt5.QtCore import QByteArray, Qt
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Version of the ptt_layout.json file (the layout is ignored if it changes)
+glb_layout_version = 1
+
+# Number of rows measured to size the columns when no layout was saved
+glb_layout_sample_rows = 50
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttLayout : geometry of the window, widths of the columns, scroll position and sort indicator of the list
+class PttLayout:
+    def __init__(self, p_layout_json: str):
+        self.layout_json = p_layout_json
+        self.geometry = None
+        self.column_widths = []
+        self.scroll_value = 0
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+
+    # Method load : loads the layout saved, returns True if one was found and valid
+    def load(self):
+
+        try:
+            with open(self.layout_json, "r", encoding="utf-8") as file:
+                w_layout_data = json.load(file)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError):
+            print("PttLayout.load : cannot read the '{}' file".format(self.layout_json))
+            return False
+
+        try:
+            if w_layout_data["version"] != glb_layout_version:
+                return False
+
+            self.geometry = QByteArray.fromBase64(w_layout_data["geometry"].encode("ascii"))
+            self.column_widths = [int(w_width) for w_width in w_layout_data["column_widths"]]
+            self.scroll_value = int(w_layout_data["scroll_value"])
+            self.sort_column = int(w_layout_data["sort_column"])
+            self.sort_order = Qt.DescendingOrder if w_layout_data["sort_order"] == "descending" else Qt.AscendingOrder
+
+        except (KeyError, TypeError, ValueError, AttributeError):
+            print("PttLayout.load : invalid data in the '{}' file".format(self.layout_json))
+            self.column_widths = []
+            return False
+
+        return True
+
+    # Method save : saves the layout captured
+    def save(self):
+
+        w_layout_data = {
+            "version": glb_layout_version,
+            "geometry": bytes(self.geometry.toBase64()).decode("ascii") if self.geometry is not None else "",
+            "column_widths": self.column_widths,
+            "scroll_value": self.scroll_value,
+            "sort_column": self.sort_column,
+            "sort_order": "descending" if self.sort_order == Qt.DescendingOrder else "ascending"}
+
+        # Note : written in a temporary file first, so the layout is never half written
+        w_layout_json_tmp = self.layout_json + ".tmp"
+
+        try:
+            with open(w_layout_json_tmp, "w", encoding="utf-8") as file:
+                json.dump(w_layout_data, file, indent=4)
+            os.replace(w_layout_json_tmp, self.layout_json)
+        except OSError:
+            print("PttLayout.save : cannot write in the '{}' file".format(self.layout_json))
+
+    # Method capture : memorizes the layout of the window and of its list (at the exit)
+    def capture(self, p_window, p_table):
+        self.geometry = p_window.saveGeometry()
+        self.column_widths = [p_table.columnWidth(w_column) for w_column in range(p_table.columnCount())]
+        self.scroll_value = p_table.verticalScrollBar().value()
+        self.sort_column = p_table.horizontalHeader().sortIndicatorSection()
+        self.sort_order = p_table.horizontalHeader().sortIndicatorOrder()
+
+    # Method restore_window : places the window where it was (nothing is done if no layout was loaded)
+    def restore_window(self, p_window):
+        if self.geometry is not None and not self.geometry.isEmpty():
+            p_window.restoreGeometry(self.geometry)
+
+    # Method restore_table : gives back the widths and the sort indicator of the list, returns False if they can't be
+    # (no layout loaded, or another number of columns) : the columns must then be sized (see size_table_columns)
+    def restore_table(self, p_table):
+
+        if len(self.column_widths) != p_table.columnCount():
+            return False
+
+        for w_column, w_width in enumerate(self.column_widths):
+            p_table.setColumnWidth(w_column, w_width)
+
+        if self.sort_column < p_table.columnCount():
+            p_table.horizontalHeader().setSortIndicator(self.sort_column, self.sort_order)
+
+        return True
+
+    # Method restore_scroll : scrolls the list where it was (once the window is displayed, its rows laid out)
+    def restore_scroll(self, p_table):
+        p_table.verticalScrollBar().setValue(self.scroll_value)
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function size_table_columns : sizes the columns of a list on its contents, measured on a bounded sample of rows
+def size_table_columns(p_table, p_nbr_rows: int = glb_layout_sample_rows):
+
+    # Note : the rows displayed are measured first, then the next ones up to the number of rows given
+    p_table.horizontalHeader().setResizeContentsPrecision(p_nbr_rows)
+    p_table.resizeColumnsToContents()
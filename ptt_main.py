@@ -16,16 +16,59 @@
 * Source files required :
 * - ptt_main.py                         The main script
 * - ptt_info.py                         Class PttAppInfo
+* - ptt_sync.py                         Delta-based synchronization (client side)
+* - ptt_sync_server.py                  Reference sync server (local socket)
+* - ptt_config.py                       Class PttConfig (typed settings of ptt_config.ini, cached and watched)
+* - ptt_tasks_watcher.py                Detection of the external modifications of my_tasks.json
+* - ptt_backup.py                       Class PttBackupManager (rotating compressed backups)
+* - ptt_undo.py                         Class PttUndoStack (undo/redo of the operations on the tasks)
+* - ptt_descriptions.py                 Packed format of my tasks on disk (each distinct description saved once)
+* - ptt_edit_delegates.py               Delegates editing the tasks in place in the list (date/time, duration, text)
+* - ptt_import.py                       Streaming import of tasks from CSV and JSON lines files
+* - ptt_tasks_stream.py                 Reading of the task records one by one (my_tasks.json and backups)
+* - ptt_export.py                       Streaming export of tasks to CSV, JSON lines and iCalendar files
+* - ptt_clock.py                        Clock and timers of PTT (system clock, or simulated by ptt_simulator.py)
+* - ptt_simulator.py                    Headless soak simulator : months of tracking in accelerated time
+* - ptt_memory.py                       Memory diagnostics (tracemalloc reports by structure, opt-in)
+* - ptt_events.py                       Events of the changes on the tasks and their bus (save, view, status bar)
+* - ptt_tasks_blocks.py                 Storage of my_tasks.json by checksummed blocks (salvage, quarantine)
+* - ptt_codecs.py                       Codecs of the JSON texts of my tasks ("pretty", "compact", orjson if installed)
+* - ptt_day_totals.py                   Class PttDayTotals (time worked per day, saved with the key of my tasks)
+* - ptt_background.py                   Class PttBackgroundMode (view refreshed once when the window is shown again)
+* - ptt_heatmap.py                      Class PttHeatmap (calendar of the time worked per day, drawn once in a QImage)
+* - ptt_replicator.py                  Class PttReplicator (local cache of the data directory, replicated in background)
+* - ptt_tasks_store.py                 my_tasks.json shared by several writers (lock, revisions, append-merge, CLI)
+* - ptt_consolidate.py                 Consolidation of the tasks with the same description (one pass, 8h parts)
+* - ptt_billing.py                     Billable time per period and client (rounding, minimum and maximum rules, NumPy)
+* - ptt_billing_defaults.py            Default values of the billing (read by the settings without loading the billing)
+* - ptt_workspaces.py                   Workspaces (one tasks folder each) and the LRU cache of the ones left
+* - ptt_layout.py                       Class PttLayout (window geometry, column widths, scroll saved at the exit)
+* - ptt_startup_profiler.py             Profile of the startup, phase by phase and import by import (opt-in)
+* - ptt_report.py                       Reports of the time worked per period over my tasks and archives (processes)
+* - ptt_bench.py                        Benchmarks on synthetic tasks (not needed to run PTT)
 * Resources and UI files required :
 * - /ui/ptt_main.ui                     Main window form
 * - /ui/ptt_edit_task.ui                Edit task form
+* - /ui/ptt_export.ui                   Export options form (also used by the reports)
+* - /ui/ptt_consolidate.ui             Consolidation options form
+* - /ui/ptt_heatmap.ui                  Calendar of the time worked form
 * - /ui/ptt.ico                         Icon used in .ui files
 * User data files used :
-* - /data/my_tasks.json                 Tasks saved in a JSON format
-* - /data/my_tasks.backup               Backup of the previous file (at startup)
+* - /data/my_tasks.json                 Tasks saved in a JSON format (by checksummed blocks)
+* - /data/quarantine/my_tasks_*.damaged Damaged parts of my_tasks.json found at startup (kept for inspection)
+* - /data/backups/my_tasks_*.json.gz    Rotating backups of the previous file (at startup, then every hour)
 * - /data/ptt_config.ini                User settings like language preferences...
+* - /data/ptt_sync.json                 Device id, version vector and pending changes for the synchronization
+* - /data/archives/*.json(.gz)        Tasks files of the previous periods (read by the reports only)
+* - /data/workspaces/<name>/            Files of my tasks of the other workspaces (my_tasks.json, backups...)
+* - /data/ptt_day_totals.json           Time worked per day (cache, computed again if my_tasks.json changed)
+* - /data/ptt_layout.json               Layout of the main window at the exit (cache, columns sized again if invalid)
+* - <local cache>/ptt_replication.json Manifest of the latest replication of the local cache (if set, see [STORAGE])
 * Miscellaneous files used/generated :
 * - /data/ptt.lock                      Used as pseudo lock file
+* - /data/my_tasks.lock                 Advisory lock held by the writers of my_tasks.json (PTT, CLI, hooks...)
+* - /data/ptt_memory_*.txt              Memory reports (PTT menu, or ptt_main.py --trace-memory at startup)
+* - /data/ptt_startup_profile.json      Profiles of the latest startups (ptt_main.py --profile-startup)
 * --------------------------------------------------------------------------------- *
 To build the application from PyInstaller, go in the ptt (root) folder then :
 pyinstaller ptt_main.py -w -n ptt.exe --add-data="ui\*.*";"ui"
@@ -34,21 +77,70 @@ pyinstaller ptt_main.py -w -n ptt.exe --add-data="ui\*.*";"ui"
 * --------------------------------------------------------------------------------- *
 """
 
+# ------------------------------------------- #
+# Processes of the reports (ptt_report.py)
+# ------------------------------------------- #
+
+# Note : checked before anything else, nothing of PTT must be initialized in these processes. Once frozen (PyInstaller),
+# the processes of a pool are started with ptt.exe (freeze_support runs their work), and so is the process running
+# the pool of a report ("ptt.exe --report-pool", see compute_report_in_pool_process in ptt_report.py)
+import sys
+import multiprocessing
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    if sys.argv[1:] == ["--report-pool"]:
+        from ptt_report import run_report_pool
+        sys.exit(run_report_pool())
+
 # ------------------------------------------- #
 # Imports
 # ------------------------------------------- #
 
+# Note : the profiler of the startup is created first, to time the other imports (ptt_main.py --profile-startup)
+from ptt_startup_profiler import PttStartupProfiler, glb_profile_startup_argument, get_slowest_phase, \
+    format_startup_profile
+glb_ptt_startup_profiler = PttStartupProfiler(glb_profile_startup_argument in sys.argv[1:])
+
+glb_ptt_startup_profiler.start_phase("PyQt5 imports")
 from PyQt5 import QtWidgets, uic, QtCore, QtGui
 from PyQt5.QtWidgets import QTableWidgetItem, QMessageBox, QAction
 from PyQt5.QtCore import Qt, QTime, QObject
 from PyQt5.QtGui import QFont
-from shutil import copyfile
+glb_ptt_startup_profiler.end_phase()
+
+glb_ptt_startup_profiler.start_phase("PTT modules imports")
 from ptt_info import PttAppInfo
-import sys
+from ptt_sync import PttSyncState, PttSyncError, new_task_id, synchronize, cells_fingerprint
+from ptt_tasks_store import PttTasksStore, PttTasksStoreError, stamp_record_revisions
+from ptt_tasks_watcher import PttTasksFileWatcher
+from ptt_backup import PttBackupManager, PttBackupRetention
+from ptt_undo import PttUndoStack, PttUndoOperation, build_removed_runs, group_consecutive_rows
+from ptt_descriptions import pack_task_records
+from ptt_edit_delegates import PttStartedOnDelegate, PttDurationDelegate, PttDescriptionEditDelegate
+from ptt_config import PttConfig
+from ptt_clock import get_ptt_clock
+from ptt_export import PttExportError, PttExportFilter, export_tasks
+from ptt_report import PttReportError, PttReportWorkspace, list_report_sources, report_workspaces
+from ptt_billing import PttBillingError, bill_tasks
+from ptt_consolidate import plan_consolidation
+from ptt_import import PttImportError, PttImportStats, import_task_records, started_on_sort_key
+from ptt_memory import PttMemoryDiagnostics
+from ptt_tasks_blocks import split_task_records, encode_tasks_blocks, decode_tasks_content, read_tasks_content, \
+    write_tasks_content, write_quarantine, replace_content_task_record
+from ptt_day_totals import PttDayTotals
+from ptt_heatmap import PttHeatmap
+from ptt_background import PttBackgroundMode
+from ptt_replicator import PttReplicator
+from ptt_workspaces import PttWorkspaceError, PttWorkspaceState, PttWorkspaceCache, glb_workspace_default, \
+    list_workspaces, get_workspace_dir, create_workspace
+from ptt_layout import PttLayout, size_table_columns
+from ptt_events import PttTaskEventBus, PttTaskAdded, PttTaskUpdated, PttTaskMoved, PttTaskRemoved, \
+    glb_task_event_origin_file, glb_task_event_origin_sync, glb_task_event_origin_record, get_events_task_ids, \
+    events_change_rows, events_need_save
 import os
-import json
 import datetime
-import configparser
+glb_ptt_startup_profiler.end_phase()
+glb_ptt_startup_profiler.stop_import_trace()
 
 
 # ------------------------------------------- #
@@ -56,12 +148,30 @@ import configparser
 # ------------------------------------------- #
 
 # Class PttFiles : contains the data file names used in the application
+# Note : the settings are always in /data, the other files in the data directory set in the settings (/data by default)
 class PttFiles:
     def __init__(self):
-        self.my_tasks_json = "data/my_tasks.json"
-        self.my_tasks_backup = "data/my_tasks.backup"
-        self.ptt_lock = "data/ptt.lock"
         self.ptt_config_ini = "data/ptt_config.ini"
+        self.ptt_layout_json = "data/ptt_layout.json"
+        self.set_data_dir("data")
+
+    # Method set_data_dir : changes the folder of the data files (at startup, before any of them is read)
+    def set_data_dir(self, p_data_dir: str):
+        self.data_dir = p_data_dir
+        self.ptt_lock = os.path.join(p_data_dir, "ptt.lock")
+        self.memory_reports_dir = p_data_dir
+        self.set_workspace_dir(p_data_dir)
+
+    # Method set_workspace_dir : changes the folder of the files of my tasks (the data directory for the default
+    # workspace, see ptt_workspaces.py)
+    def set_workspace_dir(self, p_workspace_dir: str):
+        self.workspace_dir = p_workspace_dir
+        self.my_tasks_json = os.path.join(p_workspace_dir, "my_tasks.json")
+        self.backups_dir = os.path.join(p_workspace_dir, "backups")
+        self.ptt_sync_json = os.path.join(p_workspace_dir, "ptt_sync.json")
+        self.quarantine_dir = os.path.join(p_workspace_dir, "quarantine")
+        self.ptt_day_totals_json = os.path.join(p_workspace_dir, "ptt_day_totals.json")
+        self.archives_dir = os.path.join(p_workspace_dir, "archives")
 
 
 # Class PttResourcesFiles : contains the file names used for the resources in the application
@@ -69,6 +179,9 @@ class PttResourcesFiles:
     def __init__(self):
         self.main_ui = "ui/ptt_main.ui"
         self.edit_task_ui = "ui/ptt_edit_task.ui"
+        self.export_ui = "ui/ptt_export.ui"
+        self.consolidate_ui = "ui/ptt_consolidate.ui"
+        self.heatmap_ui = "ui/ptt_heatmap.ui"
         self.ptt_ico = "ui/ptt.ico"
 
 
@@ -81,12 +194,6 @@ class TaskDuration:
         self.seconds = 0
 
 
-# Class PttConfigValues : contains the values of the ptt_config.ini file
-class PttConfigValues:
-    def __init__(self):
-        self.UI_Language = ""
-
-
 # Object for edit_task_signal calling parameters between windows
 class PttEditObject(QObject):
     edit_task_signal = QtCore.pyqtSignal(int, str, str, str)
@@ -96,6 +203,31 @@ class PttEditObject(QObject):
 ptt_main_calling_edit = PttEditObject()
 ptt_edit_task_saving = PttEditObject()
 ptt_resources = PttResourcesFiles()
+ptt_files = PttFiles()
+ptt_config = PttConfig(ptt_files.ptt_config_ini)
+
+# The settings are loaded once, before anything else : the data directory and its local cache are read from them
+# Note : with a local cache, my files are read and written locally, then replicated in the data directory
+glb_ptt_startup_profiler.start_phase("settings and data directory")
+ptt_config.load()
+glb_ptt_replicator = None
+if ptt_config.STORAGE_Local_Cache_Dir != "":
+    glb_ptt_replicator = PttReplicator(ptt_config.STORAGE_Local_Cache_Dir,
+                                       ptt_config.STORAGE_Data_Dir or ptt_files.data_dir)
+    glb_ptt_replicator.pull()
+    ptt_files.set_data_dir(ptt_config.STORAGE_Local_Cache_Dir)
+elif ptt_config.STORAGE_Data_Dir != "":
+    ptt_files.set_data_dir(ptt_config.STORAGE_Data_Dir)
+
+# My tasks are the ones of the current workspace (the default one if it was removed meanwhile)
+glb_ptt_workspace = ptt_config.WORKSPACES_Current
+if glb_ptt_workspace not in list_workspaces(ptt_files.data_dir):
+    glb_ptt_workspace = glb_workspace_default
+ptt_files.set_workspace_dir(get_workspace_dir(ptt_files.data_dir, glb_ptt_workspace))
+glb_ptt_startup_profiler.end_phase()
+
+# Settings only used at startup (a change in the file is applied at the next startup, see apply_reloaded_settings)
+glb_ptt_startup_settings = (ptt_config.UI_Language, ptt_config.STORAGE_Data_Dir, ptt_config.STORAGE_Local_Cache_Dir)
 
 
 # ------------------------------------------- #
@@ -142,86 +274,6 @@ def convert_task_duration_secs_to_dhms(p_duration_in_secs: int, p_working_day_du
     return w_task_duration
 
 
-# Function read_ptt_config : reads ptt_config.ini and returns the values found as a class
-def read_ptt_config():
-
-    # Miscellaneous initializations
-    w_ptt_config_values = PttConfigValues()
-    w_ptt_files = PttFiles()
-    w_language = ""
-    w_error_when_reading = False
-
-    # Reading the config file
-    w_ptt_config = configparser.ConfigParser()
-    try:
-        w_ptt_config.read(w_ptt_files.ptt_config_ini)
-    except:
-        print("read_ptt_config : error when reading the '{}' file".format(w_ptt_files.ptt_config_ini))
-        w_error_when_reading = True
-
-    # We continue if no error occurred when parsing the .ini file
-    if w_error_when_reading is False:
-
-        # Reading the [UI] section and its keys ; also using fallback values, just in case...
-        try:
-            w_ui_section = w_ptt_config["UI"]
-            w_language = w_ui_section.get("language", "")
-        except:
-            print("read_ptt_config : cannot find the [UI] section in the '{}' file".format(w_ptt_files.ptt_config_ini))
-
-        # If the language code found is not supported or not valid, we set it to the default value
-        if w_language not in {"fr", "en"}:
-            w_language = "fr"
-
-        # Updating section [UI] / key "Language" value in the class
-        w_ptt_config_values.UI_Language = w_language
-
-    # Returning the config values class
-    return w_ptt_config_values
-
-
-# Function write_ptt_config : writes ptt_config.ini from the values found in a class received
-def write_ptt_config(p_ptt_config_values: PttConfigValues):
-
-    # Miscellaneous initializations
-    w_ptt_files = PttFiles()
-    w_language = p_ptt_config_values.UI_Language
-    w_error_when_reading = False
-
-    # If the language code found is not supported or not valid, we set it to the default value
-    if w_language not in {"fr", "en"}:
-        w_language = "fr"
-
-    # Reading the config file
-    w_ptt_config = configparser.ConfigParser()
-    try:
-        w_ptt_config.read(w_ptt_files.ptt_config_ini)
-    except:
-        print("write_ptt_config : error when reading the '{}' file".format(w_ptt_files.ptt_config_ini))
-        w_error_when_reading = True
-
-    # We continue if no error occurred when parsing the .ini file
-    if w_error_when_reading is False:
-
-        # Adding the [UI] section if none was found
-        if w_ptt_config.has_section("UI") is False:
-            try:
-                w_ptt_config.add_section("UI")
-            except:
-                print("write_ptt_config : error when adding the [UI] section in the '{}' file"
-                      .format(w_ptt_files.ptt_config_ini))
-
-        # Updating section [UI] / key "Language" value in the config parser
-        w_ptt_config.set("UI", "language", w_language)
-
-        # Saving the whole config parser in the .ini file
-        try:
-            with open(w_ptt_files.ptt_config_ini, "w") as w_configfile:
-                w_ptt_config.write(w_configfile)
-        except:
-            print("write_ptt_config : cannot write in the '{}' file".format(w_ptt_files.ptt_config_ini))
-
-
 # Function ptt_load_translators : load translator(s) according to the language settings
 def ptt_load_translators():
 
@@ -230,15 +282,10 @@ def ptt_load_translators():
     w_main_translator = QtCore.QTranslator()
     w_qt_translations_path = QtCore.QLibraryInfo.location(QtCore.QLibraryInfo.TranslationsPath)
 
-    # Retrieving language from the .ini config file
-    w_ptt_config_values = read_ptt_config()
-
     # For now, we only deal with french and english languages (french is the default language)
-    if w_ptt_config_values.UI_Language == "fr":
-        w_locale = "fr_FR"
-    elif w_ptt_config_values.UI_Language == "en":
+    if ptt_config.UI_Language == "en":
         w_locale = "en_GB"
-    elif w_ptt_config_values.UI_Language not in {"fr", "en"}:
+    else:
         w_locale = "fr_FR"
 
     # Loading the general translator with the right "qtbase_locale.qm" (generic search with fr_FR, fr if not found...)
@@ -255,16 +302,24 @@ def ptt_load_translators():
 # ------------------------------------------- #
 
 ptt_main_ui_path = ptt_resource_path(ptt_resources.main_ui)
+glb_ptt_startup_profiler.start_phase("QApplication (main)")
 ptt_main_app = QtWidgets.QApplication([])
+glb_ptt_startup_profiler.end_phase()
+glb_ptt_startup_profiler.start_phase("uic.loadUi (main)")
 ptt_main_dlg = uic.loadUi(ptt_main_ui_path)
+glb_ptt_startup_profiler.end_phase()
 
 # ------------------------------------------- #
 # Edit task window (ptt_edit_task)
 # ------------------------------------------- #
 
 ptt_edit_task_ui_path = ptt_resource_path(ptt_resources.edit_task_ui)
+glb_ptt_startup_profiler.start_phase("QApplication (edit task)")
 ptt_edit_task_app = QtWidgets.QApplication([])
+glb_ptt_startup_profiler.end_phase()
+glb_ptt_startup_profiler.start_phase("uic.loadUi (edit task)")
 ptt_edit_task_dlg = uic.loadUi(ptt_edit_task_ui_path)
+glb_ptt_startup_profiler.end_phase()
 
 # ------------------------------------------- #
 # Global variables
@@ -273,20 +328,99 @@ ptt_edit_task_dlg = uic.loadUi(ptt_edit_task_ui_path)
 # Retrieve external application information
 glb_ptt_app_info = PttAppInfo()
 
+# Clock giving the current datetime and the timers (the system clock, unless a simulated one was installed)
+glb_ptt_clock = get_ptt_clock()
+
+# Versions of the task records for the synchronization between machines (loaded at startup)
+glb_ptt_sync_state = PttSyncState(ptt_files.ptt_sync_json)
+
+# Watcher of the modifications of my_tasks.json made outside of PTT
+glb_ptt_tasks_watcher = PttTasksFileWatcher(ptt_files.my_tasks_json)
+
+# my_tasks.json shared with the other writers (ptt_tasks_store.py, hook scripts...)
+glb_ptt_tasks_store = PttTasksStore(ptt_files.my_tasks_json)
+
+# Rotating backups of my_tasks.json (the retention is read from the settings)
+glb_ptt_backup_manager = PttBackupManager(ptt_files.my_tasks_json, ptt_files.backups_dir, PttBackupRetention())
+
+# Undo/redo stack of the deletions, merges, edits and imports
+glb_ptt_undo_stack = PttUndoStack()
+
+# Bus of the changes made on the tasks (the save, the view and the status bar are updated once per event loop turn)
+glb_ptt_task_events = PttTaskEventBus()
+
+# Time worked per day and per description of each day (updated task by task, see update_day_totals_after_changes)
+glb_ptt_day_totals = PttDayTotals()
+
+# Calendar of the time worked per day (drawn again only when displayed after the tasks changed)
+glb_ptt_heatmap = PttHeatmap()
+
+# Day the list is filtered on from the calendar (None = all the tasks displayed)
+glb_lst_tasks_day_filter = None
+
+# Background mode : while the window is hidden or minimized, the view is only refreshed when it's shown again
+glb_ptt_background_mode = PttBackgroundMode(lambda p_events: refresh_view_after_background(p_events))
+
+# Row of each task id in the list (rebuilt when needed after rows were inserted or removed)
+glb_lst_tasks_rows_by_task_id = None
+
+# Task id of the active task displayed with a yellow background (see refresh_lst_tasks_after_changes)
+glb_lst_tasks_yellow_task_id = ""
+
+# Workspaces left, kept in memory (the least recently used ones are evicted beyond the budget of the settings)
+glb_ptt_workspaces_cache = PttWorkspaceCache(ptt_config.WORKSPACES_Cache_Size_MB * 1024 * 1024)
+
+# Layout of the main window saved at the exit (geometry, widths of the columns, scroll position of the list)
+glb_ptt_layout = PttLayout(ptt_files.ptt_layout_json)
+
+# Actions of the workspaces in the menu (only one checked, rebuilt each time the menu is displayed)
+glb_workspaces_action_group = QtWidgets.QActionGroup(ptt_main_dlg)
+
+# Memory diagnostics (the allocations are only traced on demand, see write_memory_report)
+glb_ptt_memory_diagnostics = PttMemoryDiagnostics(ptt_files.memory_reports_dir)
+glb_ptt_memory_diagnostics.add_structure("indexes", "sync versions", lambda: glb_ptt_sync_state.entries)
+glb_ptt_memory_diagnostics.add_structure("indexes", "sync pending/tombstones", lambda: [
+    glb_ptt_sync_state.pending_task_ids, glb_ptt_sync_state.tombstones, glb_ptt_sync_state.version_vector])
+glb_ptt_memory_diagnostics.add_structure("indexes", "watcher fingerprints", lambda: glb_ptt_tasks_watcher.fingerprints)
+glb_ptt_memory_diagnostics.add_structure("indexes", "watcher revisions", lambda: glb_ptt_tasks_watcher.revisions)
+glb_ptt_memory_diagnostics.add_structure("caches", "day totals", lambda: glb_ptt_day_totals)
+glb_ptt_memory_diagnostics.add_structure("caches", "calendar day buckets", lambda: glb_ptt_heatmap.buckets)
+glb_ptt_memory_diagnostics.add_structure("caches", "undo/redo stack", lambda: glb_ptt_undo_stack)
+glb_ptt_memory_diagnostics.add_structure("caches", "settings", lambda: ptt_config)
+glb_ptt_memory_diagnostics.add_structure("caches", "workspaces kept", lambda: glb_ptt_workspaces_cache)
+
+# Argument of ptt_main.py tracing the memory from the startup (a report is written once my tasks are loaded)
+glb_trace_memory_argument = "--trace-memory"
+
+# Profiles of the latest startups (ptt_main.py --profile-startup, see ptt_startup_profiler.py)
+glb_startup_profile_json = "ptt_startup_profile.json"
+
 # Global variables for intervals and others duration
 glb_timer_ptt_lock_interval_in_msec = 30000
+glb_timer_replication_interval_in_msec = 5000
 glb_timer_interval_in_msec = 60000
+glb_timer_backup_interval_in_msec = 3600000
 glb_default_added_duration_in_sec = 60
 glb_max_task_duration_in_sec = 28800
 
+# Number of records inserted at once in the list by an import (the progress is refreshed between 2 batches)
+glb_import_batch_size = 5000
+
 # Active task timer management
-glb_active_task_timer = QtCore.QTimer()
+glb_active_task_timer = glb_ptt_clock.create_timer()
 glb_active_task_timer.start(glb_timer_interval_in_msec)
 
 # ptt.lock timer management
-glb_ptt_lock_timer = QtCore.QTimer()
+glb_ptt_lock_timer = glb_ptt_clock.create_timer()
 glb_ptt_lock_timer.start(glb_timer_ptt_lock_interval_in_msec)
 
+# Backups timer management (a backup is only created if my tasks changed)
+glb_backup_timer = glb_ptt_clock.create_timer()
+glb_backup_timer.start(glb_timer_backup_interval_in_msec)
+
+# Replication status timer management (the lag displayed in the status bar, only with a local cache)
+glb_replication_timer = glb_ptt_clock.create_timer()
+
 # Date/time string format displayed
 glb_dd_MM_yyyy_hh_mm_string_format = "dd/MM/yyyy hh:mm"
 
@@ -302,6 +436,9 @@ glb_maximum_time_per_task = QTime()
 glb_minimum_time_per_task.setHMS(0, 0, 0)
 glb_maximum_time_per_task.setHMS(8, 0, 0)
 
+# Step of the - and + buttons of the duration edited in the list (in minutes)
+glb_inline_duration_step_in_min = 5
+
 # Important note : for now, only texts of the buttons are dynamically translated (fr_FR or default)
 # Rest of the text errors are only in french for now in this version...
 
@@ -318,6 +455,7 @@ glb_new_task_at_startup = "Tâche créée au démarrage de l'application"
 # Popup actions text displayed
 glb_actionActivate_text = "Activer"
 glb_actionEdit_text = "Modifier"
+glb_actionEditAdvanced_text = "Modifier (avancé)..."
 glb_actionMerge_text = "Fusionner"
 glb_actionDelete_text = "Supprimer"
 glb_actionDeleteAll_text = "Tout supprimer"
@@ -339,6 +477,92 @@ glb_popup_question_merging = "Voulez-vous fusionner les tâches sélectionnées
 glb_popup_title_merging_error = "Fusion annulée"
 glb_popup_text_merging_failed = "La durée totale excède {} heures.".format(str(int(glb_max_task_duration_in_sec/3600)))
 
+# Texts for the synchronization
+glb_popup_title_sync = "Synchronisation"
+glb_popup_text_sync_failed = "La synchronisation a échoué :\n{}"
+glb_sync_done = "Synchronisation effectuée : {} modification(s) envoyée(s), {} reçue(s)."
+
+# Texts for the import of tasks
+glb_actionImport_text = "Importer"
+glb_popup_title_import = "Import"
+glb_import_file_filter = "Fichiers CSV (*.csv *.txt);;Fichiers JSON lines (*.jsonl *.json)"
+glb_import_reading = "Lecture du fichier..."
+glb_import_inserting = "Insertion des tâches..."
+glb_import_cancel = "Annuler"
+glb_popup_text_import_failed = "L'import a échoué :\n{}"
+glb_popup_text_import_rejected = "{} ligne(s) ignorée(s) :\n\n{}"
+glb_import_done = "Import terminé : {} tâche(s) ajoutée(s), {} doublon(s), {} ligne(s) ignorée(s)."
+
+# Texts for the export of tasks
+glb_popup_title_export = "Export"
+glb_export_file_filter = "Fichiers CSV (*.csv);;Fichiers JSON lines (*.jsonl);;Fichiers iCalendar (*.ics)"
+glb_popup_text_export_failed = "L'export a échoué :\n{}"
+glb_export_done = "Export terminé : {} tâche(s) exportée(s) dans '{}'."
+
+# Texts for the consolidation of the tasks (same description over a date range)
+glb_actionConsolidate_text = "Regrouper"
+glb_popup_title_consolidate = "Regroupement des tâches"
+glb_popup_text_consolidate_nothing = "Aucune tâche à regrouper sur cette période."
+glb_popup_question_consolidate = "{} tâche(s) vont être regroupées en {} tâche(s) (8 heures maximum chacune) :" \
+                                 "\n\n{}\n\nVoulez-vous continuer ?"
+glb_consolidate_preview_line = "- {} : {} tâche(s), {}"
+glb_consolidate_preview_others = "... et {} autre(s) description(s)"
+glb_consolidate_done = "Regroupement terminé : {} tâche(s) regroupée(s) en {}."
+
+# Number of groups listed in the preview of the consolidation
+glb_consolidate_preview_nbr_groups = 15
+
+# Texts for the calendar of the time worked
+glb_heatmap_tooltip = "{} : {}"
+glb_heatmap_day_filter = "Tâches du {} : {} (menu PTT / Calendrier pour afficher toutes les tâches)."
+
+# Texts for the reports (time worked per month and description, over my tasks and the archives)
+glb_popup_title_report = "Rapport"
+glb_report_file_filter = "Fichiers CSV (*.csv)"
+glb_report_computing = "Calcul du rapport..."
+glb_popup_text_report_failed = "Le rapport a échoué :\n{}"
+glb_popup_text_report_errors = "Des tâches n'ont pas pu être lues :\n\n{}"
+glb_report_done = "Rapport terminé : {} tâche(s) de {} fichier(s) dans '{}'."
+glb_report_cancelled = "Rapport annulé."
+glb_popup_title_billing = "Facturation"
+glb_popup_text_billing_failed = "La facturation a échoué :\n{}"
+glb_billing_done = "Facturation terminée : {:.2f} h facturées pour {:.2f} h réalisées ({} tâche(s)) dans '{}'."
+
+# Texts for the workspaces
+glb_popup_title_workspace = "Espace de travail"
+glb_popup_text_new_workspace = "Nom du nouvel espace de travail :"
+glb_popup_text_workspace_failed = "L'espace de travail n'a pas pu être créé :\n{}"
+glb_workspace_default_text = "Par défaut"
+glb_new_task_at_workspace_switch = "Tâche créée au changement d'espace de travail"
+glb_workspace_switched_from_memory = "Espace de travail '{}' : {} tâche(s) reprise(s) de la mémoire."
+glb_workspace_switched_from_file = "Espace de travail '{}' : {} tâche(s) chargée(s) du fichier."
+glb_window_title = "PTT - Python Time Tracker"
+glb_window_title_workspace = "PTT - Python Time Tracker - {}"
+
+# Texts for the settings modified outside of PTT
+glb_settings_reloaded = "Paramètres rechargés depuis ptt_config.ini."
+glb_settings_reloaded_restart = "Paramètres rechargés depuis ptt_config.ini (la langue et les dossiers des données " \
+                                "changeront au prochain démarrage de PTT)."
+
+# Texts for the memory diagnostics
+glb_popup_title_memory = "Diagnostic mémoire"
+glb_popup_text_memory_failed = "Le rapport mémoire n'a pas pu être écrit :\n{}"
+glb_memory_report_done = "Rapport mémoire écrit dans '{}'."
+
+# Texts for the profile of the startup
+glb_startup_profile_done = "Démarrage en {:.0f} ms (le plus long : {} en {:.0f} ms), profil écrit dans '{}'."
+glb_startup_profile_done_previous = "Démarrage en {:.0f} ms (précédent : {:.0f} ms, le plus long : {} en " \
+                                    "{:.0f} ms), profil écrit dans '{}'."
+
+# Texts for the damaged parts of my_tasks.json found when loading it
+glb_popup_title_damaged_tasks = "Fichier des tâches endommagé"
+glb_popup_text_damaged_tasks = "Le fichier des tâches est endommagé : {} partie(s) illisible(s) ignorée(s), " \
+                               "{} tâche(s) récupérée(s).\n\nLes parties endommagées ont été mises de côté dans :\n{}"
+
+# Texts for the modifications of my_tasks.json made outside of PTT
+glb_external_changes_loaded = "Modifications externes chargées : {} ajoutée(s), {} modifiée(s), {} supprimée(s)."
+glb_external_changes_merged = " {} conflit(s) : les 2 versions ont été gardées."
+
 # Last backup performed at
 glb_last_backup_performed_at = "Dernière sauvegarde effectuée à"
 
@@ -348,6 +572,12 @@ glb_working_time_duration = "Durée travaillée"
 glb_day = "jour"
 glb_days = "jours"
 glb_no_time_duration = "nulle"
+glb_day_totals_text = "Aujourd'hui : {} - Semaine : {}"
+
+glb_replication_done_text = "Réplication à jour"
+glb_replication_pending_text = "Réplication : {} fichier(s) en attente depuis {}"
+glb_replication_failed_text = "Réplication impossible depuis {}, nouvel essai dans {}"
+glb_replication_tooltip_text = "Cache local : {}\nDossier des données : {}"
 
 # --------------------------------------------------- #
 # Main window global variables (current row contents)
@@ -358,6 +588,19 @@ z_curr_task_dth = ""
 z_curr_task_duration = ""
 z_curr_task_description = ""
 
+# ------------------------------------------- #
+# Status bar widgets
+# ------------------------------------------- #
+
+# Creating the label of the time worked today and this week (always displayed on the right of the status bar)
+lbl_day_totals = QtWidgets.QLabel()
+ptt_main_dlg.ptt_statusbar.addPermanentWidget(lbl_day_totals)
+
+# Creating the label of the replication of the local cache (only displayed if a local cache is set)
+lbl_replication = QtWidgets.QLabel()
+lbl_replication.setVisible(glb_ptt_replicator is not None)
+ptt_main_dlg.ptt_statusbar.addPermanentWidget(lbl_replication)
+
 # ------------------------------------------- #
 # Popup menu actions
 # ------------------------------------------- #
@@ -372,7 +615,7 @@ bold_font.setBold(True)
 
 # Creating the actions with their texts
 actionActivate = QAction(glb_actionActivate_text, None)
-actionEdit = QAction(glb_actionEdit_text, None)
+actionEdit = QAction(glb_actionEditAdvanced_text, None)
 actionMerge = QAction(glb_actionMerge_text, None)
 actionDelete = QAction(glb_actionDelete_text, None)
 actionDeleteAll = QAction(glb_actionDeleteAll_text, None)
@@ -397,7 +640,6 @@ ptt_main_dlg.lst_tasks.addAction(actionDeleteAll)
 def check_ptt_lock_existence():
 
     # Miscellaneous initializations
-    w_ptt_files = PttFiles()
     w_file_exists = False
     w_first_line = ""
 
@@ -405,11 +647,11 @@ def check_ptt_lock_existence():
     # Note : .rstrip() was added to remove the extra control characters at the end of the line
 
     try:
-        with open(w_ptt_files.ptt_lock, "r") as file:
+        with open(ptt_files.ptt_lock, "r") as file:
             w_file_exists = True
             w_first_line = file.readline().rstrip()
     except:
-        print("check_ptt_lock_existence : file '{}' not found".format(w_ptt_files.ptt_lock))
+        print("check_ptt_lock_existence : file '{}' not found".format(ptt_files.ptt_lock))
 
     # Returning the file existence boolean and the string of the 1st line
     return w_file_exists, w_first_line
@@ -418,28 +660,24 @@ def check_ptt_lock_existence():
 # Function write_ptt_lock : creates or overwrites the ptt.lock file
 def write_ptt_lock():
 
-    # Miscellaneous initializations
-    w_ptt_files = PttFiles()
-
     # Trying to overwrite the file with a timestamp
     try:
-        with open(w_ptt_files.ptt_lock, "w") as file:
-            file.write(datetime.datetime.now().strftime("%Y%m%d%H%M%S"))
+        with open(ptt_files.ptt_lock, "w") as file:
+            file.write(glb_ptt_clock.now().strftime("%Y%m%d%H%M%S"))
     except:
-        print("write_ptt_lock : cannot write in the '{}' file".format(w_ptt_files.ptt_lock))
+        print("write_ptt_lock : cannot write in the '{}' file".format(ptt_files.ptt_lock))
+
+    replicate_data_changes()
 
 
 # Function remove_ptt_lock : removes the ptt.lock file
 def remove_ptt_lock():
 
-    # Miscellaneous initializations
-    w_ptt_files = PttFiles()
-
     # Trying to remove the file
     try:
-        os.remove(w_ptt_files.ptt_lock)
+        os.remove(ptt_files.ptt_lock)
     except:
-        print("remove_ptt_lock : cannot remove the '{}' file".format(w_ptt_files.ptt_lock))
+        print("remove_ptt_lock : cannot remove the '{}' file".format(ptt_files.ptt_lock))
 
 
 # Function ptt_start_allowed : checking if ptt is allowed to start with the help of ptt.lock
@@ -458,7 +696,6 @@ def ptt_start_allowed():
     # ----------------------------------------------------------------------------------- #
 
     # Miscellaneous initializations
-    w_ptt_files = PttFiles()
     w_ptt_start_allowed = False
     w_datetime_is_valid = False
     w_calculation_is_valid = False
@@ -474,13 +711,13 @@ def ptt_start_allowed():
             w_datetime_in_file = datetime.datetime.strptime(w_first_line, "%Y%m%d%H%M%S")
             w_datetime_is_valid = True
         except:
-            print("ptt_start_allowed : invalid data '{}' found in '{}' file".format(w_first_line, w_ptt_files.ptt_lock))
+            print("ptt_start_allowed : invalid data '{}' found in '{}' file".format(w_first_line, ptt_files.ptt_lock))
 
         # If the datetime found is OK...
         if w_datetime_is_valid is True:
 
             # Retrieving the current datetime in the format we need
-            w_now = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+            w_now = glb_ptt_clock.now().strftime("%Y%m%d%H%M%S")
             w_current_datetime = datetime.datetime.strptime(w_now, "%Y%m%d%H%M%S")
 
             # Trying to calculate the datetime difference between the current and the file one
@@ -527,23 +764,25 @@ def update_status_bar_message(p_message: str):
 # Function update_status_bar_latest_backup : generates and updates the status bar with "Last backup performed at HH:MM."
 def update_status_bar_latest_backup():
 
-    # Retrieving the numbers of row currently selected
-    w_nbr_rows_selected = len(ptt_main_dlg.lst_tasks.selectionModel().selectedRows())
-
     # Declaring glb_status_bar_latest_backup as global since we will update its contents
     global glb_status_bar_latest_backup
 
     # Generating the backup message
-    glb_status_bar_latest_backup = glb_last_backup_performed_at + " " + datetime.datetime.now().strftime("%H:%M.")
+    glb_status_bar_latest_backup = glb_last_backup_performed_at + " " + glb_ptt_clock.now().strftime("%H:%M.")
+
+    # In background, the message is only displayed when the window is shown again
+    if glb_ptt_background_mode.active is True:
+        return
+
+    # Retrieving the numbers of row currently selected
+    w_nbr_rows_selected = len(ptt_main_dlg.lst_tasks.selectionModel().selectedRows())
 
     # We only update the status bar with the latest backup message if there are less than 2 rows selected
     # (= maybe the user wants to know the sum of the working duration only, so we don't loose the current status)
-    # Otherwise, we refresh the duration of the selected tasks
+    # Note : the duration of the selected tasks is refreshed by update_status_bar_after_changes, only if they changed
 
     if w_nbr_rows_selected < 2:
         update_status_bar_message(glb_status_bar_latest_backup)
-    else:
-        update_status_bar_selected_tasks_duration()
 
 
 # Function display_status_bar_latest_backup : displays the latest backup message performed in the status bar
@@ -551,18 +790,17 @@ def display_status_bar_latest_backup():
     update_status_bar_message(glb_status_bar_latest_backup)
 
 
-# Function update_status_bar_selected_tasks_duration : generates and displays the working time of the selected tasks
-def update_status_bar_selected_tasks_duration():
+# Function convert_task_duration_secs_to_text : returns a duration in secs as a text (ex: "1 jour 2h 30min")
+def convert_task_duration_secs_to_text(p_duration_in_secs: int):
 
     # Miscellaneous initializations
-    w_message = glb_working_time_duration + " :"
     w_txt_days = ""
     w_txt_hours = ""
     w_txt_mins = ""
     w_txt_secs = ""
 
-    # Retrieving the selected tasks working duration in seconds in converting them into a class
-    w_dhms = convert_task_duration_secs_to_dhms(sum_selected_tasks_duration(), glb_max_task_duration_in_sec)
+    # Converting the working duration in seconds into a class
+    w_dhms = convert_task_duration_secs_to_dhms(p_duration_in_secs, glb_max_task_duration_in_sec)
 
     # Generating the "days" part of the text we need (with singular and plural)
     if w_dhms.days > 0:
@@ -583,30 +821,62 @@ def update_status_bar_selected_tasks_duration():
     if w_dhms.seconds > 0:
         w_txt_secs = "{}s".format(w_dhms.seconds)
 
-    # Assembling the final message...
-    if w_txt_days != "":
-        w_message = w_message + " " + w_txt_days
+    # Assembling the final text, and if we have no time duration, we need to say it
+    w_text = " ".join([w_txt for w_txt in [w_txt_days, w_txt_hours, w_txt_mins, w_txt_secs] if w_txt != ""])
+    if w_text == "":
+        w_text = glb_no_time_duration
 
-    if w_txt_hours != "":
-        w_message = w_message + " " + w_txt_hours
+    return w_text
 
-    if w_txt_mins != "":
-        w_message = w_message + " " + w_txt_mins
 
-    if w_txt_secs != "":
-        w_message = w_message + " " + w_txt_secs
-
-    # If we have no time duration, we need to say it
-    if w_txt_days == "" and w_txt_hours == "" and w_txt_mins == "" and w_txt_secs == "":
-        w_message = w_message + " " + glb_no_time_duration
+# Function update_status_bar_selected_tasks_duration : generates and displays the working time of the selected tasks
+def update_status_bar_selected_tasks_duration():
 
-    # Completing the sentence with a period
-    w_message = w_message + "."
+    # Retrieving the selected tasks working duration in seconds, then completing the sentence with a period
+    w_message = glb_working_time_duration + " : " + convert_task_duration_secs_to_text(sum_selected_tasks_duration()) + "."
 
     # Finally, updating the status bar with the generated message
     update_status_bar_message(w_message)
 
 
+# Function update_status_bar_day_totals : displays the time worked today and this week (and today's tasks as a tooltip)
+def update_status_bar_day_totals():
+
+    w_today = glb_ptt_clock.now().date()
+
+    lbl_day_totals.setText(glb_day_totals_text.format(
+        convert_task_duration_secs_to_text(glb_ptt_day_totals.seconds_of_day(w_today)),
+        convert_task_duration_secs_to_text(glb_ptt_day_totals.seconds_of_week(w_today))))
+
+    lbl_day_totals.setToolTip("\n".join(["{} : {}".format(convert_task_duration_secs_to_text(w_seconds), w_description)
+                                         for w_description, w_seconds
+                                         in glb_ptt_day_totals.description_seconds_of_day(w_today)]))
+
+
+# Function update_status_bar_replication : displays the lag of the replication of the local cache in the data directory
+def update_status_bar_replication():
+
+    # In background, the lag is only displayed when the window is shown again
+    if glb_ptt_replicator is None or glb_ptt_background_mode.active is True:
+        return
+
+    w_status = glb_ptt_replicator.status()
+
+    if w_status.error != "":
+        lbl_replication.setText(glb_replication_failed_text.format(
+            convert_task_duration_secs_to_text(int(w_status.lag_in_secs)),
+            convert_task_duration_secs_to_text(int(w_status.retry_in_secs))))
+    elif w_status.nbr_pending > 0:
+        lbl_replication.setText(glb_replication_pending_text.format(
+            w_status.nbr_pending, convert_task_duration_secs_to_text(int(w_status.lag_in_secs))))
+    else:
+        lbl_replication.setText(glb_replication_done_text)
+
+    lbl_replication.setToolTip("\n".join([w_text for w_text in [
+        glb_replication_tooltip_text.format(glb_ptt_replicator.local_dir, glb_ptt_replicator.remote_dir),
+        w_status.error] if w_text != ""]))
+
+
 # Function default_focus : puts the focus back on the entry input field
 def default_focus():
 
@@ -692,37 +962,28 @@ def change_active_task(p_row: int, p_column: int):
     # Note : no use yet for p_column
     # The parameter is kept cause it is sent by a signal which requires 2 parameters (like double clicking)
 
-    # Making sure we have some rows at least...
-    if ptt_main_dlg.lst_tasks.rowCount() > 0:
+    # Making sure we have some rows at least... (the task at row 0 is already the active one)
+    if ptt_main_dlg.lst_tasks.rowCount() > 0 and p_row > 0:
 
         # Restarting the global active task timer (only if we activate a task which is not the already activated one)
-        if p_row > 0:
-            glb_active_task_timer.start(glb_timer_interval_in_msec)
+        glb_active_task_timer.start(glb_timer_interval_in_msec)
 
-        # Retrieving the text of the 3 cells from the selected line
+        # Retrieving the text of the 3 cells from the selected line (and its task id, which moves along)
         w_cell0_selected, w_cell1_selected, w_cell2_selected = get_lst_tasks_row_cells(p_row)
+        w_task_id_selected = get_lst_tasks_row_task_id(p_row)
 
-        # If the task to be activated is not at row 0, inserting a new row at the top of the list
-        if p_row > 0:
-            ptt_main_dlg.lst_tasks.insertRow(0)
-
-        # Fix to avoid the "yellow background" to be applied on the 2nd row (row 1) when inserting a new row
-        if ptt_main_dlg.lst_tasks.rowCount() > 1:
-            w_cell0_row1, w_cell1_row1, w_cell2_row1 = get_lst_tasks_row_cells(1)
-            update_lst_tasks_row_cells(1, w_cell0_row1, w_cell1_row1, w_cell2_row1)
-
-        # Updating the cells contents after creating the new row
-        update_lst_tasks_row_cells(0, w_cell0_selected, w_cell1_selected, w_cell2_selected)
+        # Inserting a new row at the top of the list with the cells contents
+        ptt_main_dlg.lst_tasks.insertRow(0)
+        update_lst_tasks_row_cells(0, w_cell0_selected, w_cell1_selected, w_cell2_selected, w_task_id_selected)
 
-        # If the task to be activated is not at row 0, removing the original row at (row + 1)
-        if p_row > 0:
-            ptt_main_dlg.lst_tasks.removeRow(p_row + 1)
+        # Removing the original row at (row + 1)
+        ptt_main_dlg.lst_tasks.removeRow(p_row + 1)
 
-        # Replacing the focus at the top
-        default_focus()
+        # The former active task loses its yellow background when the view is refreshed (see refresh_lst_tasks_after_changes)
+        glb_ptt_task_events.emit(PttTaskMoved([w_task_id_selected], 0))
 
-    # Saving my tasks on disk
-    save_tasks_to_file()
+    # Replacing the focus at the top
+    default_focus()
 
 
 # Function empty_lst_tasks : removes all rows by setting the counter of the lst_tasks to 0
@@ -734,14 +995,17 @@ def empty_lst_tasks():
     # If confirming the deletion and if having some rows in the list
     if w_choice_confirmed is True:
 
+        # Memorizing the rows deleted so the deletion can be undone
+        w_nbr_rows = ptt_main_dlg.lst_tasks.rowCount()
+        w_undo_operation = PttUndoOperation(glb_actionDeleteAll_text)
+        w_undo_operation.removed_runs = build_removed_runs(range(w_nbr_rows), w_nbr_rows, get_lst_tasks_row_record,
+                                                           get_lst_tasks_row_task_id)
+        push_undo_operation(w_undo_operation)
+
         # Easiest way to destroy all rows and their attached items
         ptt_main_dlg.lst_tasks.setRowCount(0)
 
-        # Showing/hiding the delete all action in the context menu
-        show_action_delete_all()
-
-        # Saving my tasks on disk
-        save_tasks_to_file()
+        glb_ptt_task_events.emit(PttTaskRemoved(w_undo_operation.removed_task_ids()))
 
 
 # Function get_lst_tasks_row_cells : retrieves the text of each cells from a row of the lst_tasks list
@@ -765,19 +1029,89 @@ def get_lst_tasks_row_cells(p_row: int):
     return p_cell0_text, p_cell1_text, p_cell2_text
 
 
+# Function get_lst_tasks_row_task_id : retrieves the stable task id of a row (stored in the 1st cell)
+def get_lst_tasks_row_task_id(p_row: int):
+
+    # Miscellaneous initializations
+    p_task_id = ""
+
+    # The task id is an hidden data of the 1st cell (the row may be a new empty one)
+    w_cell0_qtwi = ptt_main_dlg.lst_tasks.item(p_row, 0)
+    if w_cell0_qtwi is not None:
+        w_task_id = w_cell0_qtwi.data(Qt.UserRole)
+        if w_task_id is not None:
+            p_task_id = w_task_id
+
+    # Returning the value
+    return p_task_id
+
+
+# Function get_lst_tasks_row_record : retrieves a row as a record tuple (task_id, started_on, duration, description)
+def get_lst_tasks_row_record(p_row: int):
+    return (get_lst_tasks_row_task_id(p_row),) + get_lst_tasks_row_cells(p_row)
+
+
+# Function get_lst_tasks_rows_by_task_id : returns the row number of each task id (not to be modified by the caller)
+def get_lst_tasks_rows_by_task_id():
+
+    global glb_lst_tasks_rows_by_task_id
+
+    # Rebuilt only if rows were inserted or removed since the latest call
+    if glb_lst_tasks_rows_by_task_id is None:
+        glb_lst_tasks_rows_by_task_id = {get_lst_tasks_row_task_id(w_row): w_row
+                                         for w_row in range(ptt_main_dlg.lst_tasks.rowCount())}
+
+    return glb_lst_tasks_rows_by_task_id
+
+
+# Function invalidate_lst_tasks_rows_by_task_id : forgets the rows of the task ids (rows inserted, removed or moved)
+def invalidate_lst_tasks_rows_by_task_id(*p_args):
+    global glb_lst_tasks_rows_by_task_id
+    glb_lst_tasks_rows_by_task_id = None
+
+
+# Function remove_lst_tasks_rows : removes the rows received (consecutive rows are removed at once)
+def remove_lst_tasks_rows(p_rows: list):
+
+    # Removing from the bottom to the top to keep the row numbers valid
+    for w_first_row, w_nbr_rows in group_consecutive_rows(p_rows):
+        ptt_main_dlg.lst_tasks.model().removeRows(w_first_row, w_nbr_rows)
+
+
+# Function insert_lst_tasks_records : inserts the records received (tuples) at once, from the row received
+def insert_lst_tasks_records(p_row: int, p_records: list):
+
+    ptt_main_dlg.lst_tasks.model().insertRows(p_row, len(p_records))
+
+    for w_index, (w_task_id, w_cell0_text, w_cell1_text, w_cell2_text) in enumerate(p_records):
+        update_lst_tasks_row_cells(p_row + w_index, w_cell0_text, w_cell1_text, w_cell2_text, w_task_id)
+
+
 # Function update_lst_tasks_row_cells : updates the text in each cell of a specified row
-def update_lst_tasks_row_cells(p_row: int, p_cell0_text: str, p_cell1_text: str, p_cell2_text: str):
+# Note : if no task id is received, the task id of the row is kept (or a new one is generated for a new row)
+def update_lst_tasks_row_cells(p_row: int, p_cell0_text: str, p_cell1_text: str, p_cell2_text: str,
+                               p_task_id: str = ""):
 
     # Making sure we have some rows at least...
     w_nbr_rows = ptt_main_dlg.lst_tasks.rowCount()
 
     if w_nbr_rows > 0:
 
+        # Retrieving the task id to keep in the row
+        w_task_id = p_task_id
+        if w_task_id == "":
+            w_task_id = get_lst_tasks_row_task_id(p_row)
+        if w_task_id == "":
+            w_task_id = new_task_id()
+
         # Turning the texts received into QTableWidgetItem objects
         w_cell0_qtwi = QTableWidgetItem(p_cell0_text)
         w_cell1_qtwi = QTableWidgetItem(p_cell1_text)
         w_cell2_qtwi = QTableWidgetItem(p_cell2_text)
 
+        # The task id is stored as an hidden data in the 1st cell
+        w_cell0_qtwi.setData(Qt.UserRole, w_task_id)
+
         # The 2 first cells contains text centered
         w_cell0_qtwi.setTextAlignment(QtCore.Qt.AlignCenter)
         w_cell1_qtwi.setTextAlignment(QtCore.Qt.AlignCenter)
@@ -794,6 +1128,11 @@ def update_lst_tasks_row_cells(p_row: int, p_cell0_text: str, p_cell1_text: str,
         ptt_main_dlg.lst_tasks.setItem(p_row, 2, QTableWidgetItem(w_cell2_qtwi))
 
 
+# Function update_lst_tasks_row_duration : updates the duration of a row only (the other cells are kept as they are)
+def update_lst_tasks_row_duration(p_row: int, p_cell1_text: str):
+    ptt_main_dlg.lst_tasks.item(p_row, 1).setText(p_cell1_text)
+
+
 # Function add_new_task : adds a new task with the text received
 def add_new_task(p_text_task: str):
 
@@ -801,23 +1140,21 @@ def add_new_task(p_text_task: str):
     if p_text_task != "":
 
         # Getting the current datetime and formatting it
-        w_now_dth = QtCore.QDateTime.currentDateTime()
+        w_now_dth = QtCore.QDateTime(glb_ptt_clock.now())
         w_now_dth_string = w_now_dth.toString(glb_dd_MM_yyyy_hh_mm_string_format)
 
         # Inserting a new task at the 1st row of the list
         ptt_main_dlg.lst_tasks.insertRow(0)
 
-        # Filling the text in each cells of the new row
+        # Filling the text in each cells of the new row, the new task being the active one
         update_lst_tasks_row_cells(0, w_now_dth_string, glb_00_00_time, p_text_task)
+        glb_ptt_task_events.emit(PttTaskAdded([get_lst_tasks_row_task_id(0)]))
 
         # Setting to blank the entry text
         ptt_main_dlg.z_task_to_add.setText("")
 
-        # Turning the new task added into the active one
-        change_active_task(0, 0)
-
-        # Showing/hiding the delete all action in the context menu
-        show_action_delete_all()
+        # Replacing the focus at the top
+        default_focus()
 
 
 # Function enable_btn_task_add : enables or disables the button to add a task depending if z_task_to_add is filled
@@ -862,18 +1199,21 @@ def delete_selected_tasks():
         for index in sorted(indexes):
             lst_rows_to_delete.append(index.row())
 
-        # Sorting the list in order to get reversed sorting (to avoid loosing the index if ascendant deletion !)
-        lst_rows_to_delete.sort(reverse=True)
+        # Memorizing the rows deleted so the deletion can be undone
+        w_undo_operation = PttUndoOperation(glb_actionDelete_text)
+        w_undo_operation.removed_runs = build_removed_runs(lst_rows_to_delete, nbr_rows, get_lst_tasks_row_record,
+                                                           get_lst_tasks_row_task_id)
+        push_undo_operation(w_undo_operation)
 
         # Deleting the rows in the lst_tasks list with the row number of the temporary list
-        for row_to_delete in lst_rows_to_delete:
-            ptt_main_dlg.lst_tasks.removeRow(row_to_delete)
+        # Note : the rows are removed from the bottom (to avoid loosing the index if ascendant deletion !)
+        remove_lst_tasks_rows(lst_rows_to_delete)
 
-        # Forcing the 1st displayed row to become the active task
-        change_active_task(0, 0)
+        # The 1st displayed row becomes the active task when the view is refreshed
+        glb_ptt_task_events.emit(PttTaskRemoved(w_undo_operation.removed_task_ids()))
 
-        # Showing/hiding the delete all action in the context menu
-        show_action_delete_all()
+        # Replacing the focus at the top
+        default_focus()
 
 
 # Function add_duration_to_task_at_row : adds a duration to the task duration found at the row received
@@ -916,6 +1256,7 @@ def add_duration_to_task_at_row(p_row: int, p_duration_to_add_in_secs: int):
                 w_task_duration = w_qt_task_duration.addSecs(w_filler_in_secs)
                 w_cell1_text = w_task_duration.toString(glb_hh_mm_string_format)
                 update_lst_tasks_row_cells(p_row, w_cell0_text, w_cell1_text, w_cell2_text)
+                glb_ptt_task_events.emit(PttTaskUpdated([get_lst_tasks_row_task_id(p_row)]))
 
                 # Creating a new task with the remains in secs
                 add_new_task(w_cell2_text)
@@ -929,11 +1270,9 @@ def add_duration_to_task_at_row(p_row: int, p_duration_to_add_in_secs: int):
                 # Turning the task duration back to string in 'hh:mm' format
                 w_cell1_text = w_task_duration.toString(glb_hh_mm_string_format)
 
-                # Putting back the row with the updated task duration
-                update_lst_tasks_row_cells(p_row, w_cell0_text, w_cell1_text, w_cell2_text)
-
-    # Saving my tasks on disk
-    save_tasks_to_file()
+                # Putting back the updated task duration (every minute, the items of the row are not created again)
+                update_lst_tasks_row_duration(p_row, w_cell1_text)
+                glb_ptt_task_events.emit(PttTaskUpdated([get_lst_tasks_row_task_id(p_row)]))
 
 
 # Function auto_increment_active_task : increments the duration of the current active task by XX seconds
@@ -1128,6 +1467,15 @@ def merge_selected_tasks():
             # Initializing the merged tasks "text collector"
             w_merged_text_collector = ""
 
+            # Memorizing the rows deleted and the row updated so the merge can be undone
+            # Note : the row kept is the upper one (the last of the list sorted in reversed order)
+            w_undo_operation = PttUndoOperation(glb_actionMerge_text)
+            w_undo_operation.removed_runs = build_removed_runs([w_row for w_row, w_text0, w_text1, w_text2
+                                                                in lst_rows_to_merge[:-1]],
+                                                               nbr_rows, get_lst_tasks_row_record,
+                                                               get_lst_tasks_row_task_id)
+            w_record_before_merge = get_lst_tasks_row_record(lst_rows_to_merge[-1][0])
+
             for w_row, w_text0, w_text1, w_text2 in lst_rows_to_merge:
 
                 # Concatenation of the tasks descriptions which will be merged
@@ -1152,9 +1500,152 @@ def merge_selected_tasks():
                     w_task_duration = w_qt_task_duration.addSecs(w_total_duration_in_secs)
                     w_text1 = w_task_duration.toString(glb_hh_mm_string_format)
                     update_lst_tasks_row_cells(w_row, w_text0, w_text1, w_merged_text_collector)
+                    w_undo_operation.updated_records.append((w_record_before_merge, get_lst_tasks_row_record(w_row)))
+
+            push_undo_operation(w_undo_operation)
+
+            glb_ptt_task_events.emit(PttTaskRemoved(w_undo_operation.removed_task_ids()))
+            glb_ptt_task_events.emit(PttTaskUpdated([w_record_before_merge[0]]))
+
+            # Replacing the focus at the top
+            default_focus()
+
 
-            # Forcing the 1st displayed row to become the active task
-            change_active_task(0, 0)
+# Function call_consolidate_tasks : asks for the range, then consolidates the tasks with the same description
+def call_consolidate_tasks():
+
+    # Consolidation options : by default, the current month
+    w_consolidate_dlg = uic.loadUi(ptt_resource_path(ptt_resources.consolidate_ui))
+    w_today = QtCore.QDate(glb_ptt_clock.now().date())
+    w_consolidate_dlg.date_from.setDate(QtCore.QDate(w_today.year(), w_today.month(), 1))
+    w_consolidate_dlg.date_to.setDate(w_today)
+
+    if w_consolidate_dlg.exec_() != QtWidgets.QDialog.Accepted:
+        return
+
+    w_consolidate_filter = PttExportFilter(w_consolidate_dlg.date_from.date().toPyDate(),
+                                           w_consolidate_dlg.date_to.date().toPyDate(),
+                                           w_consolidate_dlg.z_description.text().strip())
+    consolidate_tasks(w_consolidate_filter, w_consolidate_dlg.chk_by_day.isChecked())
+
+
+# Function consolidate_tasks : groups the tasks by description (and day), shows the preview, then applies it at once
+def consolidate_tasks(p_consolidate_filter: PttExportFilter, p_by_day: bool):
+
+    # Miscellaneous initializations
+    w_nbr_rows = ptt_main_dlg.lst_tasks.rowCount()
+
+    # Note : the active task (row 0) is left out, its duration is still increased by the timer
+    w_tasks_cells = ((w_row,) + get_lst_tasks_row_cells(w_row) for w_row in range(1, w_nbr_rows))
+    w_consolidation_plan = plan_consolidation(w_tasks_cells, p_consolidate_filter, p_by_day,
+                                              glb_max_task_duration_in_sec)
+
+    if not w_consolidation_plan.groups:
+        info_popup_ok(glb_popup_title_consolidate, glb_popup_text_consolidate_nothing)
+        return
+
+    # Preview : the groups with the most tasks 1st
+    w_groups = sorted(w_consolidation_plan.groups, key=lambda w_group: -len(w_group.rows))
+    w_preview_lines = [glb_consolidate_preview_line.format(
+        w_group.description if w_group.day == "" else "{} ({})".format(w_group.description, w_group.day),
+        len(w_group.rows), convert_task_duration_secs_to_text(w_group.total_in_secs))
+        for w_group in w_groups[:glb_consolidate_preview_nbr_groups]]
+    w_nbr_other_groups = len(w_groups) - glb_consolidate_preview_nbr_groups
+    if w_nbr_other_groups > 0:
+        w_preview_lines.append(glb_consolidate_preview_others.format(w_nbr_other_groups))
+
+    if warning_popup_yes_no(glb_popup_title_consolidate, glb_popup_question_consolidate.format(
+            w_consolidation_plan.nbr_tasks_before(), w_consolidation_plan.nbr_tasks_after(),
+            "\n".join(w_preview_lines))) is False:
+        return
+
+    # Memorizing the rows removed and the rows updated so the whole consolidation can be undone at once
+    w_undo_operation = PttUndoOperation(glb_actionConsolidate_text)
+    w_undo_operation.removed_runs = build_removed_runs(w_consolidation_plan.removed_rows, w_nbr_rows,
+                                                       get_lst_tasks_row_record, get_lst_tasks_row_task_id)
+
+    # Updating the rows kept first (the row numbers are still valid), then removing the others, with one repaint
+    ptt_main_dlg.lst_tasks.setUpdatesEnabled(False)
+
+    for w_row, w_duration, w_description in w_consolidation_plan.updated_rows:
+        w_record_before = get_lst_tasks_row_record(w_row)
+        update_lst_tasks_row_cells(w_row, w_record_before[1], w_duration, w_description)
+        w_undo_operation.updated_records.append((w_record_before, get_lst_tasks_row_record(w_row)))
+
+    remove_lst_tasks_rows(w_consolidation_plan.removed_rows)
+    ptt_main_dlg.lst_tasks.setUpdatesEnabled(True)
+
+    push_undo_operation(w_undo_operation)
+
+    # My tasks are saved on disk only once
+    glb_ptt_task_events.emit(PttTaskRemoved(w_undo_operation.removed_task_ids()))
+    glb_ptt_task_events.emit(PttTaskUpdated([w_records[0][0] for w_records in w_undo_operation.updated_records]))
+
+    update_status_bar_message(glb_consolidate_done.format(w_consolidation_plan.nbr_tasks_before(),
+                                                          w_consolidation_plan.nbr_tasks_after()))
+    default_focus()
+
+
+# Function call_heatmap : displays the calendar of the time worked, a click on a day filters the list on this day
+def call_heatmap():
+
+    w_heatmap_dlg = uic.loadUi(ptt_resource_path(ptt_resources.heatmap_ui))
+    w_heatmap_dlg.btn_show_all.setEnabled(glb_lst_tasks_day_filter is not None)
+
+    # Note : the calendar is only drawn again if the tasks changed since the latest display
+    w_heatmap_dlg.lbl_heatmap.setPixmap(QtGui.QPixmap.fromImage(
+        glb_ptt_heatmap.get_image(glb_ptt_day_totals.seconds_by_day, glb_ptt_clock.now().date())))
+
+    # Function show_day_tooltip : displays the time worked on the day under the mouse
+    def show_day_tooltip(p_event):
+        w_date = glb_ptt_heatmap.day_at(p_event.pos().x(), p_event.pos().y())
+        if w_date is None:
+            w_heatmap_dlg.lbl_heatmap.setToolTip("")
+        else:
+            w_heatmap_dlg.lbl_heatmap.setToolTip(glb_heatmap_tooltip.format(
+                w_date.strftime("%d/%m/%Y"),
+                convert_task_duration_secs_to_text(glb_ptt_heatmap.buckets.seconds_of(w_date))))
+
+    # Function filter_on_clicked_day : filters the list on the day clicked, then closes the calendar
+    def filter_on_clicked_day(p_event):
+        w_date = glb_ptt_heatmap.day_at(p_event.pos().x(), p_event.pos().y())
+        if w_date is not None:
+            filter_lst_tasks_by_day(w_date)
+            w_heatmap_dlg.accept()
+
+    # Function show_all_tasks : removes the filter of the list, then closes the calendar
+    def show_all_tasks():
+        filter_lst_tasks_by_day(None)
+        w_heatmap_dlg.accept()
+
+    w_heatmap_dlg.lbl_heatmap.mouseMoveEvent = show_day_tooltip
+    w_heatmap_dlg.lbl_heatmap.mousePressEvent = filter_on_clicked_day
+    w_heatmap_dlg.btn_show_all.clicked.connect(show_all_tasks)
+
+    w_heatmap_dlg.exec_()
+
+
+# Function filter_lst_tasks_by_day : only displays the tasks started on a day (all the tasks if None)
+def filter_lst_tasks_by_day(p_date):
+
+    global glb_lst_tasks_day_filter
+
+    # Miscellaneous initializations
+    glb_lst_tasks_day_filter = p_date
+    w_started_on_day = "" if p_date is None else p_date.strftime("%d/%m/%Y")
+
+    # Note : the active task (row 0) is always displayed
+    ptt_main_dlg.lst_tasks.setUpdatesEnabled(False)
+    for w_row in range(1, ptt_main_dlg.lst_tasks.rowCount()):
+        ptt_main_dlg.lst_tasks.setRowHidden(w_row, not ptt_main_dlg.lst_tasks.item(w_row, 0).text().startswith(
+            w_started_on_day))
+    ptt_main_dlg.lst_tasks.setUpdatesEnabled(True)
+
+    if p_date is None:
+        update_status_bar_latest_backup()
+    else:
+        update_status_bar_message(glb_heatmap_day_filter.format(
+            w_started_on_day, convert_task_duration_secs_to_text(glb_ptt_day_totals.seconds_of_day(p_date))))
 
 
 # Function read_current_task : reads the current task (actually just one) and gets the text in the globals z_ variables
@@ -1206,27 +1697,221 @@ def call_ptt_edit_task():
     default_focus()
 
 
+# Function push_undo_operation : adds an operation in the undo stack and refreshes the undo/redo actions
+def push_undo_operation(p_undo_operation: PttUndoOperation):
+    glb_ptt_undo_stack.push(p_undo_operation)
+    enable_undo_redo_actions()
+
+
+# Function enable_undo_redo_actions : enables the undo/redo actions only if there is something to undo/redo
+def enable_undo_redo_actions():
+    ptt_main_dlg.actionUndo.setEnabled(glb_ptt_undo_stack.can_undo())
+    ptt_main_dlg.actionRedo.setEnabled(glb_ptt_undo_stack.can_redo())
+
+
+# Function undo_last_operation : reverts the latest deletion, merge, edit or import
+def undo_last_operation():
+    if glb_ptt_undo_stack.can_undo() is True:
+        apply_undo_operation(glb_ptt_undo_stack.pop_undo(), True)
+
+
+# Function redo_last_operation : applies again the latest operation reverted
+def redo_last_operation():
+    if glb_ptt_undo_stack.can_redo() is True:
+        apply_undo_operation(glb_ptt_undo_stack.pop_redo(), False)
+
+
+# Function apply_undo_operation : reverts (p_undo is True) or applies again an operation, in one view update
+def apply_undo_operation(p_undo_operation: PttUndoOperation, p_undo: bool):
+
+    # The list is only repainted once at the end
+    ptt_main_dlg.lst_tasks.setUpdatesEnabled(False)
+
+    if p_undo is True:
+
+        # Removing the records added, then putting back the records removed
+        w_removed_task_ids = p_undo_operation.added_task_ids()
+        w_added_task_ids = p_undo_operation.removed_task_ids()
+        remove_lst_tasks_task_ids(w_removed_task_ids)
+        insert_lst_tasks_runs(p_undo_operation.removed_runs)
+
+        # Putting back the records as they were before the operation
+        w_records_to_update = [w_record_before for w_record_before, w_record_after in p_undo_operation.updated_records]
+
+    else:
+
+        # Removing again the records, then adding again the records
+        w_removed_task_ids = p_undo_operation.removed_task_ids()
+        w_added_task_ids = p_undo_operation.added_task_ids()
+        remove_lst_tasks_task_ids(w_removed_task_ids)
+        insert_lst_tasks_runs(p_undo_operation.added_runs)
+
+        # Updating again the records as they were after the operation
+        w_records_to_update = [w_record_after for w_record_before, w_record_after in p_undo_operation.updated_records]
+
+    # Updating the rows (found through their task id, since they may have moved)
+    if w_records_to_update:
+        w_rows_by_id = get_lst_tasks_rows_by_task_id()
+        for w_task_id, w_cell0_text, w_cell1_text, w_cell2_text in w_records_to_update:
+            if w_task_id in w_rows_by_id:
+                update_lst_tasks_row_cells(w_rows_by_id[w_task_id], w_cell0_text, w_cell1_text, w_cell2_text, w_task_id)
+
+    ptt_main_dlg.lst_tasks.setUpdatesEnabled(True)
+
+    glb_ptt_task_events.emit(PttTaskRemoved(w_removed_task_ids))
+    glb_ptt_task_events.emit(PttTaskAdded(w_added_task_ids))
+    glb_ptt_task_events.emit(PttTaskUpdated([w_record[0] for w_record in w_records_to_update]))
+
+    # Refreshing the actions and the focus
+    enable_undo_redo_actions()
+    default_focus()
+
+
+# Function insert_lst_tasks_runs : inserts runs of records (anchor task id, former 1st row, records) of an operation
+def insert_lst_tasks_runs(p_runs: list):
+
+    # Inserting from the last run to the 1st one (the upper anchors don't move)
+    w_rows_by_id = get_lst_tasks_rows_by_task_id()
+    for w_anchor_task_id, w_first_row, w_records in reversed(p_runs):
+
+        # Just above the anchor, or at the end, or at the former row if the anchor was removed meanwhile
+        if w_anchor_task_id == "":
+            w_row = ptt_main_dlg.lst_tasks.rowCount()
+        elif w_anchor_task_id in w_rows_by_id:
+            w_row = w_rows_by_id[w_anchor_task_id]
+        else:
+            w_row = min(w_first_row, ptt_main_dlg.lst_tasks.rowCount())
+
+        insert_lst_tasks_records(w_row, w_records)
+
+
+# Function remove_lst_tasks_task_ids : removes the rows of the task ids received (the unknown ones are ignored)
+def remove_lst_tasks_task_ids(p_task_ids: list):
+    if p_task_ids:
+        w_rows_by_id = get_lst_tasks_rows_by_task_id()
+        remove_lst_tasks_rows([w_rows_by_id[w_task_id] for w_task_id in p_task_ids if w_task_id in w_rows_by_id])
+
+
 # Function update_task_after_edit : updates a task after it was edited and saved in the edit window
 def update_task_after_edit(p_curr_row: int, p_curr_task_dth: str, p_curr_task_duration: str,
                            p_curr_task_description: str):
 
+    # Memorizing the row before and after the edit so it can be undone
+    w_record_before_edit = get_lst_tasks_row_record(p_curr_row)
+    w_record_after_edit = (w_record_before_edit[0], p_curr_task_dth, p_curr_task_duration, p_curr_task_description)
+    if w_record_after_edit != w_record_before_edit:
+        w_undo_operation = PttUndoOperation(glb_actionEdit_text)
+        w_undo_operation.updated_records.append((w_record_before_edit, w_record_after_edit))
+        push_undo_operation(w_undo_operation)
+
     # Updating the row contents in the list
     update_lst_tasks_row_cells(p_curr_row, p_curr_task_dth, p_curr_task_duration, p_curr_task_description)
+    glb_ptt_task_events.emit(PttTaskUpdated([w_record_before_edit[0]]))
 
     # Replacing the focus at the top
     default_focus()
 
-    # Saving my tasks on disk
-    save_tasks_to_file()
+
+# Function update_task_after_inline_edit : updates a cell of a task edited in place in the list, then saves this task
+def update_task_after_inline_edit(p_row: int, p_column: int, p_text: str):
+
+    # Memorizing the row before and after the edit so it can be undone (nothing to do if the cell didn't change)
+    w_record_before_edit = get_lst_tasks_row_record(p_row)
+    w_record_after_edit = w_record_before_edit[:p_column + 1] + (p_text,) + w_record_before_edit[p_column + 2:]
+    if w_record_after_edit == w_record_before_edit:
+        return
+
+    w_undo_operation = PttUndoOperation(glb_actionEdit_text)
+    w_undo_operation.updated_records.append((w_record_before_edit, w_record_after_edit))
+    push_undo_operation(w_undo_operation)
+
+    # Updating the row contents in the list
+    update_lst_tasks_row_cells(p_row, *w_record_after_edit[1:])
+
+    # Saving the task edited with only its block encoded again : the whole file is encoded again if it can't be done
+    if save_task_record_to_file(p_row) is True:
+        glb_ptt_task_events.emit(PttTaskUpdated([w_record_before_edit[0]], glb_task_event_origin_record))
+    else:
+        glb_ptt_task_events.emit(PttTaskUpdated([w_record_before_edit[0]]))
+
+
+# Function save_task_record_to_file : saves the task of a row in the "my_tasks.json" file, only its block being encoded
+# again, returns False if it can't be done that way (the whole file must be saved)
+# Note : the file is still read, then written and synced whole (atomic write), only the other blocks aren't encoded
+def save_task_record_to_file(p_row: int):
+
+    # Creating the task record (its revision and version are stamped like in write_tasks_to_file)
+    w_task_id, w_cell0_text, w_cell1_text, w_cell2_text = get_lst_tasks_row_record(p_row)
+    w_task_record = {
+        "task_id": w_task_id,
+        "started_on": w_cell0_text,
+        "duration": w_cell1_text,
+        "description": w_cell2_text}
+
+    try:
+        with glb_ptt_tasks_store.lock():
+
+            # The file was modified outside of PTT since the latest save or load : the whole file is saved (once
+            # these modifications are loaded)
+            if glb_ptt_tasks_watcher.get_file_signature() != glb_ptt_tasks_watcher.file_signature:
+                return False
+
+            stamp_record_revisions([w_task_record], glb_ptt_tasks_watcher.fingerprints, glb_ptt_tasks_watcher.revisions)
+            glb_ptt_sync_state.track_record(w_task_record)
+
+            # The task may not be saved yet (added in the same event loop turn), or its block was modified by hand
+            # Note : the other lines are copied as they were read, then the whole file is replaced
+            w_content = replace_content_task_record(read_tasks_content(ptt_files.my_tasks_json), w_task_record)
+            if w_content is None:
+                return False
+
+            write_tasks_content(ptt_files.my_tasks_json, w_content)
+
+    except PttTasksStoreError as w_error:
+        # For console debugging (my tasks are saved again with the next change)
+        print("save_task_record_to_file : {}".format(w_error))
+        return False
+
+    except IOError:
+        # For console debugging
+        print("save_task_record_to_file : cannot write in the '{}' file".format(ptt_files.my_tasks_json))
+        return False
+
+    # Updating the status bar message when the backup is performed
+    update_status_bar_latest_backup()
+
+    # Our own save must not be seen as an external modification
+    glb_ptt_tasks_watcher.remember_record(w_task_record, w_content)
+
+    # Replicating the file at once in the data directory, if the local cache is used, and saving the version stamped
+    replicate_data_changes()
+    glb_ptt_sync_state.save()
+
+    return True
 
 
 # Function save_tasks_to_file : saves my tasks to the "my_tasks.json" file
 def save_tasks_to_file():
 
+    # Note : the lock is held from the loading of the modifications of the other writers (CLI, hook scripts...) to
+    # the end of the write, so nothing written by them in between can be overwritten
+    try:
+        with glb_ptt_tasks_store.lock():
+            write_tasks_to_file()
+    except PttTasksStoreError as w_error:
+        # For console debugging (my tasks are saved again with the next change)
+        print("save_tasks_to_file : {}".format(w_error))
+
+
+# Function write_tasks_to_file : loads the modifications made outside of PTT then writes my tasks (lock held)
+def write_tasks_to_file():
+
     # Miscellaneous initializations
-    w_ptt_files = PttFiles()
     w_tasks = {"tasks": []}
 
+    # Loading first the modifications made outside of PTT, if any, so they are not overwritten
+    glb_ptt_tasks_watcher.check_file()
+
     # Making sure we have some rows at least...
     w_nbr_rows = ptt_main_dlg.lst_tasks.rowCount()
 
@@ -1245,6 +1930,7 @@ def save_tasks_to_file():
 
             # Creating our task record
             w_task_record = {
+                "task_id": get_lst_tasks_row_task_id(w_index - 1),
                 "started_on": w_cell0_text,
                 "duration": w_cell1_text,
                 "description": w_cell2_text}
@@ -1252,64 +1938,945 @@ def save_tasks_to_file():
             # Appending the record in the JSON array
             w_tasks["tasks"].append(w_task_record)
 
-    # Trying to open in write mode the "my_tasks.json" then saving the data
+
+    # Increasing the revision of the records changed since the latest load or save (for the other writers)
+    stamp_record_revisions(w_tasks["tasks"], glb_ptt_tasks_watcher.fingerprints, glb_ptt_tasks_watcher.revisions)
+
+    # Stamping the versions of the records changed since the latest save (for the synchronization)
+    glb_ptt_sync_state.track_records(w_tasks["tasks"])
+
+    # The tasks are saved by blocks, each one with its checksum (see ptt_tasks_blocks.py)
+    # The descriptions can be saved once per block, the tasks referring to them by id, and the JSON texts written
+    # with another codec (see the [STORAGE] settings and ptt_codecs.py)
+    w_blocks_data = []
+    for w_block_records in split_task_records(w_tasks["tasks"]):
+        if ptt_config.STORAGE_Intern_Descriptions is True:
+            w_blocks_data.append(pack_task_records(w_block_records))
+        else:
+            w_blocks_data.append({"tasks": w_block_records})
+    w_content = encode_tasks_blocks(w_blocks_data, ptt_config.STORAGE_Codec)
+
+    # Trying to write the "my_tasks.json" file (replaced at once, so it's never left half written)
     try:
-        with open(w_ptt_files.my_tasks_json, "w") as file:
+        write_tasks_content(ptt_files.my_tasks_json, w_content)
+
+        # Updating the status bar message when the backup is performed
+        update_status_bar_latest_backup()
 
-            # indent=4 for pretty json output, unicode and no \u characters
-            json.dump(w_tasks, file, indent=4, ensure_ascii=False)
+        # Our own save must not be seen as an external modification
+        glb_ptt_tasks_watcher.remember(w_tasks["tasks"], w_content)
 
-            # Updating the status bar message when the backup is performed
-            update_status_bar_latest_backup()
+        # Replicating the file at once in the data directory, if the local cache is used
+        replicate_data_changes()
 
     except IOError:
         # For console debugging
-        print("save_tasks_to_file : cannot write in the '{}' file".format(w_ptt_files.my_tasks_json))
+        print("write_tasks_to_file : cannot write in the '{}' file".format(ptt_files.my_tasks_json))
+
+    # Saving the versions stamped (only if something changed)
+    glb_ptt_sync_state.save()
 
 
 # Function load_tasks_from_file : loads my tasks to the "my_tasks.json" file
 def load_tasks_from_file():
 
     # Miscellaneous initializations
-    w_ptt_files = PttFiles()
-    w_tasks = {"tasks": []}
+    w_content = ""
 
-    # Trying to open "my_tasks.json" and loading the data in the w_tasks variable
+    # Trying to read "my_tasks.json"
     try:
-        with open(w_ptt_files.my_tasks_json, 'r') as file:
-            try:
-                w_tasks = json.load(file)
-            except:
-                # For console debugging
-                print("load_tasks_from_file : error while reading json data in '{}'".format(w_ptt_files.my_tasks_json))
+        w_content = read_tasks_content(ptt_files.my_tasks_json)
 
     except IOError:
         # For console debugging
-        print("load_tasks_from_file : cannot open the '{}' file".format(w_ptt_files.my_tasks_json))
+        print("load_tasks_from_file : cannot open the '{}' file".format(ptt_files.my_tasks_json))
+
+    # Loading the tasks of the blocks which are not damaged (the damaged parts are kept aside)
+    w_tasks_content = decode_tasks_content(w_content)
+    if w_tasks_content.is_damaged():
+        quarantine_damaged_tasks(w_tasks_content)
 
-    # For each task record found in w_tasks, loading retrieving the text
-    for w_task_record in w_tasks["tasks"]:
+    # For each task record found, loading retrieving the text
+    for w_task_record in w_tasks_content.task_records:
+
+        # Records saved by the older versions of PTT have no task id yet
+        if w_task_record.get("task_id", "") == "":
+            w_task_record["task_id"] = new_task_id()
 
         # Getting the numbers of rows and inserting a new one (at the row_count position = at the end)
         w_row_count = ptt_main_dlg.lst_tasks.rowCount()
         ptt_main_dlg.lst_tasks.insertRow(w_row_count)
 
         # Filling the text in each cells of the new row
-        update_lst_tasks_row_cells(
-            w_row_count, w_task_record["started_on"], w_task_record["duration"], w_task_record["description"])
+        update_lst_tasks_row_cells(w_row_count, w_task_record["started_on"], w_task_record["duration"],
+                                   w_task_record["description"], w_task_record["task_id"])
 
+    # Memorizing the versions of the records loaded (for the synchronization)
+    glb_ptt_sync_state.load_records(w_tasks_content.task_records)
 
-# Function create_tasks_backup : creates a backup file of the "my_tasks.json" file
-def create_tasks_backup():
+    # Memorizing the records loaded to detect the modifications made outside of PTT
+    glb_ptt_tasks_watcher.remember(w_tasks_content.task_records, w_content)
+
+    # Loading the time worked per day if it was saved for the same tasks, otherwise computing it again
+    if glb_ptt_day_totals.load(ptt_files.ptt_day_totals_json, glb_ptt_tasks_watcher.content_hash) is False:
+        glb_ptt_day_totals.rebuild(w_tasks_content.task_records)
+    glb_ptt_heatmap.invalidate()
+
+
+# Function quarantine_damaged_tasks : keeps aside the damaged parts of "my_tasks.json" (the next save overwrites them)
+def quarantine_damaged_tasks(p_tasks_content):
+
+    try:
+        w_quarantine_path = write_quarantine(ptt_files.quarantine_dir, ptt_files.my_tasks_json, p_tasks_content,
+                                             glb_ptt_clock.now())
+    except OSError:
+        # For console debugging
+        print("quarantine_damaged_tasks : cannot write in the '{}' folder".format(ptt_files.quarantine_dir))
+        w_quarantine_path = ""
+
+    # For console debugging
+    print("load_tasks_from_file : {} damaged part(s) in '{}', {} task(s) recovered, damaged data kept in '{}'"
+          .format(len(p_tasks_content.damaged_parts), ptt_files.my_tasks_json, len(p_tasks_content.task_records),
+                  w_quarantine_path))
+
+    error_popup_ok(glb_popup_title_damaged_tasks, glb_popup_text_damaged_tasks.format(
+        len(p_tasks_content.damaged_parts), len(p_tasks_content.task_records), w_quarantine_path))
+
+
+# Function apply_tasks_file_changes : updates only the rows added, updated or removed outside of PTT
+def apply_tasks_file_changes(p_tasks_diff):
+
+    # Miscellaneous initializations
+    w_rows_by_id = {get_lst_tasks_row_task_id(w_row): w_row for w_row in range(ptt_main_dlg.lst_tasks.rowCount())}
+    w_conflicting_task_ids = set()
+
+    # Looking for the rows also modified in PTT since the latest save (= conflicts)
+    for w_task_id, w_previous_fingerprint in p_tasks_diff.previous_fingerprints.items():
+        if w_task_id in w_rows_by_id and \
+                cells_fingerprint(*get_lst_tasks_row_cells(w_rows_by_id[w_task_id])) != w_previous_fingerprint:
+            w_conflicting_task_ids.add(w_task_id)
+
+    # Conflicts : nothing is overwritten, the version of PTT is added as a new task below the version of the file
+    # (append-merge), and a task modified in PTT but removed outside is kept
+    w_merged_records = [(w_task_id, new_task_id()) + get_lst_tasks_row_cells(w_rows_by_id[w_task_id])
+                        for w_task_id in w_conflicting_task_ids if w_task_id not in p_tasks_diff.removed_task_ids]
+    w_kept_task_ids = [w_task_id for w_task_id in w_conflicting_task_ids if w_task_id in p_tasks_diff.removed_task_ids]
+
+    # Updating the rows modified outside of PTT
+    w_updated_task_ids = []
+    for w_task_record in p_tasks_diff.updated_records:
+        w_task_id = w_task_record["task_id"]
+        if w_task_id in w_rows_by_id:
+            update_lst_tasks_row_cells(w_rows_by_id[w_task_id], w_task_record["started_on"],
+                                       w_task_record["duration"], w_task_record["description"], w_task_id)
+            w_updated_task_ids.append(w_task_id)
+
+    # Deleting the rows removed outside of PTT (reversed order to keep the row numbers valid)
+    w_removed_task_ids = [w_task_id for w_task_id in p_tasks_diff.removed_task_ids
+                          if w_task_id in w_rows_by_id and w_task_id not in w_conflicting_task_ids]
+    for w_row in sorted([w_rows_by_id[w_task_id] for w_task_id in w_removed_task_ids], reverse=True):
+        ptt_main_dlg.lst_tasks.removeRow(w_row)
+
+    # Inserting the rows added outside of PTT at their position in the file
+    for w_task_record in sorted(p_tasks_diff.added_records,
+                                key=lambda w_record: p_tasks_diff.positions[w_record["task_id"]]):
+        w_row = min(p_tasks_diff.positions[w_task_record["task_id"]], ptt_main_dlg.lst_tasks.rowCount())
+        ptt_main_dlg.lst_tasks.insertRow(w_row)
+        update_lst_tasks_row_cells(w_row, w_task_record["started_on"], w_task_record["duration"],
+                                   w_task_record["description"], w_task_record["task_id"])
+
+    # Inserting the versions of PTT of the conflicts below the versions of the file
+    for w_task_id, w_merged_task_id, w_cell0_text, w_cell1_text, w_cell2_text in w_merged_records:
+        w_row = get_lst_tasks_rows_by_task_id()[w_task_id] + 1
+        ptt_main_dlg.lst_tasks.insertRow(w_row)
+        update_lst_tasks_row_cells(w_row, w_cell0_text, w_cell1_text, w_cell2_text, w_merged_task_id)
+
+    # These changes are already in my_tasks.json (no need to save them)
+    glb_ptt_task_events.emit(PttTaskUpdated(w_updated_task_ids, glb_task_event_origin_file))
+    glb_ptt_task_events.emit(PttTaskRemoved(w_removed_task_ids, glb_task_event_origin_file))
+    glb_ptt_task_events.emit(PttTaskAdded([w_task_record["task_id"] for w_task_record in p_tasks_diff.added_records],
+                                          glb_task_event_origin_file))
+
+    # The versions of PTT merged are not in my_tasks.json yet (they are saved)
+    glb_ptt_task_events.emit(PttTaskUpdated(w_kept_task_ids))
+    glb_ptt_task_events.emit(PttTaskAdded([w_merged_record[1] for w_merged_record in w_merged_records]))
+
+    # Displaying the summary of the modifications loaded (and of the conflicts merged, if any)
+    w_message = glb_external_changes_loaded.format(
+        len(p_tasks_diff.added_records), len(p_tasks_diff.updated_records), len(p_tasks_diff.removed_task_ids))
+    if w_conflicting_task_ids:
+        w_message = w_message + glb_external_changes_merged.format(len(w_conflicting_task_ids))
+    update_status_bar_message(w_message)
+
+
+# Function sync_tasks_with_server : exchanges the changed tasks with the sync server and updates the changed rows
+def sync_tasks_with_server():
 
     # Miscellaneous initializations
-    w_ptt_files = PttFiles()
+    w_task_records = []
+
+    # Saving my tasks on disk first (the versions of the latest changes are stamped)
+    save_tasks_to_file()
+
+    # Retrieving the task records from the list
+    for w_row in range(ptt_main_dlg.lst_tasks.rowCount()):
+        w_cell0_text, w_cell1_text, w_cell2_text = get_lst_tasks_row_cells(w_row)
+        w_task_records.append({
+            "task_id": get_lst_tasks_row_task_id(w_row),
+            "started_on": w_cell0_text,
+            "duration": w_cell1_text,
+            "description": w_cell2_text})
+
+    # Exchanging the changes with the server
+    try:
+        w_sync_result, w_records_by_id = synchronize(glb_ptt_sync_state, w_task_records,
+                                                     ptt_config.SYNC_Server_Host, ptt_config.SYNC_Server_Port)
+    except PttSyncError as w_error:
+        error_popup_ok(glb_popup_title_sync, glb_popup_text_sync_failed.format(w_error))
+        return
+
+    # Only the changed rows are updated in the list (row numbers found through their task id)
+    if w_sync_result.updated_task_ids or w_sync_result.removed_task_ids or w_sync_result.added_task_ids:
+
+        w_rows_by_id = {get_lst_tasks_row_task_id(w_row): w_row for w_row in range(ptt_main_dlg.lst_tasks.rowCount())}
+
+        # Updating the rows modified on another machine
+        for w_task_id in w_sync_result.updated_task_ids:
+            w_task_record = w_records_by_id[w_task_id]
+            update_lst_tasks_row_cells(w_rows_by_id[w_task_id], w_task_record["started_on"],
+                                       w_task_record["duration"], w_task_record["description"], w_task_id)
+
+        # Deleting the rows deleted on another machine (reversed order to keep the row numbers valid)
+        for w_row in sorted([w_rows_by_id[w_task_id] for w_task_id in w_sync_result.removed_task_ids], reverse=True):
+            ptt_main_dlg.lst_tasks.removeRow(w_row)
+
+        # Inserting the tasks created on another machine by start date under the active task (like the imported ones)
+        w_added_records = [(w_task_id, w_records_by_id[w_task_id]["started_on"], w_records_by_id[w_task_id]["duration"],
+                            w_records_by_id[w_task_id]["description"]) for w_task_id in w_sync_result.added_task_ids]
+        for w_row, w_run_records in reversed(place_records_by_started_on(w_added_records)):
+            insert_lst_tasks_records(w_row, w_run_records)
+
+        # The active task at row 0 is refreshed (it may have been deleted remotely) and my tasks are saved on disk
+        glb_ptt_task_events.emit(PttTaskUpdated(w_sync_result.updated_task_ids, glb_task_event_origin_sync))
+        glb_ptt_task_events.emit(PttTaskRemoved(w_sync_result.removed_task_ids, glb_task_event_origin_sync))
+        glb_ptt_task_events.emit(PttTaskAdded(w_sync_result.added_task_ids, glb_task_event_origin_sync))
+
+    # Displaying the sync summary
+    update_status_bar_message(glb_sync_done.format(w_sync_result.nbr_changes_sent, w_sync_result.nbr_changes_received))
+
+
+# Function place_records_by_started_on : sorts the records (task_id, started_on, duration, description) by start date,
+# the newest first, and groups them by row of insertion in the list (under the active task, which stays at row 0)
+# Note : returns the runs [row, [records]] in the order of the rows (inserted from the last one, the rows above stay)
+def place_records_by_started_on(p_records: list):
+
+    # Miscellaneous initializations
+    w_nbr_rows = ptt_main_dlg.lst_tasks.rowCount()
+    w_runs = []
+
+    p_records.sort(key=lambda w_record: started_on_sort_key(w_record[1]), reverse=True)
+
+    w_row = min(1, w_nbr_rows)
+    w_row_key = started_on_sort_key(ptt_main_dlg.lst_tasks.item(w_row, 0).text()) if w_row < w_nbr_rows else ""
+
+    for w_record in p_records:
+
+        w_record_key = started_on_sort_key(w_record[1])
+        while w_row < w_nbr_rows and w_row_key >= w_record_key:
+            w_row = w_row + 1
+            w_row_key = started_on_sort_key(ptt_main_dlg.lst_tasks.item(w_row, 0).text()) if w_row < w_nbr_rows else ""
+
+        if w_runs and w_runs[-1][0] == w_row:
+            w_runs[-1][1].append(w_record)
+        else:
+            w_runs.append([w_row, [w_record]])
+
+    return w_runs
+
+
+# Function call_import_tasks : asks for the file to import then imports its tasks
+def call_import_tasks():
+
+    w_file_path, w_filter = QtWidgets.QFileDialog.getOpenFileName(ptt_main_dlg, glb_popup_title_import, "",
+                                                                   glb_import_file_filter)
+    if w_file_path != "":
+        import_tasks_from_file(w_file_path)
+
+
+# Function import_tasks_from_file : imports the tasks of a CSV or JSON lines file, in batches and with one save
+def import_tasks_from_file(p_file_path: str):
+
+    # Miscellaneous initializations
+    w_import_stats = PttImportStats()
+    w_records = []
+    w_nbr_rows = ptt_main_dlg.lst_tasks.rowCount()
+
+    # The tasks already in the list are not imported again
+    w_known_cells = {get_lst_tasks_row_cells(w_row) for w_row in range(w_nbr_rows)}
+
+    # Progress of the import : reading the file (0 to 50), then inserting the records (50 to 100)
+    w_progress_dlg = QtWidgets.QProgressDialog(glb_import_reading, glb_import_cancel, 0, 100, ptt_main_dlg)
+    w_progress_dlg.setWindowTitle(glb_popup_title_import)
+    w_progress_dlg.setWindowModality(Qt.WindowModal)
+    w_progress_dlg.setMinimumDuration(500)
+
+    # Reading the file (the records are validated, normalized, split and deduplicated one by one)
+    try:
+        for w_record in import_task_records(p_file_path, w_known_cells, w_import_stats):
+            w_records.append(w_record)
+
+            if len(w_records) % glb_import_batch_size == 0:
+                w_progress_dlg.setValue(int(50 * w_import_stats.progress()))
+                if w_progress_dlg.wasCanceled() is True:
+                    w_progress_dlg.close()
+                    return
+
+    except PttImportError as w_error:
+        w_progress_dlg.close()
+        error_popup_ok(glb_popup_title_import, glb_popup_text_import_failed.format(w_error))
+        return
+
+    # Nothing is inserted yet, so the import can't be cancelled anymore
+    w_progress_dlg.setLabelText(glb_import_inserting)
+    w_progress_dlg.setCancelButton(None)
+    w_progress_dlg.setValue(50)
+
+    # The records are placed by start date (the newest first) under the active task, which stays at row 0
+    w_runs = place_records_by_started_on(w_records)
+
+    # Inserting the runs from the last one (the rows above don't move), in batches, with one repaint at the end
+    ptt_main_dlg.lst_tasks.setUpdatesEnabled(False)
+    w_nbr_records_inserted = 0
+
+    for w_row, w_run_records in reversed(w_runs):
+        for w_index in range(0, len(w_run_records), glb_import_batch_size):
+            w_batch_records = w_run_records[w_index:w_index + glb_import_batch_size]
+            insert_lst_tasks_records(w_row + w_index, w_batch_records)
+
+            w_nbr_records_inserted = w_nbr_records_inserted + len(w_batch_records)
+            w_progress_dlg.setValue(50 + int(50 * w_nbr_records_inserted / len(w_records)))
+
+    ptt_main_dlg.lst_tasks.setUpdatesEnabled(True)
+    w_progress_dlg.setValue(100)
+    w_progress_dlg.close()
+
+    if w_records:
+
+        # Memorizing the rows added so the import can be undone
+        w_rows_by_id = get_lst_tasks_rows_by_task_id()
+        w_records_by_row = {w_rows_by_id[w_record[0]]: w_record for w_record in w_records}
+        w_undo_operation = PttUndoOperation(glb_actionImport_text)
+        w_undo_operation.added_runs = build_removed_runs(list(w_records_by_row), ptt_main_dlg.lst_tasks.rowCount(),
+                                                         w_records_by_row.get, get_lst_tasks_row_task_id)
+        push_undo_operation(w_undo_operation)
+
+        # My tasks are saved on disk only once
+        glb_ptt_task_events.emit(PttTaskAdded([w_record[0] for w_record in w_records]))
+
+    # Displaying the import summary, and the rows ignored if any
+    update_status_bar_message(glb_import_done.format(w_import_stats.nbr_records, w_import_stats.nbr_duplicates,
+                                                     w_import_stats.nbr_rows_rejected))
+
+    if w_import_stats.nbr_rows_rejected > 0:
+        info_popup_ok(glb_popup_title_import, glb_popup_text_import_rejected.format(
+            w_import_stats.nbr_rows_rejected, "\n".join(w_import_stats.errors)))
+
+
+# Function call_export_tasks : asks for the export options and the file, then exports my tasks
+def call_export_tasks():
+
+    # Export options : by default, the current month
+    w_export_dlg = uic.loadUi(ptt_resource_path(ptt_resources.export_ui))
+    w_today = QtCore.QDate(glb_ptt_clock.now().date())
+    w_export_dlg.date_from.setDate(QtCore.QDate(w_today.year(), w_today.month(), 1))
+    w_export_dlg.date_to.setDate(w_today)
+
+    if w_export_dlg.exec_() != QtWidgets.QDialog.Accepted:
+        return
+
+    w_file_path, w_filter = QtWidgets.QFileDialog.getSaveFileName(ptt_main_dlg, glb_popup_title_export, "",
+                                                                   glb_export_file_filter)
+    if w_file_path == "":
+        return
+
+    # The extension of the filter chosen is added if none was typed
+    if os.path.splitext(w_file_path)[1] == "":
+        w_file_path = w_file_path + w_filter[w_filter.index("*") + 1:w_filter.index(")")]
+
+    w_export_filter = PttExportFilter(w_export_dlg.date_from.date().toPyDate(), w_export_dlg.date_to.date().toPyDate(),
+                                      w_export_dlg.z_description.text().strip())
+    export_tasks_to_file(w_file_path, w_export_filter)
+
+
+# Function export_tasks_to_file : exports my tasks (from the tasks file, record by record) to a CSV, JSONL or ICS file
+def export_tasks_to_file(p_file_path: str, p_export_filter: PttExportFilter):
+
+    # Saving my tasks on disk first, so the latest changes are exported
+    glb_ptt_task_events.flush()
+
+    try:
+        w_nbr_exported = export_tasks(ptt_files.my_tasks_json, p_file_path, p_export_filter)
+    except PttExportError as w_error:
+        error_popup_ok(glb_popup_title_export, glb_popup_text_export_failed.format(w_error))
+        return
+
+    update_status_bar_message(glb_export_done.format(w_nbr_exported, os.path.basename(p_file_path)))
+
+
+# Function call_report_tasks : asks for the report options and the file, then writes the report of my tasks
+def call_report_tasks():
+
+    # Report options (same form as the export) : by default, the current year
+    w_report_dlg = uic.loadUi(ptt_resource_path(ptt_resources.export_ui))
+    w_report_dlg.setWindowTitle(glb_popup_title_report)
+    w_today = QtCore.QDate(glb_ptt_clock.now().date())
+    w_report_dlg.date_from.setDate(QtCore.QDate(w_today.year(), 1, 1))
+    w_report_dlg.date_to.setDate(w_today)
+    w_report_dlg.chk_all_workspaces.setVisible(len(list_workspaces(ptt_files.data_dir)) > 1)
+
+    if w_report_dlg.exec_() != QtWidgets.QDialog.Accepted:
+        return
+
+    w_file_path, w_filter = QtWidgets.QFileDialog.getSaveFileName(ptt_main_dlg, glb_popup_title_report, "",
+                                                                   glb_report_file_filter)
+    if w_file_path == "":
+        return
+
+    if os.path.splitext(w_file_path)[1] == "":
+        w_file_path = w_file_path + ".csv"
+
+    w_report_filter = PttExportFilter(w_report_dlg.date_from.date().toPyDate(), w_report_dlg.date_to.date().toPyDate(),
+                                      w_report_dlg.z_description.text().strip())
+    report_tasks_to_file(w_file_path, w_report_filter, w_report_dlg.chk_all_workspaces.isChecked())
+
+
+# Function report_tasks_to_file : writes the time worked per month and description of my tasks and archives (CSV)
+# Note : with all the workspaces, the report has a column more (the workspace of the tasks)
+def report_tasks_to_file(p_file_path: str, p_report_filter: PttExportFilter, p_all_workspaces: bool = False):
+
+    # Saving my tasks on disk first, so the latest changes are reported
+    glb_ptt_task_events.flush()
+    if p_all_workspaces is True:
+        w_report_workspaces = list_report_workspaces()
+    else:
+        w_report_workspaces = [PttReportWorkspace(glb_ptt_workspace, list_report_sources(ptt_files.my_tasks_json,
+                                                                                         ptt_files.archives_dir))]
+    w_source_paths = [w_file_path for w_report_workspace in w_report_workspaces
+                      for w_file_path in w_report_workspace.file_paths]
+
+    # Progress of the report : one step per unit summed up (the window stays responsive while the processes work)
+    w_progress_dlg = QtWidgets.QProgressDialog(glb_report_computing, glb_import_cancel, 0, 100, ptt_main_dlg)
+    w_progress_dlg.setWindowTitle(glb_popup_title_report)
+    w_progress_dlg.setWindowModality(Qt.WindowModal)
+    w_progress_dlg.setMinimumDuration(500)
+
+    # Note : returns False to cancel the report
+    def report_progress(p_nbr_done: int, p_nbr_units: int):
+        w_progress_dlg.setValue(int(100 * p_nbr_done / p_nbr_units))
+        QtWidgets.QApplication.processEvents()
+        return w_progress_dlg.wasCanceled() is False
+
+    try:
+        w_report_totals = report_workspaces(w_report_workspaces, p_file_path, p_report_filter, "month",
+                                            p_progress=report_progress, p_workspace_column=p_all_workspaces,
+                                            p_pool_process=True)
+    except PttReportError as w_error:
+        w_progress_dlg.close()
+        error_popup_ok(glb_popup_title_report, glb_popup_text_report_failed.format(w_error))
+        return
+
+    w_progress_dlg.close()
+
+    if w_report_totals is None:
+        update_status_bar_message(glb_report_cancelled)
+        return
+
+    # Displaying the report summary, and the files (or blocks) which could not be read if any
+    update_status_bar_message(glb_report_done.format(w_report_totals.nbr_tasks, len(w_source_paths),
+                                                     os.path.basename(p_file_path)))
+
+    if w_report_totals.errors:
+        info_popup_ok(glb_popup_title_report, glb_popup_text_report_errors.format("\n".join(w_report_totals.errors)))
+
+
+# Function call_bill_tasks : asks for the dates, the description and the CSV file, then writes the billable time
+def call_bill_tasks():
+
+    # Billing options (same form as the export) : by default, the current month
+    w_billing_dlg = uic.loadUi(ptt_resource_path(ptt_resources.export_ui))
+    w_billing_dlg.setWindowTitle(glb_popup_title_billing)
+    w_today = QtCore.QDate(glb_ptt_clock.now().date())
+    w_billing_dlg.date_from.setDate(QtCore.QDate(w_today.year(), w_today.month(), 1))
+    w_billing_dlg.date_to.setDate(w_today)
+
+    if w_billing_dlg.exec_() != QtWidgets.QDialog.Accepted:
+        return
+
+    w_file_path, w_filter = QtWidgets.QFileDialog.getSaveFileName(ptt_main_dlg, glb_popup_title_billing, "",
+                                                                   glb_report_file_filter)
+    if w_file_path == "":
+        return
+
+    if os.path.splitext(w_file_path)[1] == "":
+        w_file_path = w_file_path + ".csv"
+
+    w_billing_filter = PttExportFilter(w_billing_dlg.date_from.date().toPyDate(),
+                                       w_billing_dlg.date_to.date().toPyDate(),
+                                       w_billing_dlg.z_description.text().strip())
+    bill_tasks_to_file(w_file_path, w_billing_filter)
+
+
+# Function bill_tasks_to_file : writes the raw and billable time per month and client of my tasks and archives (CSV)
+def bill_tasks_to_file(p_file_path: str, p_billing_filter: PttExportFilter):
+
+    # Saving my tasks on disk first, so the latest changes are billed
+    glb_ptt_task_events.flush()
+    w_source_paths = list_report_sources(ptt_files.my_tasks_json, ptt_files.archives_dir)
+
+    # Note : the rules are the ones of the settings (see [BILLING] rules), my files are the files of a single user
+    try:
+        w_billing_totals = bill_tasks([w_source_paths], p_file_path, p_billing_filter, ptt_config.BILLING_Rules,
+                                      ptt_config.BILLING_Client_Pattern)
+    except PttBillingError as w_error:
+        error_popup_ok(glb_popup_title_billing, glb_popup_text_billing_failed.format(w_error))
+        return
+
+    update_status_bar_message(glb_billing_done.format(w_billing_totals.billable_seconds() / 3600,
+                                                      w_billing_totals.raw_seconds() / 3600, w_billing_totals.nbr_tasks,
+                                                      os.path.basename(p_file_path)))
+
+    if w_billing_totals.errors:
+        info_popup_ok(glb_popup_title_billing, glb_popup_text_report_errors.format("\n".join(w_billing_totals.errors)))
+
+
+# Function get_workspace_text : returns the name of a workspace displayed (menu, title of the window...)
+def get_workspace_text(p_name: str):
+    return glb_workspace_default_text if p_name == glb_workspace_default else p_name
+
+
+# Function refresh_menu_workspaces : lists the workspaces in the menu (the current one checked)
+def refresh_menu_workspaces():
+
+    # Removing the actions of the workspaces listed before (the separator and the creation are kept)
+    for w_action in glb_workspaces_action_group.actions():
+        glb_workspaces_action_group.removeAction(w_action)
+        ptt_main_dlg.menuWorkspaces.removeAction(w_action)
+        w_action.deleteLater()
+
+    w_separator = ptt_main_dlg.menuWorkspaces.actions()[0]
+
+    for w_name in list_workspaces(ptt_files.data_dir):
+        w_action = QAction(get_workspace_text(w_name), ptt_main_dlg)
+        w_action.setCheckable(True)
+        w_action.setChecked(w_name == glb_ptt_workspace)
+        w_action.triggered.connect(lambda p_checked, p_name=w_name: switch_workspace(p_name))
+        glb_workspaces_action_group.addAction(w_action)
+        ptt_main_dlg.menuWorkspaces.insertAction(w_separator, w_action)
+
+
+# Function call_new_workspace : asks for the name of a new workspace, creates it then switches to it
+def call_new_workspace():
+
+    w_name, w_ok = QtWidgets.QInputDialog.getText(ptt_main_dlg, glb_popup_title_workspace,
+                                                  glb_popup_text_new_workspace)
+    if w_ok is False or w_name.strip() == "":
+        return
+
+    try:
+        create_workspace(ptt_files.data_dir, w_name.strip())
+    except PttWorkspaceError as w_error:
+        error_popup_ok(glb_popup_title_workspace, glb_popup_text_workspace_failed.format(w_error))
+        return
+
+    switch_workspace(w_name.strip())
+
+
+# Function keep_workspace_in_cache : keeps the current workspace in memory (its tasks, versions, totals, undo stack)
+def keep_workspace_in_cache():
+
+    w_workspace_state = PttWorkspaceState(glb_ptt_workspace, [get_lst_tasks_row_record(w_row)
+                                                              for w_row in range(ptt_main_dlg.lst_tasks.rowCount())])
+    w_workspace_state.file_signature = glb_ptt_tasks_watcher.file_signature
+    w_workspace_state.content_hash = glb_ptt_tasks_watcher.content_hash
+    w_workspace_state.fingerprints = glb_ptt_tasks_watcher.fingerprints
+    w_workspace_state.revisions = glb_ptt_tasks_watcher.revisions
+    w_workspace_state.sync_state = glb_ptt_sync_state
+    w_workspace_state.day_totals = glb_ptt_day_totals
+    w_workspace_state.undo_stack = glb_ptt_undo_stack
+
+    # Note : the budget may have been changed in the settings meanwhile
+    w_evicted_names = glb_ptt_workspaces_cache.set_budget(ptt_config.WORKSPACES_Cache_Size_MB * 1024 * 1024)
+    for w_name in w_evicted_names + glb_ptt_workspaces_cache.put(w_workspace_state):
+        # For console debugging
+        print("keep_workspace_in_cache : workspace '{}' evicted from memory".format(w_name))
+
+
+# Function switch_workspace : keeps the current workspace in memory, then displays the tasks of another one
+def switch_workspace(p_name: str):
+
+    global glb_ptt_workspace, glb_ptt_tasks_store, glb_ptt_sync_state, glb_ptt_day_totals, glb_ptt_undo_stack, \
+        glb_lst_tasks_day_filter, glb_lst_tasks_yellow_task_id
+
+    if p_name == glb_ptt_workspace:
+        return
+
+    # Saving first the changes not saved yet (the backup in progress must be finished before the files change)
+    glb_ptt_task_events.flush()
+    save_day_totals()
+    glb_ptt_sync_state.save()
+    glb_ptt_backup_manager.wait()
+
+    # Note : the workspace is taken from memory before the current one is kept, so it can't be evicted by it
+    w_workspace_state = glb_ptt_workspaces_cache.take(p_name)
+    keep_workspace_in_cache()
+
+    # Using the files of the other workspace
+    glb_ptt_workspace = p_name
+    ptt_files.set_workspace_dir(get_workspace_dir(ptt_files.data_dir, p_name))
+    glb_ptt_tasks_store = PttTasksStore(ptt_files.my_tasks_json)
+    glb_ptt_tasks_watcher.set_file(ptt_files.my_tasks_json)
+    glb_ptt_backup_manager.my_tasks_json = ptt_files.my_tasks_json
+    glb_ptt_backup_manager.backups_dir = ptt_files.backups_dir
+
+    # Emptying the list (the calendar filter is dropped)
+    ptt_main_dlg.lst_tasks.setRowCount(0)
+    glb_lst_tasks_day_filter = None
+    glb_lst_tasks_yellow_task_id = ""
+
+    # The workspace kept in memory is used if its tasks were not modified on disk since it was left
+    if w_workspace_state is not None and w_workspace_state.is_file_unchanged(ptt_files.my_tasks_json):
+        insert_lst_tasks_records(0, w_workspace_state.records)
+        glb_ptt_tasks_watcher.file_signature = w_workspace_state.file_signature
+        glb_ptt_tasks_watcher.content_hash = w_workspace_state.content_hash
+        glb_ptt_tasks_watcher.fingerprints = w_workspace_state.fingerprints
+        glb_ptt_tasks_watcher.revisions = w_workspace_state.revisions
+        glb_ptt_sync_state = w_workspace_state.sync_state
+        glb_ptt_day_totals = w_workspace_state.day_totals
+        glb_ptt_undo_stack = w_workspace_state.undo_stack
+        glb_ptt_heatmap.invalidate()
+        w_switched_text = glb_workspace_switched_from_memory
+    else:
+        glb_ptt_sync_state = PttSyncState(ptt_files.ptt_sync_json)
+        glb_ptt_sync_state.load()
+        glb_ptt_day_totals = PttDayTotals()
+        glb_ptt_undo_stack = PttUndoStack()
+        load_tasks_from_file()
+        w_switched_text = glb_workspace_switched_from_file
+
+    w_nbr_tasks = ptt_main_dlg.lst_tasks.rowCount()
+
+    # Remembering the workspace for the next startup
+    ptt_config.set_value("WORKSPACES_Current", p_name)
+
+    # Create a new task in the workspace (like at startup), the time is counted from now
+    glb_active_task_timer.start(glb_timer_interval_in_msec)
+    add_new_task(glb_new_task_at_workspace_switch)
+
+    # Refreshing the window for the tasks of the workspace
+    update_window_title()
+    show_action_delete_all()
+    enable_lst_tasks_popup_actions()
+    enable_undo_redo_actions()
+    update_status_bar_day_totals()
+    update_status_bar_message(w_switched_text.format(get_workspace_text(p_name), w_nbr_tasks))
+
+
+# Function update_window_title : displays the workspace in the title of the main window (if it's not the default one)
+def update_window_title():
+
+    if glb_ptt_workspace == glb_workspace_default:
+        ptt_main_dlg.setWindowTitle(glb_window_title)
+    else:
+        ptt_main_dlg.setWindowTitle(glb_window_title_workspace.format(glb_ptt_workspace))
+
+
+# Function list_report_workspaces : returns the workspaces to report, the tasks kept in memory being used directly
+def list_report_workspaces():
+
+    # Miscellaneous initializations
+    w_report_workspaces = []
+
+    for w_name in list_workspaces(ptt_files.data_dir):
+
+        w_workspace_dir = get_workspace_dir(ptt_files.data_dir, w_name)
+        w_my_tasks_json = os.path.join(w_workspace_dir, "my_tasks.json")
+        w_archives_dir = os.path.join(w_workspace_dir, "archives")
+        w_workspace_state = glb_ptt_workspaces_cache.peek(w_name)
+
+        # Note : the current workspace was just saved, its file is read like the files of the workspaces evicted
+        if w_workspace_state is not None and w_workspace_state.is_file_unchanged(w_my_tasks_json):
+            w_report_workspaces.append(PttReportWorkspace(w_name, list_report_sources("", w_archives_dir),
+                                                          w_workspace_state.task_records()))
+        else:
+            w_report_workspaces.append(PttReportWorkspace(w_name, list_report_sources(w_my_tasks_json,
+                                                                                      w_archives_dir)))
+
+    return w_report_workspaces
+
+
+# Function save_tasks_after_changes : saves my tasks once for all the changes of an event loop turn
+def save_tasks_after_changes(p_events: list):
+
+    # Note : the changes loaded from my_tasks.json are already saved
+    if events_need_save(p_events):
+        save_tasks_to_file()
+
+
+# Function refresh_lst_tasks_after_changes : refreshes the list after tasks were added, moved or removed
+def refresh_lst_tasks_after_changes(p_events: list):
+
+    global glb_lst_tasks_yellow_task_id
+
+    # The updates of the tasks keep their rows (and the active task), nothing to refresh
+    if not events_change_rows(p_events):
+        return
+
+    # The yellow background is only for the active task at row 0 : refreshing the row 0, the former active task
+    # and the tasks added or moved meanwhile (each one was at row 0 when it was added or activated)
+    w_rows_by_id = get_lst_tasks_rows_by_task_id()
+    w_rows_to_refresh = {0, 1}
+    for w_task_id in [glb_lst_tasks_yellow_task_id] + [w_task_id for w_event in p_events
+                                                       if isinstance(w_event, (PttTaskAdded, PttTaskMoved))
+                                                       for w_task_id in w_event.task_ids]:
+        if w_task_id in w_rows_by_id:
+            w_rows_to_refresh.add(w_rows_by_id[w_task_id])
+
+    for w_row in sorted(w_rows_to_refresh):
+        if w_row < ptt_main_dlg.lst_tasks.rowCount():
+            w_cell0_text, w_cell1_text, w_cell2_text = get_lst_tasks_row_cells(w_row)
+            update_lst_tasks_row_cells(w_row, w_cell0_text, w_cell1_text, w_cell2_text)
+
+    glb_lst_tasks_yellow_task_id = get_lst_tasks_row_task_id(0) if ptt_main_dlg.lst_tasks.rowCount() > 0 else ""
+
+    # Showing/hiding the delete all action in the context menu
+    show_action_delete_all()
+
+
+# Function update_status_bar_after_changes : refreshes the duration of the selected tasks if some of them changed
+def update_status_bar_after_changes(p_events: list):
+
+    w_indexes = ptt_main_dlg.lst_tasks.selectionModel().selectedRows()
+    if len(w_indexes) < 2:
+        return
+
+    # Note : every minute, only the active task is updated, so the sum is not computed again if it isn't selected
+    if events_change_rows(p_events) or \
+            not get_events_task_ids(p_events).isdisjoint(get_lst_tasks_row_task_id(w_index.row()) for w_index in w_indexes):
+        update_status_bar_selected_tasks_duration()
+
+
+# Function update_day_totals_after_changes : counts again the time worked of the tasks changed
+def update_day_totals_after_changes(p_events: list):
+
+    # Note : every minute, only the active task is counted again (its row is found with the index of the rows)
+    w_rows_by_id = get_lst_tasks_rows_by_task_id()
+    for w_task_id in get_events_task_ids(p_events):
+        if w_task_id in w_rows_by_id:
+            glb_ptt_day_totals.set_task(w_task_id, *get_lst_tasks_row_cells(w_rows_by_id[w_task_id]))
+        else:
+            glb_ptt_day_totals.remove_task(w_task_id)
+
+    glb_ptt_heatmap.invalidate()
+
+
+# Function refresh_view_after_changes : refreshes the list and the status bar (later if the window is in background)
+def refresh_view_after_changes(p_events: list):
+
+    if glb_ptt_background_mode.defer(p_events) is True:
+        return
+
+    refresh_lst_tasks_after_changes(p_events)
+    update_status_bar_after_changes(p_events)
+    update_status_bar_day_totals()
+
+
+# Function refresh_view_after_background : refreshes the view once with the changes made while in background
+def refresh_view_after_background(p_events: list):
+
+    refresh_view_after_changes(p_events)
+    update_status_bar_latest_backup()
+
+
+# Function replicate_data_changes : replicates the files just written in the data directory (if the local cache is used)
+def replicate_data_changes():
+    if glb_ptt_replicator is not None:
+        glb_ptt_replicator.notify()
+
+
+# Function save_day_totals : saves the time worked per day with the key of the latest my_tasks.json saved or loaded
+def save_day_totals():
+    glb_ptt_day_totals.save(ptt_files.ptt_day_totals_json, glb_ptt_tasks_watcher.content_hash)
+    replicate_data_changes()
+
+
+# Function write_memory_report : writes a memory report in /data (the tracing starts with the 1st report if not started)
+def write_memory_report():
+
+    glb_ptt_memory_diagnostics.start(glb_ptt_clock.now())
+
+    try:
+        w_report_path = glb_ptt_memory_diagnostics.write_report(glb_ptt_clock.now(), ptt_main_dlg.lst_tasks.rowCount(),
+                                                                ptt_main_dlg.lst_tasks.rowCount() *
+                                                                ptt_main_dlg.lst_tasks.columnCount())
+    except OSError as w_error:
+        error_popup_ok(glb_popup_title_memory, glb_popup_text_memory_failed.format(w_error))
+        return
+
+    update_status_bar_message(glb_memory_report_done.format(os.path.basename(w_report_path)))
+
+
+# Function write_startup_profile : writes the profile of the startup once the 1st event loop turn is done (ptt_main.py
+# --profile-startup), and displays its summary
+def write_startup_profile():
+
+    glb_ptt_startup_profiler.end_phase()
+
+    w_profiles_json = os.path.join(ptt_files.data_dir, glb_startup_profile_json)
 
-    # Creating a backup of the file if it exists
     try:
-        copyfile(w_ptt_files.my_tasks_json, w_ptt_files.my_tasks_backup)
-    except FileNotFoundError:
-        print("create_tasks_backup : file '{}' not found".format(w_ptt_files.my_tasks_json))
+        w_profile, w_previous_profile = glb_ptt_startup_profiler.write_profile(w_profiles_json, glb_ptt_clock.now(),
+                                                                               ptt_main_dlg.lst_tasks.rowCount())
+    except OSError:
+        print("write_startup_profile : cannot write in the '{}' file".format(w_profiles_json))
+        return
+
+    print(format_startup_profile(w_profile, w_previous_profile))
+
+    w_slowest_phase = get_slowest_phase(w_profile)
+    if w_previous_profile is None:
+        update_status_bar_message(glb_startup_profile_done.format(
+            w_profile["total_ms"], w_slowest_phase["name"], w_slowest_phase["duration_ms"], glb_startup_profile_json))
+    else:
+        update_status_bar_message(glb_startup_profile_done_previous.format(
+            w_profile["total_ms"], w_previous_profile["total_ms"], w_slowest_phase["name"],
+            w_slowest_phase["duration_ms"], glb_startup_profile_json))
+
+
+# Function create_tasks_backup : creates a new backup generation of the "my_tasks.json" file (in background)
+def create_tasks_backup():
+
+    # The changes not saved yet are saved first (the file must not be rewritten while the backup reads it)
+    glb_ptt_task_events.flush()
+
+    # Saving the time worked per day too (so it's not computed again at the next startup, even after a crash)
+    save_day_totals()
+
+    # The retention may have been changed in the settings
+    glb_ptt_backup_manager.retention = PttBackupRetention(ptt_config.BACKUP_Hourly, ptt_config.BACKUP_Daily,
+                                                          ptt_config.BACKUP_Weekly)
+
+    # Creating the backup in a background thread (an empty, corrupted or unchanged file is not backed up)
+    glb_ptt_backup_manager.create_backup_in_background()
+
+
+# Function apply_reloaded_settings : applies the settings reloaded after a modification of ptt_config.ini outside of PTT
+# Note : the settings of the synchronization, the billing and the storage of my tasks are read each time they're used
+def apply_reloaded_settings():
+
+    # Retention of the backups and memory budget of the workspaces kept
+    glb_ptt_backup_manager.retention = PttBackupRetention(ptt_config.BACKUP_Hourly, ptt_config.BACKUP_Daily,
+                                                          ptt_config.BACKUP_Weekly)
+    for w_name in glb_ptt_workspaces_cache.set_budget(ptt_config.WORKSPACES_Cache_Size_MB * 1024 * 1024):
+        # For console debugging
+        print("apply_reloaded_settings : workspace '{}' evicted from memory".format(w_name))
+
+    # The language and the folders of the data are only used at startup
+    if (ptt_config.UI_Language, ptt_config.STORAGE_Data_Dir, ptt_config.STORAGE_Local_Cache_Dir) != \
+            glb_ptt_startup_settings:
+        update_status_bar_message(glb_settings_reloaded_restart)
+    else:
+        update_status_bar_message(glb_settings_reloaded)
+
+
+# Function init_ptt_main_window : loads the settings and my tasks, then prepares the main window (at startup)
+def init_ptt_main_window():
+
+    # Tracing the memory from the startup if asked (ptt_main.py --trace-memory)
+    if glb_trace_memory_argument in sys.argv[1:]:
+        glb_ptt_memory_diagnostics.start(glb_ptt_clock.now())
+
+    # Watching the settings (loaded once with the data directory, then reloaded only if the file is modified)
+    ptt_config.watch()
+    ptt_config.config_changed.connect(apply_reloaded_settings)
+
+    # Replicating the local cache in the data directory in background (if set, see [STORAGE] local_cache_dir)
+    if glb_ptt_replicator is not None:
+        glb_ptt_replicator.start()
+        glb_replication_timer.start(glb_timer_replication_interval_in_msec)
+
+    # Trying to create a backup of the "my_tasks.json" file (at application startup, then every hour)
+    glb_ptt_startup_profiler.start_phase("create_tasks_backup")
+    create_tasks_backup()
+    glb_ptt_startup_profiler.end_phase()
+
+    # Loading the device id and the version vector used for the synchronization
+    glb_ptt_sync_state.load()
+
+    # Forcing the list to accept the focus only with click
+    # Reason : signals not working well with QTableWidget about selecting rows with the keyboard tabbing ! (= bug ?)
+    ptt_main_dlg.lst_tasks.setFocusPolicy(Qt.ClickFocus)
+
+    # Emptying the list of tasks
+    ptt_main_dlg.lst_tasks.setRowCount(0)
+
+    # Editing the tasks in place (F2 or a click on a cell of the selected row), each edit saving only its task
+    # Note : the descriptions are edited in a multi-line field, the dates and durations with their formats and bounds
+    ptt_main_dlg.lst_tasks.setItemDelegateForColumn(0, PttStartedOnDelegate(
+        glb_dd_MM_yyyy_hh_mm_string_format, update_task_after_inline_edit, ptt_main_dlg.lst_tasks))
+    ptt_main_dlg.lst_tasks.setItemDelegateForColumn(1, PttDurationDelegate(
+        glb_hh_mm_string_format, glb_minimum_time_per_task, glb_maximum_time_per_task, glb_inline_duration_step_in_min,
+        update_task_after_inline_edit, ptt_main_dlg.lst_tasks))
+    ptt_main_dlg.lst_tasks.setItemDelegateForColumn(2, PttDescriptionEditDelegate(
+        update_task_after_inline_edit, ptt_main_dlg.lst_tasks))
+
+    # Loading my tasks (the ones of the current workspace)
+    glb_ptt_startup_profiler.start_phase("load_tasks_from_file")
+    load_tasks_from_file()
+    glb_ptt_startup_profiler.end_phase()
+    update_window_title()
+
+    # Watching the modifications of my tasks made outside of PTT
+    glb_ptt_tasks_watcher.watch()
+
+    # Create a new task at startup
+    # Note : my tasks are saved at the end of the 1st event loop turn (see the profile of the startup)
+    glb_ptt_startup_profiler.start_phase("add_new_task")
+    add_new_task(glb_new_task_at_startup)
+    glb_ptt_startup_profiler.end_phase()
+
+    # Showing/hiding the delete all action in the context menu
+    show_action_delete_all()
+
+    # Replacing the focus at the top
+    default_focus()
+
+    # Layout of the window and widths of the columns saved at the exit, or auto resize of the columns (on the first rows
+    # only, see ptt_layout.py) if there is none
+    glb_ptt_startup_profiler.start_phase("layout and columns")
+    if glb_ptt_layout.load():
+        glb_ptt_layout.restore_window(ptt_main_dlg)
+    if not glb_ptt_layout.restore_table(ptt_main_dlg.lst_tasks):
+        size_table_columns(ptt_main_dlg.lst_tasks)
+    glb_ptt_startup_profiler.end_phase()
+
+    # Refreshing the task button activation
+    enable_btn_task_add()
+
+    # Refreshing the actions of the popup menu of the list
+    enable_lst_tasks_popup_actions()
+
+    # Nothing to undo/redo yet
+    enable_undo_redo_actions()
+
+    # Displaying the time worked today and this week
+    update_status_bar_day_totals()
+
+    # Displaying the lag of the replication of the local cache
+    update_status_bar_replication()
+
+    # Writing the 1st memory report once my tasks are loaded (if traced from the startup)
+    if glb_ptt_memory_diagnostics.is_tracing():
+        write_memory_report()
 
 
 # ------------------------------------------- #
@@ -1421,43 +2988,17 @@ def ptt_edit_task_send_data():
 # Checking if we can start PTT (pseudo mutex)
 # ------------------------------------------- #
 
+glb_ptt_startup_profiler.start_phase("ptt_start_allowed")
 w_is_ptt_start_allowed = ptt_start_allowed()
+glb_ptt_startup_profiler.end_phase()
 
 # ------------------------------------------- #
 # Main loop
 # ------------------------------------------- #
 if __name__ == "__main__" and (w_is_ptt_start_allowed is True):
-
-    # Trying to create a backup of the "my_tasks.json" file (at application startup only)
-    create_tasks_backup()
-
-    # Forcing the list to accept the focus only with click
-    # Reason : signals not working well with QTableWidget about selecting rows with the keyboard tabbing ! (= bug ?)
-    ptt_main_dlg.lst_tasks.setFocusPolicy(Qt.ClickFocus)
-
-    # Emptying the list of tasks
-    ptt_main_dlg.lst_tasks.setRowCount(0)
-
-    # Loading my tasks
-    load_tasks_from_file()
-
-    # Create a new task at startup
-    add_new_task(glb_new_task_at_startup)
-
-    # Showing/hiding the delete all action in the context menu
-    show_action_delete_all()
-
-    # Replacing the focus at the top
-    default_focus()
-
-    # Auto resize of columns
-    ptt_main_dlg.lst_tasks.resizeColumnsToContents()
-
-    # Refreshing the task button activation
-    enable_btn_task_add()
-
-    # Refreshing the actions of the popup menu of the list
-    enable_lst_tasks_popup_actions()
+    glb_ptt_startup_profiler.start_phase("init_ptt_main_window")
+    init_ptt_main_window()
+    glb_ptt_startup_profiler.end_phase()
 
 
 # ------------------------------------------- #
@@ -1484,12 +3025,35 @@ if w_is_ptt_start_allowed is True:
     # Refreshing the popup actions of the list
     ptt_main_dlg.lst_tasks.itemSelectionChanged.connect(enable_lst_tasks_popup_actions)
 
+    # Loading the modifications of my tasks made outside of PTT
+    glb_ptt_tasks_watcher.tasks_file_changed.connect(apply_tasks_file_changes)
+
+    # Changes made on the tasks : saving my tasks, refreshing the list and the status bar (once per event loop turn)
+    glb_ptt_task_events.subscribe_batch(save_tasks_after_changes)
+    glb_ptt_task_events.subscribe_batch(update_day_totals_after_changes)
+    glb_ptt_task_events.subscribe_batch(refresh_view_after_changes)
+
+    # Background mode when the window is hidden or minimized (the view is refreshed when it's shown again)
+    glb_ptt_background_mode.watch(ptt_main_dlg)
+
+    # Forgetting the rows of the task ids when rows are inserted, removed or moved
+    ptt_main_dlg.lst_tasks.model().rowsInserted.connect(invalidate_lst_tasks_rows_by_task_id)
+    ptt_main_dlg.lst_tasks.model().rowsRemoved.connect(invalidate_lst_tasks_rows_by_task_id)
+    ptt_main_dlg.lst_tasks.model().rowsMoved.connect(invalidate_lst_tasks_rows_by_task_id)
+    ptt_main_dlg.lst_tasks.model().modelReset.connect(invalidate_lst_tasks_rows_by_task_id)
+
     # Timer signal to manage the time logged on the active task
     glb_active_task_timer.timeout.connect(auto_increment_active_task)
 
     # Timer signal to manage the ptt.lock (works like a heartbeat)
     glb_ptt_lock_timer.timeout.connect(write_ptt_lock)
 
+    # Timer signal to create a new backup generation of my tasks
+    glb_backup_timer.timeout.connect(create_tasks_backup)
+
+    # Timer signal to display the lag of the replication of the local cache
+    glb_replication_timer.timeout.connect(update_status_bar_replication)
+
     # Popup / actionActivate : activating the task selected
     actionActivate.triggered.connect(popup_change_active_task)
 
@@ -1508,6 +3072,38 @@ if w_is_ptt_start_allowed is True:
     # Menu bar, menu PTT / actionQuit : closing the application
     ptt_main_dlg.actionQuit.triggered.connect(ptt_main_dlg.close)
 
+    # Menu bar, menu PTT / actionUndo and actionRedo : undoing/redoing the latest deletion, merge, edit or import (Ctrl+Z/Ctrl+Y)
+    ptt_main_dlg.actionUndo.triggered.connect(undo_last_operation)
+    ptt_main_dlg.actionRedo.triggered.connect(redo_last_operation)
+
+    # Menu bar, menu PTT / menuWorkspaces : switching to another workspace, or creating a new one
+    ptt_main_dlg.menuWorkspaces.aboutToShow.connect(refresh_menu_workspaces)
+    ptt_main_dlg.actionNewWorkspace.triggered.connect(call_new_workspace)
+
+    # Menu bar, menu PTT / actionSync : synchronizing the tasks with the sync server
+    ptt_main_dlg.actionSync.triggered.connect(sync_tasks_with_server)
+
+    # Menu bar, menu PTT / actionImport : importing tasks from a CSV or JSON lines file
+    ptt_main_dlg.actionImport.triggered.connect(call_import_tasks)
+
+    # Menu bar, menu PTT / actionConsolidate : consolidating the tasks with the same description over a date range
+    ptt_main_dlg.actionConsolidate.triggered.connect(call_consolidate_tasks)
+
+    # Menu bar, menu PTT / actionHeatmap : calendar of the time worked per day
+    ptt_main_dlg.actionHeatmap.triggered.connect(call_heatmap)
+
+    # Menu bar, menu PTT / actionExport : exporting tasks to a CSV, JSON lines or iCalendar file
+    ptt_main_dlg.actionExport.triggered.connect(call_export_tasks)
+
+    # Menu bar, menu PTT / actionReport : writing the time worked per month and description (my tasks and archives)
+    ptt_main_dlg.actionReport.triggered.connect(call_report_tasks)
+
+    # Menu bar, menu PTT / actionBilling : writing the raw and billable time per month and client
+    ptt_main_dlg.actionBilling.triggered.connect(call_bill_tasks)
+
+    # Menu bar, menu PTT / actionMemory : writing a memory report in /data
+    ptt_main_dlg.actionMemory.triggered.connect(write_memory_report)
+
     # Menu bar, menu PTT / actionAbout : display the "About" information popup
     ptt_main_dlg.actionAbout.triggered.connect(lambda: info_popup_ok(glb_about_title, glb_about_info))
 
@@ -1542,25 +3138,58 @@ if w_is_ptt_start_allowed is True:
 # Initializing and running the main window
 # ------------------------------------------- #
 
-if w_is_ptt_start_allowed is True:
+if __name__ == "__main__" and (w_is_ptt_start_allowed is True):
 
     # Installing translators
     # Weird behaviour : for some strange reason, i can't seem to use installTranslator on a QtWidgets.QApplication
     # INSIDE a function, even through an entry parameter or access/alter the QtWidgets.QApplication through "Global" !
     # -> for now, i will just return the translator and install it here...
 
+    glb_ptt_startup_profiler.start_phase("translators")
     w_ptt_main_translator = ptt_load_translators()
     ptt_main_app.installTranslator(w_ptt_main_translator)
+    glb_ptt_startup_profiler.end_phase()
 
     # Initializing and running the main window
+    glb_ptt_startup_profiler.start_phase("show")
     ptt_main_dlg.show()
+    glb_ptt_startup_profiler.end_phase()
+
+    # Scrolling the list where it was at the exit, once its rows are laid out
+    QtCore.QTimer.singleShot(0, lambda: glb_ptt_layout.restore_scroll(ptt_main_dlg.lst_tasks))
+
+    # Profile of the startup written once the 1st event loop turn is done (the new task saved, the window painted...)
+    if glb_ptt_startup_profiler.enabled:
+        glb_ptt_startup_profiler.start_phase("1st event loop turn")
+        QtCore.QTimer.singleShot(0, write_startup_profile)
+
     ptt_main_app.exec()
 
+    # Saving the layout of the window (for the next startup)
+    glb_ptt_layout.capture(ptt_main_dlg, ptt_main_dlg.lst_tasks)
+    glb_ptt_layout.save()
+
+    # Delivering the latest changes (saved on disk) if the application was closed in the same event loop turn
+    glb_ptt_task_events.flush()
+
+    # Saving the time worked per day (for the next startup)
+    save_day_totals()
+
+    # Writing the settings changed but not saved yet
+    ptt_config.flush()
+
+    # Waiting for the end of the backup in progress, if any
+    glb_ptt_backup_manager.wait()
+
     # Removing the ptt.lock file
     # Note : even if the file isn't removed (ex: app crash), it becomes obsolete if not refreshed within 1 min
 
     remove_ptt_lock()
 
-else:
+    # Replicating the latest changes in the data directory (they are replicated at the next startup if not possible)
+    if glb_ptt_replicator is not None:
+        glb_ptt_replicator.stop()
+
+elif __name__ == "__main__":
     # The application is already running
     error_popup_ok(glb_popup_title_generic_error, glb_popup_text_app_is_already_running)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_memory.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : memory diagnostics of PTT (opt-in, with tracemalloc)
+* - The tracing starts with the "--trace-memory" argument of ptt_main.py (at startup, so the
+*   loading of my tasks is traced), or with the 1st report asked from the PTT menu
+* - Each report is written in /data (ptt_memory_yyyymmdd_hhmmss.txt) and gives :
+*   1) the Python memory by category of allocation site (task records, table items,
+*      indexes, caches, other), also per 10k tasks
+*   2) the deep size of the structures kept by PTT (indexes, caches)
+*   3) the resident memory not traced by tracemalloc (Qt : table items, widgets...)
+*   4) the top allocation sites, and their growth since the previous report
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import sys
+import gc
+import fnmatch
+import linecache
+import tracemalloc
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Number of frames kept for each allocation (enough to go back from json/Qt to the PTT function)
+glb_memory_trace_frames = 25
+
+# Number of allocation sites listed at the end of the report
+glb_memory_top_sites = 15
+
+# Allocations of the diagnostics themselves, not reported (snapshots, source code read to find the functions...)
+glb_memory_ignored_files = [tracemalloc.__file__, linecache.__file__, fnmatch.__file__, __file__]
+
+# Categories of the allocation sites : (category, script name, function name or "" for the whole script)
+# Note : the innermost frame found in these rules gives the category (the frames of json, csv... are skipped)
+glb_memory_categories = [
+    ("table items", "ptt_main.py", "update_lst_tasks_row_cells"),
+    ("table items", "ptt_main.py", "insert_lst_tasks_records"),
+    ("indexes", "ptt_main.py", "get_lst_tasks_rows_by_task_id"),
+    ("task records", "ptt_main.py", "load_tasks_from_file"),
+    ("task records", "ptt_main.py", "write_tasks_to_file"),
+    ("task records", "ptt_main.py", "get_lst_tasks_row_record"),
+    ("task records", "ptt_main.py", "apply_tasks_file_changes"),
+    ("task records", "ptt_main.py", "import_tasks_from_file"),
+    ("task records", "ptt_tasks_stream.py", ""),
+    ("task records", "ptt_tasks_blocks.py", ""),
+    ("task records", "ptt_tasks_store.py", ""),
+    ("task records", "ptt_import.py", ""),
+    ("indexes", "ptt_sync.py", ""),
+    ("indexes", "ptt_tasks_watcher.py", ""),
+    ("caches", "ptt_undo.py", ""),
+    ("caches", "ptt_config.py", ""),
+    ("caches", "ptt_backup.py", ""),
+]
+
+# Order of the categories in the report
+glb_memory_categories_order = ["task records", "table items", "indexes", "caches", "other"]
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttMemoryStructure : structure of PTT whose deep size is reported (get_object returns it when reporting)
+class PttMemoryStructure:
+    def __init__(self, p_category: str, p_name: str, p_get_object):
+        self.category = p_category
+        self.name = p_name
+        self.get_object = p_get_object
+
+
+# Class PttMemoryDiagnostics : tracing of the memory and reports
+class PttMemoryDiagnostics:
+    def __init__(self, p_reports_dir: str):
+        self.reports_dir = p_reports_dir
+        self.structures = []
+        self.started_on = None
+        self.previous_snapshot = None
+
+    # Method add_structure : registers a structure whose deep size must be reported
+    def add_structure(self, p_category: str, p_name: str, p_get_object):
+        self.structures.append(PttMemoryStructure(p_category, p_name, p_get_object))
+
+    # Method is_tracing : True if the allocations are traced
+    def is_tracing(self):
+        return tracemalloc.is_tracing()
+
+    # Method start : starts tracing the allocations (p_now = datetime of the start, written in the reports)
+    def start(self, p_now):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(glb_memory_trace_frames)
+            self.started_on = p_now
+
+    # Method stop : stops tracing the allocations (the traces are freed)
+    def stop(self):
+        tracemalloc.stop()
+        self.started_on = None
+        self.previous_snapshot = None
+
+    # Method write_report : writes a report in the reports folder, returns its path
+    def write_report(self, p_now, p_nbr_tasks: int, p_nbr_table_items: int):
+
+        w_report_path = os.path.join(self.reports_dir, "ptt_memory_{}.txt".format(p_now.strftime("%Y%m%d_%H%M%S")))
+
+        with open(w_report_path, "w", encoding="utf-8") as file:
+            file.write(self.build_report(p_now, p_nbr_tasks, p_nbr_table_items))
+
+        return w_report_path
+
+    # Method build_report : returns the text of a report
+    def build_report(self, p_now, p_nbr_tasks: int, p_nbr_table_items: int):
+
+        # Miscellaneous initializations
+        gc.collect()
+        w_lines = ["PTT memory report - {}".format(p_now.strftime("%d/%m/%Y %H:%M:%S")), ""]
+        w_resident_in_kb = get_resident_memory_in_kb()
+        w_snapshot = None
+
+        w_lines.append("Tasks : {} ({} table items)".format(p_nbr_tasks, p_nbr_table_items))
+        w_lines.append("Resident memory : {} KB".format(w_resident_in_kb))
+
+        if tracemalloc.is_tracing():
+            w_snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, w_file_path) for w_file_path in glb_memory_ignored_files])
+            w_traced_in_kb, w_peak_in_kb = [w_size // 1024 for w_size in tracemalloc.get_traced_memory()]
+            w_lines.append("Traced Python memory : {} KB (peak : {} KB), since {}".format(
+                w_traced_in_kb, w_peak_in_kb, self.started_on.strftime("%d/%m/%Y %H:%M:%S")))
+            w_lines.append("Not traced (Qt : table items, widgets... and the libraries) : {} KB".format(
+                max(w_resident_in_kb - w_traced_in_kb, 0)))
+        else:
+            w_lines.append("Traced Python memory : not traced (start PTT with --trace-memory)")
+
+        # 1) Python memory by category of allocation site
+        if w_snapshot is not None:
+            w_lines = w_lines + ["", "Python memory by allocation site (allocations made since the tracing started)"]
+            w_sizes, w_counts = categorize_snapshot(w_snapshot)
+            w_rows = [[w_category, w_sizes[w_category] // 1024, w_counts[w_category],
+                       format_per_10k_tasks(w_sizes[w_category], p_nbr_tasks)]
+                      for w_category in glb_memory_categories_order]
+            w_lines = w_lines + format_table(["category", "KB", "blocks", "KB per 10k tasks"], w_rows)
+
+        # 2) Deep size of the structures kept by PTT
+        w_lines = w_lines + ["", "Python objects kept by PTT (deep size)"]
+        w_rows = []
+        for w_structure in self.structures:
+            w_size, w_nbr_objects = get_deep_size(w_structure.get_object())
+            w_rows.append([w_structure.category, w_structure.name, w_size // 1024, w_nbr_objects,
+                           format_per_10k_tasks(w_size, p_nbr_tasks)])
+        w_lines = w_lines + format_table(["category", "structure", "KB", "objects", "KB per 10k tasks"], w_rows)
+
+        # 3) Top allocation sites, with their growth since the previous report
+        if w_snapshot is not None:
+            w_lines = w_lines + ["", "Top {} allocation sites".format(glb_memory_top_sites)]
+            w_rows = []
+            if self.previous_snapshot is not None:
+                for w_statistic in w_snapshot.compare_to(self.previous_snapshot, "lineno")[:glb_memory_top_sites]:
+                    w_rows.append([format_frame(w_statistic.traceback[0]), w_statistic.size // 1024,
+                                   "{:+d}".format(w_statistic.size_diff // 1024), w_statistic.count])
+            else:
+                for w_statistic in w_snapshot.statistics("lineno")[:glb_memory_top_sites]:
+                    w_rows.append([format_frame(w_statistic.traceback[0]), w_statistic.size // 1024, "",
+                                   w_statistic.count])
+            w_lines = w_lines + format_table(["site", "KB", "KB since previous report", "blocks"], w_rows)
+
+        self.previous_snapshot = w_snapshot
+        return "\n".join(w_lines) + "\n"
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function get_resident_memory_in_kb : returns the resident memory of the current process (0 if unknown)
+def get_resident_memory_in_kb():
+
+    # psutil is used if installed (any system)
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        pass
+
+    # Linux
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    return 0
+
+
+# Function get_category : returns the category of an allocation with its traceback (the innermost rule found)
+def get_category(p_traceback, p_function_names: dict):
+
+    for w_frame in reversed(p_traceback):
+        w_script_name = os.path.basename(w_frame.filename)
+        for w_category, w_rule_script_name, w_rule_function_name in glb_memory_categories:
+            if w_script_name == w_rule_script_name and \
+                    (w_rule_function_name == "" or w_rule_function_name == get_function_name(w_frame, p_function_names)):
+                return w_category
+
+    return "other"
+
+
+# Function get_function_name : returns the name of the top level function of a traced frame ("" if not found)
+def get_function_name(p_frame, p_function_names: dict):
+
+    # Note : tracemalloc only keeps the file name and the line number, the function is found in the source code
+    w_key = (p_frame.filename, p_frame.lineno)
+    w_function_name = p_function_names.get(w_key)
+
+    if w_function_name is None:
+
+        w_function_name = ""
+        w_lineno = p_frame.lineno
+
+        while w_lineno > 0:
+            w_line = linecache.getline(p_frame.filename, w_lineno)
+            if w_line.startswith("def "):
+                w_function_name = w_line[4:w_line.find("(")]
+                break
+            if w_line.startswith("class "):
+                break
+            w_lineno = w_lineno - 1
+
+        p_function_names[w_key] = w_function_name
+
+    return w_function_name
+
+
+# Function categorize_snapshot : returns the size and number of blocks of the snapshot by category
+def categorize_snapshot(p_snapshot):
+
+    # Miscellaneous initializations
+    w_sizes = {w_category: 0 for w_category in glb_memory_categories_order}
+    w_counts = {w_category: 0 for w_category in glb_memory_categories_order}
+    w_categories_by_traceback = {}
+    w_function_names = {}
+
+    for w_statistic in p_snapshot.statistics("traceback"):
+
+        w_category = w_categories_by_traceback.get(w_statistic.traceback)
+        if w_category is None:
+            w_category = get_category(w_statistic.traceback, w_function_names)
+            w_categories_by_traceback[w_statistic.traceback] = w_category
+
+        w_sizes[w_category] = w_sizes[w_category] + w_statistic.size
+        w_counts[w_category] = w_counts[w_category] + w_statistic.count
+
+    return w_sizes, w_counts
+
+
+# Function get_deep_size : returns the size of an object with all the objects it refers to, and their number
+def get_deep_size(p_object):
+
+    # Miscellaneous initializations
+    w_size = 0
+    w_nbr_objects = 0
+    w_seen_ids = set()
+    w_objects = [p_object]
+
+    while w_objects:
+
+        w_object = w_objects.pop()
+        if id(w_object) in w_seen_ids or isinstance(w_object, (type, type(sys))) or callable(w_object):
+            continue
+
+        w_seen_ids.add(id(w_object))
+        w_size = w_size + sys.getsizeof(w_object)
+        w_nbr_objects = w_nbr_objects + 1
+
+        if isinstance(w_object, dict):
+            w_objects.extend(w_object.keys())
+            w_objects.extend(w_object.values())
+        elif isinstance(w_object, (list, tuple, set, frozenset)):
+            w_objects.extend(w_object)
+        elif hasattr(w_object, "__dict__"):
+            w_objects.append(w_object.__dict__)
+
+    return w_size, w_nbr_objects
+
+
+# Function format_per_10k_tasks : returns a size in KB per 10k tasks ("" without tasks)
+def format_per_10k_tasks(p_size: int, p_nbr_tasks: int):
+
+    if p_nbr_tasks == 0:
+        return ""
+
+    return "{:.1f}".format(p_size / 1024 * 10000 / p_nbr_tasks)
+
+
+# Function format_frame : returns the "script:line" text of a traced frame
+def format_frame(p_frame):
+    return "{}:{}".format(os.path.basename(p_frame.filename), p_frame.lineno)
+
+
+# Function format_table : returns the lines of a simple text table
+def format_table(p_headers: list, p_rows: list):
+
+    w_widths = [max(len(str(w_value)) for w_value in [w_header] + [w_row[w_index] for w_row in p_rows])
+                for w_index, w_header in enumerate(p_headers)]
+
+    w_lines = [" | ".join(str(w_header).ljust(w_width) for w_header, w_width in zip(p_headers, w_widths)),
+               "-+-".join("-" * w_width for w_width in w_widths)]
+    for w_row in p_rows:
+        w_lines.append(" | ".join(str(w_value).ljust(w_width) for w_value, w_width in zip(w_row, w_widths)))
+
+    return w_lines
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_replicator.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : local write-back cache of the data directory (a network share for instance)
+* - PTT reads and writes its files in a local directory (the cache) : a save never waits
+*   for the data directory
+* - At startup, the files changed in the data directory since the latest replication are
+*   copied in the cache (if the data directory can't be read, the cache is used as is)
+* - A background thread finds the files changed in the cache (size and modification time
+*   compared with the manifest of the latest replication) and copies them in the data
+*   directory (temporary file, then replaced), the files removed are removed too
+* - Before a file is replaced or removed in the data directory, its signature is compared
+*   with the one of the manifest : if it was changed there meanwhile, the conflict is
+*   handled as at startup
+* - If the data directory can't be written, the replication is tried again later, waiting
+*   twice longer after each failure (up to 5 minutes)
+* - The lag is the age of the oldest change not replicated yet
+* - When a file was changed on both sides, the cache wins : the other version is kept in
+*   the quarantine folder
+* - A latency can be added to each operation on the data directory (tests, benchmarks)
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import json
+import time
+import shutil
+import datetime
+import threading
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Manifest of the latest replication, in the cache (relative path -> size/modification time in the cache and remotely)
+glb_replication_manifest_json = "ptt_replication.json"
+
+# Files never replicated : the manifest, the lock of the writers of my tasks (local to a machine), the temporary files
+glb_replication_excluded_names = {glb_replication_manifest_json, "my_tasks.lock"}
+glb_replication_excluded_suffix = ".tmp"
+
+# Folder of the versions of the data directory replaced by the ones of the cache (changed on both sides), never
+# replicated
+glb_replication_conflicts_dir = "quarantine"
+
+# Interval between 2 searches of the files changed in the cache (a save asks for a search at once)
+glb_replication_scan_interval_in_secs = 10
+
+# Delays before trying again after a failure (doubled at each new failure)
+glb_replication_retry_min_in_secs = 1
+glb_replication_retry_max_in_secs = 300
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttReplicationStatus : files not replicated yet, lag, and latest error (with the delay before the next try)
+class PttReplicationStatus:
+    def __init__(self, p_nbr_pending: int, p_lag_in_secs: float, p_error: str, p_retry_in_secs: float):
+        self.nbr_pending = p_nbr_pending
+        self.lag_in_secs = p_lag_in_secs
+        self.error = p_error
+        self.retry_in_secs = p_retry_in_secs
+
+
+# Class PttReplicator : replicates the local cache of the data directory in the data directory, in background
+class PttReplicator:
+    def __init__(self, p_local_dir: str, p_remote_dir: str, p_latency_in_secs: float = 0):
+        self.local_dir = p_local_dir
+        self.remote_dir = p_remote_dir
+        self.latency_in_secs = p_latency_in_secs
+        self.manifest = {}
+        self.pending = {}
+        self.nbr_failures = 0
+        self.error = ""
+        self.next_try = 0
+        self.nbr_files_replicated = 0
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.thread = None
+
+    # Method wait_remote : latency added to each operation on the data directory (0 by default)
+    def wait_remote(self):
+        if self.latency_in_secs > 0:
+            time.sleep(self.latency_in_secs)
+
+    # Method pull : copies in the cache the files changed in the data directory since the latest replication (startup)
+    def pull(self):
+
+        # Miscellaneous initializations
+        w_nbr_files_pulled = 0
+        os.makedirs(self.local_dir, exist_ok=True)
+        self.load_manifest()
+
+        try:
+            w_remote_files = self.list_files(self.remote_dir, True)
+        except OSError as w_error:
+            print("PttReplicator.pull : cannot read the '{}' folder, the local cache is used ({})"
+                  .format(self.remote_dir, w_error))
+            return w_nbr_files_pulled
+
+        w_local_files = self.list_files(self.local_dir, False)
+
+        for w_path, w_remote_signature in w_remote_files.items():
+
+            # Nothing changed remotely since the latest replication
+            w_entry = self.manifest.get(w_path)
+            if w_entry is not None and w_entry[1] == w_remote_signature:
+                continue
+
+            try:
+                # Changed on both sides : the cache wins, the other version is kept aside
+                w_local_signature = w_local_files.get(w_path)
+                if w_local_signature is not None and (w_entry is None or w_entry[0] != w_local_signature):
+                    self.keep_conflict(w_path)
+                    continue
+
+                self.wait_remote()
+                copy_file(os.path.join(self.remote_dir, w_path), os.path.join(self.local_dir, w_path))
+            except OSError as w_error:
+                print("PttReplicator.pull : cannot copy '{}' in the local cache ({})".format(w_path, w_error))
+                continue
+
+            self.manifest[w_path] = [get_signature(os.path.join(self.local_dir, w_path)), w_remote_signature]
+            w_nbr_files_pulled = w_nbr_files_pulled + 1
+
+        # The files removed remotely are removed from the cache too (if not changed there meanwhile)
+        for w_path in [w_path for w_path in self.manifest if w_path not in w_remote_files]:
+            if w_local_files.get(w_path) == self.manifest[w_path][0]:
+                try:
+                    os.remove(os.path.join(self.local_dir, w_path))
+                except OSError:
+                    continue
+            del self.manifest[w_path]
+
+        self.save_manifest()
+
+        return w_nbr_files_pulled
+
+    # Method keep_conflict : copies the remote version of a file changed on both sides in the quarantine of the cache
+    def keep_conflict(self, p_path: str):
+
+        w_conflict_path = os.path.join(self.local_dir, glb_replication_conflicts_dir, "{}_{}.remote".format(
+            p_path.replace("/", "_"), datetime.datetime.now().strftime("%Y%m%d_%H%M%S")))
+
+        self.wait_remote()
+        copy_file(os.path.join(self.remote_dir, p_path), w_conflict_path)
+
+        print("PttReplicator.keep_conflict : '{}' changed in the local cache and in '{}', the local version is kept"
+              " (the other one is in '{}')".format(p_path, self.remote_dir, w_conflict_path))
+
+    # Method list_files : returns the signature of each file of a folder and its sub-folders, by relative path
+    def list_files(self, p_dir: str, p_remote: bool):
+
+        # Miscellaneous initializations
+        w_files = {}
+
+        def raise_error(p_error):
+            raise p_error
+
+        # Note : the errors are raised, an incomplete list would look like files removed
+        for w_dir, w_sub_dirs, w_file_names in os.walk(p_dir, onerror=raise_error):
+
+            if p_remote is True:
+                self.wait_remote()
+
+            # The quarantine stays local (the versions of the other machines would be replicated as my files)
+            if w_dir == p_dir and glb_replication_conflicts_dir in w_sub_dirs:
+                w_sub_dirs.remove(glb_replication_conflicts_dir)
+
+            for w_file_name in w_file_names:
+                if w_file_name in glb_replication_excluded_names or \
+                        w_file_name.endswith(glb_replication_excluded_suffix):
+                    continue
+
+                w_path = os.path.relpath(os.path.join(w_dir, w_file_name), p_dir).replace(os.sep, "/")
+                try:
+                    w_files[w_path] = get_signature(os.path.join(w_dir, w_file_name))
+                except OSError:
+                    continue
+
+        return w_files
+
+    # Method start : starts the replication in a background thread
+    def start(self):
+
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="ptt_replicator", daemon=True)
+        self.thread.start()
+
+    # Method notify : asks for a search of the files changed at once (after a save)
+    def notify(self):
+        with self.condition:
+            self.condition.notify()
+
+    # Method stop : replicates the latest changes (one last try), then stops the thread (at the application exit)
+    def stop(self, p_timeout_in_secs: float = 10):
+
+        if self.thread is None:
+            return
+
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+        self.thread.join(p_timeout_in_secs)
+        if self.thread.is_alive():
+            print("PttReplicator.stop : {} file(s) not replicated in '{}' yet, they will be at the next startup"
+                  .format(len(self.pending), self.remote_dir))
+        self.thread = None
+
+    # Method run : searches and replicates the files changed, until stopped
+    def run(self):
+
+        while True:
+
+            with self.condition:
+                if self.stopping is False:
+                    self.condition.wait(self.get_wait_in_secs())
+                w_stopping = self.stopping
+
+            # Note : the latest changes are tried once more at the exit, even if waiting after a failure
+            self.replicate(w_stopping)
+
+            if w_stopping is True:
+                return
+
+    # Method get_wait_in_secs : delay before the next search (the next try if the latest replication failed)
+    def get_wait_in_secs(self):
+
+        if self.nbr_failures > 0:
+            return min(glb_replication_scan_interval_in_secs, max(0, self.next_try - time.monotonic()))
+
+        return glb_replication_scan_interval_in_secs
+
+    # Method scan : finds the files changed or removed in the cache since their latest replication
+    def scan(self):
+
+        w_local_files = self.list_files(self.local_dir, False)
+        w_pending = {}
+
+        # Note : the lag of a file changed starts at its modification (the change may have been found later)
+        for w_path, w_local_signature in w_local_files.items():
+            w_entry = self.manifest.get(w_path)
+            if w_entry is None or w_entry[0] != w_local_signature:
+                w_pending[w_path] = w_local_signature[1] / 1e9
+
+        for w_path in self.manifest:
+            if w_path not in w_local_files:
+                w_pending[w_path] = self.pending.get(w_path, time.time())
+
+        with self.condition:
+            self.pending = w_pending
+
+    # Method replicate : replicates the files changed, stops at the 1st failure (tried again later)
+    def replicate(self, p_force: bool = False):
+
+        self.scan()
+
+        if self.nbr_failures > 0 and p_force is False and time.monotonic() < self.next_try:
+            return
+
+        # The oldest changes 1st
+        w_nbr_files_replicated = 0
+        for w_path in sorted(self.pending, key=self.pending.get):
+
+            try:
+                self.replicate_file(w_path)
+            except OSError as w_error:
+                with self.condition:
+                    self.nbr_failures = self.nbr_failures + 1
+                    self.error = str(w_error)
+                    self.next_try = time.monotonic() + min(glb_replication_retry_max_in_secs,
+                                                           glb_replication_retry_min_in_secs *
+                                                           2 ** (self.nbr_failures - 1))
+                break
+
+            with self.condition:
+                del self.pending[w_path]
+                self.nbr_failures = 0
+                self.error = ""
+            w_nbr_files_replicated = w_nbr_files_replicated + 1
+
+        if w_nbr_files_replicated > 0:
+            self.nbr_files_replicated = self.nbr_files_replicated + w_nbr_files_replicated
+            self.save_manifest()
+
+    # Method replicate_file : copies a file of the cache in the data directory (or removes it if removed from the cache)
+    def replicate_file(self, p_path: str):
+
+        w_local_path = os.path.join(self.local_dir, p_path)
+        w_remote_path = os.path.join(self.remote_dir, p_path)
+
+        # Note : the data directory is never created (a share not mounted would be created locally)
+        self.wait_remote()
+        if os.path.isdir(self.remote_dir) is False:
+            raise FileNotFoundError("the '{}' folder is not found".format(self.remote_dir))
+
+        try:
+            w_local_signature = get_signature(w_local_path)
+        except FileNotFoundError:
+            w_local_signature = None
+
+        # Changed remotely since the latest replication (by PTT on another machine) : the cache wins, as in pull,
+        # the other version is kept aside before being replaced or removed
+        self.wait_remote()
+        try:
+            w_remote_signature = get_signature(w_remote_path)
+        except FileNotFoundError:
+            w_remote_signature = None
+
+        w_entry = self.manifest.get(p_path)
+        if w_remote_signature is not None and (w_entry is None or w_entry[1] != w_remote_signature):
+            self.keep_conflict(p_path)
+
+        if w_local_signature is None:
+            try:
+                os.remove(w_remote_path)
+            except FileNotFoundError:
+                pass
+            self.manifest.pop(p_path, None)
+            return
+
+        copy_file(w_local_path, w_remote_path)
+        self.manifest[p_path] = [w_local_signature, get_signature(w_remote_path)]
+
+    # Method status : returns the files not replicated yet, the lag and the latest error
+    def status(self):
+
+        with self.condition:
+            w_lag_in_secs = max(0, time.time() - min(self.pending.values())) if len(self.pending) > 0 else 0
+            w_retry_in_secs = max(0, self.next_try - time.monotonic()) if self.nbr_failures > 0 else 0
+
+            return PttReplicationStatus(len(self.pending), w_lag_in_secs, self.error, w_retry_in_secs)
+
+    # Method load_manifest : reads the manifest of the latest replication (empty if not found or invalid)
+    def load_manifest(self):
+
+        self.manifest = {}
+
+        try:
+            with open(os.path.join(self.local_dir, glb_replication_manifest_json), "r", encoding="utf-8") as file:
+                w_data = json.load(file)
+            self.manifest = {w_path: [tuple(w_entry[0]), tuple(w_entry[1])]
+                             for w_path, w_entry in w_data["files"].items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            print("PttReplicator.load_manifest : invalid manifest in '{}', all the files are compared again"
+                  .format(self.local_dir))
+
+    # Method save_manifest : writes the manifest of the latest replication in the cache (temporary file, then replaced)
+    def save_manifest(self):
+
+        w_manifest_json = os.path.join(self.local_dir, glb_replication_manifest_json)
+        w_manifest_json_tmp = w_manifest_json + ".tmp"
+
+        try:
+            with open(w_manifest_json_tmp, "w", encoding="utf-8") as file:
+                json.dump({"remote_dir": self.remote_dir, "files": self.manifest}, file)
+            os.replace(w_manifest_json_tmp, w_manifest_json)
+        except OSError:
+            print("PttReplicator.save_manifest : cannot write in the '{}' file".format(w_manifest_json))
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function get_signature : size and modification time (in ns) of a file
+def get_signature(p_path: str):
+
+    w_stat = os.stat(p_path)
+
+    return w_stat.st_size, w_stat.st_mtime_ns
+
+
+# Function copy_file : copies a file (temporary file, then replaced : the copy is complete or not done)
+def copy_file(p_source_path: str, p_target_path: str):
+
+    w_target_path_tmp = p_target_path + glb_replication_excluded_suffix
+
+    os.makedirs(os.path.dirname(p_target_path), exist_ok=True)
+    try:
+        shutil.copyfile(p_source_path, w_target_path_tmp)
+        os.replace(w_target_path_tmp, p_target_path)
+    finally:
+        if os.path.exists(w_target_path_tmp):
+            os.remove(w_target_path_tmp)
@@ -0,0 +1,485 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_report.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : reports of the time worked per period (day, month or year) and description,
+*         over my_tasks.json and the archives (tasks files of the previous years...)
+* - The files are split in units of work : a file saved by blocks is split in ranges of
+*   lines (see ptt_tasks_blocks.py), the other files (backups .json.gz, older versions)
+*   are read whole
+* - The units are parsed and summed up by a pool of processes, each one returning only
+*   the seconds per (period, description) of its unit : the parent merges these totals
+* - The progress is given after each unit, and the report can be cancelled (the units
+*   not started yet are dropped)
+* - The damaged blocks are skipped and counted, the report is still written
+* - Started by PTT, the pool is run by a process of its own ("ptt_report.py --report-pool",
+*   or "ptt.exe --report-pool" once frozen) : with spawn (Windows, macOS), the processes of
+*   a pool import the main script of their parent again, which must not be ptt_main.py
+*   (settings, replication, windows...). The units are given as JSON on its input, the
+*   progress and the totals are read on its output, closing its input cancels the report
+* - A report can be made over several workspaces (see ptt_workspaces.py), with a column of
+*   the workspace : the workspaces kept in memory by PTT are summed up directly, the files of
+*   the others are only read by the processes, unit by unit
+* - The command line reads my files where PTT writes them (local cache, data directory and
+*   workspace set in data/ptt_config.ini), unless --source is given
+* - No dependency on PyQt5, so it can be run without the GUI
+* --------------------------------------------------------------------------------- *
+To write the time worked per month over 5 years, go in the ptt (root) folder then :
+python ptt_report.py --from 2015-01-01 --to 2019-12-31 --period month report_2015_2019.csv
+The archives are the tasks files found in the archives folder of my tasks (or the --source files given)
+To report all the workspaces (one column more, the workspace of the tasks) :
+python ptt_report.py --all-workspaces --period month report_workspaces.csv
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import sys
+import csv
+import glob
+import json
+import argparse
+import datetime
+import threading
+import subprocess
+import concurrent.futures
+from ptt_export import PttExportFilter, parse_date_argument
+from ptt_tasks_stream import PttTasksStreamError, iter_task_records
+from ptt_tasks_blocks import is_blocks_file, read_blocks_range
+from ptt_day_totals import started_on_to_day, duration_to_seconds
+from ptt_workspaces import glb_workspace_default, list_workspaces, get_workspace_dir, read_config_storage
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Periods of the reports, and length of the "yyyy-mm-dd" day they keep
+glb_report_periods = {"day": 10, "month": 7, "year": 4}
+
+# Size of the ranges of a file saved by blocks parsed by each unit (about 25k tasks)
+glb_report_unit_size = 4 * 1024 * 1024
+
+# Extensions of the tasks files read in the archives folder
+glb_report_archives_patterns = ["*.json", "*.json.gz"]
+
+# Interval between 2 progresses (and checks of the cancellation) while the units are parsed
+glb_report_poll_interval_in_sec = 0.1
+
+# Columns of the report
+glb_report_columns = ["period", "description", "duration", "hours"]
+glb_report_workspace_column = "workspace"
+
+# Name of the default workspace in the workspace column
+glb_report_workspace_default = "default"
+
+# Argument of the process running the pool of a report started by PTT (also checked 1st by ptt_main.py, once frozen)
+glb_report_pool_argument = "--report-pool"
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttReportError : raised when a report can't be written
+class PttReportError(Exception):
+    pass
+
+
+# Class PttReportWorkspace : tasks of a workspace reported, its files and its tasks if they are kept in memory
+# Note : the tasks in memory (p_task_records) are summed up by the parent, so they must not be in the files too
+class PttReportWorkspace:
+    def __init__(self, p_name: str, p_file_paths: list, p_task_records=None):
+        self.name = p_name
+        self.file_paths = p_file_paths
+        self.task_records = p_task_records
+
+
+# Class PttReportUnit : unit of work, a range of bytes of a file saved by blocks, or a whole file (p_end = None)
+class PttReportUnit:
+    def __init__(self, p_file_path: str, p_start: int = 0, p_end=None, p_workspace: str = glb_workspace_default):
+        self.file_path = p_file_path
+        self.start = p_start
+        self.end = p_end
+        self.workspace = p_workspace
+
+
+# Class PttReportTotals : seconds worked per (period, workspace, description), tasks counted and errors
+class PttReportTotals:
+    def __init__(self):
+        self.seconds = {}
+        self.nbr_tasks = 0
+        self.errors = []
+
+    # Method add_task_record : counts the duration of a task in the period it started in
+    def add_task_record(self, p_task_record: dict, p_period_length: int, p_workspace: str = glb_workspace_default):
+
+        w_key = (started_on_to_day(p_task_record["started_on"])[:p_period_length], p_workspace,
+                 p_task_record["description"])
+        self.seconds[w_key] = self.seconds.get(w_key, 0) + duration_to_seconds(p_task_record["duration"])
+        self.nbr_tasks = self.nbr_tasks + 1
+
+    # Method merge : adds the totals of another unit
+    def merge(self, p_report_totals):
+
+        for w_key, w_seconds in p_report_totals.seconds.items():
+            self.seconds[w_key] = self.seconds.get(w_key, 0) + w_seconds
+
+        self.nbr_tasks = self.nbr_tasks + p_report_totals.nbr_tasks
+        self.errors.extend(p_report_totals.errors)
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function list_report_sources : returns my tasks file and the tasks files of the archives folder (if they exist)
+def list_report_sources(p_my_tasks_json: str, p_archives_dir: str):
+
+    w_file_paths = [p_my_tasks_json] if os.path.isfile(p_my_tasks_json) else []
+
+    for w_pattern in glb_report_archives_patterns:
+        w_file_paths.extend(sorted(glob.glob(os.path.join(p_archives_dir, w_pattern))))
+
+    return w_file_paths
+
+
+# Function list_workspaces_report_sources : returns the tasks files (and archives) of all the workspaces of a data
+# directory, as workspaces to report
+def list_workspaces_report_sources(p_data_dir: str):
+
+    w_report_workspaces = []
+
+    for w_name in list_workspaces(p_data_dir):
+        w_workspace_dir = get_workspace_dir(p_data_dir, w_name)
+        w_report_workspaces.append(PttReportWorkspace(w_name, list_report_sources(
+            os.path.join(w_workspace_dir, "my_tasks.json"), os.path.join(w_workspace_dir, "archives"))))
+
+    return w_report_workspaces
+
+
+# Function split_report_units : splits the files in units of work (ranges of glb_report_unit_size bytes if possible)
+def split_report_units(p_file_paths: list, p_unit_size: int = glb_report_unit_size,
+                       p_workspace: str = glb_workspace_default):
+
+    w_units = []
+
+    for w_file_path in p_file_paths:
+
+        try:
+            w_is_split = not w_file_path.endswith(".gz") and is_blocks_file(w_file_path)
+            w_file_size = os.path.getsize(w_file_path)
+        except OSError as w_error:
+            raise PttReportError("cannot read '{}' ({})".format(w_file_path, w_error))
+
+        if w_is_split is False:
+            w_units.append(PttReportUnit(w_file_path, p_workspace=p_workspace))
+        else:
+            for w_start in range(0, max(w_file_size, 1), p_unit_size):
+                w_units.append(PttReportUnit(w_file_path, w_start, min(w_start + p_unit_size, w_file_size),
+                                             p_workspace))
+
+    return w_units
+
+
+# Function read_unit_task_records : returns the task records of a unit (the damaged blocks are added to the errors)
+def read_unit_task_records(p_unit: PttReportUnit, p_report_totals: PttReportTotals):
+
+    if p_unit.end is None:
+        return iter_task_records(p_unit.file_path)
+
+    w_tasks_content = read_blocks_range(p_unit.file_path, p_unit.start, p_unit.end)
+    if w_tasks_content.is_damaged():
+        p_report_totals.errors.append("'{}' : {} damaged block(s) skipped".format(
+            p_unit.file_path, len(w_tasks_content.damaged_parts)))
+
+    return w_tasks_content.task_records
+
+
+# Function report_unit : sums up the tasks of a unit (run in the processes of the pool)
+def report_unit(p_unit: PttReportUnit, p_report_filter: PttExportFilter, p_period: str):
+
+    # Miscellaneous initializations
+    w_report_totals = PttReportTotals()
+    w_period_length = glb_report_periods[p_period]
+
+    # Note : a file which can't be read (or a damaged backup) is reported, the other units are still summed up
+    try:
+        for w_task_record in read_unit_task_records(p_unit, w_report_totals):
+            if p_report_filter.accepts(w_task_record):
+                w_report_totals.add_task_record(w_task_record, w_period_length, p_unit.workspace)
+
+    except (OSError, PttTasksStreamError, KeyError, ValueError) as w_error:
+        w_report_totals.errors.append("'{}' : {}".format(p_unit.file_path, w_error))
+
+    return w_report_totals
+
+
+# Function compute_report : sums up the units in a pool of processes, returns the totals (None if cancelled)
+# Note : with p_pool_process, the pool is run by a process of its own (see run_report_pool)
+def compute_report(p_units: list, p_report_filter: PttExportFilter, p_period: str, p_max_workers: int = 0,
+                   p_progress=None, p_pool_process: bool = False):
+
+    # Miscellaneous initializations
+    w_report_totals = PttReportTotals()
+    w_max_workers = min(p_max_workers or os.cpu_count() or 1, max(len(p_units), 1))
+
+    # A single process : the units are summed up here (starting a pool would only cost time)
+    if w_max_workers == 1:
+        for w_index, w_unit in enumerate(p_units):
+            w_report_totals.merge(report_unit(w_unit, p_report_filter, p_period))
+            if p_progress is not None and p_progress(w_index + 1, len(p_units)) is False:
+                return None
+        return w_report_totals
+
+    if p_pool_process is True:
+        return compute_report_in_pool_process(p_units, p_report_filter, p_period, w_max_workers, p_progress)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=w_max_workers) as w_executor:
+
+        w_futures = {w_executor.submit(report_unit, w_unit, p_report_filter, p_period) for w_unit in p_units}
+        w_nbr_done = 0
+
+        while w_futures:
+
+            w_done, w_futures = concurrent.futures.wait(w_futures, timeout=glb_report_poll_interval_in_sec,
+                                                        return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for w_future in w_done:
+                w_report_totals.merge(w_future.result())
+                w_nbr_done = w_nbr_done + 1
+
+            # Note : the units in progress are finished (they are small), the others are never started
+            if p_progress is not None and p_progress(w_nbr_done, len(p_units)) is False:
+                for w_future in w_futures:
+                    w_future.cancel()
+                return None
+
+    return w_report_totals
+
+
+# Function compute_report_in_pool_process : sums up the units in the pool of a process of its own, returns the totals
+# (None if cancelled)
+def compute_report_in_pool_process(p_units: list, p_report_filter: PttExportFilter, p_period: str, p_max_workers: int,
+                                   p_progress=None):
+
+    # Once frozen (PyInstaller), the executable is PTT itself (ptt_main.py runs the pool at once)
+    if getattr(sys, "frozen", False):
+        w_command = [sys.executable, glb_report_pool_argument]
+    else:
+        w_command = [sys.executable, os.path.abspath(__file__), glb_report_pool_argument]
+
+    w_job = {"units": [[w_unit.file_path, w_unit.start, w_unit.end, w_unit.workspace] for w_unit in p_units],
+             "date_from": None if p_report_filter.date_from is None else p_report_filter.date_from.isoformat(),
+             "date_to": None if p_report_filter.date_to is None else p_report_filter.date_to.isoformat(),
+             "description": p_report_filter.description, "period": p_period, "max_workers": p_max_workers}
+
+    # Note : the JSON texts are ASCII only (ensure_ascii), whatever the encoding of the pipes
+    try:
+        w_process = subprocess.Popen(w_command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     universal_newlines=True)
+        w_process.stdin.write(json.dumps(w_job) + "\n")
+        w_process.stdin.flush()
+    except OSError as w_error:
+        raise PttReportError("cannot start the processes of the report ({})".format(w_error))
+
+    w_report_totals = None
+    for w_line in w_process.stdout:
+
+        if w_line.startswith("progress "):
+            w_nbr_done, w_nbr_units = w_line.split()[1:]
+            if p_progress is not None and p_progress(int(w_nbr_done), int(w_nbr_units)) is False:
+                w_process.stdin.close()
+                w_process.stdout.read()
+                w_process.wait()
+                return None
+
+        elif w_line.startswith("totals "):
+            w_data = json.loads(w_line[len("totals "):])
+            w_report_totals = PttReportTotals()
+            w_report_totals.seconds = {(w_period, w_workspace, w_description): w_seconds
+                                       for w_period, w_workspace, w_description, w_seconds in w_data["seconds"]}
+            w_report_totals.nbr_tasks = w_data["nbr_tasks"]
+            w_report_totals.errors = w_data["errors"]
+
+    w_process.stdin.close()
+    if w_process.wait() != 0 or w_report_totals is None:
+        raise PttReportError("the processes of the report failed (exit code {})".format(w_process.returncode))
+
+    return w_report_totals
+
+
+# Function run_report_pool : runs the pool of a report started by PTT (units read on the input, progress and totals
+# written on the output), returns the exit code
+def run_report_pool():
+
+    w_job = json.loads(sys.stdin.readline())
+    w_cancelled = threading.Event()
+
+    # Note : PTT closes the input to cancel the report (or if it's closed itself). The descriptor is read directly :
+    # the lock of sys.stdin held by this thread would be inherited by the processes forked, which close sys.stdin
+    def wait_cancel():
+        while os.read(sys.stdin.fileno(), 1024):
+            pass
+        w_cancelled.set()
+
+    threading.Thread(target=wait_cancel, daemon=True).start()
+
+    def report_progress(p_nbr_done: int, p_nbr_units: int):
+        print("progress {} {}".format(p_nbr_done, p_nbr_units), flush=True)
+        return w_cancelled.is_set() is False
+
+    w_units = [PttReportUnit(w_file_path, w_start, w_end, w_workspace)
+               for w_file_path, w_start, w_end, w_workspace in w_job["units"]]
+    w_report_filter = PttExportFilter(
+        None if w_job["date_from"] is None else datetime.date.fromisoformat(w_job["date_from"]),
+        None if w_job["date_to"] is None else datetime.date.fromisoformat(w_job["date_to"]), w_job["description"])
+
+    w_report_totals = compute_report(w_units, w_report_filter, w_job["period"], w_job["max_workers"], report_progress)
+    if w_report_totals is None:
+        return 0
+
+    print("totals", json.dumps({"seconds": [[w_period, w_workspace, w_description, w_seconds]
+                                            for (w_period, w_workspace, w_description), w_seconds
+                                            in w_report_totals.seconds.items()],
+                                "nbr_tasks": w_report_totals.nbr_tasks, "errors": w_report_totals.errors}),
+          flush=True)
+
+    return 0
+
+
+# Function convert_seconds_to_duration : turns seconds into a "hh:mm" duration (hours over 24 included)
+def convert_seconds_to_duration(p_seconds: int):
+    return "{:02d}:{:02d}".format(p_seconds // 3600, p_seconds % 3600 // 60)
+
+
+# Function write_report : writes the totals in a CSV file (by period, workspace, then description), returns the number
+# of rows (the workspace column is only written if asked)
+def write_report(p_report_totals: PttReportTotals, p_file, p_workspace_column: bool = False):
+
+    w_writer = csv.writer(p_file)
+    if p_workspace_column is True:
+        w_writer.writerow(glb_report_columns[:1] + [glb_report_workspace_column] + glb_report_columns[1:])
+    else:
+        w_writer.writerow(glb_report_columns)
+
+    for (w_period, w_workspace, w_description), w_seconds in sorted(p_report_totals.seconds.items()):
+        w_row = [w_period, w_description, convert_seconds_to_duration(w_seconds), "{:.2f}".format(w_seconds / 3600)]
+        if p_workspace_column is True:
+            w_row.insert(1, w_workspace if w_workspace != glb_workspace_default else glb_report_workspace_default)
+        w_writer.writerow(w_row)
+
+    return len(p_report_totals.seconds)
+
+
+# Function report_tasks : writes the report of the tasks files in a CSV file, returns the totals (None if cancelled)
+def report_tasks(p_source_paths: list, p_target_path: str, p_report_filter: PttExportFilter, p_period: str = "month",
+                 p_max_workers: int = 0, p_progress=None):
+    return report_workspaces([PttReportWorkspace(glb_workspace_default, p_source_paths)], p_target_path,
+                             p_report_filter, p_period, p_max_workers, p_progress, False)
+
+
+# Function report_workspaces : writes the report of several workspaces in a CSV file (with a column of the workspace),
+# returns the totals (None if cancelled)
+def report_workspaces(p_report_workspaces: list, p_target_path: str, p_report_filter: PttExportFilter,
+                      p_period: str = "month", p_max_workers: int = 0, p_progress=None,
+                      p_workspace_column: bool = True, p_pool_process: bool = False):
+
+    if p_period not in glb_report_periods:
+        raise PttReportError("unknown period '{}'".format(p_period))
+
+    # Miscellaneous initializations
+    w_units = []
+    w_memory_totals = PttReportTotals()
+    w_period_length = glb_report_periods[p_period]
+
+    # Note : the tasks kept in memory are summed up at once, only the files are split in units for the processes
+    for w_report_workspace in p_report_workspaces:
+        w_units.extend(split_report_units(w_report_workspace.file_paths, p_workspace=w_report_workspace.name))
+        if w_report_workspace.task_records is not None:
+            for w_task_record in w_report_workspace.task_records:
+                if p_report_filter.accepts(w_task_record):
+                    w_memory_totals.add_task_record(w_task_record, w_period_length, w_report_workspace.name)
+
+    w_report_totals = compute_report(w_units, p_report_filter, p_period, p_max_workers, p_progress, p_pool_process)
+    if w_report_totals is None:
+        return None
+
+    w_report_totals.merge(w_memory_totals)
+
+    # Note : the report is written in a temporary file first, so a previous report is never left half written
+    w_tmp_path = p_target_path + ".tmp"
+
+    try:
+        with open(w_tmp_path, "w", encoding="utf-8", newline="") as w_file:
+            write_report(w_report_totals, w_file, p_workspace_column)
+        os.replace(w_tmp_path, p_target_path)
+
+    except OSError as w_error:
+        if os.path.exists(w_tmp_path):
+            os.remove(w_tmp_path)
+        raise PttReportError("cannot write the report '{}' ({})".format(p_target_path, w_error))
+
+    return w_report_totals
+
+
+# ------------------------------------------- #
+# Main
+# ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    # Pool of a report started by PTT (run from the ptt_report module, so the units and totals exchanged with the
+    # processes don't depend on the name of the main script)
+    if sys.argv[1:] == [glb_report_pool_argument]:
+        import ptt_report
+        sys.exit(ptt_report.run_report_pool())
+
+    w_parser = argparse.ArgumentParser(description="Writes the time worked per period and description (CSV file)")
+    w_parser.add_argument("target", help="CSV file to write")
+    w_parser.add_argument("--source", nargs="+", default=[],
+                          help="tasks files or backups (.json.gz) to read (by default, my tasks and archives of "
+                               "the data directory and workspace of ptt_config.ini)")
+    w_parser.add_argument("--period", choices=list(glb_report_periods), default="month", help="period of the totals")
+    w_parser.add_argument("--from", dest="date_from", type=parse_date_argument, help="1st day reported")
+    w_parser.add_argument("--to", dest="date_to", type=parse_date_argument, help="last day reported")
+    w_parser.add_argument("--description", default="", help="text the description must contain (case insensitive)")
+    w_parser.add_argument("--workers", type=int, default=0, help="number of processes (number of CPUs by default)")
+    w_parser.add_argument("--all-workspaces", action="store_true",
+                          help="reports the tasks of all the workspaces of data (with a workspace column)")
+    w_args = w_parser.parse_args()
+
+    # Note : my files are read where PTT writes them (local cache, data directory and workspace of ptt_config.ini)
+    w_data_dir, w_workspace = read_config_storage()
+    w_workspace_dir = get_workspace_dir(w_data_dir, w_workspace)
+
+    if w_args.all_workspaces is True:
+        w_report_workspaces = list_workspaces_report_sources(w_data_dir)
+    else:
+        w_report_workspaces = [PttReportWorkspace(glb_workspace_default, w_args.source or list_report_sources(
+            os.path.join(w_workspace_dir, "my_tasks.json"), os.path.join(w_workspace_dir, "archives")))]
+    w_source_paths = [w_file_path for w_report_workspace in w_report_workspaces
+                      for w_file_path in w_report_workspace.file_paths]
+
+    try:
+        w_totals = report_workspaces(w_report_workspaces, w_args.target,
+                                     PttExportFilter(w_args.date_from, w_args.date_to, w_args.description),
+                                     w_args.period, w_args.workers, p_workspace_column=w_args.all_workspaces)
+    except PttReportError as w_error:
+        print("ptt_report : {}".format(w_error), file=sys.stderr)
+        sys.exit(1)
+
+    for w_report_error in w_totals.errors:
+        print("ptt_report : {}".format(w_report_error), file=sys.stderr)
+
+    print("{} task(s) of {} file(s) reported in '{}'".format(w_totals.nbr_tasks, len(w_source_paths), w_args.target))
@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_simulator.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : headless soak simulator, months of tracking in accelerated time
+* - A PttSimulatedClock is installed before importing ptt_main.py, so all the timers of
+*   PTT (active task, ptt.lock, backups...) are fired by the simulated time only
+* - A scripted user starts PTT in the morning of the working days, adds, activates, edits
+*   (with the edit window or in the list), merges and deletes tasks during the day, then
+*   quits (or forgets PTT running all night, or "crashes" without removing ptt.lock)
+* - Everything is done in a temporary folder (copy of /ui, empty /data unless --tasks-file)
+* - The popups are answered "Yes" automatically and counted
+* - Reported for each period : tasks file size, save latency (each tick of the active task
+*   saves my tasks), ptt.lock writes, resident memory, 8h tasks and splits depth
+* --------------------------------------------------------------------------------- *
+To simulate 6 months, go in the ptt (root) folder then :
+python ptt_simulator.py --months 6
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import sys
+import time
+import random
+import shutil
+import datetime
+import argparse
+import tempfile
+import importlib
+from ptt_clock import PttSimulatedClock, install_ptt_clock
+from ptt_bench import print_table
+from ptt_memory import get_resident_memory_in_kb
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# 1st simulated day (a monday)
+glb_simulator_start = datetime.datetime(2020, 1, 6, 7, 0)
+
+# Probabilities of the scripted user's end of day
+glb_simulator_forgotten_probability = 0.05
+glb_simulator_crash_probability = 0.03
+
+# Weights of the actions of the scripted user during the day
+glb_simulator_actions = [("add", 35), ("add_again", 25), ("activate", 20), ("edit", 4), ("inline_edit", 4),
+                         ("merge", 6), ("delete", 6)]
+
+# Descriptions of the simulated tasks
+glb_simulator_topics = ["Analyse", "Développement", "Réunion", "Support client", "Recette", "Documentation"]
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttSimulatorStats : measures of a period (reset by each report)
+class PttSimulatorStats:
+    def __init__(self):
+        self.save_durations_in_msec = []
+        self.nbr_lock_writes = 0
+        self.nbr_popups = 0
+        self.nbr_actions = 0
+        self.max_split_depth = 0
+
+
+# Class PttSimulator : scripted user driving ptt_main.py with a simulated clock
+class PttSimulator:
+    def __init__(self, p_ptt_main, p_clock: PttSimulatedClock, p_seed: int):
+        self.ptt_main = p_ptt_main
+        self.clock = p_clock
+        self.random = random.Random(p_seed)
+        self.stats = PttSimulatorStats()
+        self.split_depth = 0
+        self.next_ticket = 1000
+        self.ptt_running = False
+        self.started = False
+
+        # Measuring the saves and the splits of the active task, answering the popups
+        w_save_tasks_to_file = p_ptt_main.save_tasks_to_file
+        w_add_duration_to_task_at_row = p_ptt_main.add_duration_to_task_at_row
+
+        def timed_save_tasks_to_file():
+            w_time_start = time.perf_counter()
+            w_save_tasks_to_file()
+            self.stats.save_durations_in_msec.append(1000 * (time.perf_counter() - w_time_start))
+
+        def measured_add_duration_to_task_at_row(p_row: int, p_duration_to_add_in_secs: int):
+            self.split_depth = self.split_depth + 1
+            self.stats.max_split_depth = max(self.stats.max_split_depth, self.split_depth)
+            try:
+                w_add_duration_to_task_at_row(p_row, p_duration_to_add_in_secs)
+            finally:
+                self.split_depth = self.split_depth - 1
+
+        def popup_answered(*p_args):
+            self.stats.nbr_popups = self.stats.nbr_popups + 1
+            return True
+
+        p_ptt_main.save_tasks_to_file = timed_save_tasks_to_file
+        p_ptt_main.add_duration_to_task_at_row = measured_add_duration_to_task_at_row
+        p_ptt_main.warning_popup_yes_no = popup_answered
+        p_ptt_main.error_popup_ok = popup_answered
+        p_ptt_main.info_popup_ok = popup_answered
+        p_ptt_main.glb_ptt_lock_timer.timeout.connect(self.count_lock_write)
+
+        # The timers started at import are stopped until the 1st start of PTT by the scripted user
+        p_ptt_main.glb_active_task_timer.stop()
+        p_ptt_main.glb_ptt_lock_timer.stop()
+        p_ptt_main.glb_backup_timer.stop()
+
+    # Method count_lock_write : counts the writes of ptt.lock made by its timer
+    def count_lock_write(self):
+        self.stats.nbr_lock_writes = self.stats.nbr_lock_writes + 1
+
+    # Method start_ptt : starts PTT like at the application startup (the 1st time) or a restart (the next times)
+    def start_ptt(self, p_first_start: bool):
+
+        w_ptt_main = self.ptt_main
+
+        # Note : returns False if PTT refused to start (ptt.lock still refreshed)
+        if w_ptt_main.ptt_start_allowed() is False:
+            print("{} : PTT refused to start (ptt.lock)".format(self.clock.now()), file=sys.stderr)
+            return False
+
+        self.stats.nbr_lock_writes = self.stats.nbr_lock_writes + 1
+
+        if p_first_start is True:
+            w_ptt_main.init_ptt_main_window()
+        else:
+            w_ptt_main.ptt_main_dlg.lst_tasks.setRowCount(0)
+            w_ptt_main.glb_ptt_undo_stack.clear()
+            w_ptt_main.load_tasks_from_file()
+            w_ptt_main.add_new_task(w_ptt_main.glb_new_task_at_startup)
+
+        w_ptt_main.glb_active_task_timer.start(w_ptt_main.glb_timer_interval_in_msec)
+        w_ptt_main.glb_ptt_lock_timer.start(w_ptt_main.glb_timer_ptt_lock_interval_in_msec)
+        w_ptt_main.glb_backup_timer.start(w_ptt_main.glb_timer_backup_interval_in_msec)
+        w_ptt_main.glb_ptt_task_events.flush()
+        self.ptt_running = True
+        self.started = True
+        return True
+
+    # Method quit_ptt : quits PTT like at the application exit (or crashes, ptt.lock being kept)
+    def quit_ptt(self, p_crash: bool):
+
+        w_ptt_main = self.ptt_main
+
+        w_ptt_main.glb_active_task_timer.stop()
+        w_ptt_main.glb_ptt_lock_timer.stop()
+        w_ptt_main.glb_backup_timer.stop()
+
+        if p_crash is False:
+            w_ptt_main.glb_ptt_task_events.flush()
+            w_ptt_main.save_day_totals()
+            w_ptt_main.ptt_config.flush()
+            w_ptt_main.glb_ptt_backup_manager.wait()
+            w_ptt_main.remove_ptt_lock()
+
+        self.ptt_running = False
+
+    # Method select_rows : selects the rows received in the list
+    def select_rows(self, p_rows: list):
+
+        from PyQt5.QtCore import QItemSelectionModel
+
+        w_lst_tasks = self.ptt_main.ptt_main_dlg.lst_tasks
+        w_lst_tasks.clearSelection()
+        for w_row in p_rows:
+            w_lst_tasks.selectionModel().select(w_lst_tasks.model().index(w_row, 0),
+                                                QItemSelectionModel.Select | QItemSelectionModel.Rows)
+
+    # Method new_description : description of a new ticket, or of a recent one
+    def new_description(self, p_again: bool):
+
+        if p_again is True and self.next_ticket > 1000:
+            w_ticket = self.random.randint(max(1000, self.next_ticket - 30), self.next_ticket - 1)
+        else:
+            w_ticket = self.next_ticket
+            self.next_ticket = self.next_ticket + 1
+
+        return "TICKET-{} : {}".format(w_ticket, glb_simulator_topics[w_ticket % len(glb_simulator_topics)])
+
+    # Method run_action : one action of the scripted user
+    def run_action(self):
+
+        w_ptt_main = self.ptt_main
+        w_nbr_rows = w_ptt_main.ptt_main_dlg.lst_tasks.rowCount()
+        w_action = self.random.choices([w_name for w_name, w_weight in glb_simulator_actions],
+                                       [w_weight for w_name, w_weight in glb_simulator_actions])[0]
+        self.stats.nbr_actions = self.stats.nbr_actions + 1
+
+        if w_action in ["add", "add_again"] or w_nbr_rows < 3:
+            w_ptt_main.add_new_task(self.new_description(w_action == "add_again"))
+
+        elif w_action == "activate":
+            w_ptt_main.change_active_task(self.random.randint(1, min(20, w_nbr_rows - 1)), 0)
+
+        elif w_action == "edit":
+            w_row = self.random.randint(1, min(50, w_nbr_rows - 1))
+            w_cell0_text, w_cell1_text, w_cell2_text = w_ptt_main.get_lst_tasks_row_cells(w_row)
+            w_ptt_main.update_task_after_edit(w_row, w_cell0_text, "{:02d}:{:02d}".format(
+                self.random.randint(0, 3), self.random.choice([0, 15, 30, 45])), w_cell2_text)
+
+        elif w_action == "inline_edit":
+            w_row = self.random.randint(1, min(50, w_nbr_rows - 1))
+            w_ptt_main.update_task_after_inline_edit(w_row, 1, "{:02d}:{:02d}".format(
+                self.random.randint(0, 3), self.random.choice([0, 15, 30, 45])))
+
+        elif w_action == "merge":
+            w_row = self.random.randint(1, min(30, w_nbr_rows - 2))
+            self.select_rows([w_row, w_row + 1])
+            w_ptt_main.merge_selected_tasks()
+
+        elif w_action == "delete":
+            self.select_rows([self.random.randint(1, min(30, w_nbr_rows - 1))])
+            w_ptt_main.delete_selected_tasks()
+
+        # End of the event loop turn : the changes are delivered (saved...)
+        w_ptt_main.glb_ptt_task_events.flush()
+
+    # Method run_day : one simulated day (nothing is done on the week-ends, except if PTT was forgotten)
+    # Note : p_first_day is True until the 1st start of PTT (then it's only restarted)
+    def run_day(self, p_first_day: bool):
+
+        w_day_start = self.clock.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        if w_day_start.weekday() < 5:
+
+            # Arriving between 8:00 and 9:00
+            self.advance_until(w_day_start + datetime.timedelta(hours=8, minutes=self.random.randint(0, 60)))
+            if self.ptt_running is False and self.start_ptt(p_first_day) is False:
+                self.advance_until(w_day_start + datetime.timedelta(days=1))
+                return
+
+            # Working until 17:00 - 19:00, an action every 5 to 90 minutes
+            w_day_end = w_day_start + datetime.timedelta(hours=17, minutes=self.random.randint(0, 120))
+            while self.clock.now() < w_day_end:
+                self.advance_until(min(w_day_end, self.clock.now() + datetime.timedelta(
+                    minutes=self.random.randint(5, 90))))
+                self.run_action()
+
+            # Leaving : quitting PTT, or forgetting it running, or a crash
+            w_random = self.random.random()
+            if w_random >= glb_simulator_forgotten_probability:
+                self.quit_ptt(w_random < glb_simulator_forgotten_probability + glb_simulator_crash_probability)
+
+        self.advance_until(w_day_start + datetime.timedelta(days=1))
+
+    # Method advance_until : moves the simulated time forward, the timers of PTT being fired meanwhile
+    def advance_until(self, p_datetime: datetime.datetime):
+        if p_datetime > self.clock.now():
+            self.clock.advance((p_datetime - self.clock.now()).total_seconds())
+
+    # Method report_row : measures of the latest period, then the measures are reset
+    def report_row(self):
+
+        w_ptt_main = self.ptt_main
+        w_lst_tasks = w_ptt_main.ptt_main_dlg.lst_tasks
+        w_save_durations = sorted(self.stats.save_durations_in_msec) or [0]
+        w_nbr_8h_tasks = sum(1 for w_row in range(w_lst_tasks.rowCount())
+                             if w_lst_tasks.item(w_row, 1).text() == "08:00")
+
+        try:
+            w_file_size_in_kb = os.path.getsize(w_ptt_main.ptt_files.my_tasks_json) // 1024
+        except OSError:
+            w_file_size_in_kb = 0
+
+        w_row = [(self.clock.now() - datetime.timedelta(days=1)).strftime("%d/%m/%Y"), w_lst_tasks.rowCount(),
+                 w_file_size_in_kb, len(self.stats.save_durations_in_msec),
+                 "{:.1f}".format(w_save_durations[len(w_save_durations) // 2]),
+                 "{:.1f}".format(w_save_durations[int(len(w_save_durations) * 0.95)]),
+                 "{:.1f}".format(w_save_durations[-1]), self.stats.nbr_lock_writes, self.stats.nbr_popups,
+                 w_nbr_8h_tasks, self.stats.max_split_depth, len(w_ptt_main.glb_ptt_backup_manager.list_generations()),
+                 "{:.1f}".format(get_resident_memory_in_kb() / 1024)]
+
+        self.stats = PttSimulatorStats()
+        return w_row
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function prepare_work_dir : creates the folder of the simulation (copy of /ui, /data with the tasks file if any)
+def prepare_work_dir(p_work_dir: str, p_tasks_file: str):
+
+    w_ptt_dir = os.path.dirname(os.path.abspath(__file__))
+    shutil.copytree(os.path.join(w_ptt_dir, "ui"), os.path.join(p_work_dir, "ui"))
+    os.makedirs(os.path.join(p_work_dir, "data"))
+
+    if p_tasks_file != "":
+        shutil.copyfile(p_tasks_file, os.path.join(p_work_dir, "data", "my_tasks.json"))
+
+
+# Function run_simulation : simulates the number of days received and prints a report every p_report_days days
+def run_simulation(p_nbr_days: int, p_report_days: int, p_seed: int, p_tasks_file: str):
+
+    # The simulated clock must be installed before ptt_main is imported (its timers are created at import)
+    w_clock = PttSimulatedClock(glb_simulator_start)
+    install_ptt_clock(w_clock)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    w_rows = []
+    w_time_start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as w_work_dir:
+
+        prepare_work_dir(w_work_dir, p_tasks_file)
+        os.chdir(w_work_dir)
+
+        w_ptt_main = importlib.import_module("ptt_main")
+        w_simulator = PttSimulator(w_ptt_main, w_clock, p_seed)
+
+        for w_day in range(p_nbr_days):
+
+            w_simulator.run_day(w_simulator.started is False)
+
+            if (w_day + 1) % p_report_days == 0 or w_day + 1 == p_nbr_days:
+                w_rows.append(w_simulator.report_row())
+                print("... {} day(s) simulated in {:.0f} s".format(w_day + 1, time.perf_counter() - w_time_start),
+                      file=sys.stderr)
+
+        if w_simulator.ptt_running is True:
+            w_simulator.quit_ptt(False)
+
+        w_ptt_main.glb_ptt_backup_manager.wait()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print_table(["period end", "tasks", "file (KB)", "saves", "save p50 (ms)", "save p95 (ms)", "save max (ms)",
+                 "lock writes", "popups", "8h tasks", "split depth", "backups", "memory (MB)"], w_rows)
+    print("{} day(s) simulated in {:.1f} s".format(p_nbr_days, time.perf_counter() - w_time_start))
+
+
+# ------------------------------------------- #
+# Main
+# ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    w_parser = argparse.ArgumentParser(description="PTT soak simulator (accelerated clock, scripted user)")
+    w_parser.add_argument("--months", type=int, default=6, help="number of simulated months (30 days each)")
+    w_parser.add_argument("--days", type=int, default=0, help="number of simulated days (instead of --months)")
+    w_parser.add_argument("--report-days", type=int, default=7, help="number of days of each report period")
+    w_parser.add_argument("--seed", type=int, default=2020, help="seed of the scripted user")
+    w_parser.add_argument("--tasks-file", default="", help="my_tasks.json to start with (copied, never modified)")
+    w_args = w_parser.parse_args()
+
+    run_simulation(w_args.days or 30 * w_args.months, w_args.report_days, w_args.seed, w_args.tasks_file)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_startup_profiler.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : profile of the startup of PTT (ptt_main.py --profile-startup)
+* - Each phase of the startup (imports, Qt windows, loading of my tasks...) is timed with
+*   perf_counter_ns, the phases can contain other phases
+* - The imports of ptt_main.py are timed module by module : builtins.__import__ is wrapped
+*   until the end of the imports (only the imports loading new modules are kept)
+* - The profiles of the latest startups are kept in ptt_startup_profile.json (the latest
+*   one last), so a slower startup can be compared with the previous ones
+* - Without --profile-startup, nothing is timed nor written (the calls do nothing)
+* - No dependency on PyQt5 (imported before it, to time its import)
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import sys
+import json
+import time
+import builtins
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Argument of ptt_main.py profiling the startup
+glb_profile_startup_argument = "--profile-startup"
+
+# Version of the ptt_startup_profile.json file (the profiles of another version are dropped)
+glb_startup_profile_version = 1
+
+# Number of startup profiles kept in ptt_startup_profile.json
+glb_startup_profiles_kept = 20
+
+# Number of the slowest imports (by their own time) listed in the summary of a profile
+glb_startup_top_imports = 10
+
+# Number of the submodules imported with "from ... import" shown in the name of an import
+glb_startup_import_submodules_shown = 3
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttStartupPhase : a phase of the startup (start and duration in ns, since the profiler was created)
+class PttStartupPhase:
+    def __init__(self, p_name: str, p_depth: int, p_start_in_ns: int):
+        self.name = p_name
+        self.depth = p_depth
+        self.start_in_ns = p_start_in_ns
+        self.duration_in_ns = 0
+
+
+# Class PttImportTiming : an import loading new modules (its total time, and its own time without the imports it made)
+class PttImportTiming:
+    def __init__(self, p_name: str, p_depth: int):
+        self.name = p_name
+        self.depth = p_depth
+        self.nbr_modules = 0
+        self.total_in_ns = 0
+        self.self_in_ns = 0
+
+
+# Class PttStartupProfiler : times the phases of the startup and the imports, then writes the profile
+class PttStartupProfiler:
+    def __init__(self, p_enabled: bool):
+        self.enabled = p_enabled
+        self.origin_in_ns = time.perf_counter_ns()
+        self.phases = []
+        self.open_phases = []
+        self.imports = []
+        self.import_children_in_ns = []
+        self.original_import = None
+
+        # Timing the imports from now on (until stop_import_trace)
+        if self.enabled:
+            self.original_import = builtins.__import__
+            builtins.__import__ = self.timed_import
+
+    # Method timed_import : imports like builtins.__import__, timing the imports loading new modules
+    def timed_import(self, p_name, p_globals=None, p_locals=None, p_fromlist=(), p_level=0):
+
+        w_nbr_modules = len(sys.modules)
+        self.import_children_in_ns.append(0)
+        w_time_start = time.perf_counter_ns()
+
+        try:
+            return self.original_import(p_name, p_globals, p_locals, p_fromlist, p_level)
+
+        finally:
+            w_total_in_ns = time.perf_counter_ns() - w_time_start
+            w_children_in_ns = self.import_children_in_ns.pop()
+
+            # Note : the imports of modules already loaded are not kept (their time stays in their parent's own time)
+            if len(sys.modules) > w_nbr_modules:
+                w_import_timing = PttImportTiming(get_import_name(p_name, p_globals, p_fromlist, p_level),
+                                                  len(self.import_children_in_ns))
+                w_import_timing.nbr_modules = len(sys.modules) - w_nbr_modules
+                w_import_timing.total_in_ns = w_total_in_ns
+                w_import_timing.self_in_ns = w_total_in_ns - w_children_in_ns
+                self.imports.append(w_import_timing)
+
+                if self.import_children_in_ns:
+                    self.import_children_in_ns[-1] = self.import_children_in_ns[-1] + w_total_in_ns
+
+    # Method stop_import_trace : stops timing the imports (the imports made later, in the functions, are not timed)
+    def stop_import_trace(self):
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+    # Method start_phase : starts a phase (inside the phases started and not ended yet)
+    def start_phase(self, p_name: str):
+        if self.enabled:
+            w_phase = PttStartupPhase(p_name, len(self.open_phases), time.perf_counter_ns() - self.origin_in_ns)
+            self.phases.append(w_phase)
+            self.open_phases.append(w_phase)
+
+    # Method end_phase : ends the latest phase started
+    def end_phase(self):
+        if self.enabled and self.open_phases:
+            w_phase = self.open_phases.pop()
+            w_phase.duration_in_ns = time.perf_counter_ns() - self.origin_in_ns - w_phase.start_in_ns
+
+    # Method build_profile : returns the profile of the startup (a dict, as saved in ptt_startup_profile.json)
+    # Note : the imports are listed in the order they ended (the imports made by a module before the module itself)
+    def build_profile(self, p_now, p_nbr_tasks: int):
+
+        w_total_in_ns = time.perf_counter_ns() - self.origin_in_ns
+        w_phases_in_ns = sum(w_phase.duration_in_ns for w_phase in self.phases if w_phase.depth == 0)
+
+        return {
+            "started_on": p_now.strftime("%d/%m/%Y %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "frozen": getattr(sys, "frozen", False),
+            "nbr_tasks": p_nbr_tasks,
+            "total_ms": ns_to_ms(w_total_in_ns),
+            "other_ms": ns_to_ms(w_total_in_ns - w_phases_in_ns),
+            "phases": [{"name": w_phase.name, "depth": w_phase.depth, "start_ms": ns_to_ms(w_phase.start_in_ns),
+                        "duration_ms": ns_to_ms(w_phase.duration_in_ns)} for w_phase in self.phases],
+            "imports": [{"name": w_import.name, "depth": w_import.depth, "nbr_modules": w_import.nbr_modules,
+                         "total_ms": ns_to_ms(w_import.total_in_ns), "self_ms": ns_to_ms(w_import.self_in_ns)}
+                        for w_import in self.imports]}
+
+    # Method write_profile : adds the profile of this startup to the profiles file, returns it with the previous one
+    # (None if it's the 1st profile)
+    def write_profile(self, p_profiles_json: str, p_now, p_nbr_tasks: int):
+
+        w_profile = self.build_profile(p_now, p_nbr_tasks)
+        w_profiles = load_startup_profiles(p_profiles_json)
+        w_previous_profile = w_profiles[-1] if w_profiles else None
+
+        w_profiles = (w_profiles + [w_profile])[-glb_startup_profiles_kept:]
+
+        # Note : written in a temporary file first, so the profiles are never half written
+        w_profiles_json_tmp = p_profiles_json + ".tmp"
+        with open(w_profiles_json_tmp, "w", encoding="utf-8") as file:
+            json.dump({"version": glb_startup_profile_version, "profiles": w_profiles}, file, indent=4)
+        os.replace(w_profiles_json_tmp, p_profiles_json)
+
+        return w_profile, w_previous_profile
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function get_import_name : returns the name of the module imported (absolute), with its submodules imported by
+# "from ... import" if any
+def get_import_name(p_name: str, p_globals, p_fromlist, p_level: int):
+
+    w_name = p_name
+
+    # Relative import : the name is completed with the package of the module importing it
+    if p_level > 0 and p_globals is not None:
+        w_package = p_globals.get("__package__") or p_globals.get("__name__", "").rpartition(".")[0]
+        w_package = w_package.rsplit(".", p_level - 1)[0] if p_level > 1 else w_package
+        w_name = w_package + "." + p_name if p_name else w_package
+
+    w_submodules = [w_item for w_item in (p_fromlist or ()) if w_name + "." + w_item in sys.modules]
+    if not w_submodules:
+        return w_name
+
+    return "{} ({}{})".format(w_name, ", ".join(w_submodules[:glb_startup_import_submodules_shown]),
+                              ", ..." if len(w_submodules) > glb_startup_import_submodules_shown else "")
+
+
+# Function ns_to_ms : converts a duration in ns into ms (rounded to 0.01 ms)
+def ns_to_ms(p_duration_in_ns: int):
+    return round(p_duration_in_ns / 1000000, 2)
+
+
+# Function load_startup_profiles : returns the profiles saved in the profiles file (the latest one last)
+def load_startup_profiles(p_profiles_json: str):
+
+    try:
+        with open(p_profiles_json, "r", encoding="utf-8") as file:
+            w_profiles_data = json.load(file)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError):
+        print("load_startup_profiles : cannot read the '{}' file".format(p_profiles_json))
+        return []
+
+    if not isinstance(w_profiles_data, dict) or w_profiles_data.get("version") != glb_startup_profile_version or \
+            not isinstance(w_profiles_data.get("profiles"), list):
+        return []
+
+    return w_profiles_data["profiles"]
+
+
+# Function get_slowest_phase : returns the slowest phase of a profile, at the top level (None if there is none)
+def get_slowest_phase(p_profile: dict):
+
+    w_phases = [w_phase for w_phase in p_profile["phases"] if w_phase["depth"] == 0]
+    if not w_phases:
+        return None
+
+    return max(w_phases, key=lambda p_phase: p_phase["duration_ms"])
+
+
+# Function format_startup_profile : returns the summary of a profile as text (phases, then the slowest imports)
+def format_startup_profile(p_profile: dict, p_previous_profile: dict = None):
+
+    w_lines = ["PTT startup profile - {} ({} task(s), Python {}{})".format(
+        p_profile["started_on"], p_profile["nbr_tasks"], p_profile["python"],
+        ", frozen" if p_profile["frozen"] else "")]
+
+    w_lines.append("Total : {:.2f} ms{}".format(p_profile["total_ms"], "" if p_previous_profile is None else
+                                                 " (previous startup : {:.2f} ms)".format(
+                                                     p_previous_profile["total_ms"])))
+
+    w_lines = w_lines + ["", "Phases (ms)"]
+    for w_phase in p_profile["phases"]:
+        w_lines.append("{:>10.2f}  {}{}".format(w_phase["duration_ms"], "  " * w_phase["depth"], w_phase["name"]))
+    w_lines.append("{:>10.2f}  {}".format(p_profile["other_ms"], "(other)"))
+
+    w_lines = w_lines + ["", "Slowest imports of ptt_main.py, with their imports (ms)"]
+    for w_import in sorted([w_import for w_import in p_profile["imports"] if w_import["depth"] == 0],
+                           key=lambda p_import: p_import["total_ms"], reverse=True)[:glb_startup_top_imports]:
+        w_lines.append("{:>10.2f}  {} ({} module(s))".format(w_import["total_ms"], w_import["name"],
+                                                             w_import["nbr_modules"]))
+
+    w_lines = w_lines + ["", "Slowest imports, own time (ms)"]
+    for w_import in sorted(p_profile["imports"], key=lambda p_import: p_import["self_ms"],
+                           reverse=True)[:glb_startup_top_imports]:
+        w_lines.append("{:>10.2f}  {} ({} module(s), {:.2f} ms with its imports)".format(
+            w_import["self_ms"], w_import["name"], w_import["nbr_modules"], w_import["total_ms"]))
+
+    return "\n".join(w_lines)
+
+
+# ------------------------------------------- #
+# Main
+# ------------------------------------------- #
+
+# Displays the summary of the latest startup profiles saved (python ptt_startup_profiler.py [profiles file] [--all])
+if __name__ == "__main__":
+
+    w_arguments = [w_argument for w_argument in sys.argv[1:] if w_argument != "--all"]
+    w_profiles = load_startup_profiles(w_arguments[0] if w_arguments else os.path.join("data",
+                                                                                       "ptt_startup_profile.json"))
+
+    if not w_profiles:
+        print("No startup profile found (start PTT with ptt_main.py {})".format(glb_profile_startup_argument))
+        sys.exit(1)
+
+    w_nbr_profiles = len(w_profiles) if "--all" in sys.argv[1:] else 1
+    for w_index in range(len(w_profiles) - w_nbr_profiles, len(w_profiles)):
+        print(format_startup_profile(w_profiles[w_index], w_profiles[w_index - 1] if w_index > 0 else None))
+        print()
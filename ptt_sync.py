@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_sync.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : client side of the delta-based synchronization between machines
+* - Each task record gets a stable "task_id" and a version [device_id, counter, modified_at]
+* - Each device keeps a version vector {device_id: highest counter known}
+* - Only the records changed since the version vector are exchanged with the server
+* - Concurrent edits are solved with a last-writer-wins rule (modified_at, then device_id)
+* - No dependency on PyQt5, so it can also be used by ptt_sync_server.py
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import json
+import uuid
+import socket
+from ptt_clock import get_ptt_clock
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Default location of the sync server (local socket) and network settings
+glb_sync_default_host = "127.0.0.1"
+glb_sync_default_port = 47201
+glb_sync_socket_timeout_in_sec = 10
+
+# Protocol version sent in each request (the server refuses the unknown ones)
+glb_sync_protocol_version = 1
+
+# Datetime format of the "modified_at" part of a version (sortable as a string)
+glb_sync_modified_at_format = "%Y%m%d%H%M%S%f"
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttSyncError : raised when the synchronization with the server fails
+class PttSyncError(Exception):
+    pass
+
+
+# Class PttSyncResult : contains the task ids changed locally by a synchronization
+class PttSyncResult:
+    def __init__(self):
+        self.added_task_ids = []
+        self.updated_task_ids = []
+        self.removed_task_ids = []
+        self.nbr_changes_sent = 0
+        self.nbr_changes_received = 0
+
+
+# Class PttSyncState : versions of the local task records and version vector of the device
+class PttSyncState:
+    def __init__(self, p_sync_json: str):
+        self.sync_json = p_sync_json
+        self.device_id = ""
+        self.counter = 0
+        self.version_vector = {}
+        self.pending_task_ids = set()
+        self.tombstones = {}
+        self.entries = {}
+        self.dirty = False
+
+    # Method load : loads the device id, version vector, pending changes and tombstones from the sync file
+    def load(self):
+
+        # Miscellaneous initializations
+        w_sync_data = {}
+
+        # Trying to read the sync file (it doesn't exist before the 1st save)
+        try:
+            with open(self.sync_json, "r", encoding="utf-8") as file:
+                w_sync_data = json.load(file)
+        except FileNotFoundError:
+            pass
+        except (IOError, ValueError):
+            print("PttSyncState.load : error while reading the '{}' file".format(self.sync_json))
+
+        self.device_id = w_sync_data.get("device_id", "")
+        self.counter = w_sync_data.get("counter", 0)
+        self.version_vector = w_sync_data.get("version_vector", {})
+        self.pending_task_ids = set(w_sync_data.get("pending_task_ids", []))
+        self.tombstones = w_sync_data.get("tombstones", {})
+
+        # A new device id is generated the very first time
+        if self.device_id == "":
+            self.device_id = uuid.uuid4().hex
+            self.dirty = True
+
+    # Method save : saves the sync file if something changed since the latest save
+    def save(self):
+
+        if self.dirty is True:
+
+            w_sync_data = {
+                "device_id": self.device_id,
+                "counter": self.counter,
+                "version_vector": self.version_vector,
+                "pending_task_ids": sorted(self.pending_task_ids),
+                "tombstones": self.tombstones}
+
+            try:
+                with open(self.sync_json, "w", encoding="utf-8") as file:
+                    json.dump(w_sync_data, file, indent=4, ensure_ascii=False)
+                self.dirty = False
+            except IOError:
+                print("PttSyncState.save : cannot write in the '{}' file".format(self.sync_json))
+
+    # Method new_version : stamps a new local version (the counter is increased for each change)
+    def new_version(self):
+        self.counter = self.counter + 1
+        self.version_vector[self.device_id] = self.counter
+        self.dirty = True
+        return [self.device_id, self.counter, get_ptt_clock().now().strftime(glb_sync_modified_at_format)]
+
+    # Method load_records : memorizes the versions of the records loaded from the tasks file
+    def load_records(self, p_task_records: list):
+
+        self.entries = {}
+
+        for w_task_record in p_task_records:
+
+            # Records saved without version (older files) will be stamped as changed at the next save
+            w_version = w_task_record.get("version")
+            if w_version is None:
+                self.entries[w_task_record["task_id"]] = (None, None)
+            else:
+                self.entries[w_task_record["task_id"]] = (task_fingerprint(w_task_record), w_version)
+
+    # Method track_records : stamps the records changed since the latest save and the deleted ones
+    def track_records(self, p_task_records: list):
+
+        # Note : the records are updated "in place" with their "version" key
+        w_seen_task_ids = set()
+
+        for w_task_record in p_task_records:
+            w_seen_task_ids.add(w_task_record["task_id"])
+            self.track_record(w_task_record)
+
+        # The records which disappeared are turned into tombstones
+        for w_task_id in [w_id for w_id in self.entries if w_id not in w_seen_task_ids]:
+            del self.entries[w_task_id]
+            self.tombstones[w_task_id] = self.new_version()
+            self.pending_task_ids.add(w_task_id)
+
+    # Method track_record : stamps a record if it changed since the latest save (a record saved alone, see track_records)
+    def track_record(self, p_task_record: dict):
+
+        # Note : the record is updated "in place" with its "version" key
+        w_task_id = p_task_record["task_id"]
+        w_fingerprint = task_fingerprint(p_task_record)
+        w_entry = self.entries.get(w_task_id)
+
+        if w_entry is None or w_entry[0] != w_fingerprint:
+
+            # New or modified record (or restored after a deletion)
+            w_version = self.new_version()
+            self.entries[w_task_id] = (w_fingerprint, w_version)
+            self.tombstones.pop(w_task_id, None)
+            self.pending_task_ids.add(w_task_id)
+            p_task_record["version"] = w_version
+
+        else:
+            p_task_record["version"] = w_entry[1]
+
+    # Method local_changes : returns the changes not yet sent to the server
+    def local_changes(self, p_records_by_id: dict):
+
+        # Miscellaneous initializations
+        w_changes = []
+
+        for w_task_id in sorted(self.pending_task_ids):
+
+            if w_task_id in self.tombstones:
+                w_changes.append({"task_id": w_task_id, "version": self.tombstones[w_task_id], "deleted": True})
+
+            elif w_task_id in p_records_by_id and w_task_id in self.entries:
+                w_task_record = p_records_by_id[w_task_id]
+                w_changes.append({
+                    "task_id": w_task_id,
+                    "version": self.entries[w_task_id][1],
+                    "deleted": False,
+                    "started_on": w_task_record["started_on"],
+                    "duration": w_task_record["duration"],
+                    "description": w_task_record["description"]})
+
+        return w_changes
+
+    # Method apply_remote_changes : applies the changes received from the server (last writer wins)
+    def apply_remote_changes(self, p_records_by_id: dict, p_changes: list, p_sync_result: PttSyncResult):
+
+        for w_change in p_changes:
+
+            w_task_id = w_change["task_id"]
+            w_remote_version = w_change["version"]
+
+            # Retrieving the local version of the record (alive or deleted)
+            if w_task_id in self.entries:
+                w_local_version = self.entries[w_task_id][1]
+            else:
+                w_local_version = self.tombstones.get(w_task_id)
+
+            # Updating the version vector with the remote device counter
+            w_device_id = w_remote_version[0]
+            if w_remote_version[1] > self.version_vector.get(w_device_id, 0):
+                self.version_vector[w_device_id] = w_remote_version[1]
+                self.dirty = True
+
+            # The local version is kept if it's the latest one
+            if version_wins(w_remote_version, w_local_version) is False:
+                continue
+
+            self.pending_task_ids.discard(w_task_id)
+            self.dirty = True
+
+            if w_change.get("deleted", False) is True:
+
+                # Remote deletion
+                self.tombstones[w_task_id] = w_remote_version
+                if w_task_id in self.entries:
+                    del self.entries[w_task_id]
+                if w_task_id in p_records_by_id:
+                    del p_records_by_id[w_task_id]
+                    p_sync_result.removed_task_ids.append(w_task_id)
+
+            else:
+
+                # Remote creation or modification
+                w_task_record = {
+                    "task_id": w_task_id,
+                    "started_on": w_change["started_on"],
+                    "duration": w_change["duration"],
+                    "description": w_change["description"],
+                    "version": w_remote_version}
+
+                if w_task_id in p_records_by_id:
+                    p_sync_result.updated_task_ids.append(w_task_id)
+                else:
+                    p_sync_result.added_task_ids.append(w_task_id)
+
+                p_records_by_id[w_task_id] = w_task_record
+                self.entries[w_task_id] = (task_fingerprint(w_task_record), w_remote_version)
+                self.tombstones.pop(w_task_id, None)
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function new_task_id : generates a new stable task id
+def new_task_id():
+    return uuid.uuid4().hex
+
+
+# Function task_fingerprint : returns the value used to detect if a task record was changed
+def task_fingerprint(p_task_record: dict):
+    return cells_fingerprint(p_task_record["started_on"], p_task_record["duration"], p_task_record["description"])
+
+
+# Function cells_fingerprint : returns the value used to detect if the 3 texts of a task were changed
+# Note : only a hash is kept, so the texts of all the tasks are not held a 2nd time in memory
+def cells_fingerprint(p_started_on: str, p_duration: str, p_description: str):
+    return hash((p_started_on, p_duration, p_description))
+
+
+# Function version_wins : returns True if the version A must replace the version B (last writer wins)
+def version_wins(p_version_a: list, p_version_b: list):
+
+    # Any version wins against no version at all
+    if p_version_b is None:
+        return True
+
+    if p_version_a is None:
+        return False
+
+    # Versions are [device_id, counter, modified_at] : the latest modification wins, then the device id, then the counter
+    return (p_version_a[2], p_version_a[0], p_version_a[1]) > (p_version_b[2], p_version_b[0], p_version_b[1])
+
+
+# Function send_sync_message : sends one JSON message (one line) and returns the JSON answer (one line)
+def send_sync_message(p_host: str, p_port: int, p_message: dict):
+
+    try:
+        with socket.create_connection((p_host, p_port), timeout=glb_sync_socket_timeout_in_sec) as w_socket:
+
+            w_socket.sendall(json.dumps(p_message, ensure_ascii=False).encode("utf-8") + b"\n")
+
+            with w_socket.makefile("rb") as w_socket_file:
+                w_answer_line = w_socket_file.readline()
+
+    except OSError as w_error:
+        raise PttSyncError("cannot reach the sync server {}:{} ({})".format(p_host, p_port, w_error))
+
+    try:
+        w_answer = json.loads(w_answer_line.decode("utf-8"))
+    except ValueError:
+        raise PttSyncError("invalid answer received from the sync server {}:{}".format(p_host, p_port))
+
+    if "error" in w_answer:
+        raise PttSyncError("sync server error : {}".format(w_answer["error"]))
+
+    return w_answer
+
+
+# Function synchronize : exchanges the changes with the sync server and returns the merged task records
+def synchronize(p_sync_state: PttSyncState, p_task_records: list, p_host: str, p_port: int):
+
+    # Miscellaneous initializations
+    w_sync_result = PttSyncResult()
+
+    # Making sure the latest local changes are stamped before sending them
+    p_sync_state.track_records(p_task_records)
+    w_records_by_id = {w_task_record["task_id"]: w_task_record for w_task_record in p_task_records}
+
+    # Sending the local changes with our version vector, receiving the changes we don't know yet
+    w_local_changes = p_sync_state.local_changes(w_records_by_id)
+    w_answer = send_sync_message(p_host, p_port, {
+        "protocol": glb_sync_protocol_version,
+        "device_id": p_sync_state.device_id,
+        "version_vector": p_sync_state.version_vector,
+        "changes": w_local_changes})
+
+    # The server acknowledged our changes
+    for w_change in w_local_changes:
+        p_sync_state.pending_task_ids.discard(w_change["task_id"])
+
+    w_sync_result.nbr_changes_sent = len(w_local_changes)
+    w_sync_result.nbr_changes_received = len(w_answer["changes"])
+    p_sync_state.dirty = True
+
+    # Applying the remote changes
+    p_sync_state.apply_remote_changes(w_records_by_id, w_answer["changes"], w_sync_result)
+
+    # Catching up the counters the server knows (older versions which were already replaced)
+    for w_device_id, w_counter in w_answer["version_vector"].items():
+        if w_device_id != p_sync_state.device_id and w_counter > p_sync_state.version_vector.get(w_device_id, 0):
+            p_sync_state.version_vector[w_device_id] = w_counter
+
+    p_sync_state.save()
+
+    # Returning the sync result and the records (indexed by task id)
+    return w_sync_result, w_records_by_id
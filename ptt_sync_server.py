@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_sync_server.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : reference sync server, listening on a local socket (127.0.0.1 by default)
+* - One request = one JSON line, one answer = one JSON line
+* - The changes are appended to a journal (one JSON line per change), compacted at startup
+* - Each device has an index of its changes sorted by counter, so a request only reads
+*   the changes made after the version vector received (and not the whole history)
+* --------------------------------------------------------------------------------- *
+To run the server :
+python ptt_sync_server.py --port 47201 --journal data/ptt_sync_server.journal
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+from ptt_sync import glb_sync_default_host, glb_sync_default_port, glb_sync_protocol_version, version_wins
+import os
+import sys
+import json
+import bisect
+import argparse
+import threading
+import socketserver
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttSyncServerStore : latest version of each task record and per device indexes of the changes
+class PttSyncServerStore:
+    def __init__(self, p_journal: str):
+        self.journal = p_journal
+        self.records = {}
+        self.device_counters = {}
+        self.device_task_ids = {}
+        self.lock = threading.Lock()
+
+    # Method load : replays the journal then compacts it (only the latest version of each record is kept)
+    def load(self):
+
+        try:
+            with open(self.journal, "r", encoding="utf-8") as file:
+                for w_line in file:
+                    try:
+                        self.apply_change(json.loads(w_line))
+                    except (ValueError, KeyError):
+                        # A truncated last line (crash while appending) is ignored
+                        print("PttSyncServerStore.load : invalid line ignored in '{}'".format(self.journal))
+        except FileNotFoundError:
+            pass
+
+        # Rewriting the journal and the indexes with the latest versions only
+        w_journal_tmp = self.journal + ".tmp"
+        with open(w_journal_tmp, "w", encoding="utf-8") as file:
+            for w_change in self.records.values():
+                file.write(json.dumps(w_change, ensure_ascii=False) + "\n")
+        os.replace(w_journal_tmp, self.journal)
+
+        self.device_counters = {}
+        self.device_task_ids = {}
+        for w_change in sorted(self.records.values(), key=lambda w_record: w_record["version"][1]):
+            self.index_change(w_change)
+
+    # Method index_change : adds a change in the index of its device (sorted by counter)
+    def index_change(self, p_change: dict):
+
+        w_device_id, w_counter = p_change["version"][0], p_change["version"][1]
+        w_counters = self.device_counters.setdefault(w_device_id, [])
+        w_task_ids = self.device_task_ids.setdefault(w_device_id, [])
+
+        # The changes of a device are most of the time received in order, so it's an append
+        w_position = bisect.bisect_right(w_counters, w_counter)
+        w_counters.insert(w_position, w_counter)
+        w_task_ids.insert(w_position, p_change["task_id"])
+
+    # Method apply_change : keeps the change if it's the latest version of the record (last writer wins)
+    def apply_change(self, p_change: dict):
+
+        w_current_change = self.records.get(p_change["task_id"])
+
+        if w_current_change is None or version_wins(p_change["version"], w_current_change["version"]) is True:
+            self.records[p_change["task_id"]] = p_change
+            return True
+
+        return False
+
+    # Method changes_since : returns the latest changes not covered by the version vector received
+    def changes_since(self, p_version_vector: dict):
+
+        # Miscellaneous initializations
+        w_changes = []
+
+        for w_device_id, w_counters in self.device_counters.items():
+
+            # Skipping directly to the 1st counter unknown by the client
+            w_start = bisect.bisect_right(w_counters, p_version_vector.get(w_device_id, 0))
+            w_task_ids = self.device_task_ids[w_device_id]
+
+            for w_position in range(w_start, len(w_counters)):
+
+                # Only the latest version of a record is sent (older entries of the index are skipped)
+                w_change = self.records[w_task_ids[w_position]]
+                if w_change["version"][0] == w_device_id and w_change["version"][1] == w_counters[w_position]:
+                    w_changes.append(w_change)
+
+        return w_changes
+
+    # Method version_vector : returns the highest counter known for each device
+    def version_vector(self):
+        return {w_device_id: w_counters[-1] for w_device_id, w_counters in self.device_counters.items() if w_counters}
+
+    # Method synchronize : applies the changes of a client, then returns what the client doesn't know yet
+    def synchronize(self, p_version_vector: dict, p_changes: list):
+
+        with self.lock:
+
+            # Applying the changes received (in the counter order) and appending the accepted ones to the journal
+            w_accepted_changes = []
+            for w_change in sorted(p_changes, key=lambda w_record: w_record["version"][1]):
+                if self.apply_change(w_change) is True:
+                    self.index_change(w_change)
+                    w_accepted_changes.append(w_change)
+
+            if w_accepted_changes:
+                with open(self.journal, "a", encoding="utf-8") as file:
+                    for w_change in w_accepted_changes:
+                        file.write(json.dumps(w_change, ensure_ascii=False) + "\n")
+
+            return self.changes_since(p_version_vector), self.version_vector()
+
+
+# Class PttSyncRequestHandler : handles one request (one JSON line) of a client
+class PttSyncRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+
+        try:
+            w_request = json.loads(self.rfile.readline().decode("utf-8"))
+        except ValueError:
+            self.send_answer({"error": "invalid JSON request"})
+            return
+
+        if w_request.get("protocol") != glb_sync_protocol_version:
+            self.send_answer({"error": "unsupported protocol version '{}'".format(w_request.get("protocol"))})
+            return
+
+        try:
+            w_changes, w_version_vector = self.server.store.synchronize(
+                w_request.get("version_vector", {}), w_request.get("changes", []))
+        except (KeyError, IndexError, TypeError):
+            self.send_answer({"error": "invalid changes received"})
+            return
+
+        self.send_answer({"changes": w_changes, "version_vector": w_version_vector})
+
+    # Method send_answer : sends the JSON answer on one line
+    def send_answer(self, p_answer: dict):
+        self.wfile.write(json.dumps(p_answer, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+# Class PttSyncServer : threaded TCP server sharing the same store between the requests
+class PttSyncServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, p_host: str, p_port: int, p_store: PttSyncServerStore):
+        super().__init__((p_host, p_port), PttSyncRequestHandler)
+        self.store = p_store
+
+
+# ------------------------------------------- #
+# Main
+# ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    w_parser = argparse.ArgumentParser(description="PTT reference sync server")
+    w_parser.add_argument("--host", default=glb_sync_default_host)
+    w_parser.add_argument("--port", type=int, default=glb_sync_default_port)
+    w_parser.add_argument("--journal", default="data/ptt_sync_server.journal")
+    w_args = w_parser.parse_args()
+
+    w_store = PttSyncServerStore(w_args.journal)
+    w_store.load()
+
+    with PttSyncServer(w_args.host, w_args.port, w_store) as w_server:
+        print("PTT sync server listening on {}:{} ({} records)".format(w_args.host, w_args.port, len(w_store.records)))
+        try:
+            w_server.serve_forever()
+        except KeyboardInterrupt:
+            sys.exit(0)
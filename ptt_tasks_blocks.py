@@ -0,0 +1,498 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_tasks_blocks.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : storage of my_tasks.json by checksummed blocks, so a damaged part of the file
+*         (power loss during a save, bad sector...) only costs the tasks of its block
+* - The tasks are saved by blocks of glb_tasks_blocks_size records, one block per line :
+*   {"crc32": "1a2b3c4d", "data": {"tasks": [...]}} (with the "descriptions" of the block
+*   if they are packed, see ptt_descriptions.py) ; the whole file is still a JSON object
+* - The CRC32 is computed on the data as written by the codec of the file ("pretty" by
+*   default, json.dumps with ensure_ascii=False, or "compact", see ptt_codecs.py) ; the
+*   codec is written after the format, and found again when loading
+* - When loading, the file is read line by line (one linear pass) : the checksum of each
+*   block is checked on its data as written (nothing is encoded again), then the data is
+*   decoded ; the damaged blocks are skipped, the others salvaged
+* - A file which is valid JSON but not laid out one block per line (reformatted by hand...)
+*   is decoded whole, each block being checked on its data encoded again
+* - The damaged parts are written in a quarantine file for inspection (before the next
+*   save overwrites them)
+* - The files of the older versions ({"tasks": [...]}, packed or not) are still loaded ; if
+*   they are damaged, the tasks found before the damage are salvaged
+* - A block without "crc32" (added or modified by hand) is loaded without check
+* - The file is written atomically (temporary file, synced on disk, then replaced)
+* - A task edited alone only encodes its block again (replace_content_task_record), the
+*   other lines being copied as they were read : the whole file is still read, written
+*   and synced again (atomic write), only the encoding of the other blocks is saved
+* - A file saved by blocks can also be read by ranges of lines (reports in parallel, see
+*   ptt_report.py)
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import re
+import json
+import zlib
+import locale
+from ptt_codecs import glb_codec_default, glb_codecs, get_codec, loads
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Number of task records saved in each block
+glb_tasks_blocks_size = 64
+
+# Format of the files saved by blocks (written at the start of the file)
+glb_tasks_blocks_format = "ptt-blocks-1"
+glb_tasks_blocks_format_line = "\"format\": \"{}\"".format(glb_tasks_blocks_format)
+
+# Lines of the file around the blocks (they are not blocks when the file is read line by line)
+glb_tasks_blocks_frame_lines = {"", "{", "}", "]", "\"blocks\": [",
+                                "\"format\": \"{}\",".format(glb_tasks_blocks_format)} | \
+                               {"\"codec\": \"{}\",".format(w_codec_name) for w_codec_name in glb_codecs}
+
+# Codec written after the format (in the 1st bytes of the file)
+glb_tasks_blocks_codec_regex = re.compile(r"\"codec\"\s*:\s*\"(\w+)\"")
+glb_tasks_blocks_header_size = 256
+
+# Keys of a block (the "crc32" key is optional)
+glb_tasks_blocks_keys = {"crc32", "data"}
+
+# Start of a block line, and position of its checksum and data : {"crc32": "1a2b3c4d", "data": {...}}
+glb_tasks_blocks_line_start = "{\"crc32\": \""
+glb_tasks_blocks_line_data = "\", \"data\": "
+glb_tasks_blocks_line_crc32_slice = slice(11, 19)
+glb_tasks_blocks_line_data_slice = slice(19, 30)
+
+# Keys every task record must have (text values)
+glb_tasks_blocks_record_keys = ["started_on", "duration", "description"]
+
+# Start of the "descriptions" and "tasks" arrays in the files of the older versions
+glb_tasks_legacy_descriptions_regex = re.compile(r"\"descriptions\"\s*:\s*")
+glb_tasks_legacy_tasks_regex = re.compile(r"\"tasks\"\s*:\s*\[")
+glb_tasks_legacy_separator_regex = re.compile(r"\s*(,?)\s*")
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttTasksContent : task records found in a tasks file, and the damaged parts skipped
+class PttTasksContent:
+    def __init__(self):
+        self.task_records = []
+        self.nbr_blocks = 0
+        self.damaged_parts = []
+        self.codec_name = glb_codec_default
+
+    # Method is_damaged : True if some parts of the file could not be loaded
+    def is_damaged(self):
+        return len(self.damaged_parts) > 0
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function block_checksum : returns the CRC32 (8 hexadecimal digits) of the data of a block
+def block_checksum(p_data_text: str):
+    return "{:08x}".format(zlib.crc32(p_data_text.encode("utf-8")))
+
+
+# Function split_task_records : yields the task records by blocks of glb_tasks_blocks_size records
+def split_task_records(p_task_records: list):
+    for w_index in range(0, len(p_task_records), glb_tasks_blocks_size):
+        yield p_task_records[w_index:w_index + glb_tasks_blocks_size]
+
+
+# Function get_content_codec : returns the codec written at the start of a tasks file content (the default one if none)
+def get_content_codec(p_content: str):
+
+    w_match = glb_tasks_blocks_codec_regex.search(p_content, 0, glb_tasks_blocks_header_size)
+    return get_codec(glb_codec_default if w_match is None else w_match.group(1))
+
+
+# Function encode_tasks_blocks : returns the content of a tasks file with the data of each block (and its checksum)
+def encode_tasks_blocks(p_blocks_data: list, p_codec_name: str = glb_codec_default):
+
+    # Note : the codec is only written if it's not the default one, so these files are the same as before
+    w_codec = get_codec(p_codec_name)
+    w_lines = ["{", "    \"format\": \"{}\",".format(glb_tasks_blocks_format)]
+    if w_codec.name != glb_codec_default:
+        w_lines.append("    \"codec\": \"{}\",".format(w_codec.name))
+    w_lines.append("    \"blocks\": [")
+
+    for w_index, w_data in enumerate(p_blocks_data):
+        w_separator = "," if w_index < len(p_blocks_data) - 1 else ""
+        w_lines.append("        " + encode_block_line(w_codec.dumps(w_data)) + w_separator)
+
+    w_lines.extend(["    ]", "}"])
+    return "\n".join(w_lines) + "\n"
+
+
+# Function encode_block_line : returns the line of a block (without indent and separator) with the checksum of its data
+def encode_block_line(p_data_text: str):
+    return "{}{}{}{}}}".format(glb_tasks_blocks_line_start, block_checksum(p_data_text), glb_tasks_blocks_line_data,
+                               p_data_text)
+
+
+# Function get_data_task_records : returns the task records of data (with their description text), None if invalid
+def get_data_task_records(p_data):
+
+    if not isinstance(p_data, dict) or not isinstance(p_data.get("tasks"), list):
+        return None
+
+    w_descriptions = p_data.get("descriptions", [])
+
+    for w_task_record in p_data["tasks"]:
+
+        if not isinstance(w_task_record, dict):
+            return None
+
+        # Packed format : the description text is found with its id
+        if "description_id" in w_task_record:
+            w_description_id = w_task_record.pop("description_id")
+            if not isinstance(w_description_id, int) or not 0 <= w_description_id < len(w_descriptions):
+                return None
+            w_task_record["description"] = w_descriptions[w_description_id]
+
+        for w_key in glb_tasks_blocks_record_keys:
+            if not isinstance(w_task_record.get(w_key), str):
+                return None
+
+    return p_data["tasks"]
+
+
+# Function get_block_task_records : returns the task records of a block if its checksum is right, None if damaged
+def get_block_task_records(p_block, p_codec=None):
+
+    # Note : a block with another key (a damaged "crc32" key for instance) is damaged
+    if not isinstance(p_block, dict) or not isinstance(p_block.get("data"), dict) or \
+            not set(p_block.keys()) <= glb_tasks_blocks_keys:
+        return None
+
+    # Note : the texts with undecodable bytes (see read_tasks_content) can't be encoded, so the block is damaged
+    try:
+        w_checksum = block_checksum((p_codec or get_codec(glb_codec_default)).dumps(p_block["data"]))
+    except UnicodeError:
+        return None
+
+    if "crc32" in p_block and p_block["crc32"] != w_checksum:
+        return None
+
+    return get_data_task_records(p_block["data"])
+
+
+# Function decode_blocks : adds the task records of the valid blocks, the damaged blocks are skipped
+def decode_blocks(p_blocks: list, p_tasks_content: PttTasksContent, p_codec):
+
+    for w_block in p_blocks:
+
+        p_tasks_content.nbr_blocks = p_tasks_content.nbr_blocks + 1
+        w_task_records = get_block_task_records(w_block, p_codec)
+
+        if w_task_records is None:
+            p_tasks_content.damaged_parts.append(json.dumps(w_block, ensure_ascii=False))
+        else:
+            p_tasks_content.task_records.extend(w_task_records)
+
+
+# Function get_line_task_records : returns the task records of a block line if its checksum (on the data as written)
+# is right, None otherwise
+def get_line_task_records(p_block_text: str):
+
+    if not p_block_text.startswith(glb_tasks_blocks_line_start) or not p_block_text.endswith("}") or \
+            p_block_text[glb_tasks_blocks_line_data_slice] != glb_tasks_blocks_line_data:
+        return None
+
+    # Note : the texts with undecodable bytes (see read_tasks_content) can't be encoded, so the block is damaged
+    w_data_text = p_block_text[glb_tasks_blocks_line_data_slice.stop:-1]
+    try:
+        if block_checksum(w_data_text) != p_block_text[glb_tasks_blocks_line_crc32_slice]:
+            return None
+    except UnicodeError:
+        return None
+
+    return get_data_task_records(loads(w_data_text))
+
+
+# Function salvage_blocks : reads a file saved by blocks line by line, the lines which are not valid blocks are skipped
+def salvage_blocks(p_content: str, p_tasks_content: PttTasksContent, p_codec):
+
+    # Note : only "\n" ends a line, the descriptions may contain the other line separators of Unicode (U+2028...)
+    for w_line in p_content.split("\n"):
+
+        w_text = w_line.strip()
+        if w_text in glb_tasks_blocks_frame_lines:
+            continue
+
+        # Note : a truncated line, or several lines merged by a lost newline, are not valid JSON
+        # A block modified by hand (no checksum, other spaces...) is checked on its data encoded again
+        p_tasks_content.nbr_blocks = p_tasks_content.nbr_blocks + 1
+        w_block_text = w_text[:-1] if w_text.endswith(",") else w_text
+        try:
+            w_task_records = get_line_task_records(w_block_text)
+            if w_task_records is None:
+                w_task_records = get_block_task_records(loads(w_block_text), p_codec)
+        except ValueError:
+            w_task_records = None
+
+        if w_task_records is None:
+            p_tasks_content.damaged_parts.append(w_line)
+        else:
+            p_tasks_content.task_records.extend(w_task_records)
+
+
+# Function replace_line_task_record : returns a block line where the record with the same task id is replaced by the
+# record received (only this block is encoded again), None if the line is not a valid block with this task id
+def replace_line_task_record(p_line: str, p_task_record: dict, p_codec):
+
+    w_text = p_line.strip()
+    w_separator = "," if w_text.endswith(",") else ""
+    w_block_text = w_text[:-1] if w_separator else w_text
+
+    # The checksum is checked first (a damaged block is never written again)
+    try:
+        if get_line_task_records(w_block_text) is None:
+            return None
+        w_data = loads(w_block_text[glb_tasks_blocks_line_data_slice.stop:-1])
+    except ValueError:
+        return None
+
+    for w_position, w_task_record in enumerate(w_data["tasks"]):
+        if w_task_record.get("task_id") == p_task_record["task_id"]:
+            break
+    else:
+        return None
+
+    # Packed block : the description is added in the descriptions of the block if needed (the descriptions which are
+    # not used anymore are only removed by the next save of the whole file)
+    w_task_record = dict(p_task_record)
+    if "descriptions" in w_data:
+        w_description = w_task_record.pop("description")
+        if w_description not in w_data["descriptions"]:
+            w_data["descriptions"].append(w_description)
+        w_task_record["description_id"] = w_data["descriptions"].index(w_description)
+
+    w_data["tasks"][w_position] = w_task_record
+
+    return p_line[:len(p_line) - len(p_line.lstrip())] + encode_block_line(p_codec.dumps(w_data)) + w_separator
+
+
+# Function replace_content_task_record : returns the content of a tasks file where only the block of a record is
+# encoded again with the record received, None if the record is not found in a valid block (the whole file is saved)
+def replace_content_task_record(p_content: str, p_task_record: dict):
+
+    # Only a file saved by blocks, one block per line, can be changed block by block
+    if glb_tasks_blocks_format_line not in p_content[:glb_tasks_blocks_header_size]:
+        return None
+
+    w_codec = get_content_codec(p_content)
+    w_task_id_text = json.dumps(p_task_record["task_id"], ensure_ascii=False)
+
+    # Note : the task id may also be found in a description, the next lines are then searched too
+    w_start = p_content.find(w_task_id_text)
+    while w_start >= 0:
+
+        w_line_start = p_content.rfind("\n", 0, w_start) + 1
+        w_line_end = p_content.find("\n", w_start)
+        if w_line_end < 0:
+            w_line_end = len(p_content)
+
+        w_line = replace_line_task_record(p_content[w_line_start:w_line_end], p_task_record, w_codec)
+        if w_line is not None:
+            return p_content[:w_line_start] + w_line + p_content[w_line_end:]
+
+        w_start = p_content.find(w_task_id_text, w_line_end)
+
+    return None
+
+
+# Function salvage_legacy_task_records : returns the task records found before the damage in an older tasks file
+def salvage_legacy_task_records(p_content: str):
+
+    # Miscellaneous initializations
+    w_decoder = json.JSONDecoder()
+    w_data = {"tasks": []}
+
+    # The descriptions are saved before the tasks in the packed format
+    w_match = glb_tasks_legacy_descriptions_regex.search(p_content)
+    if w_match is not None:
+        try:
+            w_data["descriptions"] = w_decoder.raw_decode(p_content, w_match.end())[0]
+        except ValueError:
+            return []
+
+    w_match = glb_tasks_legacy_tasks_regex.search(p_content)
+    if w_match is None:
+        return []
+
+    # Decoding the records one by one until the damaged one
+    w_position = glb_tasks_legacy_separator_regex.match(p_content, w_match.end()).end()
+    while True:
+
+        try:
+            w_task_record, w_position = w_decoder.raw_decode(p_content, w_position)
+        except ValueError:
+            break
+
+        w_data["tasks"].append(w_task_record)
+        w_match = glb_tasks_legacy_separator_regex.match(p_content, w_position)
+        if w_match.group(1) != ",":
+            break
+        w_position = w_match.end()
+
+    # Keeping the valid records only, until the 1st invalid one
+    w_task_records = []
+    for w_task_record in w_data["tasks"]:
+        if get_data_task_records({"descriptions": w_data.get("descriptions", []), "tasks": [w_task_record]}) is None:
+            break
+        w_task_records.append(w_task_record)
+
+    return w_task_records
+
+
+# Function decode_tasks_content : returns the task records of a tasks file content, with its damaged parts
+def decode_tasks_content(p_content: str):
+
+    # Miscellaneous initializations
+    w_tasks_content = PttTasksContent()
+
+    # No file (or an empty one) : no tasks
+    if p_content.strip() == "":
+        return w_tasks_content
+
+    # The blocks are checked with the codec which wrote them
+    w_codec = get_content_codec(p_content)
+    w_tasks_content.codec_name = w_codec.name
+
+    # Saved by blocks, one per line : each line is checked as written
+    if glb_tasks_blocks_format_line in p_content[:glb_tasks_blocks_header_size]:
+        salvage_blocks(p_content, w_tasks_content, w_codec)
+        if not w_tasks_content.is_damaged():
+            return w_tasks_content
+
+    try:
+        w_tasks_data = loads(p_content)
+    except ValueError:
+        w_tasks_data = None
+
+    # Valid file saved by blocks, but not one block per line : each block is checked on its data encoded again
+    if isinstance(w_tasks_data, dict) and isinstance(w_tasks_data.get("blocks"), list):
+        w_tasks_content = PttTasksContent()
+        w_tasks_content.codec_name = w_codec.name
+        decode_blocks(w_tasks_data["blocks"], w_tasks_content, w_codec)
+
+    # Valid file of an older version : all the tasks, or none of them
+    elif isinstance(w_tasks_data, dict) and "tasks" in w_tasks_data:
+        w_task_records = get_data_task_records(w_tasks_data)
+        if w_task_records is None:
+            w_tasks_content.damaged_parts.append(p_content)
+        else:
+            w_tasks_content.task_records = w_task_records
+
+    # Damaged file saved by blocks : the valid blocks are salvaged (already done if its format was found)
+    elif "\"blocks\"" in p_content:
+        if w_tasks_content.nbr_blocks == 0:
+            salvage_blocks(p_content, w_tasks_content, w_codec)
+
+    # Damaged file of an older version : the tasks before the damage are salvaged, the whole content is kept aside
+    else:
+        w_tasks_content.task_records = salvage_legacy_task_records(p_content)
+        w_tasks_content.damaged_parts.append(p_content)
+
+    return w_tasks_content
+
+
+# Function read_tasks_content : reads a tasks file (default encoding of the system, like save_tasks_to_file)
+def read_tasks_content(p_file_path: str):
+
+    # Note : the undecodable bytes are kept as they are (surrogateescape), so they can be quarantined unchanged
+    with open(p_file_path, "r", errors="surrogateescape") as file:
+        return file.read()
+
+
+# Function write_tasks_content : writes a tasks file atomically (a power loss never leaves it half written)
+def write_tasks_content(p_file_path: str, p_content: str):
+
+    w_file_path_tmp = p_file_path + ".tmp"
+
+    try:
+        with open(w_file_path_tmp, "w") as file:
+            file.write(p_content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(w_file_path_tmp, p_file_path)
+
+    except OSError:
+        if os.path.exists(w_file_path_tmp):
+            os.remove(w_file_path_tmp)
+        raise
+
+
+# Function write_quarantine : writes the damaged parts of a tasks file as they were read, returns the file path
+def write_quarantine(p_quarantine_dir: str, p_file_name: str, p_tasks_content: PttTasksContent, p_now):
+
+    w_quarantine_path = os.path.join(p_quarantine_dir, "{}_{}.damaged".format(
+        os.path.splitext(os.path.basename(p_file_name))[0], p_now.strftime("%Y%m%d_%H%M%S")))
+
+    os.makedirs(p_quarantine_dir, exist_ok=True)
+    with open(w_quarantine_path, "w", errors="surrogateescape") as file:
+        for w_damaged_part in p_tasks_content.damaged_parts:
+            file.write(w_damaged_part + "\n")
+
+    return w_quarantine_path
+
+
+# Function is_blocks_file : True if a tasks file is saved by blocks (its format is written at its start)
+def is_blocks_file(p_file_path: str):
+
+    with open(p_file_path, "rb") as file:
+        return glb_tasks_blocks_format_line.encode("ascii") in file.read(glb_tasks_blocks_header_size)
+
+
+# Function read_blocks_range : returns the task records of the blocks whose line starts in a range of bytes of a file
+def read_blocks_range(p_file_path: str, p_start: int, p_end: int):
+
+    # Miscellaneous initializations
+    w_tasks_content = PttTasksContent()
+
+    with open(p_file_path, "rb") as file:
+
+        # The codec is written at the start of the file
+        w_codec = get_content_codec(file.read(glb_tasks_blocks_header_size).decode("ascii", errors="replace"))
+
+        # Note : the line started before the range belongs to the previous range
+        if p_start > 0:
+            file.seek(p_start - 1)
+            file.readline()
+        else:
+            file.seek(0)
+
+        w_position = file.tell()
+        if w_position >= p_end:
+            return w_tasks_content
+
+        # The last line started in the range is read until its end
+        w_bytes = file.read(p_end - w_position)
+        if not w_bytes.endswith(b"\n"):
+            w_bytes = w_bytes + file.readline()
+
+    # Same encoding as read_tasks_content (the newlines are never part of a multibyte character)
+    salvage_blocks(w_bytes.decode(locale.getpreferredencoding(False), errors="surrogateescape"), w_tasks_content,
+                   w_codec)
+    return w_tasks_content
@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_tasks_store.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : my_tasks.json shared by several writers (PTT, this script, hook scripts...)
+* - Each write (read, change, write) is made under an advisory lock of my_tasks.lock
+*   (fcntl on Unix, msvcrt on Windows), so a writer never overwrites the tasks written
+*   by another one in between ; the readers need no lock (the file is replaced at once)
+* - Each task record has a "revision", increased at each change written (its "version"
+*   is the one of the synchronization, see ptt_sync.py)
+* - A change can be made on the revision read before (optimistic) : if the record was
+*   changed in between, the change is appended as a new task instead of overwriting the
+*   other one (append-merge), and a deletion is dropped
+* - The command line writes my tasks where PTT does (local cache, data directory and
+*   workspace set in data/ptt_config.ini), unless --tasks is given
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+To add a task done (from a hook script for instance), go in the ptt (root) folder then :
+python ptt_tasks_store.py add --started-on "31/01/2020 09:00" --duration 01:30 --description "TICKET-1234"
+python ptt_tasks_store.py list
+python ptt_tasks_store.py edit <task_id> --duration 02:00 --if-revision 1
+python ptt_tasks_store.py delete <task_id>
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import sys
+import time
+import argparse
+from ptt_sync import new_task_id, task_fingerprint
+from ptt_import import glb_import_max_task_duration_in_sec, parse_datetime, parse_duration_in_secs, \
+    format_task_cells, started_on_sort_key
+from ptt_tasks_blocks import split_task_records, encode_tasks_blocks, decode_tasks_content, read_tasks_content, \
+    write_tasks_content
+from ptt_codecs import glb_codec_default
+from ptt_workspaces import get_config_workspace_dir
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Time to wait for the lock held by another writer, and interval between 2 tries
+glb_tasks_store_lock_timeout_in_sec = 10
+glb_tasks_store_lock_retry_in_sec = 0.005
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttTasksStoreError : raised when the tasks can't be written (lock not obtained, damaged file...)
+class PttTasksStoreError(Exception):
+    pass
+
+
+# Class PttTasksStoreLock : advisory lock of the tasks file, held during a whole write (context manager)
+class PttTasksStoreLock:
+    def __init__(self, p_lock_path: str, p_timeout_in_sec: float = glb_tasks_store_lock_timeout_in_sec):
+        self.lock_path = p_lock_path
+        self.timeout_in_sec = p_timeout_in_sec
+        self.file = None
+
+    def __enter__(self):
+
+        self.file = open(self.lock_path, "a+")
+        w_time_limit = time.monotonic() + self.timeout_in_sec
+
+        # Note : not blocking, so a writer stuck with the lock doesn't block the others forever
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_NBLCK, 1)
+                return self
+
+            except OSError:
+                if time.monotonic() > w_time_limit:
+                    self.file.close()
+                    raise PttTasksStoreError("the '{}' lock is held by another writer".format(self.lock_path))
+                time.sleep(glb_tasks_store_lock_retry_in_sec)
+
+    def __exit__(self, p_exc_type, p_exc_value, p_traceback):
+
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+
+        self.file.close()
+        return False
+
+
+# Class PttTasksStoreChange : change of a task record ("put" a record, or "delete" a task id) on a revision read before
+class PttTasksStoreChange:
+    def __init__(self, p_kind: str, p_task_record: dict, p_base_revision=None):
+        self.kind = p_kind
+        self.task_record = p_task_record
+        self.base_revision = p_base_revision
+
+
+# Class PttTasksStoreResult : task ids added, updated and removed by a commit, and the conflicts merged
+class PttTasksStoreResult:
+    def __init__(self):
+        self.added_task_ids = []
+        self.updated_task_ids = []
+        self.removed_task_ids = []
+        self.nbr_conflicts = 0
+
+
+# Class PttTasksStore : reads my tasks, and writes changes on them under the lock
+class PttTasksStore:
+    def __init__(self, p_my_tasks_json: str):
+        self.my_tasks_json = p_my_tasks_json
+        self.lock_path = os.path.splitext(p_my_tasks_json)[0] + ".lock"
+        self.codec_name = glb_codec_default
+
+    # Method lock : returns the lock to hold during a whole write of the tasks file
+    def lock(self):
+        return PttTasksStoreLock(self.lock_path)
+
+    # Method read : returns the task records of the file (no records if it doesn't exist)
+    def read(self):
+
+        try:
+            w_tasks_content = decode_tasks_content(read_tasks_content(self.my_tasks_json))
+        except FileNotFoundError:
+            return []
+        except OSError as w_error:
+            raise PttTasksStoreError("cannot read '{}' ({})".format(self.my_tasks_json, w_error))
+
+        # Note : PTT salvages a damaged file at startup (see ptt_tasks_blocks.py), it must not be overwritten before
+        if w_tasks_content.is_damaged():
+            raise PttTasksStoreError("'{}' is damaged, start PTT to salvage it".format(self.my_tasks_json))
+
+        # The file is written again with the same codec (the one chosen in PTT)
+        self.codec_name = w_tasks_content.codec_name
+
+        return w_tasks_content.task_records
+
+    # Method write : writes the task records (by blocks, replaced at once)
+    def write(self, p_task_records: list):
+
+        try:
+            write_tasks_content(self.my_tasks_json, encode_tasks_blocks(
+                [{"tasks": w_block_records} for w_block_records in split_task_records(p_task_records)],
+                self.codec_name))
+        except OSError as w_error:
+            raise PttTasksStoreError("cannot write '{}' ({})".format(self.my_tasks_json, w_error))
+
+    # Method commit : applies changes on the latest records, under the lock, and writes them
+    def commit(self, p_changes: list):
+
+        # Miscellaneous initializations
+        w_store_result = PttTasksStoreResult()
+
+        with self.lock():
+
+            w_task_records = self.read()
+            w_positions = {w_task_record.get("task_id"): w_position
+                           for w_position, w_task_record in enumerate(w_task_records)}
+
+            for w_change in p_changes:
+                apply_store_change(w_task_records, w_positions, w_change, w_store_result)
+
+            self.write(w_task_records)
+
+        return w_store_result
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function stamp_record_revisions : sets the revision of each record, increased if it changed since the revisions known
+def stamp_record_revisions(p_task_records: list, p_known_fingerprints: dict, p_known_revisions: dict):
+
+    for w_task_record in p_task_records:
+
+        w_task_id = w_task_record["task_id"]
+        w_revision = p_known_revisions.get(w_task_id, 0)
+        if p_known_fingerprints.get(w_task_id) != task_fingerprint(w_task_record):
+            w_revision = w_revision + 1
+
+        w_task_record["revision"] = w_revision
+
+
+# Function get_record_revision : returns the revision of a record (the records of the older versions have none)
+def get_record_revision(p_task_record: dict):
+
+    w_revision = p_task_record.get("revision", 0)
+    return w_revision if isinstance(w_revision, int) and not isinstance(w_revision, bool) else 0
+
+
+# Function insert_task_record : inserts a new record by start date (the newest first), under the active task (row 0)
+def insert_task_record(p_task_records: list, p_task_record: dict, p_position=None):
+
+    if p_position is None:
+        w_key = started_on_sort_key(p_task_record["started_on"])
+        p_position = min(1, len(p_task_records))
+        while p_position < len(p_task_records) and \
+                started_on_sort_key(p_task_records[p_position]["started_on"]) >= w_key:
+            p_position = p_position + 1
+
+    p_task_records.insert(p_position, p_task_record)
+    return p_position
+
+
+# Function apply_store_change : applies a change on the records, or merges it if the record changed since its revision
+def apply_store_change(p_task_records: list, p_positions: dict, p_change: PttTasksStoreChange,
+                       p_store_result: PttTasksStoreResult):
+
+    # Miscellaneous initializations
+    w_task_record = dict(p_change.task_record)
+    w_task_id = w_task_record.get("task_id") or new_task_id()
+    w_position = p_positions.get(w_task_id)
+    w_current_revision = None if w_position is None else get_record_revision(p_task_records[w_position])
+
+    # The record was changed (or removed) by another writer since it was read
+    w_is_conflict = p_change.base_revision is not None and p_change.base_revision != w_current_revision
+
+    if p_change.kind == "delete":
+
+        # Note : a deletion made on an older revision is dropped, the latest changes of the record are kept
+        if w_position is None or w_is_conflict:
+            p_store_result.nbr_conflicts = p_store_result.nbr_conflicts + int(w_is_conflict)
+            return
+
+        del p_task_records[w_position]
+        p_store_result.removed_task_ids.append(w_task_id)
+
+    # Updating the record if it's still the revision read
+    elif w_position is not None and not w_is_conflict:
+        w_task_record["task_id"] = w_task_id
+        w_task_record["revision"] = w_current_revision + 1
+        p_task_records[w_position] = w_task_record
+        p_store_result.updated_task_ids.append(w_task_id)
+        return
+
+    # New record, or record changed in between : appended as a new task (below the other version if still there)
+    else:
+        if w_is_conflict:
+            p_store_result.nbr_conflicts = p_store_result.nbr_conflicts + 1
+            w_task_id = new_task_id()
+
+        w_task_record["task_id"] = w_task_id
+        w_task_record["revision"] = 1
+        insert_task_record(p_task_records, w_task_record, None if w_position is None else w_position + 1)
+        p_store_result.added_task_ids.append(w_task_id)
+
+    # The positions after the record inserted or deleted moved
+    p_positions.clear()
+    p_positions.update({w_record.get("task_id"): w_index for w_index, w_record in enumerate(p_task_records)})
+
+
+# Function normalize_task_cells : returns the 3 texts of a task in the format of PTT (dates, durations typed in a CLI)
+def normalize_task_cells(p_started_on: str, p_duration: str, p_description: str):
+
+    w_started_on = parse_datetime(p_started_on)
+    if w_started_on is None:
+        raise PttTasksStoreError("invalid start '{}'".format(p_started_on))
+
+    w_duration_in_secs = parse_duration_in_secs(p_duration)
+    if w_duration_in_secs is None or w_duration_in_secs > glb_import_max_task_duration_in_sec:
+        raise PttTasksStoreError("invalid duration '{}' (8 hours maximum)".format(p_duration))
+
+    if p_description.strip() == "":
+        raise PttTasksStoreError("no description")
+
+    return next(format_task_cells([(w_started_on, w_duration_in_secs, p_description.strip())]))
+
+
+# Function print_task_records : prints the records (one per line, tab separated)
+def print_task_records(p_task_records: list):
+    for w_task_record in p_task_records:
+        print("\t".join([w_task_record.get("task_id", ""), str(get_record_revision(w_task_record)),
+                         w_task_record["started_on"], w_task_record["duration"], w_task_record["description"]]))
+
+
+# ------------------------------------------- #
+# Main
+# ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    w_parser = argparse.ArgumentParser(description="Reads and changes the PTT tasks (safe with PTT running)")
+    w_parser.add_argument("--tasks", default="", help="tasks file (by default, my tasks where PTT writes them : "
+                                                      "local cache, data directory and workspace of ptt_config.ini)")
+    w_subparsers = w_parser.add_subparsers(dest="command", required=True)
+
+    w_subparser = w_subparsers.add_parser("list", help="prints the tasks (task id, revision, start, duration, text)")
+
+    w_subparser = w_subparsers.add_parser("add", help="adds a task done")
+    w_subparser.add_argument("--started-on", required=True, help="start date and time (dd/mm/yyyy hh:mm)")
+    w_subparser.add_argument("--duration", required=True, help="duration (hh:mm)")
+    w_subparser.add_argument("--description", required=True)
+
+    w_subparser = w_subparsers.add_parser("edit", help="changes a task")
+    w_subparser.add_argument("task_id")
+    w_subparser.add_argument("--started-on")
+    w_subparser.add_argument("--duration")
+    w_subparser.add_argument("--description")
+    w_subparser.add_argument("--if-revision", type=int, help="revision read before (merged as a new task if changed)")
+
+    w_subparser = w_subparsers.add_parser("delete", help="deletes a task")
+    w_subparser.add_argument("task_id")
+    w_subparser.add_argument("--if-revision", type=int, help="revision read before (not deleted if changed)")
+
+    w_args = w_parser.parse_args()
+    w_tasks_store = PttTasksStore(w_args.tasks or os.path.join(get_config_workspace_dir(), "my_tasks.json"))
+
+    try:
+        if w_args.command == "list":
+            print_task_records(w_tasks_store.read())
+            sys.exit(0)
+
+        elif w_args.command == "add":
+            w_started_on, w_duration, w_description = normalize_task_cells(w_args.started_on, w_args.duration,
+                                                                            w_args.description)
+            w_change = PttTasksStoreChange("put", {"started_on": w_started_on, "duration": w_duration,
+                                                   "description": w_description})
+
+        elif w_args.command == "edit":
+            w_records_by_id = {w_task_record.get("task_id"): w_task_record for w_task_record in w_tasks_store.read()}
+            if w_args.task_id not in w_records_by_id:
+                raise PttTasksStoreError("unknown task id '{}'".format(w_args.task_id))
+
+            # Note : without --if-revision, the change is made on the revision read just now
+            w_task_record = w_records_by_id[w_args.task_id]
+            w_started_on, w_duration, w_description = normalize_task_cells(
+                w_args.started_on or w_task_record["started_on"], w_args.duration or w_task_record["duration"],
+                w_args.description or w_task_record["description"])
+            w_change = PttTasksStoreChange("put", {"task_id": w_args.task_id, "started_on": w_started_on,
+                                                   "duration": w_duration, "description": w_description},
+                                           get_record_revision(w_task_record) if w_args.if_revision is None
+                                           else w_args.if_revision)
+
+        else:
+            w_change = PttTasksStoreChange("delete", {"task_id": w_args.task_id}, w_args.if_revision)
+
+        w_store_result = w_tasks_store.commit([w_change])
+
+    except PttTasksStoreError as w_error:
+        print("ptt_tasks_store : {}".format(w_error), file=sys.stderr)
+        sys.exit(1)
+
+    print("{} added, {} updated, {} removed, {} conflict(s) merged".format(
+        len(w_store_result.added_task_ids), len(w_store_result.updated_task_ids),
+        len(w_store_result.removed_task_ids), w_store_result.nbr_conflicts))
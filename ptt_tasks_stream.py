@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_tasks_stream.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : reading of the task records of a tasks file one by one, without loading it whole
+* - Works with my_tasks.json and with the compressed backups (my_tasks_*.json.gz)
+* - The file is read by chunks and each task record is decoded with JSONDecoder.raw_decode,
+*   so the memory used doesn't depend on the number of tasks
+* - The packed format (see ptt_descriptions.py) is supported : the "descriptions" array is
+*   read first (it's saved before the "tasks" array), only the distinct texts are kept
+* - The files saved by blocks (see ptt_tasks_blocks.py) are read one block at a time, and
+*   each block is checked : a damaged block raises a PttTasksStreamError
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import io
+import re
+import gzip
+import json
+from ptt_tasks_blocks import get_block_task_records
+from ptt_codecs import glb_codec_default, get_codec
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Size of the chunks read from the file
+glb_tasks_stream_chunk_size = 65536
+
+# Whitespaces allowed between the JSON values
+glb_tasks_stream_whitespaces_regex = re.compile(r"[ \t\n\r]*")
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttTasksStreamError : raised when the tasks file can't be read (invalid JSON, unexpected structure...)
+class PttTasksStreamError(Exception):
+    pass
+
+
+# Class PttJsonStreamReader : decodes the JSON values of a text file one by one, reading it by chunks
+class PttJsonStreamReader:
+    def __init__(self, p_file, p_chunk_size: int = glb_tasks_stream_chunk_size):
+        self.file = p_file
+        self.chunk_size = p_chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.end_of_file = False
+
+    # Method read_chunk : appends the next chunk of the file to the buffer (the part already decoded is dropped)
+    def read_chunk(self):
+
+        w_chunk = self.file.read(self.chunk_size)
+        if w_chunk == "":
+            self.end_of_file = True
+
+        self.buffer = self.buffer[self.position:] + w_chunk
+        self.position = 0
+
+    # Method next_char : returns the next character which is not a whitespace ("" at the end of the file)
+    def next_char(self):
+
+        while True:
+
+            self.position = glb_tasks_stream_whitespaces_regex.match(self.buffer, self.position).end()
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+
+            if self.end_of_file is True:
+                return ""
+
+            self.read_chunk()
+
+    # Method expect : skips the next character, which must be one of the characters received
+    def expect(self, p_chars: str):
+
+        w_char = self.next_char()
+        if w_char == "" or w_char not in p_chars:
+            raise PttTasksStreamError("'{}' expected, '{}' found".format(p_chars, w_char))
+
+        self.position = self.position + 1
+        return w_char
+
+    # Method decode_value : decodes the next JSON value (more chunks are read until it's complete)
+    def decode_value(self):
+
+        self.next_char()
+
+        while True:
+
+            try:
+                w_value, w_end = self.decoder.raw_decode(self.buffer, self.position)
+
+                # A value ending with the buffer may be incomplete (a number cut by the chunk for instance)
+                if w_end < len(self.buffer) or self.end_of_file is True:
+                    self.position = w_end
+                    return w_value
+
+            except ValueError:
+                if self.end_of_file is True:
+                    raise PttTasksStreamError("invalid JSON value at character {}".format(self.position))
+
+            self.read_chunk()
+
+    # Method iter_object_items : yields (key, reader) for each item of the next JSON object
+    # Note : the value of each item must be read (decode_value, iter_array...) before the next item
+    def iter_object_items(self):
+
+        self.expect("{")
+        if self.next_char() == "}":
+            self.position = self.position + 1
+            return
+
+        while True:
+
+            w_key = self.decode_value()
+            self.expect(":")
+            yield w_key, self
+
+            if self.expect(",}") == "}":
+                return
+
+    # Method iter_array : yields each value of the next JSON array
+    def iter_array(self):
+
+        self.expect("[")
+        if self.next_char() == "]":
+            self.position = self.position + 1
+            return
+
+        while True:
+
+            yield self.decode_value()
+
+            if self.expect(",]") == "]":
+                return
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function open_tasks_file : opens a tasks file in text mode (a ".gz" file is uncompressed on the fly)
+def open_tasks_file(p_file_path: str):
+
+    # Note : same encoding as save_tasks_to_file (the default one) for my_tasks.json, utf-8 for the backups
+    if p_file_path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(p_file_path, "rb"), encoding="utf-8")
+
+    return open(p_file_path, "r")
+
+
+# Function iter_task_records : yields the task records of a tasks file one by one (with their description text)
+def iter_task_records(p_file_path: str):
+
+    # Miscellaneous initializations
+    w_descriptions = None
+    w_codec = get_codec(glb_codec_default)
+
+    with open_tasks_file(p_file_path) as w_file:
+
+        w_reader = PttJsonStreamReader(w_file)
+
+        try:
+            for w_key, w_value_reader in w_reader.iter_object_items():
+
+                if w_key == "descriptions":
+                    w_descriptions = w_value_reader.decode_value()
+
+                elif w_key == "tasks":
+
+                    for w_task_record in w_value_reader.iter_array():
+
+                        # Packed format : the description text is found with its id
+                        if "description_id" in w_task_record:
+                            if w_descriptions is None:
+                                raise PttTasksStreamError("the descriptions must be saved before the tasks")
+                            w_task_record["description"] = w_descriptions[w_task_record.pop("description_id")]
+
+                        yield w_task_record
+
+                # Codec of the blocks (written before them)
+                elif w_key == "codec":
+                    w_codec = get_codec(w_value_reader.decode_value())
+
+                # Saved by blocks : the tasks of each block are checked then yielded
+                elif w_key == "blocks":
+
+                    for w_block_number, w_block in enumerate(w_value_reader.iter_array(), 1):
+
+                        w_task_records = get_block_task_records(w_block, w_codec)
+                        if w_task_records is None:
+                            raise PttTasksStreamError("the block {} is damaged".format(w_block_number))
+
+                        yield from w_task_records
+
+                else:
+                    w_value_reader.decode_value()
+
+        except (EOFError, OSError, UnicodeDecodeError, IndexError, TypeError) as w_error:
+            raise PttTasksStreamError("cannot read the '{}' file ({})".format(p_file_path, w_error))
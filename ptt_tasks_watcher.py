@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_tasks_watcher.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : detection of the modifications of my_tasks.json made outside of PTT
+* - The signature (mtime/size) and the hash of the latest content loaded/saved by PTT are kept
+* - A change is only considered as external if the signature AND the hash differ
+* - The records found are compared (by task id) to the latest ones loaded/saved by PTT,
+*   so only the records added, updated or removed are sent to the main window
+* - The revisions of the records (see ptt_tasks_store.py) are kept too, so PTT only
+*   increases the revisions of the records it changed
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+from PyQt5 import QtCore
+from ptt_sync import new_task_id, task_fingerprint
+from ptt_tasks_blocks import decode_tasks_content, read_tasks_content
+from ptt_tasks_store import get_record_revision
+from ptt_clock import get_ptt_clock
+import os
+import hashlib
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Delay to wait for the end of the external write before reading the file (several writes = one change)
+glb_tasks_watcher_delay_in_msec = 300
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttTasksDiff : differences between the records known by PTT and the records found in the file
+class PttTasksDiff:
+    def __init__(self):
+        self.added_records = []
+        self.updated_records = []
+        self.removed_task_ids = []
+        self.previous_fingerprints = {}
+        self.positions = {}
+
+
+# Class PttTasksFileWatcher : watches my_tasks.json and emits the differences when it's modified outside of PTT
+class PttTasksFileWatcher(QtCore.QObject):
+
+    # Signal emitted with a PttTasksDiff when the file was modified outside of PTT
+    tasks_file_changed = QtCore.pyqtSignal(object)
+
+    def __init__(self, p_my_tasks_json: str):
+        super().__init__()
+        self.my_tasks_json = p_my_tasks_json
+        self.file_signature = None
+        self.content_hash = ""
+        self.fingerprints = {}
+        self.revisions = {}
+        self.watcher = None
+        self.delay_timer = None
+
+    # Method remember : memorizes the records and the content loaded or saved by PTT itself
+    def remember(self, p_task_records: list, p_content: str):
+        self.fingerprints = {w_task_record["task_id"]: task_fingerprint(w_task_record) for w_task_record in p_task_records}
+        self.revisions = {w_task_record["task_id"]: get_record_revision(w_task_record) for w_task_record in p_task_records}
+        self.content_hash = hashlib.sha1(p_content.encode("utf-8")).hexdigest()
+        self.file_signature = self.get_file_signature()
+
+    # Method remember_record : memorizes a record saved alone by PTT itself, and the content saved with it
+    def remember_record(self, p_task_record: dict, p_content: str):
+        self.fingerprints[p_task_record["task_id"]] = task_fingerprint(p_task_record)
+        self.revisions[p_task_record["task_id"]] = get_record_revision(p_task_record)
+        self.content_hash = hashlib.sha1(p_content.encode("utf-8")).hexdigest()
+        self.file_signature = self.get_file_signature()
+
+    # Method watch : starts watching the file (and its folder, since the file may be replaced or created)
+    def watch(self):
+
+        self.delay_timer = get_ptt_clock().create_timer()
+        self.delay_timer.setSingleShot(True)
+        self.delay_timer.timeout.connect(self.check_file)
+
+        self.watcher = QtCore.QFileSystemWatcher()
+        self.watcher.addPath(os.path.dirname(os.path.abspath(self.my_tasks_json)))
+        if os.path.exists(self.my_tasks_json):
+            self.watcher.addPath(self.my_tasks_json)
+
+        self.watcher.fileChanged.connect(self.file_changed)
+        self.watcher.directoryChanged.connect(self.file_changed)
+
+    # Method set_file : watches the tasks file of another workspace (nothing is known about it until it's remembered)
+    def set_file(self, p_my_tasks_json: str):
+
+        self.my_tasks_json = p_my_tasks_json
+        self.file_signature = None
+        self.content_hash = ""
+        self.fingerprints = {}
+        self.revisions = {}
+
+        if self.watcher is None:
+            return
+
+        # Note : a check delayed for the former file is cancelled
+        self.delay_timer.stop()
+        w_watched_paths = self.watcher.files() + self.watcher.directories()
+        if w_watched_paths:
+            self.watcher.removePaths(w_watched_paths)
+
+        self.watcher.addPath(os.path.dirname(os.path.abspath(self.my_tasks_json)))
+        if os.path.exists(self.my_tasks_json):
+            self.watcher.addPath(self.my_tasks_json)
+
+    # Method get_file_signature : modification time and size of the file (None if it doesn't exist)
+    def get_file_signature(self):
+        try:
+            w_stat = os.stat(self.my_tasks_json)
+            return w_stat.st_mtime_ns, w_stat.st_size
+        except OSError:
+            return None
+
+    # Method file_changed : delays the check of the file (an external write can be made in several parts)
+    def file_changed(self):
+
+        # Watching the file again if it was replaced or created
+        if os.path.exists(self.my_tasks_json) and self.my_tasks_json not in self.watcher.files():
+            self.watcher.addPath(self.my_tasks_json)
+
+        self.delay_timer.start(glb_tasks_watcher_delay_in_msec)
+
+    # Method check_file : reads the file if it was really modified and emits the differences found
+    def check_file(self):
+
+        # Quick check : it's our own file if the modification time and the size didn't change
+        w_file_signature = self.get_file_signature()
+        if w_file_signature is None or w_file_signature == self.file_signature:
+            return
+
+        # Reading the file (same encoding as load_tasks_from_file)
+        try:
+            w_content = read_tasks_content(self.my_tasks_json)
+        except IOError:
+            print("PttTasksFileWatcher.check_file : cannot open the '{}' file".format(self.my_tasks_json))
+            return
+
+        # The file was only touched (or rewritten by PTT with the same content)
+        w_content_hash = hashlib.sha1(w_content.encode("utf-8")).hexdigest()
+        if w_content_hash == self.content_hash:
+            self.file_signature = w_file_signature
+            return
+
+        # An invalid content (write in progress, or a broken file) is ignored until the next change
+        # Note : a block modified by hand must have no "crc32" anymore, otherwise it's seen as damaged
+        w_tasks_content = decode_tasks_content(w_content)
+        if w_tasks_content.is_damaged():
+            print("PttTasksFileWatcher.check_file : invalid or damaged data in '{}'".format(self.my_tasks_json))
+            return
+
+        w_task_records = w_tasks_content.task_records
+
+        # Comparing the records with the latest ones known, then the file content becomes the known one
+        w_tasks_diff = diff_task_records(self.fingerprints, w_task_records)
+        self.remember(w_task_records, w_content)
+
+        if w_tasks_diff.added_records or w_tasks_diff.updated_records or w_tasks_diff.removed_task_ids:
+            self.tasks_file_changed.emit(w_tasks_diff)
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function diff_task_records : compares the fingerprints known (by task id) with the records received
+def diff_task_records(p_fingerprints: dict, p_task_records: list):
+
+    # Miscellaneous initializations
+    w_tasks_diff = PttTasksDiff()
+    w_seen_task_ids = set()
+
+    for w_position, w_task_record in enumerate(p_task_records):
+
+        # Records added by another tool may have no task id yet
+        if w_task_record.get("task_id", "") == "":
+            w_task_record["task_id"] = new_task_id()
+
+        w_task_id = w_task_record["task_id"]
+        w_seen_task_ids.add(w_task_id)
+        w_tasks_diff.positions[w_task_id] = w_position
+
+        if w_task_id not in p_fingerprints:
+            w_tasks_diff.added_records.append(w_task_record)
+        elif p_fingerprints[w_task_id] != task_fingerprint(w_task_record):
+            w_tasks_diff.updated_records.append(w_task_record)
+            w_tasks_diff.previous_fingerprints[w_task_id] = p_fingerprints[w_task_id]
+
+    # The records which disappeared from the file
+    for w_task_id, w_fingerprint in p_fingerprints.items():
+        if w_task_id not in w_seen_task_ids:
+            w_tasks_diff.removed_task_ids.append(w_task_id)
+            w_tasks_diff.previous_fingerprints[w_task_id] = w_fingerprint
+
+    return w_tasks_diff
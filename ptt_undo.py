@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_undo.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : undo/redo stack of the operations made on the tasks
+* - An operation only keeps what's needed to be reverted (no copy of the whole list) :
+*   the records removed or added (grouped in runs of consecutive rows) and the records updated (before/after)
+* - A run of removed records is placed back just above its "anchor" (the task id of the row
+*   which was following the run), so the positions stay right even if tasks were added meanwhile
+*   (same for a run of added records when the operation is redone)
+* - The stack is limited in operations and in records kept (the oldest operations are dropped)
+* - A record is a tuple (task_id, started_on, duration, description)
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Limits of the undo stack (the latest operation is always kept, even if it's bigger)
+glb_undo_max_operations = 100
+glb_undo_max_records = 200000
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttUndoOperation : inverse data of an operation (removed runs and updated records)
+class PttUndoOperation:
+    def __init__(self, p_label: str):
+        self.label = p_label
+
+        # List of (anchor task id or "" if the run was at the end, row of the 1st record, [records])
+        self.removed_runs = []
+
+        # List of (record before, record after)
+        self.updated_records = []
+
+        # List of (anchor task id or "" if the run is at the end, row of the 1st record, [records])
+        self.added_runs = []
+
+    # Method nbr_records : number of records kept by the operation
+    def nbr_records(self):
+        return sum(len(w_run[2]) for w_run in self.removed_runs + self.added_runs) + 2 * len(self.updated_records)
+
+    # Method removed_task_ids : task ids of all the records removed by the operation
+    def removed_task_ids(self):
+        return [w_record[0] for w_run in self.removed_runs for w_record in w_run[2]]
+
+    # Method added_task_ids : task ids of all the records added by the operation
+    def added_task_ids(self):
+        return [w_record[0] for w_run in self.added_runs for w_record in w_run[2]]
+
+
+# Class PttUndoStack : undo and redo stacks of operations, limited in size
+class PttUndoStack:
+    def __init__(self, p_max_operations: int = glb_undo_max_operations, p_max_records: int = glb_undo_max_records):
+        self.max_operations = p_max_operations
+        self.max_records = p_max_records
+        self.undo_operations = []
+        self.redo_operations = []
+        self.nbr_records = 0
+
+    # Method push : adds a new operation (the operations undone can't be redone anymore)
+    def push(self, p_operation: PttUndoOperation):
+
+        self.undo_operations.append(p_operation)
+        self.redo_operations = []
+        self.nbr_records = self.count_records()
+
+        # Dropping the oldest operations when a limit is exceeded
+        while len(self.undo_operations) > 1 and \
+                (len(self.undo_operations) > self.max_operations or self.nbr_records > self.max_records):
+            self.nbr_records = self.nbr_records - self.undo_operations.pop(0).nbr_records()
+
+    # Method count_records : number of records kept by all the operations
+    def count_records(self):
+        return sum(w_operation.nbr_records() for w_operation in self.undo_operations + self.redo_operations)
+
+    # Method can_undo : True if there is an operation to undo
+    def can_undo(self):
+        return len(self.undo_operations) > 0
+
+    # Method can_redo : True if there is an operation to redo
+    def can_redo(self):
+        return len(self.redo_operations) > 0
+
+    # Method pop_undo : returns the operation to undo (it goes in the redo stack)
+    def pop_undo(self):
+        w_operation = self.undo_operations.pop()
+        self.redo_operations.append(w_operation)
+        return w_operation
+
+    # Method pop_redo : returns the operation to redo (it goes back in the undo stack)
+    def pop_redo(self):
+        w_operation = self.redo_operations.pop()
+        self.undo_operations.append(w_operation)
+        return w_operation
+
+    # Method clear : empties both stacks
+    def clear(self):
+        self.undo_operations = []
+        self.redo_operations = []
+        self.nbr_records = 0
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function build_removed_runs : groups the rows to remove (or added) in runs of consecutive rows with their anchor
+def build_removed_runs(p_rows_to_remove: list, p_nbr_rows: int, p_get_record, p_get_task_id):
+
+    # Note : p_get_record(row) returns the record of a row, p_get_task_id(row) its task id only
+    w_removed_runs = []
+    w_run_records = []
+    w_run_first_row = 0
+    w_previous_row = -2
+
+    for w_row in sorted(p_rows_to_remove):
+
+        # A gap with the previous row closes the current run (its anchor is the 1st row kept after it)
+        if w_row != w_previous_row + 1 and w_run_records:
+            w_removed_runs.append((p_get_task_id(w_previous_row + 1), w_run_first_row, w_run_records))
+            w_run_records = []
+
+        if not w_run_records:
+            w_run_first_row = w_row
+
+        w_run_records.append(p_get_record(w_row))
+        w_previous_row = w_row
+
+    # Closing the last run (no anchor if it ends with the last row)
+    if w_run_records:
+        if w_previous_row + 1 < p_nbr_rows:
+            w_removed_runs.append((p_get_task_id(w_previous_row + 1), w_run_first_row, w_run_records))
+        else:
+            w_removed_runs.append(("", w_run_first_row, w_run_records))
+
+    return w_removed_runs
+
+
+# Function group_consecutive_rows : turns rows into (first row, count) ranges, the last range first
+def group_consecutive_rows(p_rows: list):
+
+    # Note : the ranges are returned from the bottom to the top, so they can be removed in this order
+    w_ranges = []
+
+    for w_row in sorted(p_rows, reverse=True):
+        if w_ranges and w_ranges[-1][0] == w_row + 1:
+            w_ranges[-1] = (w_row, w_ranges[-1][1] + 1)
+        else:
+            w_ranges.append((w_row, 1))
+
+    return w_ranges
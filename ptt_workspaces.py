@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* --------------------------------------------------------------------------------- *
+* Application name : PTT (Python Time Tracker)
+* Script name : ptt_workspaces.py
+* Created by DCH (June 2019 -> 2020)
+* --------------------------------------------------------------------------------- *
+* Modified by XXX on the DD/MM/YYYY
+* --------------------------------------------------------------------------------- *
+* Notes : workspaces, each one with its own tasks (one per client for instance)
+* - The default workspace is the data directory itself, the other ones are the folders
+*   data/workspaces/<name>/ with the same files (my_tasks.json, backups, sync, day totals...)
+* - The workspaces left are kept in memory in a LRU cache (their tasks, the versions of the
+*   synchronization, the day totals, the undo stack...) : switching back is immediate
+* - The cache has a memory budget : the least recently used workspaces are evicted when
+*   it's exceeded (they are loaded from their files again)
+* - The size of a workspace is estimated on a sample of its items (a full count would cost
+*   more than the switch itself)
+* - A workspace kept in memory is only used if its my_tasks.json didn't change since (CLI,
+*   hook scripts, another PTT...)
+* - The reports over all the workspaces sum up the tasks kept in memory directly, and read
+*   the files of the other workspaces lazily (see ptt_report.py)
+* - No dependency on PyQt5
+* --------------------------------------------------------------------------------- *
+"""
+
+# ------------------------------------------- #
+# Imports
+# ------------------------------------------- #
+
+import os
+import re
+import sys
+import random
+import collections
+import configparser
+from ptt_memory import get_deep_size
+
+
+# ------------------------------------------- #
+# Global variables
+# ------------------------------------------- #
+
+# Folder of the workspaces, in the data directory (the default workspace is the data directory itself)
+glb_workspaces_dir = "workspaces"
+glb_workspace_default = ""
+
+# Name of a workspace : letters, digits, spaces, "-", "_" and "." (no path separators), 64 characters max
+glb_workspace_name_regex = re.compile(r"^\w[\w .\-]{0,63}$")
+
+# Memory budget of the workspaces kept in memory (in MB)
+glb_workspaces_cache_size_in_mb = 64
+
+# Number of items of a list or dict measured to estimate the size of all its items
+glb_workspace_size_sample = 500
+
+# Settings of PTT (always in /data), read by the command lines to find my tasks (see get_config_workspace_dir)
+glb_workspaces_config_ini = "data/ptt_config.ini"
+
+
+# ------------------------------------------- #
+# Classes
+# ------------------------------------------- #
+
+# Class PttWorkspaceError : raised when a workspace can't be created or used
+class PttWorkspaceError(Exception):
+    pass
+
+
+# Class PttWorkspaceState : a workspace kept in memory (tasks, versions, day totals, undo stack, known file content)
+# Note : the records are tuples (task_id, started_on, duration, description), in the order of the list
+class PttWorkspaceState:
+    def __init__(self, p_name: str, p_records: list):
+        self.name = p_name
+        self.records = p_records
+        self.file_signature = None
+        self.content_hash = ""
+        self.fingerprints = {}
+        self.revisions = {}
+        self.sync_state = None
+        self.day_totals = None
+        self.undo_stack = None
+        self.size_in_bytes = 0
+
+    # Method is_file_unchanged : returns True if the tasks file wasn't modified since the workspace was left
+    def is_file_unchanged(self, p_my_tasks_json: str):
+        return get_file_signature(p_my_tasks_json) == self.file_signature
+
+    # Method task_records : returns the tasks kept as records (same keys as in my_tasks.json)
+    def task_records(self):
+        for w_task_id, w_started_on, w_duration, w_description in self.records:
+            yield {"task_id": w_task_id, "started_on": w_started_on, "duration": w_duration,
+                   "description": w_description}
+
+
+# Class PttWorkspaceCache : workspaces kept in memory, the least recently used evicted beyond the budget
+class PttWorkspaceCache:
+    def __init__(self, p_budget_in_bytes: int):
+        self.budget_in_bytes = p_budget_in_bytes
+        self.states = collections.OrderedDict()
+        self.size_in_bytes = 0
+        self.nbr_hits = 0
+        self.nbr_misses = 0
+        self.nbr_evictions = 0
+
+    # Method put : keeps a workspace left (the most recent one), returns the names of the workspaces evicted
+    def put(self, p_state: PttWorkspaceState):
+
+        self.discard(p_state.name)
+
+        p_state.size_in_bytes = estimate_deep_size(p_state)
+        self.states[p_state.name] = p_state
+        self.size_in_bytes = self.size_in_bytes + p_state.size_in_bytes
+
+        return self.evict()
+
+    # Method take : removes and returns a workspace kept (None if it was evicted or never kept)
+    def take(self, p_name: str):
+
+        w_state = self.states.pop(p_name, None)
+
+        if w_state is None:
+            self.nbr_misses = self.nbr_misses + 1
+        else:
+            self.nbr_hits = self.nbr_hits + 1
+            self.size_in_bytes = self.size_in_bytes - w_state.size_in_bytes
+
+        return w_state
+
+    # Method peek : returns a workspace kept without changing the order of eviction (None if not kept)
+    def peek(self, p_name: str):
+        return self.states.get(p_name)
+
+    # Method discard : forgets a workspace kept (its files changed, or it's used again)
+    def discard(self, p_name: str):
+
+        w_state = self.states.pop(p_name, None)
+        if w_state is not None:
+            self.size_in_bytes = self.size_in_bytes - w_state.size_in_bytes
+
+    # Method set_budget : changes the budget (the workspaces beyond it are evicted), returns the names evicted
+    def set_budget(self, p_budget_in_bytes: int):
+        self.budget_in_bytes = p_budget_in_bytes
+        return self.evict()
+
+    # Method evict : evicts the least recently used workspaces until the budget is respected
+    # Note : a workspace bigger than the whole budget is not kept either
+    def evict(self):
+
+        w_evicted_names = []
+
+        while self.states and self.size_in_bytes > self.budget_in_bytes:
+            w_name, w_state = self.states.popitem(last=False)
+            self.size_in_bytes = self.size_in_bytes - w_state.size_in_bytes
+            self.nbr_evictions = self.nbr_evictions + 1
+            w_evicted_names.append(w_name)
+
+        return w_evicted_names
+
+    # Method names : names of the workspaces kept, from the least to the most recently used
+    def names(self):
+        return list(self.states)
+
+
+# ------------------------------------------- #
+# Functions
+# ------------------------------------------- #
+
+# Function check_workspace_name : raises an error if the name can't be the name of a workspace folder
+def check_workspace_name(p_name: str):
+
+    if p_name == glb_workspace_default:
+        return
+
+    if glb_workspace_name_regex.match(p_name) is None or p_name.strip(" .") != p_name:
+        raise PttWorkspaceError("invalid workspace name '{}'".format(p_name))
+
+
+# Function get_workspace_dir : returns the folder of the files of a workspace
+def get_workspace_dir(p_data_dir: str, p_name: str):
+
+    if p_name == glb_workspace_default:
+        return p_data_dir
+
+    return os.path.join(p_data_dir, glb_workspaces_dir, p_name)
+
+
+# Function list_workspaces : returns the names of the workspaces of the data directory (the default one first)
+def list_workspaces(p_data_dir: str):
+
+    w_names = [glb_workspace_default]
+
+    try:
+        w_entries = sorted(os.listdir(os.path.join(p_data_dir, glb_workspaces_dir)), key=str.casefold)
+    except OSError:
+        return w_names
+
+    for w_entry in w_entries:
+        if glb_workspace_name_regex.match(w_entry) is not None and \
+                os.path.isdir(os.path.join(p_data_dir, glb_workspaces_dir, w_entry)):
+            w_names.append(w_entry)
+
+    return w_names
+
+
+# Function read_config_storage : returns the data directory and the current workspace set in ptt_config.ini, like
+# ptt_main.py does (the local cache if set, else the data directory), so the command lines use the files of PTT
+# Note : read without PttConfig (no dependency on PyQt5), the settings missing or invalid give /data
+def read_config_storage(p_ptt_config_ini: str = glb_workspaces_config_ini):
+
+    w_parser = configparser.ConfigParser()
+    try:
+        w_parser.read(p_ptt_config_ini, encoding="utf-8")
+    except configparser.Error:
+        print("read_config_storage : error when reading the '{}' file".format(p_ptt_config_ini))
+
+    w_data_dir = w_parser.get("STORAGE", "local_cache_dir", fallback="") or \
+        w_parser.get("STORAGE", "data_dir", fallback="") or os.path.dirname(p_ptt_config_ini)
+
+    # The default workspace if the current one was removed meanwhile
+    w_workspace = w_parser.get("WORKSPACES", "current", fallback=glb_workspace_default)
+    if w_workspace not in list_workspaces(w_data_dir):
+        w_workspace = glb_workspace_default
+
+    return w_data_dir, w_workspace
+
+
+# Function get_config_workspace_dir : returns the folder of my tasks of the current workspace set in ptt_config.ini
+def get_config_workspace_dir(p_ptt_config_ini: str = glb_workspaces_config_ini):
+    return get_workspace_dir(*read_config_storage(p_ptt_config_ini))
+
+
+# Function create_workspace : creates the folder of a new workspace, returns it
+def create_workspace(p_data_dir: str, p_name: str):
+
+    check_workspace_name(p_name)
+    if p_name == glb_workspace_default or p_name.casefold() in [w_name.casefold()
+                                                                 for w_name in list_workspaces(p_data_dir)]:
+        raise PttWorkspaceError("the workspace '{}' already exists".format(p_name))
+
+    w_workspace_dir = get_workspace_dir(p_data_dir, p_name)
+
+    try:
+        os.makedirs(w_workspace_dir)
+    except OSError as w_error:
+        raise PttWorkspaceError("cannot create '{}' ({})".format(w_workspace_dir, w_error))
+
+    return w_workspace_dir
+
+
+# Function get_file_signature : modification time and size of a file (None if it doesn't exist), as kept by the
+# watcher of my tasks (see ptt_tasks_watcher.py)
+def get_file_signature(p_file_path: str):
+    try:
+        w_stat = os.stat(p_file_path)
+        return w_stat.st_mtime_ns, w_stat.st_size
+    except OSError:
+        return None
+
+
+# Function estimate_deep_size : returns the estimated size of an object with all the objects it refers to
+# Note : the size of the items of a big list, set or dict is extrapolated from a sample of them ; the keys of the big
+# dicts are not counted, they are mostly the task ids already counted with the records (the objects shared between
+# the items, like the descriptions, are still counted several times : the estimate is rather high)
+def estimate_deep_size(p_object, p_sample_size: int = glb_workspace_size_sample):
+
+    if isinstance(p_object, (list, tuple, dict, set, frozenset)) and len(p_object) > p_sample_size:
+        w_items = list(p_object.values()) if isinstance(p_object, dict) else list(p_object)
+        w_sample_size = sum(get_deep_size(w_item)[0] for w_item in random.sample(w_items, p_sample_size))
+        return sys.getsizeof(p_object) + w_sample_size * len(w_items) // p_sample_size
+
+    if hasattr(p_object, "__dict__") and not isinstance(p_object, type):
+        return sys.getsizeof(p_object) + sum(estimate_deep_size(w_value, p_sample_size)
+                                             for w_value in vars(p_object).values())
+
+    return get_deep_size(p_object)[0]